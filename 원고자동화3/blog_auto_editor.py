@@ -6,16 +6,25 @@ Gemini API 기반
 """
 
 import openpyxl
-import google.generativeai as genai
 import re
 import os
+import sys
 from datetime import datetime
 
+# 공용 모듈 원본은 최적화 폴더 하나 - EXE는 원고자동화v3.spec의 pathex로 함께 묶음
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '최적화'))
+from example_index import INDEX_CACHE_FILE, ExampleIndex, format_example
+from model_clients import BACKEND_ENV, needs_api_key
+from key_pool import load_api_keys
+from model_tiers import create_tiered_model, generate
+from quality_gate import check_common
+
 class BlogEditor:
     def __init__(self):
         self.api_key = ""
         self.forbidden_words = {}
         self.examples = []
+        self.example_index = None
         
         print("="*60)
         print("📝 블로그 원고 자동 수정 프로그램")
@@ -88,6 +97,10 @@ class BlogEditor:
                 if example['original'] and example['edited']:
                     self.examples.append(example)
             
+            # 비슷한 예시 검색용 색인 (예시 폴더에 캐시)
+            self.example_index = ExampleIndex.load_or_build(
+                self.examples, os.path.join('/mnt/user-data/uploads', INDEX_CACHE_FILE), log=self.log)
+            
             self.log(f"✅ 학습 예시 {len(self.examples)}개 로딩 완료")
             return True
             
@@ -97,24 +110,29 @@ class BlogEditor:
             
     def input_api_key(self):
         """API 키 입력"""
+        # 오프라인 백엔드 (GEMINI_BACKEND=replay/fake)는 API 키 불필요
+        if not needs_api_key():
+            self.log(f"🧪 오프라인 백엔드 사용: {os.getenv(BACKEND_ENV)}")
+            return True
+        
         print("\n" + "="*60)
         print("1️⃣  Gemini API 키를 입력해주세요")
         print("=" *60)
         print("💡 API 키 발급: https://aistudio.google.com/app/apikey")
+        print("💡 키 여러 개는 쉼표로 구분 (gemini_keys.json / GEMINI_API_KEYS의 키도 함께 사용)")
         
         self.api_key = input("\n🔑 API 키: ").strip()
         
-        if not self.api_key:
+        if not self.api_key and not load_api_keys():
             print("❌ API 키가 입력되지 않았습니다.")
             return False
         
         # API 키 검증
         try:
-            genai.configure(api_key=self.api_key)
-            model = genai.GenerativeModel('gemini-2.5-pro')
-            response = model.generate_content("안녕")
+            model = create_tiered_model(self.api_key, log=self.log)
+            response = model.tiers[0][1].generate_content("안녕")
             
-            self.log("✅ Gemini API 연결 성공! (모델: gemini-2.5-pro)")
+            self.log(f"✅ Gemini API 연결 성공! (모델: {' → '.join(model.names)}, 키 {len(load_api_keys(self.api_key))}개)")
             return True
             
         except Exception as e:
@@ -162,16 +180,9 @@ class BlogEditor:
     def create_prompt(self, row_data):
         """Gemini용 프롬프트 생성"""
         
-        # 예시 데이터 (처음 3개)
-        examples_text = ""
-        for i, ex in enumerate(self.examples[:3], 1):
-            examples_text += f"\n\n=== 예시 {i} ===\n"
-            examples_text += f"키워드: {ex['keyword']}\n"
-            examples_text += f"통키워드: {ex['main_keyword_count']}\n"
-            examples_text += f"조각키워드: {ex['sub_keyword_count']}\n"
-            examples_text += f"서브키워드: {ex['extra_keyword_count']}\n"
-            examples_text += f"수정 전:\n{str(ex['original'])[:300]}...\n"
-            examples_text += f"수정 후:\n{str(ex['edited'])[:300]}...\n"
+        # 예시 데이터 (키워드/내용이 비슷한 예시 최대 3개, 토큰 예산 안에서)
+        examples = self.example_index.select(row_data['keyword'], row_data['original']) if self.example_index else []
+        examples_text = "".join(format_example(i, ex) for i, ex in enumerate(examples, 1))
         
         prompt = f"""
 당신은 블로그 SEO 원고 수정 전문가입니다.
@@ -235,8 +246,7 @@ class BlogEditor:
             wb = openpyxl.load_workbook(input_file)
             ws = wb.active
             
-            genai.configure(api_key=self.api_key)
-            model = genai.GenerativeModel('gemini-2.5-pro')
+            model = create_tiered_model(self.api_key, log=self.log)
             
             total_rows = ws.max_row - 1
             
@@ -270,13 +280,16 @@ class BlogEditor:
                 row_data['original'] = corrected
                 prompt = self.create_prompt(row_data)
                 
-                response = model.generate_content(prompt)
+                response = generate(model, prompt,
+                                    validate=lambda result: not check_common(result, self.forbidden_words, []))
                 edited_text = response.text.strip()
                 
                 # 결과 저장 (H열)
                 ws.cell(row_idx, 8).value = edited_text
                 self.log(f"✅ 2단계: AI 수정 완료 (결과 글자수: {len(edited_text)}자)")
                 
+            model.log_summary()
+            
             # 저장
             output_file = input_file.replace('.xlsx', '_수정완료.xlsx')
             wb.save(output_file)
@@ -7,15 +7,25 @@ Gemini API 기반
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-import openpyxl
-import google.generativeai as genai
-import re
 import os
+import sys
 from datetime import datetime
+from queue import Empty, Queue
 import threading
 import json
 import base64
 
+# 공용 모듈 원본은 최적화 폴더 하나 - EXE는 원고자동화v3.spec의 pathex로 함께 묶음
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '최적화'))
+from editor_engine import EditorEngine
+from model_clients import BACKEND_ENV, needs_api_key
+from key_pool import load_api_keys
+from dry_run import estimate_editor
+from job_queue import DEFAULT_DB, JobQueue, collect_results, run_workers, submit_workbook
+
+# 작업 스레드가 쌓은 화면 갱신(로그, 상태 표시, 메시지 창)을 Tk 스레드가 처리하는 간격 (ms)
+UI_POLL_MS = 50
+
 class BlogEditorGUI:
     def __init__(self, root):
         self.root = root
@@ -24,15 +34,25 @@ class BlogEditorGUI:
         self.root.resizable(False, False)
         
         # 데이터 저장 변수
-        self.api_key = ""
-        self.forbidden_words = {}
-        self.examples = []
+        self.api_key = ""  # 쉼표로 구분하면 여러 키를 돌아가며 사용
+        self.config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'blog_editor_config.json')
         self.input_file = ""
         self.is_processing = False
+        self.last_model = None  # 마지막 실행 모델 (예상 시간 계산에 측정된 응답 시간 사용)
+        self.ui_events = Queue()  # (함수, 인자) - Tk는 스레드 안전하지 않아 위젯은 Tk 스레드에서만 건드림
         
         self.setup_ui()
+        self.root.after(UI_POLL_MS, self.drain_ui_events)
+        
+        # 수정 엔진 (로그는 GUI 창으로, 생성 중 글자수는 상태바로)
+        self.engine = EditorEngine(log=self.log, progress=self.show_progress)
+        
         self.load_saved_api_key()  # 저장된 API 키 불러오기
         
+        # 오프라인 백엔드 (GEMINI_BACKEND=replay/fake)는 API 키 없이 실행 가능
+        if not needs_api_key():
+            self.api_status.config(text=f"🧪 오프라인 백엔드: {os.getenv(BACKEND_ENV)}", fg="#8e44ad")
+        
     def load_saved_api_key(self):
         """저장된 API 키 불러오기"""
         try:
@@ -46,7 +66,7 @@ class BlogEditorGUI:
                         decoded_key = base64.b64decode(saved_key).decode('utf-8')
                         self.api_key = decoded_key
                         self.api_entry.insert(0, decoded_key)
-                        self.api_status.config(text="✅ 저장된 API 키 불러옴", fg="green")
+                        self.api_status.config(text=f"✅ 저장된 API 키 불러옴{self.key_count_text()}", fg="green")
                         self.log("✅ 저장된 API 키를 불러왔습니다", "#27ae60")
                         self.check_ready()
         except Exception as e:
@@ -101,7 +121,7 @@ class BlogEditorGUI:
                                    font=("맑은 고딕", 9), fg="red")
         self.api_status.pack(anchor=tk.W, pady=(5, 0))
         
-        api_help = tk.Label(api_frame, text="💡 API 키 발급: https://aistudio.google.com/app/apikey", 
+        api_help = tk.Label(api_frame, text="💡 API 키 발급: https://aistudio.google.com/app/apikey  (키 여러 개는 쉼표로 구분)", 
                            font=("맑은 고딕", 8), fg="#3498db", cursor="hand2")
         api_help.pack(anchor=tk.W)
         api_help.bind("<Button-1>", lambda e: self.open_url("https://aistudio.google.com/app/apikey"))
@@ -128,9 +148,53 @@ class BlogEditorGUI:
         run_frame = ttk.LabelFrame(main_frame, text="  3️⃣  자동 수정 실행  ", padding="10")
         run_frame.pack(fill=tk.X, pady=(0, 10))
         
-        self.run_button = ttk.Button(run_frame, text="🚀 자동 수정 시작", 
+        run_buttons = ttk.Frame(run_frame)
+        run_buttons.pack(fill=tk.X)
+        
+        self.run_button = ttk.Button(run_buttons, text="🚀 자동 수정 시작", 
                                      command=self.start_processing, state='disabled')
-        self.run_button.pack(fill=tk.X)
+        self.run_button.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        # AI 호출 없이 예상 시간/토큰/비용 (API 키 불필요)
+        self.estimate_button = ttk.Button(run_buttons, text="🧮 예상 시간/비용", 
+                                          command=self.start_estimate, state='disabled')
+        self.estimate_button.pack(side=tk.LEFT, padx=(5, 0))
+        
+        # 일시정지/취소 (처리한 행까지 저장, 다음 실행에서 이어서)
+        control_frame = ttk.Frame(run_frame)
+        control_frame.pack(fill=tk.X, pady=(5, 0))
+        
+        self.hedge_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(control_frame, text="느린 요청 중복 전송 (헤징)", 
+                        variable=self.hedge_var).pack(side=tk.LEFT)
+        
+        # AI 동시 요청 수 (원고 읽기/후처리/저장은 그 사이에 병렬로, 자동 조절이면 최대값)
+        tk.Label(control_frame, text="동시 요청", font=("맑은 고딕", 9)).pack(side=tk.LEFT, padx=(15, 5))
+        self.concurrency_var = tk.IntVar(value=8)
+        ttk.Spinbox(control_frame, from_=1, to=8, width=3, 
+                    textvariable=self.concurrency_var).pack(side=tk.LEFT)
+        
+        self.adaptive_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(control_frame, text="자동 조절", 
+                        variable=self.adaptive_var).pack(side=tk.LEFT, padx=(5, 0))
+        
+        # 화자 정보 로컬 판정 (신뢰도가 낮은 원고만 AI 화자 분석)
+        self.local_speaker_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(control_frame, text="화자 로컬 판정", 
+                        variable=self.local_speaker_var).pack(side=tk.LEFT, padx=(5, 0))
+        
+        # 작업 큐 (엑셀 옆 작업큐.db) - 같은 엑셀을 여러 PC/작업자가 행 단위로 나눠 처리
+        self.queue_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(control_frame, text="여럿이 나눠 처리", 
+                        variable=self.queue_var).pack(side=tk.LEFT, padx=(5, 0))
+        
+        self.cancel_button = ttk.Button(control_frame, text="⏹️ 취소", 
+                                        command=self.cancel_processing, state='disabled')
+        self.cancel_button.pack(side=tk.RIGHT)
+        
+        self.pause_button = ttk.Button(control_frame, text="⏸️ 일시정지", 
+                                       command=self.toggle_pause, state='disabled')
+        self.pause_button.pack(side=tk.RIGHT, padx=(0, 5))
         
         # 4. 진행 상황
         progress_frame = ttk.LabelFrame(main_frame, text="  처리 상황  ", padding="10")
@@ -153,10 +217,29 @@ class BlogEditorGUI:
         import webbrowser
         webbrowser.open(url)
         
+    def in_ui(self, func, *args):
+        """Tk 스레드에서 실행 (작업 스레드/엔진 워커 스레드에서 위젯을 바꿀 때)"""
+        self.ui_events.put((func, args))
+        
+    def drain_ui_events(self):
+        """쌓인 화면 갱신을 순서대로 처리 (Tk 스레드, UI_POLL_MS마다)"""
+        try:
+            while True:
+                func, args = self.ui_events.get_nowait()
+                func(*args)
+        except Empty:
+            pass
+        finally:
+            self.root.after(UI_POLL_MS, self.drain_ui_events)
+        
     def log(self, message, color=None):
-        """로그 출력"""
+        """로그 출력 (어느 스레드에서든 - 창에는 Tk 스레드가 씀)"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        self.progress_text.insert(tk.END, f"[{timestamp}] {message}\n")
+        self.in_ui(self.write_log, f"[{timestamp}] {message}", color)
+        
+    def write_log(self, line, color):
+        """로그 창에 한 줄 추가 (Tk 스레드)"""
+        self.progress_text.insert(tk.END, line + "\n")
         if color:
             # 마지막 줄에 색상 적용
             line_start = self.progress_text.index("end-2c linestart")
@@ -164,7 +247,19 @@ class BlogEditorGUI:
             self.progress_text.tag_add(color, line_start, line_end)
             self.progress_text.tag_config(color, foreground=color)
         self.progress_text.see(tk.END)
-        self.root.update()
+        
+    def show_progress(self, message):
+        """행별 실시간 진행 상황 (스트리밍으로 받은 글자수, 엔진 워커 스레드에서 호출)"""
+        self.in_ui(self.set_status, message, "orange")
+        
+    def set_status(self, text, color):
+        """상태 표시줄 (Tk 스레드)"""
+        self.status_label.config(text=text, fg=color)
+        
+    def key_count_text(self):
+        """키 풀 안내 (설정 파일/환경변수 키 포함, 두 개 이상일 때만)"""
+        count = len(load_api_keys(self.api_key))
+        return f" - 키 {count}개 돌아가며 사용" if count > 1 else ""
         
     def save_api_key(self):
         """API 키 저장 (검증 없이)"""
@@ -177,7 +272,7 @@ class BlogEditorGUI:
         # 파일로 저장
         self.save_api_key_to_file()
         
-        self.api_status.config(text="✅ API 키 저장 완료 (gemini-2.5-pro)", fg="green")
+        self.api_status.config(text=f"✅ API 키 저장 완료{self.key_count_text()} ({' → '.join(self.engine.model_tiers)})", fg="green")
         self.log("✅ API 키가 저장되었습니다", "#27ae60")
         self.check_ready()
         messagebox.showinfo("저장 완료", "API 키가 저장되었습니다.\n다음 실행 시 자동으로 불러옵니다.")
@@ -198,7 +293,8 @@ class BlogEditorGUI:
             
     def check_ready(self):
         """실행 가능 여부 체크"""
-        if self.api_key and self.input_file:
+        self.estimate_button.config(state='normal' if self.input_file else 'disabled')
+        if (self.api_key or load_api_keys() or not needs_api_key()) and self.input_file:
             self.run_button.config(state='normal')
             self.status_label.config(text="✅ 준비 완료 - 실행 버튼을 눌러주세요", fg="green")
         else:
@@ -211,360 +307,83 @@ class BlogEditorGUI:
         
         self.is_processing = True
         self.run_button.config(state='disabled')
+        self.estimate_button.config(state='disabled')
         self.file_button.config(state='disabled')
         self.api_button.config(state='disabled')
         
+        # 취소/일시정지 상태 초기화
+        self.engine.control.reset()
+        self.engine.hedge = self.hedge_var.get()
+        self.engine.concurrency = max(1, self.concurrency_var.get())
+        self.engine.adaptive = self.adaptive_var.get()
+        self.engine.local_speaker = self.local_speaker_var.get()
+        self.pause_button.config(text="⏸️ 일시정지", state='normal')
+        self.cancel_button.config(state='normal')
+        
         # 별도 스레드에서 처리
         thread = threading.Thread(target=self.process_file)
         thread.daemon = True
         thread.start()
         
-    def load_forbidden_words(self, base_dir):
-        """금칙어 로딩"""
-        try:
-            file_path = os.path.join(base_dir, '금칙어_리스트.xlsx')
-            
-            if not os.path.exists(file_path):
-                self.log(f"⚠️  금칙어 파일 없음: {file_path}", "#e67e22")
-                return False
-            
-            wb = openpyxl.load_workbook(file_path)
-            ws = wb.active
-            
-            for row_idx in range(3, ws.max_row + 1):
-                forbidden = ws.cell(row_idx, 2).value
-                alternatives = []
-                
-                for col_idx in range(3, 10):
-                    alt = ws.cell(row_idx, col_idx).value
-                    if alt:
-                        alternatives.append(str(alt).strip())
-                
-                if forbidden and alternatives:
-                    self.forbidden_words[str(forbidden).strip()] = alternatives
-            
-            self.log(f"✅ 금칙어 {len(self.forbidden_words)}개 로딩 완료", "#27ae60")
-            return True
-            
-        except Exception as e:
-            self.log(f"❌ 금칙어 로딩 실패: {str(e)}", "#e74c3c")
-            return False
-            
-    def load_examples(self, base_dir):
-        """학습 예시 로딩"""
-        try:
-            # 수정전후.xlsx
-            file1 = os.path.join(base_dir, '수정전후.xlsx')
-            if os.path.exists(file1):
-                wb1 = openpyxl.load_workbook(file1)
-                ws1 = wb1.active
-                
-                for row_idx in range(2, ws1.max_row + 1):
-                    example = {
-                        'keyword': ws1.cell(row_idx, 2).value,
-                        'char_count': ws1.cell(row_idx, 3).value,
-                        'main_keyword_count': ws1.cell(row_idx, 4).value,
-                        'sub_keyword_count': ws1.cell(row_idx, 5).value,
-                        'extra_keyword_count': ws1.cell(row_idx, 6).value,
-                        'original': ws1.cell(row_idx, 7).value,
-                        'edited': ws1.cell(row_idx, 8).value
-                    }
-                    if example['original'] and example['edited']:
-                        self.examples.append(example)
-            
-            # 블로그_작업_엑셀템플릿.xlsx
-            file2 = os.path.join(base_dir, '블로그_작업_엑셀템플릿.xlsx')
-            if os.path.exists(file2):
-                wb2 = openpyxl.load_workbook(file2)
-                ws2 = wb2.active
-                
-                for row_idx in range(2, ws2.max_row + 1):
-                    example = {
-                        'keyword': ws2.cell(row_idx, 2).value,
-                        'char_count': ws2.cell(row_idx, 3).value,
-                        'main_keyword_count': ws2.cell(row_idx, 4).value,
-                        'sub_keyword_count': ws2.cell(row_idx, 5).value,
-                        'extra_keyword_count': ws2.cell(row_idx, 6).value,
-                        'original': ws2.cell(row_idx, 7).value,
-                        'edited': ws2.cell(row_idx, 8).value
-                    }
-                    if example['original'] and example['edited']:
-                        self.examples.append(example)
-            
-            self.log(f"✅ 학습 예시 {len(self.examples)}개 로딩 완료", "#27ae60")
-            return len(self.examples) > 0
-            
-        except Exception as e:
-            self.log(f"❌ 예시 로딩 실패: {str(e)}", "#e74c3c")
-            return False
-            
-    def analyze_speaker(self, text, model):
-        """화자 정보 분석 (성별, 연령대, 상황)"""
-        if not text:
-            return "분석 불가"
+    def start_estimate(self):
+        """예상 시간/비용 계산 (별도 스레드, AI 호출 없음)"""
+        if self.is_processing:
+            return
+        
+        self.is_processing = True
+        self.estimate_button.config(state='disabled')
+        self.run_button.config(state='disabled')
+        self.engine.concurrency = max(1, self.concurrency_var.get())
         
+        thread = threading.Thread(target=self.estimate_file)
+        thread.daemon = True
+        thread.start()
+        
+    def estimate_file(self):
+        """드라이런: 모든 행의 프롬프트를 만들어 토큰/시간/비용 추정"""
         try:
-            analysis_prompt = f"""
-다음 블로그 글을 분석하여 작성자(화자)의 정보를 유추해주세요.
-
-글:
-{text[:500]}...
-
-다음 형식으로만 답변하세요 (다른 설명 없이):
-성별: [남성/여성/알 수 없음]
-연령대: [20대/30대/40대/50대/60대 이상/알 수 없음]
-상황: [한 줄로 간단히 설명]
-
-예시:
-성별: 여성
-연령대: 30대
-상황: 자녀 키 성장 고민
-"""
-            
-            response = model.generate_content(analysis_prompt)
-            analysis = response.text.strip()
+            self.log("\n🧮 예상 시간/비용 계산 중 (AI 호출 없음)...", "#2c3e50")
+            self.in_ui(self.set_status, "🧮 계산 중...", "orange")
             
-            # 한 줄로 정리
-            analysis = analysis.replace('\n', ' / ')
+            self.engine.load_resources(os.path.dirname(self.input_file))
+            report = estimate_editor(self.engine, self.input_file, model=self.last_model, api_key=self.api_key)
+            lines = report.lines()
+            for line in lines:
+                self.log(line, "#3498db")
             
-            return analysis
+            self.in_ui(self.set_status, "✅ 예상 시간/비용 계산 완료", "green")
+            self.in_ui(messagebox.showinfo, "예상 시간/비용", "\n".join(lines))
             
         except Exception as e:
-            return f"분석 실패: {str(e)}"
-    
-    def add_line_breaks(self, text):
-        """문장마다 줄바꿈 추가"""
-        if not text:
-            return text
-        
-        # 문장 종결 부호 뒤에 줄바꿈 추가
-        # 이미 줄바꿈이 있으면 추가하지 않음
-        text = re.sub(r'([.!?])\s+', r'\1\n', text)
-        
-        # 연속된 줄바꿈을 하나로 (최대 1개)
-        text = re.sub(r'\n{2,}', '\n', text)
-        
-        return text.strip()
-    
-    def apply_basic_corrections(self, text):
-        """기본 교정"""
-        if not text:
-            return text
-        
-        # 1. 네요 -> 내요 (무조건)
-        text = text.replace('네요', '내요')
-        
-        # 2. 더라 -> 더 라 (무조건)
-        text = text.replace('더라', '더 라')
-        
-        # 3. 이모티콘 앞뒤 띄어쓰기 처리 (서브키워드 카운팅을 위해)
-        emoticons = ['^^', '??', '!!', '~~', '...', 'ㅠㅠ', 'ㅜㅜ', 'ㅎㅎ', ';;', '--', 'ㅋㅋ']
-        
-        for emoticon in emoticons:
-            # 이모티콘 앞에 띄어쓰기 없으면 추가
-            # "좋아요^^" → "좋아요 ^^"
-            text = re.sub(r'([^\s])' + re.escape(emoticon), r'\1 ' + emoticon, text)
+            self.log(f"\n❌ 예상 계산 오류: {str(e)}", "#e74c3c")
+            self.in_ui(self.set_status, "❌ 오류 발생", "red")
+            self.in_ui(messagebox.showerror, "오류", f"예상 계산 중 오류가 발생했습니다:\n{str(e)}")
             
-            # 이모티콘 뒤 문장부호 제거하고 띄어쓰기
-            # "^^ ." → "^^ "
-            text = text.replace(f'{emoticon}.', f'{emoticon} ')
-            text = text.replace(f'{emoticon},', f'{emoticon} ')
-            text = text.replace(f'{emoticon}!', f'{emoticon} ')
-            text = text.replace(f'{emoticon}?', f'{emoticon} ')
+        finally:
+            self.in_ui(self.finish_estimate)
             
-            # 이모티콘 뒤에 아무것도 없거나 문자가 바로 오면 띄어쓰기 추가
-            # "^^ 다음" 은 그대로, "^^다음" → "^^ 다음"
-            text = re.sub(re.escape(emoticon) + r'([^\s.,!?])', emoticon + r' \1', text)
-        
-        # 4. 금칙어 치환
-        for forbidden, alternatives in self.forbidden_words.items():
-            if forbidden in text and alternatives:
-                text = text.replace(forbidden, alternatives[0])
-        
-        return text
-    
-    def clean_markdown(self, text):
-        """마크다운 형식 제거"""
-        if not text:
-            return text
-        
-        # ** 강조 제거
-        text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
-        
-        # * 강조 제거
-        text = re.sub(r'\*([^*]+)\*', r'\1', text)
-        
-        # # 헤더 제거
-        text = re.sub(r'^#+\s+', '', text, flags=re.MULTILINE)
-        
-        # 마크다운 코드 블록 제거 (```로 둘러싸인 부분)
-        text = re.sub(r'```[^`]*```', '', text, flags=re.DOTALL)
-        
-        return text.strip()
-    
-    def parse_keyword_rule(self, rule_text):
-        """키워드 규칙 파싱"""
-        if not rule_text:
-            return ""
-        
-        rule_text = str(rule_text).strip()
-        
-        # "키워드 : 숫자" 형식 파싱
-        match = re.match(r'(.+?)\s*:\s*(\d+)', rule_text)
-        if match:
-            keyword = match.group(1).strip()
-            count = match.group(2).strip()
-            return f"'{keyword}'를 정확히 {count}번 반복 (±1 허용)"
-        
-        return rule_text
-    
-    def parse_sub_keywords(self, rule_text):
-        """조각 키워드 규칙 파싱"""
-        if not rule_text:
-            return ""
-        
-        rule_text = str(rule_text).strip()
-        
-        # 여러 줄로 나뉜 경우 처리
-        lines = rule_text.split('\n')
-        parsed_rules = []
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
+    def finish_estimate(self):
+        """예상 계산 끝 - 버튼 복구 (Tk 스레드)"""
+        self.is_processing = False
+        self.check_ready()
             
-            # "키워드 : 숫자" 형식 파싱
-            match = re.match(r'(.+?)\s*:\s*(\d+)', line)
-            if match:
-                keyword = match.group(1).strip()
-                count = match.group(2).strip()
-                parsed_rules.append(f"'{keyword}' {count}번")
-        
-        if parsed_rules:
-            return ", ".join(parsed_rules) + " 각각 반복 (±1 허용)"
-        
-        return rule_text
-        
-    def create_prompt(self, row_data):
-        """Gemini용 프롬프트 생성"""
-        
-        # 키워드 규칙 파싱
-        main_keyword_rule = self.parse_keyword_rule(row_data['main_keyword_count'])
-        sub_keyword_rule = self.parse_sub_keywords(row_data['sub_keyword_count'])
-        extra_keyword_count = str(row_data['extra_keyword_count']).strip() if row_data['extra_keyword_count'] else "0"
-        
-        # 글자수 및 오차 계산
-        target_chars = int(row_data['char_count']) if row_data['char_count'] else 1000
-        char_tolerance = int(target_chars * 0.05)  # 5% 오차
-        
-        # 통키워드 문장 시작 횟수
-        keyword_start_count = str(row_data['keyword_start_count']).strip() if row_data['keyword_start_count'] else "2~3"
-        
-        # 금칙어 리스트 생성
-        forbidden_list = ""
-        for forbidden, alternatives in self.forbidden_words.items():
-            alt_text = ", ".join(alternatives[:3])  # 최대 3개까지만
-            forbidden_list += f"- '{forbidden}' 대신 → {alt_text} 중 문맥에 맞는 것 사용\n"
-        
-        # 예시 데이터 (처음 3개)
-        examples_text = ""
-        for i, ex in enumerate(self.examples[:3], 1):
-            examples_text += f"\n\n=== 예시 {i} ===\n"
-            examples_text += f"키워드: {ex['keyword']}\n"
-            examples_text += f"통키워드: {ex['main_keyword_count']}\n"
-            examples_text += f"조각키워드: {ex['sub_keyword_count']}\n"
-            examples_text += f"서브키워드: {ex['extra_keyword_count']}\n"
-            examples_text += f"수정 전:\n{str(ex['original'])[:300]}...\n"
-            examples_text += f"수정 후:\n{str(ex['edited'])[:300]}...\n"
-        
-        prompt = f"""
-당신은 원고를 정확한 규칙에 맞춰 수정하는 전문가입니다.
-
-# 핵심 규칙
-
-## 1. 키워드 규칙
-- **통 키워드 (핵심 키워드)**: {main_keyword_rule}
-  → **중요**: 이 횟수는 첫 문단을 제외한 나머지 문단에서의 반복 횟수
-  → 첫 문단에는 무조건 2회, 나머지 문단에서만 지정된 횟수 반복
-- **조각 키워드**: {sub_keyword_rule}
-  → **중요**: 이 횟수도 첫 문단을 제외한 나머지 문단에서의 반복 횟수
-- **서브 키워드 목록 수**: {extra_keyword_count}개
-  → 조각 키워드를 제외한 2회 이상 등장하는 단어의 총 개수
-  → **중요**: 단어가 부족하면 중복 문장부호 적극 활용 (^^, ??, !!, ~~, .., ㅠㅠ, ㅜㅜ, ㅎㅎ 등)
-  → 각 중복 문장부호는 서브키워드 1개로 카운팅됨
-  → 예시: ^^ 사용, ?? 사용, .. 사용, ~~ 사용 등으로 자연스럽게 개수 채우기
-
-## 2. 카운팅 규칙 (매우 중요!)
-- **띄어쓰기 단위로 카운팅**
-- "강남 맛집 추천을" → 통키워드 카운팅 안됨 (조사 '을' 붙음)
-- "강남 맛집 추천 리스트" → 통키워드 1회 카운팅 됨
-- **한글자 조사(을/를/이/가)**: 띄어쓰기 하지 말고 우회 표현 사용
-- **두글자 이상 조사(으로/에게/부터)**: 띄어쓰기 허용
-- **중복 문장부호 카운팅**: 앞뒤 띄어쓰기 필수
-  → "궁금해요 ^^ 정말" → ^^ 는 1개 서브키워드
-  → "그렇내요.." → 카운팅 안됨 (띄어쓰기 없음)
-  → "그렇내요 .." → 카운팅 됨 (띄어쓰기 있음)
-
-## 3. 첫 문단 필수 규칙 (매우 중요!)
-- **첫 문단에 핵심 키워드 정확히 2회 등장 필수**
-- 핵심 키워드 사이에 2문장 이상 삽입
-- 예시: "페퍼로니피자 다이어트 관련해서 요즘 알아보고 있어요. (중간 2문장) 페퍼로니피자 다이어트 정보를 찾아보니..."
-- **주의**: 첫 문단은 첫 번째 문단 구분(줄바꿈) 전까지를 의미함
-
-## 4. 핵심 키워드로 시작하는 문장
-- 글 전체에서 핵심 키워드로 시작하는 문장이 {keyword_start_count}개 있어야 함
-- 예: "강남 맛집 추천을 받아서..." (X - 조사 붙음)
-- 예: "강남 맛집 추천 리스트를 보면..." (O - 띄어쓰기 유지)
-
-## 5. 글 구조
-- **도입부**: 고민/궁금증/경험 소개
-- **중간부**: 자연스러운 키워드 반복
-- **마무리**: 댓글 유도 (정보 공유 요청, 질문 등)
-
-## 6. 키워드 부족 시
-- **일반 단어 부족**: 자연스러운 문맥에 추가 삽입
-- **서브키워드 부족**: 중복 문장부호를 적극 활용하여 채우기
-  → ^^, ??, !!, ~~, ..., ㅠㅠ, ㅜㅜ, ㅎㅎ 등을 문장 끝이나 중간에 자연스럽게 배치
-  → 각 중복 문장부호는 앞뒤 띄어쓰기 필수 (예: "궁금해요 ^^ 정말" / "그렇네요 ...")
-  → 개수가 다르면 다른 서브키워드 (예: ?? 와 ??? 는 별개)
-- **그래도 부족하면**: 마지막에 #해시태그 형식으로 추가
-  → 맛집 서브키워드 추가시 예: # 강남 맛집 # 맛집 추천
-
-## 7. 글자수
-- 목표: 약 {target_chars}자 (±{char_tolerance}자, 목표의 ±5% 허용)
-
-## 8. 금칙어 (절대 사용 금지)
-**다음 단어들은 절대 사용하지 말고, 문맥에 맞는 대체어를 사용하세요:**
-
-{forbidden_list}
-
-# 학습 예시 (패턴 참고)
-{examples_text}
-
-# 수정할 원고
-**키워드**: {row_data['keyword']}
-
-{row_data['original']}
-
-# 지시사항
-위 모든 규칙을 정확히 지키면서 자연스럽고 읽기 편한 블로그 글로 수정하세요.
-
-**특히 중요:**
-1. 첫 문단(첫 번째 줄바꿈 전까지)에 '{row_data['keyword']}' 정확히 2회 포함
-2. **첫 문단 이후 나머지 문단에서** 통키워드와 조각키워드는 지정된 횟수만큼만 사용
-3. 서브키워드 목표 개수를 맞추기 위해 중복 문장부호(^^, ??, !!, ㅠㅠ, ㅜㅜ, ..., ~~ 등) 적극 활용
-4. 통키워드로 시작하는 문장 2~3개 포함
-5. **금칙어는 절대 사용하지 말고 문맥에 맞는 대체어 사용**
-
-**예시:**
-- 통키워드 0회 지정 = 첫 문단에만 2회, 나머지 문단 0회
-- 조각키워드 '다이어트' 3회 지정 = 첫 문단 제외하고 3회
-
-**수정된 원고만 출력**하고, 설명이나 주석은 절대 붙이지 마세요.
-"""
-        
-        return prompt
+    def toggle_pause(self):
+        """일시정지/재개 (진행 중인 원고는 끝까지 처리 후 멈춤)"""
+        if self.engine.control.paused:
+            self.engine.control.resume()
+            self.pause_button.config(text="⏸️ 일시정지")
+            self.status_label.config(text="⏳ 처리 중...", fg="orange")
+        else:
+            self.engine.control.pause()
+            self.pause_button.config(text="▶️ 재개")
+            self.status_label.config(text="⏸️ 일시정지 - 현재 원고까지 처리 후 저장하고 멈춥니다", fg="#f39c12")
+            
+    def cancel_processing(self):
+        """취소 (진행 중인 요청은 버리고 처리한 행까지 저장)"""
+        self.engine.control.cancel()
+        self.pause_button.config(state='disabled')
+        self.cancel_button.config(state='disabled')
+        self.status_label.config(text="⏹️ 취소 중... 처리한 원고까지 저장합니다", fg="#e67e22")
         
     def process_file(self):
         """파일 처리 메인 로직"""
@@ -572,100 +391,85 @@ class BlogEditorGUI:
             self.log("\n" + "="*60, "#2c3e50")
             self.log("🚀 자동 수정 시작...", "#2c3e50")
             self.log("="*60, "#2c3e50")
-            self.status_label.config(text="⏳ 처리 중...", fg="orange")
+            self.in_ui(self.set_status, "⏳ 처리 중...", "orange")
             
             # 같은 폴더 경로
             base_dir = os.path.dirname(self.input_file)
             
-            # 금칙어 로딩
-            if not self.load_forbidden_words(base_dir):
-                messagebox.showwarning("경고", "금칙어 파일을 찾을 수 없습니다.\n같은 폴더에 '금칙어_리스트.xlsx'를 넣어주세요.")
-            
-            # 예시 로딩
-            if not self.load_examples(base_dir):
-                messagebox.showwarning("경고", "예시 파일을 찾을 수 없습니다.\n같은 폴더에 '수정전후.xlsx', '블로그_작업_엑셀템플릿.xlsx'를 넣어주세요.")
+            # 금칙어/예시 로딩 (세 파일 동시에, 이번 세션에서 이미 읽은 파일은 바뀐 경우에만 다시 읽음)
+            forbidden_loaded, examples_loaded = self.engine.load_resources(base_dir)
+            if not forbidden_loaded:
+                self.in_ui(messagebox.showwarning, "경고", "금칙어 파일을 찾을 수 없습니다.\n같은 폴더에 '금칙어_리스트.xlsx'를 넣어주세요.")
             
-            # 입력 파일 로드
-            wb = openpyxl.load_workbook(self.input_file)
-            ws = wb.active
+            if not examples_loaded:
+                self.in_ui(messagebox.showwarning, "경고", "예시 파일을 찾을 수 없습니다.\n같은 폴더에 '수정전후.xlsx', '블로그_작업_엑셀템플릿.xlsx'를 넣어주세요.")
             
             # Gemini 모델 초기화
-            genai.configure(api_key=self.api_key)
-            model = genai.GenerativeModel('gemini-2.5-pro')
+            model = self.engine.create_model(self.api_key)
+            self.last_model = model
             
-            total_rows = ws.max_row - 1
+            if self.queue_var.get():
+                self.process_with_queue(model)
+                return
             
-            for row_idx in range(2, ws.max_row + 1):
-                self.log(f"\n{'─'*60}", "#95a5a6")
-                self.log(f"📄 {row_idx-1}/{total_rows}번째 원고 처리 중...", "#3498db")
-                self.log(f"{'─'*60}", "#95a5a6")
-                
-                # 데이터 추출 (새 양식)
-                row_data = {
-                    'keyword': ws.cell(row_idx, 2).value,  # B열: 키워드
-                    'main_keyword_count': ws.cell(row_idx, 4).value,  # D열: 통키워드 반복수
-                    'sub_keyword_count': ws.cell(row_idx, 5).value,  # E열: 조각키워드 반복수
-                    'original': ws.cell(row_idx, 7).value,  # G열: 원고
-                    'char_count': ws.cell(row_idx, 10).value,  # J열: 실제 글자수
-                    'keyword_start_count': ws.cell(row_idx, 11).value,  # K열: 문장시작통키워드 수
-                    'extra_keyword_count': ws.cell(row_idx, 12).value  # L열: 보정 서브키워드 목록 수
-                }
-                
-                if not row_data['original']:
-                    self.log(f"⚠️  {row_idx}행: 원고 없음, 건너뜀", "#e67e22")
-                    continue
-                
-                self.log(f"키워드: {row_data['keyword']}")
-                self.log(f"목표 글자수: {row_data['char_count']}자")
-                
-                # AI 수정
-                self.log("⏳ AI 수정 중... (10~30초 소요)", "#f39c12")
-                prompt = self.create_prompt(row_data)
-                
-                response = model.generate_content(prompt)
-                edited_text = response.text.strip()
-                
-                # 마크다운 형식 제거
-                edited_text = self.clean_markdown(edited_text)
-                
-                # AI 생성 후 기본 교정 적용 (네요→내요, 더라→더 라, 금칙어)
-                edited_text = self.apply_basic_corrections(edited_text)
-                
-                # 문장마다 줄바꿈 추가
-                edited_text = self.add_line_breaks(edited_text)
-                
-                # 결과 저장 (M열 = 13번)
-                ws.cell(row_idx, 13).value = edited_text
-                self.log(f"✅ AI 수정 및 교정 완료 (결과 글자수: {len(edited_text)}자)", "#27ae60")
-                
-                # 화자 분석 (N열 = 14번)
-                self.log("⏳ 화자 정보 분석 중...", "#3498db")
-                speaker_info = self.analyze_speaker(edited_text, model)
-                ws.cell(row_idx, 14).value = speaker_info
-                self.log(f"✅ 화자 분석 완료: {speaker_info}", "#27ae60")
-                
-            # 결과 파일 저장 (원본 파일에 덮어쓰기)
-            wb.save(self.input_file)
+            # 일괄 처리 (변경 없는 행은 이전 결과 유지, 원본 파일에 덮어쓰기)
+            summary = self.engine.process_workbook(self.input_file, model)
+            
+            if summary['cancelled']:
+                self.log(f"\n⏹️  취소됨 - 처리한 원고 {summary['processed']}개까지 저장 (다시 실행하면 이어서 처리)", "#e67e22")
+                self.in_ui(self.set_status, "⏹️ 취소됨 (처리한 원고까지 저장)", "#e67e22")
+                self.in_ui(messagebox.showinfo, "취소", f"취소되었습니다.\n\n처리한 원고 {summary['processed']}개까지 저장됨:\n{self.input_file}")
+                return
             
             self.log("\n" + "="*60, "#2c3e50")
             self.log("🎉 모든 작업 완료!", "#27ae60")
             self.log("="*60, "#2c3e50")
+            self.log(f"⏭️  규칙 통과 원고 {summary['ai_skipped']}개는 AI 수정 생략 (O열에 판정 기록)", "#3498db")
+            self.log(f"🔁 중복 원고 {summary['deduplicated']}개는 기존 결과 재사용", "#3498db")
+            self.log(f"♻️  변경 없는 원고 {summary['reused']}개는 이전 결과 유지", "#3498db")
             self.log(f"📁 저장 위치: {self.input_file}", "#3498db")
             
-            self.status_label.config(text="✅ 완료!", fg="green")
+            self.in_ui(self.set_status, "✅ 완료!", "green")
             
-            messagebox.showinfo("완료", f"수정이 완료되었습니다!\n\n원본 파일에 저장됨:\n{self.input_file}")
+            self.in_ui(messagebox.showinfo, "완료", f"수정이 완료되었습니다!\n\n원본 파일에 저장됨:\n{self.input_file}")
             
         except Exception as e:
             self.log(f"\n❌ 오류 발생: {str(e)}", "#e74c3c")
-            self.status_label.config(text="❌ 오류 발생", fg="red")
-            messagebox.showerror("오류", f"처리 중 오류가 발생했습니다:\n{str(e)}")
+            self.in_ui(self.set_status, "❌ 오류 발생", "red")
+            self.in_ui(messagebox.showerror, "오류", f"처리 중 오류가 발생했습니다:\n{str(e)}")
             
         finally:
-            self.is_processing = False
-            self.run_button.config(state='normal')
-            self.file_button.config(state='normal')
-            self.api_button.config(state='normal')
+            self.in_ui(self.finish_processing)
+            
+    def finish_processing(self):
+        """처리 끝 - 버튼 복구 (Tk 스레드)"""
+        self.is_processing = False
+        self.run_button.config(state='normal')
+        self.estimate_button.config(state='normal')
+        self.file_button.config(state='normal')
+        self.api_button.config(state='normal')
+        self.pause_button.config(text="⏸️ 일시정지", state='disabled')
+        self.cancel_button.config(state='disabled')
+            
+    def process_with_queue(self, model):
+        """작업 큐로 처리 - 엑셀 옆 작업큐.db에 행을 등록하고, 같은 엑셀을 연 다른 작업자와 나눠 처리 후 결과 모음"""
+        queue = JobQueue(os.path.join(os.path.dirname(self.input_file), DEFAULT_DB))
+        batch = submit_workbook(queue, self.engine, self.input_file)
+        stats = run_workers(queue, self.engine, model, self.engine.concurrency)
+        summary = collect_results(queue, self.engine, batch)
+        
+        self.log(f"\n📋 이 작업자가 처리한 원고 {stats['done']}개 (재시도 {stats['retried']}개)", "#3498db")
+        if self.engine.control.cancelled or summary['pending']:
+            self.log(f"⏹️  남은 원고 {summary['pending']}개는 다른 작업자가 처리 중이거나 대기 중 (다시 실행하면 이어서 처리)", "#e67e22")
+            self.in_ui(self.set_status, "⏹️ 일부만 모음 (남은 원고는 작업 큐에)", "#e67e22")
+            self.in_ui(messagebox.showinfo, "일부 완료", f"모은 원고 {summary['written']}개까지 저장됨:\n{self.input_file}")
+            return
+        
+        if summary['dead']:
+            self.log(f"❌ 실패한 원고 {summary['dead']}개는 비워 둠 (job_queue.py requeue로 다시 시도)", "#e74c3c")
+        self.log(f"📁 저장 위치: {self.input_file}", "#3498db")
+        self.in_ui(self.set_status, "✅ 완료!", "green")
+        self.in_ui(messagebox.showinfo, "완료", f"모든 작업자의 결과를 모았습니다!\n\n원본 파일에 저장됨:\n{self.input_file}")
 
 def main():
     root = tk.Tk()
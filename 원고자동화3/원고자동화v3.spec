@@ -0,0 +1,68 @@
+# -*- mode: python ; coding: utf-8 -*-
+# 빌드: pyinstaller 원고자동화v3.spec --clean  (출력: dist/원고자동화v3.exe)
+
+import os
+
+block_cipher = None
+
+# 공용 모듈(editor_engine, model_clients 등)은 최적화 폴더에만 있음 → 분석 경로에 넣어 EXE에 함께 묶음
+SHARED_DIR = os.path.join(SPECPATH, '..', '최적화')
+
+# 숨겨진 import들
+hiddenimports = [
+    'openpyxl',
+    'google.generativeai',
+    'anthropic',
+    'tkinter',
+    'tkinter.filedialog',
+    'tkinter.scrolledtext',
+    'tkinter.ttk',
+    'editor_engine',
+    'model_clients',
+    'key_pool',
+    'dry_run',
+    'job_queue',
+]
+
+icon = os.path.join(SPECPATH, 'icon.ico')
+
+a = Analysis(
+    ['blog_editor_gui.py'],
+    pathex=[SHARED_DIR],
+    binaries=[],
+    datas=[],
+    hiddenimports=hiddenimports,
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=[],
+    win_no_prefer_redirects=False,
+    win_private_assemblies=False,
+    cipher=block_cipher,
+    noarchive=False,
+)
+
+pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    [],
+    name='원고자동화v3',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    runtime_tmpdir=None,
+    console=False,  # GUI 모드 (콘솔 창 숨김)
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon=[icon] if os.path.exists(icon) else None,
+)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+AI 동시 요청 수 자동 조절 (AIMD)
+- 응답이 건강하면(정상 응답, 지연 시간 평소 수준) 조금씩 늘림: 동시 요청 수만큼 성공할 때마다 +1
+- 429(한도 초과), 마감 시간 초과, 지연 급증이면 절반으로 줄임 (최소 1)
+- 줄인 뒤에 시작한 요청의 결과만 다시 줄이는 근거로 씀 (한 번의 폭주로 연달아 줄이지 않게)
+- 지연 급증: 비슷한 길이의 요청끼리 최근 중간값의 SPIKE_RATIO배 이상
+- 시간대마다 달라지는 실제 한도를 따라감 (고정 동시 요청 수는 최대값으로만 사용)
+"""
+
+import math
+import threading
+import time
+from typing import Callable, Optional
+
+from deadlines import LatencyTracker
+
+DEFAULT_INITIAL = 2
+DEFAULT_MAXIMUM = 8
+
+# 줄이는 사유
+BACKOFF_REASONS = {'rate_limited': '429 한도 초과', 'timeout': '마감 시간 초과', 'latency': '지연 급증'}
+
+# 최근 중간값의 이 배수를 넘으면 지연 급증
+SPIKE_RATIO = 2.5
+
+# 시작 시각을 모르는 신호(키 풀의 429)는 이 시간(초) 안에 다시 줄이지 않음
+HOLD_SECONDS = 5.0
+
+
+def size_class(prompt) -> int:
+    """요청 크기 구간 (비슷한 길이의 프롬프트끼리 지연 시간 비교 - 화자 분석과 원고 수정을 섞지 않게)"""
+    return int(math.log2(len(str(prompt)) // 1000 + 1))
+
+
+class AdaptiveLimiter:
+    """동시 요청 수 제한 (AIMD, 스레드 안전)"""
+
+    def __init__(self, maximum: int = DEFAULT_MAXIMUM, initial: int = DEFAULT_INITIAL, minimum: int = 1,
+                 decrease: float = 0.5, spike_ratio: float = SPIKE_RATIO, log: Callable[[str], None] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            maximum: 최대 동시 요청 수 (GUI의 "동시 요청")
+            initial: 시작 동시 요청 수
+            minimum: 최소 동시 요청 수
+            decrease: 줄일 때 곱하는 비율
+            spike_ratio: 지연 급증 기준 (최근 중간값의 배수)
+            log: 로그 함수 (한도가 바뀔 때)
+            clock: 시간 함수 (테스트용)
+        """
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.initial = min(max(initial, self.minimum), self.maximum)
+        self.limit = float(self.initial)
+        self.decrease_ratio = decrease
+        self.spike_ratio = spike_ratio
+        self.log = log or print
+        self.clock = clock
+        self.condition = threading.Condition()
+        self.in_flight = 0
+        self.latency = {}  # 요청 크기 구간 → LatencyTracker
+        self.last_decrease = float('-inf')
+        self.increases = 0
+        self.decreases = {reason: 0 for reason in BACKOFF_REASONS}
+
+    @property
+    def current(self) -> int:
+        """지금 허용하는 동시 요청 수"""
+        return int(self.limit)
+
+    def describe(self) -> str:
+        """진행 상황 표시용 ("동시 3/8")"""
+        return f"동시 {self.current}/{self.maximum}"
+
+    def acquire(self, control=None, poll: float = 0.2) -> float:
+        """
+        자리 받기 (한도만큼 진행 중이면 대기, 취소되면 Cancelled)
+
+        Returns:
+            시작 시각 (release에 그대로 전달)
+        """
+        with self.condition:
+            while self.in_flight >= self.current:
+                if control:
+                    control.check()
+                self.condition.wait(poll)
+            self.in_flight += 1
+            return self.clock()
+
+    def release(self, started: float, outcome: str = 'ok', seconds: Optional[float] = None, size: int = 0):
+        """
+        자리 반환 + 결과 반영
+
+        Args:
+            started: acquire가 돌려준 시작 시각
+            outcome: 'ok' / 'rate_limited' / 'timeout' / 'error' (그 밖의 오류는 조절하지 않음)
+            seconds: 응답 시간 (정상 응답일 때 지연 급증 판정)
+            size: 요청 크기 구간 (size_class)
+        """
+        with self.condition:
+            saturated = self.in_flight >= self.current
+            self.in_flight -= 1
+            if outcome == 'ok' and seconds is not None:
+                tracker = self.latency.setdefault(size, LatencyTracker())
+                baseline = tracker.percentile(0.5)
+                tracker.record(seconds)
+                if baseline and seconds > baseline * self.spike_ratio:
+                    outcome = 'latency'
+
+            if outcome in BACKOFF_REASONS:
+                change = self.back_off(outcome, started >= self.last_decrease)
+            elif outcome == 'ok' and saturated:
+                change = self.grow()
+            else:
+                change = None
+            self.condition.notify_all()
+
+        if change:
+            self.log(change)
+
+    def penalize(self, reason: str = 'rate_limited'):
+        """시작 시각을 모르는 외부 신호 (키 풀에서 받은 429 등)"""
+        with self.condition:
+            change = self.back_off(reason, self.clock() - self.last_decrease >= HOLD_SECONDS)
+            self.condition.notify_all()
+        if change:
+            self.log(change)
+
+    def grow(self) -> Optional[str]:
+        """덧셈 증가 - 한도만큼 성공하면 +1 (lock 안에서)"""
+        before = self.current
+        self.limit = min(float(self.maximum), self.limit + 1.0 / max(1, before))
+        if self.limit > before + 1 - 1e-9:
+            self.limit = float(before + 1)  # 1/n을 n번 더한 부동소수 오차 정리
+        if self.current > before:
+            self.increases += 1
+            return f"🚦 동시 요청 {before} → {self.current} (응답 정상)"
+        return None
+
+    def back_off(self, reason: str, fresh: bool) -> Optional[str]:
+        """곱셈 감소 (lock 안에서, fresh가 False면 이미 줄인 뒤라 무시)"""
+        if not fresh:
+            return None
+        before = self.current
+        self.limit = max(float(self.minimum), math.floor(self.limit * self.decrease_ratio))
+        self.last_decrease = self.clock()
+        self.decreases[reason] += 1
+        if self.current < before:
+            return f"🚦 동시 요청 {before} → {self.current} ({BACKOFF_REASONS[reason]})"
+        return None
+
+    def summary(self) -> str:
+        """실행 요약"""
+        reasons = ', '.join(f"{BACKOFF_REASONS[reason]} {count}회" for reason, count in self.decreases.items() if count)
+        return (f"동시 요청 자동 조절: 시작 {self.initial} → 현재 {self.current} (최대 {self.maximum}), "
+                f"증가 {self.increases}회, 감소 {sum(self.decreases.values())}회" + (f" ({reasons})" if reasons else ""))
@@ -4,46 +4,140 @@ Gemini API를 사용한 자연스러운 블로그 원고 재구성
 - 원본 구조 최대한 유지
 - 어색한 부분만 최소한으로 수정
 - 사람이 쓴 느낌 유지
+- 수정 목록 모드: 고칠 부분만 [{문장 번호, old, new}]로 받아 로컬 적용 (출력 토큰 절감)
+- 문단 병렬 모드: 긴 원고를 문단 묶음으로 나눠 동시에 재구성 (지연 시간 단축)
+- 모델 단계: 빠른 모델 결과가 로컬 검증을 통과하면 그대로 사용, 실패 시에만 상위 모델
+- 스트리밍: 받는 도중 금칙어/마크다운/글자수 폭주가 보이면 바로 중단하고 재시도
+- 원고 전체 모드는 JSON 스키마 응답({"manuscript", "notes"}) - 로컬 검증, 형식 오류면 한 번 재시도
 """
 
 import os
 import google.generativeai as genai
-from typing import Optional
+from typing import Callable, Optional, Sequence
+
+from adaptive_limit import DEFAULT_MAXIMUM, AdaptiveLimiter
+from edit_ops import EDIT_SCHEMA, EditApplyError, apply_edits, number_sentences, parse_edits
+from paragraph_parallel import (distribute, format_context, group_paragraphs, rewrite_groups, split_paragraphs,
+                                stitch, trim_excess)
+from model_tiers import configured_tiers, create_tiered_model, generate, generate_manuscript
+from prompt_budget import AssembledPrompt, PromptAssembler
+from quality_gate import check_common
+from streaming import ProgressTracker, StreamGuard
+from structured_output import OUTPUT_INSTRUCTION, OutputFormatError
+from token_estimator import estimate_output_tokens, estimate_tokens
 
 
 class AIRewriter:
     """Gemini API를 사용한 원고 자연스럽게 다듬기"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    # Gemini 2.5 Pro 모델 사용 (사용자 확인) - 모델 단계의 최상위
+    MODEL_NAME = 'gemini-2.5-pro'
+
+    # 로컬 검증: 결과 글자수가 원본 대비 이 비율을 넘게 달라지면 실패
+    LENGTH_TOLERANCE = 0.3
+
+    # 키워드 목표 횟수 (프롬프트 "2-3회")
+    KEYWORD_MAX = 3
+
+    # 문단 병렬 모드는 이 글자수 이상 원고에만 적용
+    PARALLEL_MIN_CHARS = 800
+
+    # 프롬프트 입력 토큰 예산 (로컬 추정 기준, 넘으면 최종 체크 → 수정 예시 순으로 뺌)
+    PROMPT_TOKENS = 4000
+
+    # 출력 모드: full = 수정된 원고 전체, edits = 수정 목록 (실패하면 full로 재시도)
+    OUTPUT_MODES = ('full', 'edits')
+
+    # 금칙어 리스트 (B열만 - 사용하면 안 되는 단어)
+    FORBIDDEN_WORDS = [
+        "네요", "가격", "광고", "구매", "병원", "진단", "효과", "약효",
+        "상담", "시술", "의사", "환자", "판매", "투자", "후회",
+        "보험", "재발", "대출", "비용", "의문", "의심",
+        "산부인과", "부작용", "홍보성", "의구심", "증상", "증.상"
+    ]
+
+    FULL_OUTPUT_INSTRUCTION = f"""# 출력
+{OUTPUT_INSTRUCTION}
+"""
+
+    EDITS_OUTPUT_INSTRUCTION = """# 출력 (수정 목록만)
+원고는 [번호] 문장 단위로 나뉘어 있습니다. 원고 전체를 다시 쓰지 말고, 고칠 부분만 JSON 배열로 출력하세요.
+- sentence: 문장 번호
+- old: 그 문장 안에 있는 고칠 부분 (원문 그대로 복사, 최대한 짧게)
+- new: 바꿀 내용 (지우려면 빈 문자열)
+예: [{"sentence": 3, "old": "개선는", "new": "도움은"}]
+고칠 것이 없으면 [] 를 출력하세요.
+"""
+
+    def __init__(self, api_key: Optional[str] = None, model=None, output_mode: str = 'full',
+                 parallel_groups: int = 0, model_tiers: Optional[Sequence[str]] = None,
+                 progress: Optional[Callable[[str], None]] = None, client=None, adaptive: bool = False):
         """
         초기화
 
         Args:
-            api_key: Gemini API 키 (없으면 환경변수 GEMINI_API_KEY 사용)
+            api_key: Gemini API 키 (없으면 환경변수 GEMINI_API_KEY 사용, 쉼표 구분이면 키 풀)
+            model: generate_content()를 제공하는 모델 (테스트용 가짜 모델 등, 주면 API 키 불필요)
+            output_mode: 'full' (원고 전체) 또는 'edits' (수정 목록)
+            parallel_groups: 2 이상이면 긴 원고를 최대 이 개수의 문단 묶음으로 나눠 동시에 재구성
+            model_tiers: 모델 단계 (빠른 모델부터, 없으면 환경변수 GEMINI_MODEL_TIERS 또는 기본값)
+            progress: 진행 상황 함수 (message) - 스트리밍으로 받은 글자수를 실시간 전달
+            client: 모델 클라이언트 (없으면 환경변수 GEMINI_BACKEND 기준 - 기본은 실제 Gemini, API 키 필요)
+            adaptive: True면 동시 요청 수 자동 조절 (문단 병렬, 여러 스레드가 같은 재구성기를 쓸 때)
         """
+        if output_mode not in self.OUTPUT_MODES:
+            raise ValueError(f"output_mode는 {self.OUTPUT_MODES} 중 하나여야 합니다: {output_mode}")
+        self.output_mode = output_mode
+        self.parallel_groups = parallel_groups
+        self.model_tiers = configured_tiers(model_tiers)
+        self.progress = progress
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
 
-        if not self.api_key:
-            raise ValueError(
-                "Gemini API 키가 필요합니다. "
-                "환경변수 GEMINI_API_KEY를 설정하거나 api_key 파라미터를 전달하세요."
-            )
+        if model is not None:
+            self.model = model
+            return
 
-        # Gemini 설정
-        genai.configure(api_key=self.api_key)
-        # Gemini 2.5 Pro 모델 사용 (사용자 확인)
-        self.model = genai.GenerativeModel('gemini-2.5-pro')
+        # 모델 설정 (빠른 모델 → 검증 실패 시 상위 모델, 실제 Gemini면 API 키 없을 때 ValueError)
+        limiter = AdaptiveLimiter(maximum=max(parallel_groups, DEFAULT_MAXIMUM)) if adaptive else None
+        self.model = create_tiered_model(self.api_key, self.model_tiers, client=client, limiter=limiter)
 
-    def create_prompt(self, text: str, keyword: str) -> str:
-        """재구성 프롬프트 생성 - 어색한 부분만 최소한으로 수정"""
+    def validate_rewrite(self, original: str, result: str, keyword: Optional[str] = None) -> bool:
+        """
+        재구성 결과 로컬 검증 (실패하면 상위 모델로)
+        - 금칙어/조사 오류/치환 흔적 없음, 글자수 급변 없음, 키워드 최대 횟수 이하
+        """
+        result = result.strip()
+        if not result:
+            return False
+        if abs(len(result) - len(original)) > len(original) * self.LENGTH_TOLERANCE:
+            return False
+        if keyword and result.count(keyword) > self.KEYWORD_MAX:
+            return False
+        return not check_common(result, self.FORBIDDEN_WORDS, [keyword] if keyword else [])
+
+    def stream_guard(self, original: str) -> StreamGuard:
+        """스트리밍 검사기 - validate_rewrite에서 떨어질 것이 확실해지는 순간 중단 (원고 JSON의 원고 값만 검사)"""
+        return StreamGuard(self.FORBIDDEN_WORDS, max_chars=int(len(original) * (1 + self.LENGTH_TOLERANCE)))
+
+    def progress_tracker(self, text: str) -> Optional[ProgressTracker]:
+        """진행 상황 (progress 함수가 있을 때만, 자동 조절이면 현재 동시 요청 수도)"""
+        if not self.progress:
+            return None
+        limiter = getattr(self.model, 'limiter', None)
+        return ProgressTracker(self.progress, 'AI 재구성', len(text), status=limiter.describe if limiter else None)
+
+    def apply_edits_response(self, text: str, response_text: str) -> str:
+        """수정 목록 응답 → 적용한 원고 (EditApplyError)"""
+        edits = parse_edits(response_text)
+        return apply_edits(text, edits, forbidden_words=self.FORBIDDEN_WORDS).strip()
+
+    def build_prompt(self, text: str, keyword: str) -> AssembledPrompt:
+        """
+        재구성 프롬프트 조립 - 어색한 부분만 최소한으로 수정
+        (입력 토큰 예산 PROMPT_TOKENS를 넘으면 최종 체크 → 수정 예시 순으로 뺌)
+        """
 
-        # 금칙어 리스트 (B열만 - 사용하면 안 되는 단어)
-        forbidden_words = [
-            "네요", "가격", "광고", "구매", "병원", "진단", "효과", "약효",
-            "상담", "시술", "의사", "환자", "판매", "투자", "후회",
-            "보험", "재발", "대출", "비용", "의문", "의심",
-            "산부인과", "부작용", "홍보성", "의구심", "증상", "증.상"
-        ]
+        forbidden_words = self.FORBIDDEN_WORDS
 
         # 사용 가능한 대체어 (C열 이후 - 사용해도 되는 표현)
         allowed_replacements = """
@@ -55,7 +149,7 @@ class AIRewriter:
         - 효과 대신 → "도움" (OK) / "개선" (X - 단독 사용 시 조사 오류)
         """
 
-        prompt = f"""당신은 블로그 글의 어색한 부분만 살짝 고치는 편집자입니다.
+        intro = f"""당신은 블로그 글의 어색한 부분만 살짝 고치는 편집자입니다.
 
 ⚠️ **핵심 원칙: 원본을 거의 그대로 두세요!**
 
@@ -66,7 +160,9 @@ class AIRewriter:
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-# 🎯 당신의 임무
+"""
+
+        mission = """# 🎯 당신의 임무
 
 **원본 문장 구조를 거의 그대로 유지하되, 명백히 어색한 부분만 최소한으로 수정하세요.**
 
@@ -97,7 +193,9 @@ class AIRewriter:
    - ❌ "컨설팅" (병원에서)
    - → 너무 격식적이고 작문 같거나 말이 안 됨!
 
-## ✅ 해야 할 것
+"""
+
+        examples = """## ✅ 해야 할 것
 
 **어색한 부분만 최소한으로 수정:**
 
@@ -129,7 +227,9 @@ class AIRewriter:
 → 이미 자연스러우면 그대로 둠!
 ```
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+"""
+
+        rules = f"""━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 # 📋 수정 규칙
 
@@ -163,7 +263,9 @@ class AIRewriter:
 - 나머지는 "이거", "이런 거"
 - **원본에서 키워드를 어떻게 썼는지 보고 그대로**
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+"""
+
+        final_check = """━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 # 🎯 최종 체크
 
@@ -177,33 +279,120 @@ class AIRewriter:
 
 **중요: 명백히 어색한 부분(조사 오류, 점 표현, 금칙어)만 고치고 나머지는 원본 그대로 두세요!**
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-# 출력
-수정된 원고만 출력하세요. 설명 없이.
 """
-        return prompt
 
-    def rewrite(self, text: str, keyword: str) -> str:
+        separator = "━" * 65  # 최종 체크를 빼도 출력 지시 앞 구분선은 유지
+        assembler = PromptAssembler(self.PROMPT_TOKENS)
+        assembler.add('원고', intro)
+        assembler.add('임무', mission)
+        assembler.add('수정 예시', examples, priority=1)
+        assembler.add('수정 규칙', rules)
+        assembler.add('최종 체크', final_check, priority=2)
+        assembler.add('출력', f"{separator}\n\n{self.FULL_OUTPUT_INSTRUCTION}")
+        return assembler.build()
+
+    def create_prompt(self, text: str, keyword: str) -> str:
+        """재구성 프롬프트 (문자열)"""
+        return self.build_prompt(text, keyword).text
+
+    def log_tokens(self, prompt: AssembledPrompt, output_chars: int):
+        """입력/출력 토큰 추정 로그"""
+        print(f"  📏 AI 재구성 입력 {prompt.describe()}, 출력 약 {estimate_output_tokens(output_chars)}토큰")
+
+    def create_edits_prompt(self, text: str, keyword: str) -> str:
+        """수정 목록 모드 프롬프트 (같은 규칙 + 번호 붙인 문장 + JSON 출력 지시)"""
+        prompt = self.create_prompt(number_sentences(text), keyword)
+        return prompt.replace(self.FULL_OUTPUT_INSTRUCTION, self.EDITS_OUTPUT_INSTRUCTION)
+
+    def rewrite_with_edits(self, text: str, keyword: str) -> str:
+        """
+        수정 목록 모드 재구성
+
+        Raises:
+            EditApplyError: 응답이 수정 목록이 아니거나 원고에 적용되지 않을 때
+        """
+        def validate(response_text):
+            try:
+                return self.validate_rewrite(text, self.apply_edits_response(text, response_text), keyword)
+            except EditApplyError:
+                return False
+
+        prompt = self.create_edits_prompt(text, keyword)
+        print(f"  📏 AI 재구성(수정 목록) 입력 약 {estimate_tokens(prompt)}토큰")
+        tracker = self.progress_tracker(text)
+        response = generate(
+            self.model,
+            prompt,
+            validate=validate,
+            on_progress=tracker.callback() if tracker else None,
+            generation_config=genai.GenerationConfig(
+                response_mime_type='application/json',
+                response_schema=EDIT_SCHEMA,
+            ),
+        )
+        return self.apply_edits_response(text, response.text)
+
+    def rewrite_parallel(self, text: str, keyword: str) -> str:
+        """
+        문단 병렬 재구성 - 묶음별 동시 호출 후 순서대로 이어 붙이고 키워드 횟수 다시 맞춤
+        """
+        groups = group_paragraphs(split_paragraphs(text), self.parallel_groups)
+        if len(groups) < 2:
+            return self.rewrite(text, keyword, parallel=False)
+
+        # 키워드 2-3회를 묶음 길이 비율로 배정
+        keyword_shares = distribute(self.KEYWORD_MAX, [len(group) for group in groups])
+        tracker = self.progress_tracker(text)
+
+        def rewrite_group(group, context):
+            notes = [f"키워드 \"{keyword}\"는 이 부분에서 최대 {keyword_shares[context['index']]}회"]
+            prompt = self.create_prompt(group, keyword).replace(
+                self.FULL_OUTPUT_INSTRUCTION, format_context(context, notes) + self.FULL_OUTPUT_INSTRUCTION)
+            try:
+                manuscript, _ = generate_manuscript(
+                    self.model, prompt, validate=lambda result: self.validate_rewrite(group, result),
+                    guard=self.stream_guard(group), on_progress=tracker.callback(context['index']) if tracker else None,
+                    log=print)
+            except OutputFormatError as e:
+                print(f"  ⚠️ {context['index'] + 1}번째 부분 응답 형식 오류 ({e}) - 원래 문단 유지")
+                return group
+            return manuscript
+
+        print(f"  🧩 {len(groups)}개 부분 동시 재구성")
+        rewritten = stitch(rewrite_groups(groups, rewrite_group, log=print))
+        return trim_excess(rewritten, keyword, self.KEYWORD_MAX)
+
+    def rewrite(self, text: str, keyword: str, parallel: bool = True) -> str:
         """
         원고의 어색한 부분만 최소한으로 수정
 
         Args:
             text: 기계 치환된 어색한 원고
             keyword: 키워드
+            parallel: False면 문단 병렬 모드를 쓰지 않음
 
         Returns:
             어색한 부분만 수정한 원고
         """
         try:
-            prompt = self.create_prompt(text, keyword)
-            response = self.model.generate_content(prompt)
-
-            if response.text:
-                return response.text.strip()
-            else:
-                print("⚠️ AI 재구성 실패: 응답 없음")
-                return text
+            if parallel and self.parallel_groups > 1 and len(text) >= self.PARALLEL_MIN_CHARS:
+                return self.rewrite_parallel(text, keyword)
+
+            if self.output_mode == 'edits':
+                try:
+                    return self.rewrite_with_edits(text, keyword)
+                except EditApplyError as e:
+                    print(f"⚠️ 수정 목록 적용 실패 ({e}) - 원고 전체 모드로 재시도")
+
+            prompt = self.build_prompt(text, keyword)
+            self.log_tokens(prompt, len(text))
+            tracker = self.progress_tracker(text)
+            manuscript, notes = generate_manuscript(
+                self.model, prompt.text, validate=lambda result: self.validate_rewrite(text, result, keyword),
+                guard=self.stream_guard(text), on_progress=tracker.callback() if tracker else None, log=print)
+            if notes:
+                print(f"  📝 AI 메모: {notes}")
+            return manuscript
 
         except Exception as e:
             print(f"⚠️ AI 재구성 오류: {e}")
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+블로그 원고 최적화 HTTP 서버 (로컬 CMS 연동용)
+- POST /optimize         원고 한 건 검색 최적화
+- POST /optimize/batch   여러 건 일괄 최적화 (?stream=true 면 NDJSON 스트리밍)
+- POST /rewrite          AI 재구성 (--ai 필요)
+- GET  /health           상태 + 요청 지표
+
+금칙어를 미리 로딩한 워커 풀을 띄워두고 요청마다 재사용합니다.
+
+사용법:
+    python api_server.py --port 8000 --workers 4
+    python api_server.py --port 8000 --ai
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import List
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from hashing import DEFAULT_SEED
+from worker_pool import create_executor, log, optimize_document, rewrite_document, warm_up
+
+
+class OptimizeRequest(BaseModel):
+    text: str
+    keyword: str = ''
+    brand: str = ''
+
+
+class BatchRequest(BaseModel):
+    items: List[OptimizeRequest]
+
+
+class RewriteRequest(BaseModel):
+    text: str
+    keyword: str = ''
+
+
+class Metrics:
+    """엔드포인트별 요청 수, 오류 수, 지연 시간 (최근 1000건 기준 p50/p95)"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.in_flight = 0
+        self.endpoints = {}
+
+    def record(self, endpoint: str, seconds: float, ok: bool = True):
+        stats = self.endpoints.setdefault(endpoint, {'count': 0, 'errors': 0, 'latencies': deque(maxlen=1000)})
+        stats['count'] += 1
+        if not ok:
+            stats['errors'] += 1
+        stats['latencies'].append(seconds)
+
+    def snapshot(self) -> dict:
+        endpoints = {}
+        for endpoint, stats in self.endpoints.items():
+            latencies = sorted(stats['latencies'])
+            endpoints[endpoint] = {
+                'count': stats['count'],
+                'errors': stats['errors'],
+                'p50_ms': round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+                'p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None,
+            }
+        return {
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'in_flight': self.in_flight,
+            'endpoints': endpoints,
+        }
+
+
+def create_app(workers=2, use_ai=False, api_key=None, seed=DEFAULT_SEED, model_factory=None,
+               use_processes=True, ai_output_mode='full', parallel_groups=0, adaptive=False) -> FastAPI:
+    """
+    서버 생성
+
+    Args:
+        workers: 워커 수
+        use_ai: AI 재구성 사용 여부
+        api_key: Gemini API 키 (없으면 환경변수 GEMINI_API_KEY)
+        seed: 실행 시드
+        model_factory: 모델 생성 함수 (테스트용 가짜 모델 등)
+        use_processes: True면 프로세스 풀, False면 스레드 풀
+        ai_output_mode: AI 재구성 출력 모드 ('full' / 'edits')
+        parallel_groups: 긴 원고 문단 병렬 재구성 묶음 수 (0이면 사용 안 함)
+        adaptive: AI 동시 요청 수 자동 조절 (429/시간 초과/지연 급증이면 줄임)
+    """
+    config = {
+        'use_ai': use_ai,
+        'api_key': api_key or os.getenv('GEMINI_API_KEY'),
+        'seed': seed,
+        'model_factory': model_factory,
+        'ai_output_mode': ai_output_mode,
+        'parallel_groups': parallel_groups,
+        'adaptive': adaptive,
+    }
+    metrics = Metrics()
+    pool = {}
+
+    @asynccontextmanager
+    async def lifespan(app):
+        executor = create_executor(config, workers, use_processes)
+        pids = warm_up(executor, workers)
+        log(f"🔥 워커 {len(pids)}개 준비 완료")
+        pool['executor'] = executor
+        yield
+        executor.shutdown(wait=True)
+
+    app = FastAPI(title="블로그 검색 최적화", lifespan=lifespan)
+
+    async def run(endpoint, func, *args):
+        """워커 풀에서 실행 + 지표 기록"""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        metrics.in_flight += 1
+        ok = False
+        try:
+            result = await loop.run_in_executor(pool['executor'], func, *args)
+            ok = True
+            return result
+        finally:
+            metrics.in_flight -= 1
+            metrics.record(endpoint, time.perf_counter() - started, ok)
+
+    @app.post('/optimize')
+    async def optimize(request: OptimizeRequest):
+        return await run('optimize', optimize_document, request.text, request.keyword, request.brand)
+
+    @app.post('/optimize/batch')
+    async def optimize_batch(request: BatchRequest, stream: bool = False):
+        tasks = [
+            asyncio.ensure_future(run('optimize/batch', optimize_document, item.text, item.keyword, item.brand))
+            for item in request.items
+        ]
+
+        if not stream:
+            return {'results': await asyncio.gather(*tasks)}
+
+        async def indexed(index, task):
+            try:
+                return {'index': index, 'result': await task}
+            except Exception as e:
+                return {'index': index, 'error': str(e)}
+
+        async def ndjson():
+            # 끝나는 순서대로 한 줄씩 (index로 원래 순서 확인)
+            for next_done in asyncio.as_completed([indexed(i, task) for i, task in enumerate(tasks)]):
+                yield json.dumps(await next_done, ensure_ascii=False) + '\n'
+
+        return StreamingResponse(ndjson(), media_type='application/x-ndjson')
+
+    @app.post('/rewrite')
+    async def rewrite(request: RewriteRequest):
+        if not config['use_ai']:
+            raise HTTPException(status_code=503, detail="AI 재구성이 비활성화되어 있습니다 (--ai 로 실행)")
+        text = await run('rewrite', rewrite_document, request.text, request.keyword)
+        return {'rewritten_text': text}
+
+    @app.get('/health')
+    async def health():
+        return {
+            'status': 'ok' if 'executor' in pool else 'starting',
+            'workers': workers,
+            'use_ai': config['use_ai'],
+            'metrics': metrics.snapshot(),
+        }
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="블로그 원고 최적화 HTTP 서버")
+    parser.add_argument('--host', default='127.0.0.1', help="바인드 주소")
+    parser.add_argument('--port', type=int, default=8000, help="포트")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="워커 수")
+    parser.add_argument('--ai', action='store_true', help="AI 재구성 사용 (GEMINI_API_KEY 필요)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="실행 시드")
+    parser.add_argument('--threads', action='store_true', help="프로세스 대신 스레드 풀 사용")
+    parser.add_argument('--ai-output', choices=['full', 'edits'], default='full',
+                        help="AI 재구성 출력 모드 (edits: 수정 목록만 받아 출력 토큰 절감)")
+    parser.add_argument('--parallel', type=int, default=0,
+                        help="긴 원고를 최대 N개 문단 묶음으로 나눠 동시에 재구성 (급한 단건 처리용)")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="AI 동시 요청 수 자동 조절 (429/시간 초과/지연 급증이면 줄이고 정상이면 늘림)")
+    args = parser.parse_args()
+
+    app = create_app(workers=args.workers, use_ai=args.ai, seed=args.seed, use_processes=not args.threads,
+                     ai_output_mode=args.ai_output, parallel_groups=args.parallel, adaptive=args.adaptive)
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+AI 출력 모드 비교 (원고 전체 vs 수정 목록) - 수정전후.xlsx 기준
+
+1) 오프라인: 수정 전/후 원고에서 수정 목록을 역산해서 출력 크기 비교 (+ 적용 결과가 수정 후와 같은지 검증)
+2) --live: 실제 Gemini로 두 모드를 돌려 지연 시간/출력 크기 비교 (GEMINI_API_KEY 필요)
+
+사용법:
+    python bench_edit_mode.py
+    python bench_edit_mode.py --live --limit 5
+"""
+
+import argparse
+import json
+import os
+import time
+
+import pandas as pd
+
+from edit_ops import apply_edits, derive_edits
+
+DEFAULT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '수정전후.xlsx')
+
+
+def compact_json(edits) -> str:
+    """AI가 돌려줄 수정 목록 JSON (공백 없이)"""
+    return json.dumps(edits, ensure_ascii=False, separators=(',', ':'))
+
+
+def offline_compare(df):
+    """수정 전/후 원고 → 출력 크기 비교"""
+    print(f"{'행':>3} {'전체(자)':>8} {'수정목록(자)':>11} {'수정 수':>6} {'비율':>6}")
+    total_full = total_edits = smaller = 0
+
+    for idx, row in df.iterrows():
+        before, after = str(row['원고']), str(row['최종 원고'])
+        edits = derive_edits(before, after)
+        assert apply_edits(before, edits) == after, f"{idx}행: 수정 목록 적용 결과가 다름"
+
+        full_size = len(after)
+        edits_size = len(compact_json(edits))
+        total_full += full_size
+        total_edits += edits_size
+        smaller += edits_size < full_size
+        print(f"{idx:>3} {full_size:>8} {edits_size:>11} {len(edits):>6} {edits_size / full_size:>6.2f}")
+
+    print("-" * 40)
+    print(f"합계: 전체 {total_full}자 / 수정 목록 {total_edits}자 ({total_edits / total_full:.2f}배)")
+    print(f"수정 목록이 더 짧은 원고: {smaller}/{len(df)}개")
+
+
+def live_compare(df, limit):
+    """실제 Gemini로 두 모드 비교 (검색 최적화 결정적 단계 결과를 입력으로 사용)"""
+    from ai_rewriter import AIRewriter
+    from search_optimizer import SearchOptimizer
+
+    optimizer = SearchOptimizer()
+    rewriters = {mode: AIRewriter(output_mode=mode) for mode in AIRewriter.OUTPUT_MODES}
+
+    for idx, row in df.head(limit).iterrows():
+        keyword = str(row['키워드'])
+        text = optimizer.optimize_for_search(str(row['원고']), keyword)['optimized_text']
+
+        for mode, rewriter in rewriters.items():
+            started = time.perf_counter()
+            result = rewriter.rewrite(text, keyword)
+            elapsed = time.perf_counter() - started
+            print(f"{idx:>3} {mode:>5}: {elapsed:6.1f}초, 결과 {len(result)}자")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI 출력 모드 비교 (원고 전체 vs 수정 목록)")
+    parser.add_argument('--file', default=DEFAULT_FILE, help="수정전후.xlsx 경로")
+    parser.add_argument('--live', action='store_true', help="실제 Gemini 호출 (GEMINI_API_KEY 필요)")
+    parser.add_argument('--limit', type=int, default=5, help="--live 비교 원고 수")
+    args = parser.parse_args()
+
+    df = pd.read_excel(args.file)
+    print("=" * 60)
+    print("📏 출력 크기 비교 (수정 전/후 원고에서 역산)")
+    print("=" * 60)
+    offline_compare(df)
+
+    if args.live:
+        print("\n" + "=" * 60)
+        print("⏱️ 실제 Gemini 비교")
+        print("=" * 60)
+        live_compare(df, args.limit)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,14 +8,34 @@
 import re
 import random
 import os
-from typing import Dict, List, Tuple
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 from forbidden_words_loader import ForbiddenWordsLoader
+from hashing import DEFAULT_SEED, content_hash, make_rng
+from manifest import version_fingerprint
 
 
 class BlogOptimizer:
-    def __init__(self, forbidden_words_file='금칙어 리스트.xlsx'):
-        """초기화"""
+    # 치환/변형 로직 버전 (규칙 코드를 바꾸면 올릴 것 → 전체 재처리)
+    PIPELINE_VERSION = 1
+
+    # 중복 원고 결과 캐시 최대 개수 (오래 안 쓴 것부터 버림 → 데몬/GUI를 오래 켜 둬도 메모리 일정)
+    RESULT_CACHE_SIZE = 1000
+
+    def __init__(self, forbidden_words_file='금칙어 리스트.xlsx', seed=DEFAULT_SEED):
+        """
+        초기화
+
+        Args:
+            forbidden_words_file: 금칙어 파일 경로
+            seed: 실행 시드 (같은 시드 + 같은 입력 → 같은 결과)
+        """
+        self.seed = seed
+
+        # 내용 해시 → 최적화 결과 (중복 원고는 한 번만 처리, 최근 RESULT_CACHE_SIZE개)
+        self.result_cache = OrderedDict()
+
         # 절대 경로로 변환
         if not os.path.isabs(forbidden_words_file):
             base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -63,17 +83,46 @@ class BlogOptimizer:
             ]
         }
 
-    def replace_forbidden_words(self, text: str) -> Tuple[str, List[str]]:
+    def version_fingerprint(self) -> str:
+        """규칙 버전 지문 (금칙어, AI 패턴, 시드, 로직 버전)"""
+        return version_fingerprint(
+            type(self).__name__,
+            self.PIPELINE_VERSION,
+            self.seed,
+            self.forbidden_loader.forbidden_dict,
+            self.ai_patterns,
+        )
+
+    def make_rng(self, *parts) -> random.Random:
+        """문서별 난수 생성기 (실행 시드 + 입력 내용 해시)"""
+        return make_rng(self.seed, *parts)
+
+    def cached_result(self, row_key: str) -> Optional[Dict]:
+        """중복 원고의 이전 결과 (없으면 None, 있으면 최근 사용으로 표시)"""
+        result = self.result_cache.get(row_key)
+        if result is not None:
+            self.result_cache.move_to_end(row_key)
+        return result
+
+    def store_result(self, row_key: str, result: Dict):
+        """결과 보관 (RESULT_CACHE_SIZE개를 넘으면 가장 오래 안 쓴 것부터 버림)"""
+        self.result_cache[row_key] = result
+        self.result_cache.move_to_end(row_key)
+        while len(self.result_cache) > self.RESULT_CACHE_SIZE:
+            self.result_cache.popitem(last=False)
+
+    def replace_forbidden_words(self, text: str, rng: Optional[random.Random] = None) -> Tuple[str, List[str]]:
         """금칙어 치환 (새로운 로더 사용)"""
-        return self.forbidden_loader.replace_forbidden_words(text)
+        return self.forbidden_loader.replace_forbidden_words(text, rng)
 
-    def diversify_ai_patterns(self, text: str) -> Tuple[str, List[str]]:
+    def diversify_ai_patterns(self, text: str, rng: Optional[random.Random] = None) -> Tuple[str, List[str]]:
         """AI 느낌 나는 패턴 다양화"""
+        rng = rng or random
         diversified = []
 
         for pattern, alternatives in self.ai_patterns.items():
             if pattern in text:
-                replacement = random.choice(alternatives)
+                replacement = rng.choice(alternatives)
                 text = text.replace(pattern, replacement, 1)  # 첫 번째만 교체
                 diversified.append(f"{pattern} → {replacement}")
 
@@ -106,8 +155,10 @@ class BlogOptimizer:
         final_count = text.count(keyword)
         return text, final_count
 
-    def add_natural_variations(self, text: str) -> str:
+    def add_natural_variations(self, text: str, rng: Optional[random.Random] = None) -> str:
         """자연스러운 문장 변형 추가"""
+        rng = rng or random
+
         # 동일한 문장 패턴 방지
         text = re.sub(r'(정말|너무|굉장히)\s+(정말|너무|굉장히)', r'\1', text)
 
@@ -116,22 +167,24 @@ class BlogOptimizer:
         if count > 2:
             alternatives = ['하더군요', '했어요', '했습니다', '했죠']
             for i in range(count - 2):
-                text = text.replace('하더라고요', random.choice(alternatives), 1)
+                text = text.replace('하더라고요', rng.choice(alternatives), 1)
 
         # "~네요" 과다 사용 방지
         count = text.count('네요')
         if count > 3:
             alternatives = ['어요', '습니다', '죠']
             for i in range(count - 3):
-                text = text.replace('네요', random.choice(alternatives), 1)
+                text = text.replace('네요', rng.choice(alternatives), 1)
 
         return text
 
-    def generate_title(self, keyword: str, original_text: str) -> str:
+    def generate_title(self, keyword: str, original_text: str, rng: Optional[random.Random] = None) -> str:
         """SEO 최적화 제목 생성 (15-40자 권장)"""
         if not keyword or pd.isna(keyword):
             return ''
 
+        rng = rng or random
+
         # 제목 템플릿 (상품 판매용)
         templates = [
             f"{keyword} 추천 정보 (후기 모음)",
@@ -144,7 +197,7 @@ class BlogOptimizer:
         ]
 
         # 랜덤으로 하나 선택
-        title = random.choice(templates)
+        title = rng.choice(templates)
 
         # 15-40자 범위 확인
         if len(title) < 15:
@@ -154,8 +207,9 @@ class BlogOptimizer:
 
         return title
 
-    def generate_hashtags(self, keyword: str, brand: str) -> List[str]:
+    def generate_hashtags(self, keyword: str, brand: str, rng: Optional[random.Random] = None) -> List[str]:
         """SEO 최적화 해시태그 생성 (8-10개 권장)"""
+        rng = rng or random
         hashtags = []
 
         if not pd.isna(keyword):
@@ -186,7 +240,7 @@ class BlogOptimizer:
 
         # 부족하면 일반 태그 추가
         while len(hashtags) < 8:
-            tag = random.choice([t for t in general_tags if t not in hashtags])
+            tag = rng.choice([t for t in general_tags if t not in hashtags])
             hashtags.append(tag)
 
         # 너무 많으면 자르기
@@ -208,12 +262,15 @@ class BlogOptimizer:
         original_text = text
         changes = []
 
+        # 문서별 난수 생성기 (같은 입력 → 같은 결과)
+        rng = self.make_rng(text, keyword, brand, title)
+
         # 1. 금칙어 치환
-        text, forbidden_changes = self.replace_forbidden_words(text)
+        text, forbidden_changes = self.replace_forbidden_words(text, rng)
         changes.extend(forbidden_changes)
 
         # 2. AI 패턴 다양화
-        text, ai_changes = self.diversify_ai_patterns(text)
+        text, ai_changes = self.diversify_ai_patterns(text, rng)
         changes.extend(ai_changes)
 
         # 3. 키워드 밀도 최적화
@@ -222,14 +279,14 @@ class BlogOptimizer:
             changes.append(f"키워드 '{keyword}' 출현: {keyword_count}회")
 
         # 4. 자연스러운 변형
-        text = self.add_natural_variations(text)
+        text = self.add_natural_variations(text, rng)
 
         # 5. 해시태그 생성
-        hashtags = self.generate_hashtags(keyword, brand)
+        hashtags = self.generate_hashtags(keyword, brand, rng)
 
         # 6. 제목 생성 (없는 경우)
         if pd.isna(title) or not title:
-            title = self.generate_title(keyword, text)
+            title = self.generate_title(keyword, text, rng)
 
         return {
             'optimized_text': text,
@@ -250,6 +307,7 @@ class BlogOptimizer:
         df = pd.read_excel(input_file)
 
         results = []
+        deduplicated = 0
 
         # 각 행 최적화
         for idx, row in df.iterrows():
@@ -258,8 +316,14 @@ class BlogOptimizer:
             original_text = row.get('원고', '')
             title = row.get('제목', '')
 
-            # 최적화 실행
-            result = self.optimize_text(original_text, keyword, brand, title)
+            # 최적화 실행 (같은 원고/키워드/브랜드/제목은 기존 결과 재사용)
+            row_key = content_hash('optimize_text', original_text, keyword, brand, title)
+            result = self.cached_result(row_key)
+            if result is not None:
+                deduplicated += 1
+            else:
+                result = self.optimize_text(original_text, keyword, brand, title)
+                self.store_result(row_key, result)
 
             # 결과 저장
             df.at[idx, '원고'] = result['optimized_text']
@@ -289,6 +353,7 @@ class BlogOptimizer:
             'input_file': input_file,
             'output_file': output_file,
             'total_rows': len(df),
+            'deduplicated_rows': deduplicated,
             'results': results
         }
 
@@ -306,6 +371,7 @@ def main():
     print(f"\n📂 입력 파일: {result['input_file']}")
     print(f"📁 출력 파일: {result['output_file']}")
     print(f"📊 처리된 행: {result['total_rows']}개")
+    print(f"🔁 중복 원고 (결과 재사용): {result['deduplicated_rows']}개")
     print("\n" + "=" * 80)
     print("각 행별 최적화 결과:")
     print("=" * 80)
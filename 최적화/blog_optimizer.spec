@@ -22,6 +22,29 @@ hiddenimports = [
     'threading',
     'search_optimizer',
     'blog_optimizer',
+    'hashing',
+    'manifest',
+    'korean_particles',
+    'quality_gate',
+    'edit_ops',
+    'paragraph_parallel',
+    'model_tiers',
+    'streaming',
+    'deadlines',
+    'model_clients',
+    'pipeline',
+    'key_pool',
+    'token_estimator',
+    'example_index',
+    'resource_cache',
+    'prompt_budget',
+    'dry_run',
+    'adaptive_limit',
+    'job_queue',
+    'workbook_shards',
+    'speaker_classifier',
+    'structured_output',
+    'provider_router',
 ]
 
 a = Analysis(
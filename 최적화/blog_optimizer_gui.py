@@ -16,6 +16,7 @@ import threading
 # 상대 import 처리
 try:
     from search_optimizer import SearchOptimizer
+    from dry_run import DryRunModel, estimate_search
     import pandas as pd
 except ImportError:
     messagebox.showerror("오류", "필요한 패키지가 설치되어 있지 않습니다.\npip install -r requirements.txt")
@@ -180,12 +181,21 @@ class BlogOptimizerGUI:
         )
         self.optimize_button.grid(row=0, column=0, padx=5)
 
+        # AI 호출 없이 예상 시간/토큰/비용
+        self.estimate_button = ttk.Button(
+            button_frame,
+            text="🧮 예상 시간/비용",
+            command=self.start_estimate,
+            width=20
+        )
+        self.estimate_button.grid(row=0, column=1, padx=5)
+
         ttk.Button(
             button_frame,
             text="📂 출력 폴더 열기",
             command=self.open_output_folder,
             width=20
-        ).grid(row=0, column=1, padx=5)
+        ).grid(row=0, column=2, padx=5)
 
         # 6. 진행 상황
         row += 1
@@ -196,6 +206,14 @@ class BlogOptimizerGUI:
         self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
         self.progress.grid(row=row, column=1, columnspan=2, sticky=(tk.W, tk.E), pady=(10, 5))
 
+        # 행별 실시간 진행 (AI 스트리밍으로 받은 글자수)
+        row += 1
+        self.progress_status = tk.StringVar(value="대기 중")
+        ttk.Label(main_frame, textvariable=self.progress_status, foreground="gray").grid(
+            row=row, column=1, columnspan=2, sticky=tk.W
+        )
+        self.current_item = ''
+
         # 7. 로그
         row += 1
         log_frame = ttk.LabelFrame(main_frame, text="실행 로그", padding="5")
@@ -228,6 +246,11 @@ class BlogOptimizerGUI:
         self.log_text.see(tk.END)
         self.root.update_idletasks()
 
+    def show_progress(self, message):
+        """행별 실시간 진행 상황 (AI 재구성 중 받은 글자수)"""
+        self.progress_status.set(f"{self.current_item} {message}".strip())
+        self.root.update_idletasks()
+
     def toggle_ai_options(self):
         """AI 옵션 표시/숨김"""
         if self.use_ai.get():
@@ -293,7 +316,7 @@ class BlogOptimizerGUI:
         try:
             use_ai = self.use_ai.get()
             api_key = self.gemini_api_key.get() if self.gemini_api_key.get() else None
-            self.optimizer = SearchOptimizer(use_ai=use_ai, gemini_api_key=api_key)
+            self.optimizer = SearchOptimizer(use_ai=use_ai, gemini_api_key=api_key, ai_progress=self.show_progress)
             if use_ai:
                 self.log("🤖 AI 재구성 모드로 초기화됨")
         except Exception as e:
@@ -315,6 +338,43 @@ class BlogOptimizerGUI:
         thread.daemon = True
         thread.start()
 
+    def start_estimate(self):
+        """예상 시간/비용 계산 (AI 호출 없음, API 키 불필요)"""
+        input_path = self.input_file.get()
+        if not input_path or not input_path.lower().endswith('.xlsx'):
+            messagebox.showerror("오류", "엑셀 파일을 선택해주세요.")
+            return
+
+        self.optimize_button.config(state='disabled')
+        self.estimate_button.config(state='disabled')
+        self.progress.start()
+        self.log("")
+        self.log("🧮 예상 시간/비용 계산 중 (AI 호출 없음)...")
+
+        thread = threading.Thread(target=self.run_estimate, args=(input_path,))
+        thread.daemon = True
+        thread.start()
+
+    def run_estimate(self, input_path):
+        """드라이런 (백그라운드) - 규칙 단계와 AI 판정까지 실행하고 AI 재구성 프롬프트만 만들어 추정"""
+        try:
+            optimizer = SearchOptimizer(use_ai=self.use_ai.get(), ai_model=DryRunModel())
+            # 이전 실행의 모델이 있으면 측정된 응답 시간 사용
+            previous = self.optimizer.ai_rewriter if self.optimizer else None
+            report = estimate_search(optimizer, input_path, model=previous.model if previous else None,
+                                     api_key=self.gemini_api_key.get() or None, incremental=False)
+            lines = report.lines()
+            for line in lines:
+                self.log(line)
+            messagebox.showinfo("예상 시간/비용", "\n".join(lines))
+        except Exception as e:
+            self.log(f"❌ 예상 계산 오류: {str(e)}")
+            messagebox.showerror("오류", f"예상 계산 중 오류가 발생했습니다:\n{str(e)}")
+        finally:
+            self.progress.stop()
+            self.optimize_button.config(state='normal')
+            self.estimate_button.config(state='normal')
+
     def run_optimization(self):
         """최적화 실행 (백그라운드)"""
         try:
@@ -335,6 +395,8 @@ class BlogOptimizerGUI:
             messagebox.showerror("오류", f"최적화 중 오류가 발생했습니다:\n{str(e)}")
         finally:
             self.progress.stop()
+            self.progress_status.set("대기 중")
+            self.current_item = ''
             self.optimize_button.config(state='normal')
 
     def optimize_excel(self, input_file):
@@ -355,6 +417,8 @@ class BlogOptimizerGUI:
             original_text = row.get('원고', '')
 
             self.log(f"[{idx+1}/{len(df)}] {keyword} 처리 중...")
+            self.current_item = f"[{idx+1}/{len(df)}] {keyword}"
+            self.progress_status.set(f"{self.current_item} 처리 중...")
 
             # 최적화
             result = self.optimizer.optimize_for_search(original_text, keyword, brand)
@@ -392,21 +456,8 @@ class BlogOptimizerGUI:
 
         self.log(f"✅ 원본 글자수: {len(original_text)}자")
 
-        # 키워드 추출
-        keyword = self.keyword.get()
-        if not keyword:
-            # 자동 추출 시도
-            lines = original_text.split('\n')
-            for line in lines:
-                line = line.strip()
-                if line.startswith('#'):
-                    line = line.lstrip('#').strip()
-                    for suffix in ['관련해서', '에 대해', '관련', '사용', '후기', '정보']:
-                        if suffix in line:
-                            line = line.split(suffix)[0].strip()
-                            break
-                    keyword = line
-                    break
+        # 키워드 추출 (빈칸이면 # 제목에서 자동 추출)
+        keyword = self.keyword.get() or self.optimizer.extract_keyword(original_text)
 
         if not keyword:
             keyword = "키워드"
@@ -424,30 +475,7 @@ class BlogOptimizerGUI:
         output_file = input_file.replace('.txt', '_최적화.txt')
 
         with open(output_file, 'w', encoding='utf-8') as f:
-            f.write("=" * 80 + "\n")
-            f.write("블로그 원고 검색 최적화 결과\n")
-            f.write("=" * 80 + "\n\n")
-            f.write("📊 최적화 정보\n")
-            f.write("-" * 80 + "\n")
-            f.write(f"키워드: {keyword}\n")
-            f.write(f"글자수: {result['optimized_length']}자 ({result['length_diff']:+d}자)\n")
-            f.write(f"키워드 출현: {result['keyword_count']}회\n\n")
-            f.write("🔧 변경 사항\n")
-            f.write("-" * 80 + "\n")
-            for change in result['changes']:
-                f.write(f"{change}\n")
-            f.write("\n")
-            f.write("🏷️ 추천 해시태그\n")
-            f.write("-" * 80 + "\n")
-            f.write(' '.join(['#' + tag for tag in result['hashtags'][:10]]) + "\n\n")
-            if result.get('optimized_title'):
-                f.write("📌 제목\n")
-                f.write("-" * 80 + "\n")
-                f.write(f"{result['optimized_title']}\n\n")
-            f.write("=" * 80 + "\n")
-            f.write("📝 최적화된 원고\n")
-            f.write("=" * 80 + "\n\n")
-            f.write(result['optimized_text'])
+            f.write(self.optimizer.format_txt_report(keyword, result))
 
         self.log(f"\n💾 저장됨: {os.path.basename(output_file)}")
 
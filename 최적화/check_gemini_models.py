@@ -1,26 +1,29 @@
 #!/usr/bin/env python3
-"""Gemini API 모델 확인"""
+"""Gemini API 모델 확인 (GEMINI_BACKEND=replay/fake면 오프라인 백엔드 확인)"""
 
 import os
-import google.generativeai as genai
+
+from model_clients import create_client, needs_api_key
 
 api_key = os.getenv('GEMINI_API_KEY')
 
-if not api_key:
+if not api_key and needs_api_key():
     print("❌ GEMINI_API_KEY 환경변수를 설정해주세요.")
     print("   export GEMINI_API_KEY='your-api-key'")
     exit(1)
 
-print(f"✅ API 키 있음 (길이: {len(api_key)}자)")
+if api_key:
+    print(f"✅ API 키 있음 (길이: {len(api_key)}자)")
 
 try:
-    genai.configure(api_key=api_key)
+    client = create_client(api_key)
+    print(f"✅ 백엔드: {client.name}")
 
     print("\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
     print("사용 가능한 Gemini 모델:")
     print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
 
-    models = list(genai.list_models())
+    models = client.list_models()
 
     if not models:
         print("⚠️ 사용 가능한 모델이 없습니다.")
@@ -50,7 +53,7 @@ try:
     for model_name in recommended:
         try:
             # 모델이 존재하는지 확인
-            model = genai.GenerativeModel(model_name)
+            model = client.model(model_name)
             print(f"✅ {model_name} - 사용 가능")
         except Exception as e:
             print(f"❌ {model_name} - 사용 불가 ({str(e)[:50]}...)")
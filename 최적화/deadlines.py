@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+요청 마감 시간, 헤징(중복 요청), 취소/일시정지
+- 모델 호출마다 마감 시간: 넘기면 기다리지 않고 DeadlineExceeded (멈춘 호출이 배치 전체를 붙잡지 않게)
+- 헤징: 최근 지연 시간 p95가 지나도 응답이 없으면 같은 요청을 한 번 더 보내고 먼저 온 응답 사용
+- 취소: 진행 중인 호출을 기다리지 않고 Cancelled (스트리밍 호출은 다음 조각에서 실제로 멈추고 스트림을 닫음)
+- 보낸 요청마다 멈춤 신호: 마감 시간 초과, 헤징에서 진 요청, 취소된 요청은 다음 조각에서 멈춤 (토큰/키 자리를 계속 쓰지 않게)
+- 일시정지: 행 사이에서 멈춤 (진행 중인 호출은 끝까지)
+"""
+
+import math
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+
+class Cancelled(RuntimeError):
+    """사용자가 취소함"""
+
+
+class DeadlineExceeded(TimeoutError):
+    """요청 마감 시간 초과"""
+
+
+def close_stream(chunks):
+    """스트리밍 응답을 바로 닫음 (중간에 그만 받을 때 - 감싼 생성기들이 키/연결을 정리하게, 닫을 수 없으면 무시)"""
+    close = getattr(chunks, 'close', None)
+    if close:
+        close()
+
+
+class RunControl:
+    """취소/일시정지 상태 (GUI 버튼 ↔ 작업 스레드)"""
+
+    def __init__(self):
+        self.cancel_event = threading.Event()
+        self.resume_event = threading.Event()
+        self.resume_event.set()
+
+    def reset(self):
+        """새 작업 시작"""
+        self.cancel_event.clear()
+        self.resume_event.set()
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.resume_event.set()  # 일시정지 중이면 풀어서 취소 처리
+
+    def pause(self):
+        self.resume_event.clear()
+
+    def resume(self):
+        self.resume_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self.resume_event.is_set()
+
+    def check(self):
+        """취소됐으면 Cancelled"""
+        if self.cancelled:
+            raise Cancelled("사용자 취소")
+
+    def wait_if_paused(self):
+        """일시정지 중이면 재개/취소까지 대기 (취소되면 Cancelled)"""
+        self.resume_event.wait()
+        self.check()
+
+
+class LatencyTracker:
+    """최근 응답 시간 → 헤징 지연 (p95)"""
+
+    def __init__(self, window: int = 50, min_samples: int = 5):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def percentile(self, ratio: float) -> Optional[float]:
+        """최근 응답 시간의 백분위 (표본이 모자라면 None)"""
+        with self.lock:
+            samples = sorted(self.samples)
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(ratio * len(samples)) - 1)]
+
+    def hedge_delay(self) -> Optional[float]:
+        return self.percentile(0.95)
+
+
+def call_with_deadline(fn: Callable[[], object], timeout: Optional[float] = None, hedge_delay: Optional[float] = None,
+                       control: Optional[RunControl] = None, poll: float = 0.2, log: Callable[[str], None] = print):
+    """
+    마감 시간/헤징/취소를 적용해서 fn() 호출
+
+    Args:
+        fn: 호출할 함수 fn(요청별 RunControl) - 헤징하면 두 번 불릴 수 있음 (부작용 없어야 함),
+            결과를 더 기다리지 않는 요청은 RunControl이 취소됨 (스트리밍이면 넘겨서 다음 조각에서 멈추게)
+        timeout: 마감 시간 (초, None이면 무제한)
+        hedge_delay: 이 시간(초)이 지나도 응답이 없으면 같은 요청 한 번 더 (None이면 헤징 안 함)
+        control: 취소 상태
+
+    Raises:
+        DeadlineExceeded: 마감 시간 초과
+        Cancelled: 취소됨
+        fn()이 낸 예외: 보낸 요청이 모두 실패했을 때 (마지막 예외)
+    """
+    results = queue.Queue()
+    attempts = []  # 보낸 요청별 멈춤 신호
+
+    def run(attempt):
+        try:
+            results.put((True, fn(attempt)))
+        except BaseException as e:
+            results.put((False, e))
+
+    def launch():
+        attempt = RunControl()
+        attempts.append(attempt)
+        # 멈춘 호출이 프로그램 종료를 막지 않도록 데몬 스레드
+        threading.Thread(target=run, args=(attempt,), daemon=True).start()
+
+    started = time.perf_counter()
+    launch()
+    pending = 1
+    hedged = hedge_delay is None
+
+    try:
+        while True:
+            if control:
+                control.check()
+
+            elapsed = time.perf_counter() - started
+            if timeout is not None and elapsed >= timeout:
+                raise DeadlineExceeded(f"{timeout:.0f}초 안에 응답 없음")
+
+            wait = poll
+            if timeout is not None:
+                wait = min(wait, timeout - elapsed)
+            if not hedged:
+                wait = min(wait, max(0.0, hedge_delay - elapsed))
+
+            try:
+                ok, value = results.get(timeout=wait)
+            except queue.Empty:
+                if not hedged and time.perf_counter() - started >= hedge_delay:
+                    log(f"🔀 {hedge_delay:.1f}초 동안 응답 없음 → 중복 요청")
+                    launch()
+                    pending += 1
+                    hedged = True
+                continue
+
+            pending -= 1
+            if ok:
+                return value
+            if not pending:
+                raise value
+    finally:
+        # 결과를 더 기다리지 않는 요청(진 요청, 시간 초과, 취소)은 멈추게 함 - 끝난 요청에는 영향 없음
+        for attempt in attempts:
+            attempt.cancel()
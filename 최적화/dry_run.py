@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+일괄 처리 사전 추정 (드라이런) - 네트워크 호출 없이 소요 시간/토큰/비용 예측
+- 모든 행의 프롬프트를 실제 처리와 같은 방식으로 조립해 입력/출력 토큰 추정 (token_estimator)
+- 원고 없음, 중복 원고, 변경 없는 행(매니페스트), AI 생략 판정을 실제 처리와 같은 규칙으로 미리 적용
+- 호출당 시간: 이번 세션에서 측정한 값(단계별 모델 통계) → 기록 파일(record 백엔드) → 기본값
+- 예상 소요 시간 = max(호출 시간 합계 / 동시 요청 수, 요청 수 / (키 수 × 키별 분당 한도))
+- 원고 수정(EditorEngine, 원고자동화3 GUI)과 검색 최적화 AI 재구성(SearchOptimizer, 최적화 GUI) 모두 지원
+
+사용:
+    python3 dry_run.py 작업.xlsx                      # 원고 수정 (같은 폴더의 금칙어/예시 사용)
+    python3 dry_run.py 원고.xlsx --mode search         # 검색 최적화 + AI 재구성
+    python3 dry_run.py 작업.xlsx --concurrency 4 --records calls.jsonl
+"""
+
+import argparse
+import json
+import math
+import os
+from typing import Dict, Optional, Sequence
+
+import openpyxl
+
+from hashing import content_hash
+from key_pool import load_api_keys, load_key_config
+from manifest import RunManifest
+from model_clients import needs_api_key
+from model_tiers import TieredModel, configured_tiers
+from token_estimator import estimate_output_tokens, estimate_tokens
+
+# 측정값이 없을 때 호출당 시간 (초) - 원고 수정은 로그 안내 "10~30초"의 중간값
+DEFAULT_EDIT_SECONDS = 20.0
+DEFAULT_SPEAKER_SECONDS = 4.0
+
+# 화자 분석 응답 (성별/연령대/상황 세 줄)
+SPEAKER_OUTPUT_TOKENS = 30
+
+# 모델별 단가 (USD / 100만 토큰, (입력, 출력)) - 등록되지 않은 모델은 비용 계산에서 빠짐
+MODEL_PRICES = {
+    'gemini-2.5-flash-lite': (0.10, 0.40),
+    'gemini-2.5-flash': (0.30, 2.50),
+    'gemini-2.5-pro': (1.25, 10.00),
+}
+
+
+class DryRunModel:
+    """드라이런용 모델 자리 (호출되면 오류 - 네트워크를 쓰지 않는다는 보장)"""
+
+    def generate_content(self, prompt, **kwargs):
+        raise RuntimeError("드라이런 중에는 AI를 호출하지 않습니다.")
+
+
+class CallProfile:
+    """호출당 시간과 단계별 도달 비율 (상위 모델로 넘어간 비율)"""
+
+    def __init__(self, tiers: Sequence[str], edit_seconds: float = DEFAULT_EDIT_SECONDS,
+                 speaker_seconds: float = DEFAULT_SPEAKER_SECONDS, shares: Optional[Dict[str, float]] = None,
+                 source: str = '기본값'):
+        """
+        Args:
+            tiers: 모델 단계 (빠른 모델부터)
+            edit_seconds / speaker_seconds: 원고 수정 / 화자 분석 요청 한 건의 시간 (상위 모델 승격 포함)
+            shares: 모델 이름 → 요청 중 그 단계까지 간 비율 (없으면 첫 단계 1.0)
+            source: 로그에 표시할 출처
+        """
+        self.tiers = list(tiers)
+        self.edit_seconds = edit_seconds
+        self.speaker_seconds = speaker_seconds
+        self.shares = shares or {self.tiers[0]: 1.0}
+        self.source = source
+
+    @property
+    def attempts(self) -> float:
+        """요청 한 건당 실제 API 요청 수 (승격하면 단계마다 한 번)"""
+        return sum(self.shares.values())
+
+    @classmethod
+    def from_model(cls, model) -> Optional['CallProfile']:
+        """이번 세션에서 실행한 단계별 모델의 통계 (호출 기록이 없으면 None)"""
+        if not isinstance(model, TieredModel):
+            return None
+        with model.lock:
+            stats = {name: dict(values) for name, values in model.stats.items()}
+        return cls.from_counts(model.names, {name: (s['calls'], s['seconds']) for name, s in stats.items()},
+                               '이번 세션 측정')
+
+    @classmethod
+    def from_records(cls, path: str, tiers: Sequence[str]) -> Optional['CallProfile']:
+        """record 백엔드 JSONL 기록의 모델별 호출 시간 (기록이 없으면 None)"""
+        counts = {name: (0, 0.0) for name in tiers}
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get('model') in counts and record.get('seconds') is not None:
+                    calls, seconds = counts[record['model']]
+                    counts[record['model']] = (calls + 1, seconds + record['seconds'])
+        return cls.from_counts(tiers, counts, f"기록 {os.path.basename(path)}")
+
+    @classmethod
+    def from_counts(cls, tiers: Sequence[str], counts: Dict[str, tuple], source: str) -> Optional['CallProfile']:
+        """모델별 (호출 수, 시간 합계) → 요청당 시간 (모든 요청은 첫 단계부터 시작)"""
+        requests = counts.get(tiers[0], (0, 0.0))[0]
+        if not requests:
+            return None
+        seconds = sum(total for _, total in counts.values()) / requests
+        shares = {name: counts[name][0] / requests for name in tiers if counts.get(name, (0,))[0]}
+        # 원고 수정/화자 분석이 섞인 평균이라 둘 다 같은 값 사용
+        return cls(tiers, seconds, seconds, shares, source)
+
+
+class RowPlan:
+    """행 분류 + 토큰 합계 (AI 호출 예정 행만 토큰 계산)"""
+
+    def __init__(self):
+        self.total_rows = 0
+        self.ai_rows = 0          # AI 수정/재구성 호출
+        self.ai_skipped = 0       # 규칙 통과 - AI 생략
+        self.deduplicated = 0
+        self.reused = 0           # 변경 없음 (이전 결과 유지)
+        self.empty = 0
+        self.speaker_calls = 0    # 화자 분석 (원고 수정만)
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.largest_prompt = 0
+
+    def add_call(self, input_tokens: int, output_tokens: int):
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.largest_prompt = max(self.largest_prompt, input_tokens)
+
+
+def plan_editor_rows(engine, input_file: str, output_file: Optional[str] = None, incremental: bool = True) -> RowPlan:
+    """원고 수정 (EditorEngine.process_workbook과 같은 분류, 금칙어/예시는 미리 로딩)"""
+    output_file = output_file or input_file
+    manifest = RunManifest.for_output(output_file, engine.version_fingerprint())
+    previous_outputs = engine.load_previous_outputs(output_file) if incremental and manifest.previous else {}
+
+    plan = RowPlan()
+    wb = openpyxl.load_workbook(input_file)
+    ws = wb.active
+    engine.learn_past_speakers(input_file, output_file)
+    seen = set()
+    for row_idx in range(2, ws.max_row + 1):
+        plan.total_rows += 1
+        row_data = engine.read_row(ws, row_idx)
+        if not row_data['original']:
+            plan.empty += 1
+            continue
+
+        row_key = engine.row_hash(row_data)
+        if row_key in seen:
+            plan.deduplicated += 1
+            continue
+        seen.add(row_key)
+        if manifest.previous_row(row_key) in previous_outputs:
+            plan.reused += 1
+            continue
+
+        gate, corrected = engine.gate_row(row_data)
+        if gate and not gate['needs_ai']:
+            plan.ai_skipped += 1
+            speaker_text = corrected
+        else:
+            plan.ai_rows += 1
+            target_chars = int(row_data['char_count']) if row_data['char_count'] else 1000
+            plan.add_call(engine.build_prompt(row_data).tokens, estimate_output_tokens(target_chars))
+            speaker_text = str(row_data['original'])
+
+        # 화자 분석은 수정 원고 앞 500자 기준 (수정 전 원고로 근사), 로컬 판정이 자신 있으면 호출 없음
+        if engine.local_speaker and engine.speaker_classifier.confident(
+                engine.speaker_classifier.classify(speaker_text, row_data['keyword'])):
+            continue
+        plan.speaker_calls += 1
+        plan.add_call(estimate_tokens(engine.speaker_prompt(speaker_text)), SPEAKER_OUTPUT_TOKENS)
+    return plan
+
+
+def plan_search_rows(optimizer, input_file: str, output_file: Optional[str] = None,
+                     incremental: bool = True) -> RowPlan:
+    """검색 최적화 (SearchOptimizer.process_excel과 같은 분류, 규칙 단계는 실제로 실행)"""
+    import pandas as pd
+
+    if output_file is None:
+        output_file = input_file.replace('.xlsx', '_검색최적화.xlsx')
+    manifest = RunManifest.for_output(output_file, optimizer.version_fingerprint())
+    previous_index = set()
+    if incremental and manifest.previous and os.path.exists(output_file):
+        previous_index = set(pd.read_excel(output_file).index)
+
+    plan = RowPlan()
+    seen = set()
+    for _, row in pd.read_excel(input_file).iterrows():
+        plan.total_rows += 1
+        keyword = row.get('키워드', '')
+        brand = row.get('브랜드', '')
+        text = row.get('원고', '')
+        if pd.isna(text) or not text:
+            plan.empty += 1
+            continue
+
+        row_key = content_hash('optimize_for_search', text, keyword, brand)
+        if manifest.previous_row(row_key) in previous_index:
+            plan.reused += 1
+            continue
+        if row_key in seen:
+            plan.deduplicated += 1
+            continue
+        seen.add(row_key)
+
+        processed, _, _ = optimizer.apply_search_rules(text, keyword, optimizer.make_rng(text, keyword, brand))
+        gate = optimizer.search_gate(processed, keyword, len(text))
+        if gate is None:
+            continue
+        if not gate['needs_ai']:
+            plan.ai_skipped += 1
+            continue
+
+        plan.ai_rows += 1
+        rewriter = optimizer.ai_rewriter
+        if rewriter.output_mode == 'edits':
+            prompt_tokens = estimate_tokens(rewriter.create_edits_prompt(processed, keyword))
+        else:
+            prompt_tokens = rewriter.build_prompt(processed, keyword).tokens
+        # 수정 목록(edits) 모드는 실제 출력이 훨씬 짧음 - 원고 전체 출력 기준(상한)으로 계산
+        plan.add_call(prompt_tokens, estimate_output_tokens(len(processed)))
+    return plan
+
+
+def rate_limit(api_key=None) -> Optional[int]:
+    """전체 분당 요청 한도 (키 수 × 키별 rpm, 한도가 없거나 오프라인 백엔드면 None)"""
+    if not needs_api_key():
+        return None
+    config = load_key_config()
+    rpm = config.get('rpm')
+    if not rpm:
+        return None
+    return max(1, len(load_api_keys(api_key, config))) * int(rpm)
+
+
+def format_duration(seconds: float) -> str:
+    """초 → "약 1시간 5분" """
+    minutes = math.ceil(seconds / 60)
+    if minutes < 1:
+        return "1분 미만"
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"약 {hours}시간 {minutes}분" if minutes else f"약 {hours}시간"
+    return f"약 {minutes}분"
+
+
+class DryRunReport:
+    """드라이런 결과 (행 분류, 토큰, 예상 소요 시간, 비용)"""
+
+    def __init__(self, plan: RowPlan, profile: CallProfile, concurrency: int = 1,
+                 requests_per_minute: Optional[int] = None, prices: Optional[Dict[str, tuple]] = None):
+        """
+        Args:
+            plan: 행 분류/토큰 합계
+            profile: 호출당 시간, 단계별 도달 비율
+            concurrency: AI 동시 요청 수
+            requests_per_minute: 전체 분당 요청 한도 (None이면 제한 없음)
+            prices: 모델별 단가 (없으면 MODEL_PRICES)
+        """
+        self.plan = plan
+        self.profile = profile
+        self.concurrency = max(1, concurrency)
+        self.requests_per_minute = requests_per_minute
+        self.prices = MODEL_PRICES if prices is None else prices
+
+    @property
+    def calls(self) -> int:
+        return self.plan.ai_rows + self.plan.speaker_calls
+
+    @property
+    def requests(self) -> int:
+        """실제 API 요청 수 (상위 모델 승격 포함)"""
+        return math.ceil(self.calls * self.profile.attempts)
+
+    @property
+    def latency_seconds(self) -> float:
+        """동시 요청 수만큼 나눠 처리할 때 시간"""
+        busy = self.plan.ai_rows * self.profile.edit_seconds + self.plan.speaker_calls * self.profile.speaker_seconds
+        return busy / self.concurrency
+
+    @property
+    def rate_limit_seconds(self) -> float:
+        """분당 한도로만 계산한 최소 시간"""
+        if not self.requests_per_minute:
+            return 0.0
+        return self.requests / self.requests_per_minute * 60
+
+    @property
+    def wall_seconds(self) -> float:
+        return max(self.latency_seconds, self.rate_limit_seconds)
+
+    def cost(self, shares: Dict[str, float]) -> Optional[float]:
+        """단계별 도달 비율 기준 비용 (USD, 단가가 있는 모델만, 하나도 없으면 None)"""
+        total, priced = 0.0, False
+        for name, share in shares.items():
+            if name in self.prices:
+                input_price, output_price = self.prices[name]
+                total += share * (self.plan.input_tokens * input_price + self.plan.output_tokens * output_price) / 1e6
+                priced = True
+        return total if priced else None
+
+    @property
+    def expected_cost(self) -> Optional[float]:
+        return self.cost(self.profile.shares)
+
+    @property
+    def worst_cost(self) -> Optional[float]:
+        """모든 요청이 마지막 단계까지 간 경우"""
+        return self.cost({name: 1.0 for name in self.profile.tiers})
+
+    def lines(self) -> list:
+        """로그용 요약"""
+        plan, profile = self.plan, self.profile
+        lines = [
+            f"🧮 드라이런: 전체 {plan.total_rows}행 → AI 호출 {plan.ai_rows}행 "
+            f"(AI 생략 {plan.ai_skipped} | 중복 {plan.deduplicated} | 변경 없음 {plan.reused} | 원고 없음 {plan.empty})",
+            f"📏 입력 약 {plan.input_tokens:,}토큰 / 출력 약 {plan.output_tokens:,}토큰 "
+            f"(호출 {self.calls:,}회, 가장 큰 프롬프트 약 {plan.largest_prompt:,}토큰)",
+        ]
+        if not self.calls:
+            lines.append("⏱️ AI 호출 없음 - 금방 끝납니다")
+            return lines
+
+        seconds = f"원고 {profile.edit_seconds:.1f}초"
+        if plan.speaker_calls:
+            seconds += f" / 화자 분석 {profile.speaker_seconds:.1f}초"
+        bound = "분당 한도" if self.rate_limit_seconds > self.latency_seconds else "응답 시간"
+        lines.append(f"⏱️ 예상 소요 {format_duration(self.wall_seconds)} ({bound} 기준, 동시 요청 {self.concurrency}, "
+                     f"호출당 {seconds} - {profile.source})")
+        if self.requests_per_minute:
+            lines.append(f"🔑 분당 한도 {self.requests_per_minute}회 → API 요청 {self.requests:,}회에 최소 "
+                         f"{format_duration(self.rate_limit_seconds)}")
+        if self.expected_cost is not None:
+            cost = f"💰 예상 비용 약 ${self.expected_cost:.2f} ({' → '.join(profile.tiers)}"
+            if self.worst_cost and self.worst_cost > self.expected_cost:
+                cost += f", 모두 상위 모델까지 가면 최대 ${self.worst_cost:.2f}"
+            lines.append(cost + ")")
+        return lines
+
+    def as_dict(self) -> Dict:
+        plan = self.plan
+        return {
+            'total_rows': plan.total_rows, 'ai_rows': plan.ai_rows, 'ai_skipped': plan.ai_skipped,
+            'deduplicated': plan.deduplicated, 'reused': plan.reused, 'empty': plan.empty,
+            'speaker_calls': plan.speaker_calls, 'input_tokens': plan.input_tokens,
+            'output_tokens': plan.output_tokens, 'requests': self.requests, 'concurrency': self.concurrency,
+            'wall_seconds': round(self.wall_seconds, 1), 'latency_source': self.profile.source,
+            'expected_cost_usd': self.expected_cost, 'worst_cost_usd': self.worst_cost,
+        }
+
+
+def call_profile(tiers: Sequence[str], model=None, records: Optional[str] = None,
+                 seconds: Optional[float] = None) -> CallProfile:
+    """호출당 시간 (직접 지정 → 세션 측정 → 기록 파일 → 기본값)"""
+    if seconds:
+        return CallProfile(tiers, seconds, seconds, source='직접 지정')
+    profile = CallProfile.from_model(model)
+    if profile is None and records and os.path.exists(records):
+        profile = CallProfile.from_records(records, tiers)
+    return profile or CallProfile(tiers)
+
+
+def estimate_editor(engine, input_file: str, output_file: Optional[str] = None, model=None,
+                    records: Optional[str] = None, seconds: Optional[float] = None, api_key=None) -> DryRunReport:
+    """원고 수정 드라이런 (engine.concurrency - 자동 조절 모델이면 지금 한도, 금칙어/예시는 미리 load_resources)"""
+    plan = plan_editor_rows(engine, input_file, output_file)
+    limiter = getattr(model, 'limiter', None)
+    concurrency = min(limiter.current, engine.concurrency) if limiter else engine.concurrency
+    return DryRunReport(plan, call_profile(engine.model_tiers, model, records, seconds), concurrency,
+                        rate_limit(api_key))
+
+
+def estimate_search(optimizer, input_file: str, output_file: Optional[str] = None, model=None,
+                    records: Optional[str] = None, seconds: Optional[float] = None, api_key=None,
+                    incremental: bool = True) -> DryRunReport:
+    """검색 최적화 드라이런 (행은 하나씩 처리하므로 동시 요청 1, GUI는 매니페스트를 쓰지 않으므로 incremental=False)"""
+    plan = plan_search_rows(optimizer, input_file, output_file, incremental)
+    tiers = optimizer.ai_rewriter.model_tiers if optimizer.ai_rewriter else configured_tiers()
+    return DryRunReport(plan, call_profile(tiers, model, records, seconds), 1, rate_limit(api_key))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="일괄 처리 사전 추정 (AI 호출 없이 시간/토큰/비용)")
+    parser.add_argument('input', help="처리할 엑셀 파일")
+    parser.add_argument('--mode', choices=['editor', 'search'], default='editor',
+                        help="editor: 원고 수정 (원고자동화3), search: 검색 최적화 + AI 재구성")
+    parser.add_argument('--output', help="결과 파일 (변경 없는 행 판정용, 기본은 실제 처리와 같음)")
+    parser.add_argument('--resources', help="금칙어_리스트.xlsx, 수정전후.xlsx 등이 있는 폴더 (기본: 입력 파일 폴더)")
+    parser.add_argument('--concurrency', type=int, default=3, help="AI 동시 요청 수 (editor)")
+    parser.add_argument('--records', help="record 백엔드 JSONL (측정된 호출 시간 사용)")
+    parser.add_argument('--seconds', type=float, help="호출당 시간 직접 지정 (초)")
+    parser.add_argument('--api-key', help="API 키 (쉼표 구분, 분당 한도 계산용 키 수)")
+    parser.add_argument('--json', action='store_true', help="JSON으로 출력")
+    args = parser.parse_args()
+
+    if args.mode == 'editor':
+        from editor_engine import EditorEngine
+
+        engine = EditorEngine(log=lambda message, color=None: None, concurrency=args.concurrency)
+        engine.load_resources(args.resources or os.path.dirname(os.path.abspath(args.input)))
+        report = estimate_editor(engine, args.input, args.output, records=args.records, seconds=args.seconds,
+                                 api_key=args.api_key)
+    else:
+        from search_optimizer import SearchOptimizer
+
+        optimizer = SearchOptimizer(use_ai=True, ai_model=DryRunModel())
+        report = estimate_search(optimizer, args.input, args.output, records=args.records, seconds=args.seconds,
+                                 api_key=args.api_key)
+
+    if args.json:
+        print(json.dumps(report.as_dict(), ensure_ascii=False, indent=1))
+    else:
+        for line in report.lines():
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+문장 단위 수정 목록 (AI 출력 토큰 절감용)
+- 원고를 문장 번호로 나누고, AI는 고칠 부분만 [{sentence, old, new}] 로 돌려줌
+- 수정 목록은 로컬에서 적용하고 검증 (적용 안 되면 EditApplyError)
+- 수정 전후 원고로부터 수정 목록 역산 (측정용)
+"""
+
+import json
+import re
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List
+
+# 문장 끝: 문장부호 + 공백, 또는 줄바꿈
+SENTENCE_END_RE = re.compile(r'[.!?]+[ \t]+|[.!?]*\n+')
+
+# Gemini 구조화 출력 스키마
+EDIT_SCHEMA = {
+    'type': 'array',
+    'items': {
+        'type': 'object',
+        'properties': {
+            'sentence': {'type': 'integer'},
+            'old': {'type': 'string'},
+            'new': {'type': 'string'},
+        },
+        'required': ['sentence', 'old', 'new'],
+    },
+}
+
+
+class EditApplyError(ValueError):
+    """수정 목록을 원고에 적용할 수 없음"""
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    문장 단위로 나누기 (뒤 공백/줄바꿈 포함 → 이어 붙이면 원문 그대로)
+    """
+    sentences = []
+    start = 0
+    for match in SENTENCE_END_RE.finditer(text):
+        sentences.append(text[start:match.end()])
+        start = match.end()
+    if start < len(text):
+        sentences.append(text[start:])
+    return sentences
+
+
+def number_sentences(text: str) -> str:
+    """프롬프트용 번호 붙인 원고 ("[0] 첫 문장")"""
+    return '\n'.join(f"[{i}] {sentence.strip()}" for i, sentence in enumerate(split_sentences(text)))
+
+
+def parse_edits(response_text: str) -> List[Dict]:
+    """AI 응답(JSON) → 수정 목록"""
+    try:
+        data = json.loads(response_text)
+    except json.JSONDecodeError as e:
+        raise EditApplyError(f"JSON 아님: {e}")
+
+    if isinstance(data, dict):
+        data = data.get('edits', [])
+    if not isinstance(data, list):
+        raise EditApplyError("수정 목록이 배열이 아님")
+
+    edits = []
+    for item in data:
+        if not isinstance(item, dict) or not {'sentence', 'old', 'new'} <= set(item):
+            raise EditApplyError(f"잘못된 수정 항목: {item}")
+        edits.append({'sentence': int(item['sentence']), 'old': str(item['old']), 'new': str(item['new'])})
+    return edits
+
+
+def apply_edits(text: str, edits: List[Dict], forbidden_words: Iterable[str] = ()) -> str:
+    """
+    수정 목록 적용 + 검증
+
+    Args:
+        text: 원고
+        edits: [{sentence, old, new}] (같은 문장은 순서대로 적용)
+        forbidden_words: 새로 넣는 내용에 있으면 안 되는 단어
+
+    Raises:
+        EditApplyError: 문장 번호가 없거나, old가 문장에 없거나, new에 금칙어가 있을 때
+    """
+    sentences = split_sentences(text)
+    forbidden_words = list(forbidden_words)
+
+    for edit in edits:
+        index, old, new = edit['sentence'], edit['old'], edit['new']
+        if not 0 <= index < len(sentences):
+            raise EditApplyError(f"문장 번호 없음: {index}")
+        if not old or old not in sentences[index]:
+            raise EditApplyError(f"{index}번 문장에 '{old}' 없음")
+
+        added = [word for word in forbidden_words if word in new and word not in old]
+        if added:
+            raise EditApplyError(f"금칙어 추가됨: {', '.join(added)}")
+
+        sentences[index] = sentences[index].replace(old, new, 1)
+
+    return ''.join(sentences)
+
+
+def trim_edit(index: int, old: str, new: str) -> Dict:
+    """문장 전체 교체 → 실제로 바뀐 부분만 (앞뒤 공통 부분 제거, 문장 안에서 위치가 유일하도록)"""
+    prefix = 0
+    while prefix < min(len(old), len(new)) and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < min(len(old), len(new)) - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+
+    start, end = prefix, len(old) - suffix
+    new_start, new_end = prefix, len(new) - suffix
+
+    # old가 비었거나 문장 안 첫 등장 위치가 다르면 앞뒤로 넓힘
+    while start == end or old.find(old[start:end]) != start:
+        if start > 0:
+            start -= 1
+            new_start -= 1
+        else:
+            end += 1
+            new_end += 1
+
+    return {'sentence': index, 'old': old[start:end], 'new': new[new_start:new_end]}
+
+
+def derive_edits(before: str, after: str) -> List[Dict]:
+    """수정 전후 원고 → 수정 목록 (apply_edits(before, 결과) == after)"""
+    old_sentences = split_sentences(before)
+    new_sentences = split_sentences(after)
+    if not old_sentences:
+        raise EditApplyError("수정 전 원고가 비어 있음")
+
+    edits = []
+    matcher = SequenceMatcher(a=old_sentences, b=new_sentences, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+
+        inserted = ''.join(new_sentences[j1:j2])
+        if i1 == i2:
+            # 삽입: 앞 문장 뒤에 (맨 앞이면 첫 문장 앞에) 붙임
+            if i1 > 0:
+                edits.append(trim_edit(i1 - 1, old_sentences[i1 - 1], old_sentences[i1 - 1] + inserted))
+            else:
+                edits.append(trim_edit(0, old_sentences[0], inserted + old_sentences[0]))
+            continue
+
+        # 교체/삭제: 첫 문장에 새 내용 전체, 나머지 문장은 삭제
+        edits.append(trim_edit(i1, old_sentences[i1], inserted))
+        for index in range(i1 + 1, i2):
+            edits.append({'sentence': index, 'old': old_sentences[index], 'new': ''})
+
+    return edits
@@ -0,0 +1,1012 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+블로그 원고 자동 수정 엔진 (GUI / CLI / 데몬 공용)
+- 금칙어, 학습 예시 로딩 (세션 캐시, 파일이 바뀌었을 때만 다시 읽음 / 예시는 원고마다 비슷한 것을 골라 프롬프트에)
+- 프롬프트 생성, AI 수정(JSON 스키마 응답 + 로컬 검증), 화자 분석
+- 엑셀 일괄 처리 (중복 원고 재사용, 변경된 행만 재처리)
+- AI 응답은 스트리밍으로 받으며 조기 중단, 행별 진행 상황 실시간 전달
+- 호출 마감 시간/헤징, 취소·일시정지 시 처리한 행까지 저장 (다음 실행에서 이어서)
+- 일괄 처리는 단계별 파이프라인 (AI 호출 동시 실행, 로컬 작업/쓰기와 겹침)
+- 동시 요청 수 자동 조절 (선택, 429/시간 초과/지연 급증이면 줄이고 정상이면 늘림)
+- 화자 정보 로컬 판정 (선택, 신뢰도가 낮은 원고만 AI 화자 분석)
+"""
+
+import os
+import re
+import threading
+from datetime import datetime
+
+import openpyxl
+
+from adaptive_limit import DEFAULT_INITIAL, AdaptiveLimiter
+from deadlines import Cancelled, RunControl
+from example_index import (DEFAULT_EXAMPLE_COUNT, DEFAULT_EXAMPLE_TOKENS, INDEX_CACHE_FILE, ExampleIndex,
+                           examples_fingerprint, format_example)
+from hashing import content_hash
+from pipeline import Pipeline, Stage, StageError
+from paragraph_parallel import (distribute, format_context, group_paragraphs, rewrite_groups, split_paragraphs,
+                                stitch, trim_excess)
+from korean_particles import replace_with_particles
+from manifest import RunManifest, version_fingerprint
+from model_tiers import (DEFAULT_TIMEOUT, TieredModel, configured_tiers, create_tiered_model, generate,
+                         generate_manuscript)
+from resource_cache import SESSION_CACHE, read_examples_workbook, read_forbidden_workbook
+from speaker_classifier import SPEAKER_MODEL_FILE, SPEAKER_VERSION, SpeakerClassifier
+from prompt_budget import PromptAssembler
+from quality_gate import (GATE_VERSION, SKIP_LABEL, check_common, count_standalone, find_forbidden, format_decision,
+                          gate_decision, parse_count_rules, starts_with_keyword)
+from streaming import JUNK_PATTERNS, ProgressTracker, StreamGuard
+from structured_output import OUTPUT_INSTRUCTION
+from token_estimator import estimate_output_tokens
+
+
+def print_log(message, color=None):
+    """기본 로그 출력 (콘솔)"""
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+
+class EditorEngine:
+    """원고 자동 수정 엔진"""
+
+    # Gemini 모델 (모델 단계의 최상위)
+    MODEL_NAME = 'gemini-2.5-pro'
+
+    # 화자 분석 응답 형식 (빠른 모델 결과 검증용)
+    SPEAKER_FORMAT_RE = re.compile(r'성별\s*:\s*\S+.*연령대\s*:\s*\S+.*상황\s*:\s*\S+', re.S)
+
+    # 교정/후처리 로직 버전 (규칙 코드를 바꾸면 올릴 것 → 전체 재처리)
+    PIPELINE_VERSION = 2
+
+    # 입력/출력 열 (B, D, E, G, J, K, L → M, N, O)
+    INPUT_COLUMNS = {
+        'keyword': 2,  # B열: 키워드
+        'main_keyword_count': 4,  # D열: 통키워드 반복수
+        'sub_keyword_count': 5,  # E열: 조각키워드 반복수
+        'original': 7,  # G열: 원고
+        'char_count': 10,  # J열: 실제 글자수
+        'keyword_start_count': 11,  # K열: 문장시작통키워드 수
+        'extra_keyword_count': 12,  # L열: 보정 서브키워드 목록 수
+    }
+    EDITED_COLUMN = 13  # M열: 수정 원고
+    SPEAKER_COLUMN = 14  # N열: 화자 정보
+    GATE_COLUMN = 15  # O열: AI 판정 (생략 여부와 사유)
+
+    # 문단 병렬 수정은 이 글자수 이상 원고에만 적용
+    PARALLEL_MIN_CHARS = 800
+
+    # 스트리밍 중 받은 글자수가 목표의 이 배수를 넘으면 폭주로 보고 중단
+    RUNAWAY_RATIO = 1.5
+
+    # 빠른 모델 결과를 상위 모델로 넘기는 글자수 차이 (목표 대비) - 그보다 작은 차이와 키워드 횟수 차이는 받아들임
+    ESCALATE_CHAR_RATIO = 0.2
+
+    # 리소스 파일 (작업 폴더 안)
+    FORBIDDEN_FILE = '금칙어_리스트.xlsx'
+    EXAMPLE_FILES = ('수정전후.xlsx', '블로그_작업_엑셀템플릿.xlsx')
+
+    # 프롬프트 학습 예시: 비슷한 예시 최대 개수, 예시 합계 토큰 예산
+    EXAMPLE_COUNT = DEFAULT_EXAMPLE_COUNT
+    EXAMPLE_TOKENS = DEFAULT_EXAMPLE_TOKENS
+
+    # 프롬프트 입력 토큰 예산 (로컬 추정 기준, 넘으면 금칙어 목록/예시부터 줄임)
+    PROMPT_TOKENS = 6000
+
+    # 파이프라인 로컬 단계 작업자 수 (AI 호출 단계는 concurrency)
+    PROMPT_WORKERS = 2
+    POSTPROCESS_WORKERS = 2
+
+    def __init__(self, log=None, ai_gate=True, parallel_groups=0, model_tiers=None, progress=None,
+                 request_timeout=DEFAULT_TIMEOUT, hedge=False, concurrency=1, resource_cache=None,
+                 prompt_tokens=None, adaptive=False, local_speaker=False):
+        """
+        초기화
+
+        Args:
+            log: 로그 함수 (message, color) - 없으면 콘솔 출력
+            ai_gate: True면 원본이 교정만으로 규칙을 모두 지킬 때 AI 수정 생략
+            parallel_groups: 2 이상이면 긴 원고를 최대 이 개수의 문단 묶음으로 나눠 동시에 수정
+            model_tiers: 모델 단계 (빠른 모델부터, 없으면 환경변수 GEMINI_MODEL_TIERS 또는 기본값)
+            progress: 진행 상황 함수 (message) - 스트리밍으로 받은 글자수를 행별로 실시간 전달
+            request_timeout: AI 호출 마감 시간 (초) - 넘기면 상위 모델로
+            hedge: True면 최근 응답 시간 p95가 지나도 응답이 없을 때 같은 요청 한 번 더 (먼저 온 응답 사용)
+            concurrency: 일괄 처리 시 AI 동시 호출 수
+            resource_cache: 금칙어/예시 캐시 (없으면 프로세스 공용 세션 캐시)
+            prompt_tokens: 프롬프트 입력 토큰 예산 (없으면 PROMPT_TOKENS)
+            adaptive: True면 concurrency를 최대값으로 두고 AI 동시 요청 수를 자동 조절 (AIMD)
+            local_speaker: True면 화자 정보를 로컬에서 판정하고 신뢰도가 낮을 때만 AI 화자 분석
+        """
+        log = log or print_log
+        log_lock = threading.Lock()
+
+        def locked_log(message, color=None):
+            # 파이프라인 여러 단계에서 동시에 로그 → 한 번에 하나씩
+            with log_lock:
+                log(message, color)
+
+        self.log = locked_log
+        self.concurrency = max(1, concurrency)
+        self.adaptive = adaptive
+        self.local_speaker = local_speaker
+        self.speaker_classifier = SpeakerClassifier()
+        self.speaker_model_stamp = None  # 불러온 화자모델.json (경로, 수정 시각)
+        self.speaker_stats = {'local': 0, 'model': 0}
+        self.stats_lock = threading.Lock()  # speaker_stats (화자 분석 워커 여러 개가 동시에 셈)
+        self.progress = progress
+        self.request_timeout = request_timeout
+        self.hedge = hedge
+        self.control = RunControl()  # 취소/일시정지 (GUI 버튼)
+        self.ai_gate = ai_gate
+        self.parallel_groups = parallel_groups
+        self.model_tiers = configured_tiers(model_tiers)
+        self.resource_cache = resource_cache or SESSION_CACHE
+        self.prompt_tokens = prompt_tokens or self.PROMPT_TOKENS
+        self.forbidden_words = {}
+        self.examples = ()
+        self.example_index = None
+
+    def create_model(self, api_key, client=None):
+        """
+        모델 초기화 (빠른 모델 → 검증 실패 시 상위 모델)
+
+        Args:
+            client: 모델 클라이언트 (없으면 환경변수 GEMINI_BACKEND 기준 - 기본은 실제 Gemini)
+        """
+        def log(message):
+            self.log(message, "#95a5a6")
+
+        limiter = None
+        if self.adaptive:
+            limiter = AdaptiveLimiter(maximum=self.concurrency, initial=min(DEFAULT_INITIAL, self.concurrency), log=log)
+        return create_tiered_model(api_key, self.model_tiers, log=log, timeout=self.request_timeout, hedge=self.hedge,
+                                   control=self.control, client=client, limiter=limiter)
+
+    def load_forbidden_words(self, base_dir):
+        """금칙어 로딩 (세션 캐시 - 파일이 바뀌었을 때만 다시 읽음)"""
+        try:
+            file_path = os.path.join(base_dir, self.FORBIDDEN_FILE)
+
+            if not os.path.exists(file_path):
+                self.log(f"⚠️  금칙어 파일 없음: {file_path}", "#e67e22")
+                return False
+
+            self.forbidden_words = self.resource_cache.get(file_path, read_forbidden_workbook)
+
+            self.log(f"✅ 금칙어 {len(self.forbidden_words)}개 로딩 완료", "#27ae60")
+            return True
+
+        except Exception as e:
+            self.log(f"❌ 금칙어 로딩 실패: {str(e)}", "#e74c3c")
+            return False
+
+    def load_examples(self, base_dir):
+        """학습 예시 로딩 (세션 캐시, 두 파일 동시에 - 다시 불러도 쌓이지 않고 교체)"""
+        try:
+            paths = [os.path.join(base_dir, name) for name in self.EXAMPLE_FILES]
+            loaded = self.resource_cache.load_many([(path, read_examples_workbook)
+                                                    for path in paths if os.path.exists(path)])
+            examples = tuple(example for file_examples in loaded for example in file_examples)
+
+            # 비슷한 예시 검색용 색인 (예시가 바뀌었을 때만, 예시 폴더에 캐시)
+            if self.example_index is None or self.example_index.fingerprint != examples_fingerprint(examples):
+                self.example_index = ExampleIndex.load_or_build(
+                    examples, os.path.join(base_dir, INDEX_CACHE_FILE),
+                    log=lambda message: self.log(message, "#e67e22"))
+            self.examples = examples
+
+            self.log(f"✅ 학습 예시 {len(self.examples)}개 로딩 완료", "#27ae60")
+            return len(self.examples) > 0
+
+        except Exception as e:
+            self.log(f"❌ 예시 로딩 실패: {str(e)}", "#e74c3c")
+            return False
+
+    def load_resources(self, base_dir):
+        """
+        금칙어 + 학습 예시 로딩 (세 파일을 동시에 읽어 캐시에 올린 뒤 각각 로딩)
+
+        Returns:
+            (금칙어 로딩 성공, 예시 로딩 성공)
+        """
+        paths = [os.path.join(base_dir, name) for name in (self.FORBIDDEN_FILE, *self.EXAMPLE_FILES)]
+        readers = [read_forbidden_workbook] + [read_examples_workbook] * len(self.EXAMPLE_FILES)
+        try:
+            self.resource_cache.load_many([(path, reader) for path, reader in zip(paths, readers)
+                                           if os.path.exists(path)])
+        except Exception:
+            pass  # 실패한 파일은 아래 개별 로딩에서 다시 시도하며 오류를 기록
+        self.load_speaker_model(base_dir)
+        return self.load_forbidden_words(base_dir), self.load_examples(base_dir)
+
+    def load_speaker_model(self, base_dir):
+        """화자 판정 학습 결과(화자모델.json, speaker_classifier.py train) 로딩 - 바뀐 경우에만 다시 읽음"""
+        path = os.path.join(base_dir, SPEAKER_MODEL_FILE)
+        if not os.path.exists(path):
+            return
+        stamp = (os.path.abspath(path), os.path.getmtime(path))
+        if stamp == self.speaker_model_stamp:
+            return
+        try:
+            classifier = SpeakerClassifier(self.speaker_classifier.threshold)
+            keywords = classifier.load(path)
+        except Exception as e:
+            self.log(f"⚠️ 화자 판정 학습 결과 로드 실패: {e}", "#e67e22")
+            return
+        self.speaker_classifier, self.speaker_model_stamp = classifier, stamp
+        self.log(f"✅ 화자 판정 학습 결과 로드됨 (키워드 {keywords}개)", "#27ae60")
+
+    def speaker_prompt(self, text):
+        """화자 분석 프롬프트 (글 앞 500자)"""
+        return f"""
+다음 블로그 글을 분석하여 작성자(화자)의 정보를 유추해주세요.
+
+글:
+{text[:500]}...
+
+다음 형식으로만 답변하세요 (다른 설명 없이):
+성별: [남성/여성/알 수 없음]
+연령대: [20대/30대/40대/50대/60대 이상/알 수 없음]
+상황: [한 줄로 간단히 설명]
+
+예시:
+성별: 여성
+연령대: 30대
+상황: 자녀 키 성장 고민
+"""
+
+    def analyze_speaker(self, text, model):
+        """화자 정보 분석 (성별, 연령대, 상황)"""
+        if not text:
+            return "분석 불가"
+
+        try:
+            response = generate(model, self.speaker_prompt(text),
+                                validate=lambda result: bool(self.SPEAKER_FORMAT_RE.search(result)))
+            analysis = response.text.strip()
+
+            # 한 줄로 정리
+            analysis = analysis.replace('\n', ' / ')
+
+            return analysis
+
+        except Cancelled:
+            raise
+        except Exception as e:
+            return f"분석 실패: {str(e)}"
+
+    def add_line_breaks(self, text):
+        """문장마다 줄바꿈 추가"""
+        if not text:
+            return text
+
+        # 문장 종결 부호 뒤에 줄바꿈 추가
+        # 이미 줄바꿈이 있으면 추가하지 않음
+        text = re.sub(r'([.!?])\s+', r'\1\n', text)
+
+        # 연속된 줄바꿈을 하나로 (최대 1개)
+        text = re.sub(r'\n{2,}', '\n', text)
+
+        return text.strip()
+
+    def apply_basic_corrections(self, text):
+        """기본 교정"""
+        if not text:
+            return text
+
+        # 1. 네요 -> 내요 (무조건)
+        text = text.replace('네요', '내요')
+
+        # 2. 더라 -> 더 라 (무조건)
+        text = text.replace('더라', '더 라')
+
+        # 3. 이모티콘 앞뒤 띄어쓰기 처리 (서브키워드 카운팅을 위해)
+        emoticons = ['^^', '??', '!!', '~~', '...', 'ㅠㅠ', 'ㅜㅜ', 'ㅎㅎ', ';;', '--', 'ㅋㅋ']
+
+        for emoticon in emoticons:
+            # 이모티콘 앞에 띄어쓰기 없으면 추가
+            # "좋아요^^" → "좋아요 ^^"
+            text = re.sub(r'([^\s])' + re.escape(emoticon), r'\1 ' + emoticon, text)
+
+            # 이모티콘 뒤 문장부호 제거하고 띄어쓰기
+            # "^^ ." → "^^ "
+            text = text.replace(f'{emoticon}.', f'{emoticon} ')
+            text = text.replace(f'{emoticon},', f'{emoticon} ')
+            text = text.replace(f'{emoticon}!', f'{emoticon} ')
+            text = text.replace(f'{emoticon}?', f'{emoticon} ')
+
+            # 이모티콘 뒤에 아무것도 없거나 문자가 바로 오면 띄어쓰기 추가
+            # "^^ 다음" 은 그대로, "^^다음" → "^^ 다음"
+            text = re.sub(re.escape(emoticon) + r'([^\s.,!?])', emoticon + r' \1', text)
+
+        # 4. 금칙어 치환 (조사 교정 포함)
+        for forbidden, alternatives in self.forbidden_words.items():
+            if forbidden in text and alternatives:
+                text, _ = replace_with_particles(text, forbidden, alternatives[0])
+
+        return text
+
+    def parse_keyword_rule(self, rule_text):
+        """키워드 규칙 파싱"""
+        if not rule_text:
+            return ""
+
+        rule_text = str(rule_text).strip()
+
+        # "키워드 : 숫자" 형식 파싱
+        match = re.match(r'(.+?)\s*:\s*(\d+)', rule_text)
+        if match:
+            keyword = match.group(1).strip()
+            count = match.group(2).strip()
+            return f"'{keyword}'를 정확히 {count}번 반복 (±1 허용)"
+
+        return rule_text
+
+    def parse_sub_keywords(self, rule_text):
+        """조각 키워드 규칙 파싱"""
+        if not rule_text:
+            return ""
+
+        rule_text = str(rule_text).strip()
+
+        # 여러 줄로 나뉜 경우 처리
+        lines = rule_text.split('\n')
+        parsed_rules = []
+
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+
+            # "키워드 : 숫자" 형식 파싱
+            match = re.match(r'(.+?)\s*:\s*(\d+)', line)
+            if match:
+                keyword = match.group(1).strip()
+                count = match.group(2).strip()
+                parsed_rules.append(f"'{keyword}' {count}번")
+
+        if parsed_rules:
+            return ", ".join(parsed_rules) + " 각각 반복 (±1 허용)"
+
+        return rule_text
+
+    def select_examples(self, row_data):
+        """원고와 비슷한 학습 예시 (토큰 예산 안에서 최대 EXAMPLE_COUNT개)"""
+        if not self.examples:
+            return []
+        if self.example_index is None or len(self.example_index.examples) != len(self.examples):
+            self.example_index = ExampleIndex(self.examples)
+        return self.example_index.select(row_data['keyword'], row_data['original'],
+                                         k=self.EXAMPLE_COUNT, token_budget=self.EXAMPLE_TOKENS)
+
+    def build_prompt(self, row_data):
+        """
+        Gemini용 프롬프트 조립 (블록별 우선순위, 입력 토큰 예산 self.prompt_tokens)
+
+        Returns:
+            AssembledPrompt (text, 추정 토큰 수, 줄인 블록)
+        """
+
+        # 키워드 규칙 파싱
+        main_keyword_rule = self.parse_keyword_rule(row_data['main_keyword_count'])
+        sub_keyword_rule = self.parse_sub_keywords(row_data['sub_keyword_count'])
+        extra_keyword_count = str(row_data['extra_keyword_count']).strip() if row_data['extra_keyword_count'] else "0"
+
+        # 글자수 및 오차 계산
+        target_chars = int(row_data['char_count']) if row_data['char_count'] else 1000
+        char_tolerance = int(target_chars * 0.05)  # 5% 오차
+
+        # 통키워드 문장 시작 횟수
+        keyword_start_count = str(row_data['keyword_start_count']).strip() if row_data['keyword_start_count'] else "2~3"
+
+        # 금칙어 리스트 생성 (원고에 나오는 금칙어 먼저 - 예산이 모자라면 나머지부터 줄임)
+        original = str(row_data['original'] or '')
+        forbidden_hit, forbidden_rest = "", ""
+        for forbidden, alternatives in self.forbidden_words.items():
+            alt_text = ", ".join(alternatives[:3])  # 최대 3개까지만
+            line = f"- '{forbidden}' 대신 → {alt_text} 중 문맥에 맞는 것 사용\n"
+            if forbidden in original:
+                forbidden_hit += line
+            else:
+                forbidden_rest += line
+
+        rules = f"""
+당신은 원고를 정확한 규칙에 맞춰 수정하는 전문가입니다.
+
+# 핵심 규칙
+
+## 1. 키워드 규칙
+- **통 키워드 (핵심 키워드)**: {main_keyword_rule}
+  → **중요**: 이 횟수는 첫 문단을 제외한 나머지 문단에서의 반복 횟수
+  → 첫 문단에는 무조건 2회, 나머지 문단에서만 지정된 횟수 반복
+- **조각 키워드**: {sub_keyword_rule}
+  → **중요**: 이 횟수도 첫 문단을 제외한 나머지 문단에서의 반복 횟수
+- **서브 키워드 목록 수**: {extra_keyword_count}개
+  → 조각 키워드를 제외한 2회 이상 등장하는 단어의 총 개수
+  → **중요**: 단어가 부족하면 중복 문장부호 적극 활용 (^^, ??, !!, ~~, .., ㅠㅠ, ㅜㅜ, ㅎㅎ 등)
+  → 각 중복 문장부호는 서브키워드 1개로 카운팅됨
+  → 예시: ^^ 사용, ?? 사용, .. 사용, ~~ 사용 등으로 자연스럽게 개수 채우기
+
+## 2. 카운팅 규칙 (매우 중요!)
+- **띄어쓰기 단위로 카운팅**
+- "강남 맛집 추천을" → 통키워드 카운팅 안됨 (조사 '을' 붙음)
+- "강남 맛집 추천 리스트" → 통키워드 1회 카운팅 됨
+- **한글자 조사(을/를/이/가)**: 띄어쓰기 하지 말고 우회 표현 사용
+- **두글자 이상 조사(으로/에게/부터)**: 띄어쓰기 허용
+- **중복 문장부호 카운팅**: 앞뒤 띄어쓰기 필수
+  → "궁금해요 ^^ 정말" → ^^ 는 1개 서브키워드
+  → "그렇내요.." → 카운팅 안됨 (띄어쓰기 없음)
+  → "그렇내요 .." → 카운팅 됨 (띄어쓰기 있음)
+
+## 3. 첫 문단 필수 규칙 (매우 중요!)
+- **첫 문단에 핵심 키워드 정확히 2회 등장 필수**
+- 핵심 키워드 사이에 2문장 이상 삽입
+- 예시: "페퍼로니피자 다이어트 관련해서 요즘 알아보고 있어요. (중간 2문장) 페퍼로니피자 다이어트 정보를 찾아보니..."
+- **주의**: 첫 문단은 첫 번째 문단 구분(줄바꿈) 전까지를 의미함
+
+## 4. 핵심 키워드로 시작하는 문장
+- 글 전체에서 핵심 키워드로 시작하는 문장이 {keyword_start_count}개 있어야 함
+- 예: "강남 맛집 추천을 받아서..." (X - 조사 붙음)
+- 예: "강남 맛집 추천 리스트를 보면..." (O - 띄어쓰기 유지)
+
+## 5. 글 구조
+- **도입부**: 고민/궁금증/경험 소개
+- **중간부**: 자연스러운 키워드 반복
+- **마무리**: 댓글 유도 (정보 공유 요청, 질문 등)
+
+## 6. 키워드 부족 시
+- **일반 단어 부족**: 자연스러운 문맥에 추가 삽입
+- **서브키워드 부족**: 중복 문장부호를 적극 활용하여 채우기
+  → ^^, ??, !!, ~~, ..., ㅠㅠ, ㅜㅜ, ㅎㅎ 등을 문장 끝이나 중간에 자연스럽게 배치
+  → 각 중복 문장부호는 앞뒤 띄어쓰기 필수 (예: "궁금해요 ^^ 정말" / "그렇네요 ...")
+  → 개수가 다르면 다른 서브키워드 (예: ?? 와 ??? 는 별개)
+- **그래도 부족하면**: 마지막에 #해시태그 형식으로 추가
+  → 맛집 서브키워드 추가시 예: # 강남 맛집 # 맛집 추천
+
+## 7. 글자수
+- 목표: 약 {target_chars}자 (±{char_tolerance}자, 목표의 ±5% 허용)
+
+## 8. 금칙어 (절대 사용 금지)
+**다음 단어들은 절대 사용하지 말고, 문맥에 맞는 대체어를 사용하세요:**
+
+"""
+
+        manuscript = f"""
+
+# 수정할 원고
+**키워드**: {row_data['keyword']}
+
+{row_data['original']}
+
+# 지시사항
+위 모든 규칙을 정확히 지키면서 자연스럽고 읽기 편한 블로그 글로 수정하세요.
+
+**특히 중요:**
+1. 첫 문단(첫 번째 줄바꿈 전까지)에 '{row_data['keyword']}' 정확히 2회 포함
+2. **첫 문단 이후 나머지 문단에서** 통키워드와 조각키워드는 지정된 횟수만큼만 사용
+3. 서브키워드 목표 개수를 맞추기 위해 중복 문장부호(^^, ??, !!, ㅠㅠ, ㅜㅜ, ..., ~~ 등) 적극 활용
+4. 통키워드로 시작하는 문장 2~3개 포함
+5. **금칙어는 절대 사용하지 말고 문맥에 맞는 대체어 사용**
+
+**예시:**
+- 통키워드 0회 지정 = 첫 문단에만 2회, 나머지 문단 0회
+- 조각키워드 '다이어트' 3회 지정 = 첫 문단 제외하고 3회
+
+**{OUTPUT_INSTRUCTION}**
+"""
+
+        # 우선순위: 규칙/원고는 필수, 예산을 넘으면 나머지 금칙어 → 뒤쪽 예시 → 원고에 나온 금칙어 순으로 줄임
+        assembler = PromptAssembler(self.prompt_tokens)
+        assembler.add('규칙', rules)
+        assembler.add('금칙어(원고)', forbidden_hit, priority=1, shrink='lines')
+        assembler.add('금칙어(나머지)', forbidden_rest, priority=6, shrink='lines')
+        assembler.add('예시 제목', "\n\n# 학습 예시 (패턴 참고)\n")
+        # 예시 데이터 (키워드/내용이 비슷한 예시, 토큰 예산 안에서)
+        for i, ex in enumerate(self.select_examples(row_data), 1):
+            assembler.add(f'예시 {i}', format_example(i, ex), priority=6 - i)
+        assembler.add('원고', manuscript)
+        return assembler.build()
+
+    def create_prompt(self, row_data):
+        """Gemini용 프롬프트 생성 (문자열)"""
+        return self.build_prompt(row_data).text
+
+    def read_row(self, ws, row_idx):
+        """행 데이터 추출"""
+        return {key: ws.cell(row_idx, col).value for key, col in self.INPUT_COLUMNS.items()}
+
+    def row_hash(self, row_data):
+        """행 입력 해시 (중복 원고 판별, 매니페스트용)"""
+        return content_hash(*(row_data[key] for key in sorted(row_data)))
+
+    def version_fingerprint(self):
+        """규칙/프롬프트/모델 버전 지문 - 바뀌면 모든 행 재처리"""
+        probe = {key: None for key in self.INPUT_COLUMNS}
+        return version_fingerprint(
+            self.model_tiers,
+            self.PIPELINE_VERSION,
+            self.create_prompt(probe),  # 규칙, 금칙어 포함
+            self.example_index.fingerprint if self.example_index else None,  # 학습 예시 (원고마다 골라 씀)
+            (self.EXAMPLE_COUNT, self.EXAMPLE_TOKENS, self.prompt_tokens),
+            GATE_VERSION if self.ai_gate else None,
+            self.parallel_groups,
+            (SPEAKER_VERSION, self.speaker_classifier.threshold) if self.local_speaker else None,
+        )
+
+    def check_rules(self, row_data, text):
+        """
+        원고가 수정 규칙을 모두 지키는지 판정 (AI 수정 생략 여부)
+
+        Returns:
+            {'needs_ai': bool, 'reasons': [실패 사유]}
+        """
+        keyword = str(row_data['keyword'] or '').strip()
+        particle_words = {word for alternatives in self.forbidden_words.values() for word in alternatives}
+        if keyword:
+            particle_words.add(keyword)
+        reasons = check_common(text, self.forbidden_words, particle_words)
+
+        # 첫 문단(첫 줄바꿈 전) 핵심 키워드 2회, 나머지 문단은 지정 횟수 ±1
+        first_paragraph, _, rest = text.partition('\n')
+        if keyword:
+            first_count = count_standalone(first_paragraph, keyword)
+            if first_count != 2:
+                reasons.append(f"첫 문단 키워드 {first_count}회(목표 2회)")
+
+        count_rules = parse_count_rules(row_data['main_keyword_count'])
+        count_rules.update(parse_count_rules(row_data['sub_keyword_count']))
+        for rule_keyword, target in count_rules.items():
+            count = count_standalone(rest, rule_keyword)
+            if abs(count - target) > 1:
+                reasons.append(f"'{rule_keyword}' {count}회(목표 {target}회)")
+
+        # 핵심 키워드로 시작하는 문장 수
+        start_target = str(row_data['keyword_start_count'] or '').strip()
+        start_target = int(start_target) if start_target.isdigit() else 2
+        if keyword:
+            sentences = re.split(r'(?<=[.!?])\s+|\n', text)
+            start_count = sum(1 for sentence in sentences if starts_with_keyword(sentence, keyword))
+            if start_count < start_target:
+                reasons.append(f"키워드 시작 문장 {start_count}개(목표 {start_target}개)")
+
+        # 서브 키워드 목록 수 (2회 이상 등장하는 어절 수)
+        extra_target = str(row_data['extra_keyword_count'] or '').strip()
+        if extra_target.isdigit():
+            words = text.split()
+            repeated = {word for word in words if words.count(word) >= 2}
+            if len(repeated) < int(extra_target):
+                reasons.append(f"서브키워드 {len(repeated)}개(목표 {extra_target}개)")
+
+        # 글자수 (목표 ±5%)
+        target_chars = int(row_data['char_count']) if row_data['char_count'] else 1000
+        if abs(len(text) - target_chars) > target_chars * 0.05:
+            reasons.append(f"글자수 {len(text)}자(목표 {target_chars}자)")
+
+        return gate_decision(reasons)
+
+    def postprocess(self, manuscript):
+        """AI 원고 후처리 (기본 교정)"""
+        return self.apply_basic_corrections(manuscript.strip())
+
+    def unfixable_words(self):
+        """대체어가 없는 금칙어 (후처리로 못 고침)"""
+        return [word for word, alternatives in self.forbidden_words.items() if not alternatives]
+
+    def validate_edit(self, row_data, manuscript):
+        """
+        AI 수정 결과 로컬 검증 - 후처리로 못 고치는 실패만 상위 모델로
+        (대체어 없는 금칙어, 마크다운/설명 문구, 글자수 ±ESCALATE_CHAR_RATIO 밖, 빈 원고)
+        - 키워드 횟수/글자수 ±5% 같은 세부 규칙까지 보면 빠른 모델 결과 대부분이 상위 모델로 넘어가 호출이 두 번 듦
+        """
+        text = self.postprocess(manuscript)
+        if not text or find_forbidden(text, self.unfixable_words()):
+            return False
+        if any(pattern.search(text) for pattern, _ in JUNK_PATTERNS):
+            return False
+        target_chars = int(row_data['char_count']) if row_data['char_count'] else 1000
+        return abs(len(text) - target_chars) <= target_chars * self.ESCALATE_CHAR_RATIO
+
+    def validate_group(self, group_row, manuscript):
+        """문단 묶음 수정 결과 로컬 검증 - 금칙어/조사 오류 없음, 배정 글자수 ±20%"""
+        text = self.postprocess(manuscript)
+        target_chars = int(group_row['char_count'] or 0)
+        if target_chars and abs(len(text) - target_chars) > target_chars * 0.2:
+            return False
+        particle_words = {word for alternatives in self.forbidden_words.values() for word in alternatives}
+        return not check_common(text, self.forbidden_words, particle_words)
+
+    def stream_guard(self, target_chars):
+        """스트리밍 검사기 - 대체어 없는 금칙어(후처리로 못 고침), 마크다운/설명 문구, 글자수 폭주 (원고 JSON의 원고 값만 검사)"""
+        return StreamGuard(self.unfixable_words(), max_chars=int(target_chars * self.RUNAWAY_RATIO))
+
+    def edit_text_parallel(self, row_data, model, tracker=None):
+        """
+        문단 병렬 수정 - 글 전체 규칙을 묶음별로 나눠 배정하고 동시에 수정한 뒤 이어 붙임
+
+        Returns:
+            수정 원고 (묶음 수가 1개 이하면 None)
+        """
+        groups = group_paragraphs(split_paragraphs(str(row_data['original'])), self.parallel_groups)
+        if len(groups) < 2:
+            return None
+
+        # 글자수/문장 시작 횟수는 묶음 길이 비율, 키워드 횟수는 첫 문단을 뺀 길이 비율로 배정
+        weights = [len(group) for group in groups]
+        rest_weights = [weights[0] - len(groups[0].split('\n\n')[0])] + weights[1:]
+
+        target_chars = int(row_data['char_count']) if row_data['char_count'] else 1000
+        start_target = str(row_data['keyword_start_count'] or '').strip()
+        start_target = int(start_target) if start_target.isdigit() else 2
+        main_rules = parse_count_rules(row_data['main_keyword_count'])
+        sub_rules = parse_count_rules(row_data['sub_keyword_count'])
+
+        char_shares = distribute(target_chars, weights)
+        start_shares = distribute(start_target, weights)
+        main_shares = {keyword: distribute(count, rest_weights) for keyword, count in main_rules.items()}
+        sub_shares = {keyword: distribute(count, rest_weights) for keyword, count in sub_rules.items()}
+
+        def share_rules(shares, index):
+            return '\n'.join(f"{keyword} : {counts[index]}" for keyword, counts in shares.items())
+
+        def edit_group(group, context):
+            index = context['index']
+            group_row = dict(
+                row_data,
+                original=group,
+                char_count=char_shares[index],
+                keyword_start_count=start_shares[index],
+                main_keyword_count=share_rules(main_shares, index) or row_data['main_keyword_count'],
+                sub_keyword_count=share_rules(sub_shares, index) or row_data['sub_keyword_count'],
+                extra_keyword_count=row_data['extra_keyword_count'] if index == 0 else 0,
+            )
+            notes = []
+            if index > 0:
+                notes.append("이 부분은 첫 문단이 아닙니다. '첫 문단 키워드 2회' 규칙은 적용하지 마세요.")
+            prompt = self.create_prompt(group_row).replace(
+                "# 지시사항", format_context(context, notes) + "# 지시사항", 1)
+            manuscript, notes = generate_manuscript(
+                model, prompt, validate=lambda result: self.validate_group(group_row, result),
+                guard=self.stream_guard(char_shares[index]), on_progress=tracker.callback(index) if tracker else None,
+                log=self.log)
+            self.log_notes(f"{index + 1}번째 부분", notes)
+            return manuscript
+
+        self.log(f"🧩 {len(groups)}개 부분 동시 수정", "#3498db")
+        edited_text = stitch(rewrite_groups(groups, edit_group, log=self.log))
+
+        # 이어 붙인 뒤 첫 문단 이후 키워드 횟수 다시 맞춤 (지정 횟수 +1 초과분 정리)
+        first_paragraph, separator, rest = edited_text.partition('\n')
+        for keyword, count in {**main_rules, **sub_rules}.items():
+            rest = trim_excess(rest, keyword, count + 1, standalone=True)
+        return first_paragraph + separator + rest
+
+    def gate_row(self, row_data):
+        """AI 생략 판정 → (판정, 교정만 한 원고) - 판정을 쓰지 않으면 (None, None)"""
+        if not self.ai_gate:
+            return None, None
+        corrected = self.apply_basic_corrections(str(row_data['original']).strip())
+        return self.check_rules(row_data, corrected), corrected
+
+    def generate_edit(self, row_data, model, label='원고', prompt=None):
+        """
+        AI 수정 호출 (긴 원고는 문단 병렬)
+
+        Args:
+            prompt: 미리 조립한 프롬프트 (AssembledPrompt, 없으면 여기서 조립)
+
+        Returns:
+            AI 응답 원고 (JSON의 manuscript, 후처리 전)
+        """
+        self.log(f"⏳ {label} AI 수정 중... (10~30초 소요)", "#f39c12")
+        target_chars = int(row_data['char_count']) if row_data['char_count'] else 1000
+        limiter = getattr(model, 'limiter', None)
+        tracker = None
+        if self.progress:
+            tracker = ProgressTracker(self.progress, label, target_chars, status=limiter.describe if limiter else None)
+        if self.parallel_groups > 1 and len(str(row_data['original'])) >= self.PARALLEL_MIN_CHARS:
+            edited_text = self.edit_text_parallel(row_data, model, tracker)
+            if edited_text is not None:
+                return edited_text
+
+        prompt = prompt or self.build_prompt(row_data)
+        self.log(f"📏 {label} 입력 {prompt.describe()}, 출력 약 {estimate_output_tokens(target_chars)}토큰",
+                 "#95a5a6")
+        manuscript, notes = generate_manuscript(
+            model, prompt.text, validate=lambda result: self.validate_edit(row_data, result),
+            guard=self.stream_guard(target_chars), on_progress=tracker.callback() if tracker else None, log=self.log)
+        self.log_notes(label, notes)
+        return manuscript
+
+    def log_notes(self, label, notes):
+        """AI가 원고와 따로 남긴 메모 (원고 열에는 넣지 않음)"""
+        if notes:
+            self.log(f"📝 {label} AI 메모: {notes}", "#95a5a6")
+
+    def finish_edit(self, text):
+        """AI 수정 결과 후처리"""
+        # AI 생성 후 기본 교정 적용 (네요→내요, 더라→더 라, 금칙어)
+        text = self.apply_basic_corrections(text.strip())
+
+        # 문장마다 줄바꿈 추가
+        return self.add_line_breaks(text)
+
+    def learn_past_speakers(self, *paths):
+        """로컬 화자 판정이면 엑셀에 이미 있는 화자 정보(N열) 학습"""
+        if not self.local_speaker:
+            return
+        for path in dict.fromkeys(paths):
+            if path and os.path.exists(path):
+                learned = self.speaker_classifier.learn_workbook(
+                    path, self.INPUT_COLUMNS['keyword'], (self.EDITED_COLUMN, self.INPUT_COLUMNS['original']),
+                    self.SPEAKER_COLUMN)
+                if learned:
+                    self.log(f"🧭 지난 화자 정보 {learned}건 학습 ({os.path.basename(path)})", "#95a5a6")
+
+    def speaker_row(self, edited_text, model, label='원고', keyword=None):
+        """화자 분석 (로그 포함) - 로컬 판정이 자신 있으면 AI 호출 생략, AI 답은 로컬 판정에 학습"""
+        if self.local_speaker:
+            profile = self.speaker_classifier.classify(edited_text, keyword)
+            if self.speaker_classifier.confident(profile):
+                with self.stats_lock:
+                    self.speaker_stats['local'] += 1
+                self.log(f"🧭 {label} 화자 로컬 판정 (신뢰도 {profile.confidence:.2f}): {profile}", "#27ae60")
+                return profile.format()
+
+        self.log(f"⏳ {label} 화자 정보 분석 중...", "#3498db")
+        speaker_info = self.analyze_speaker(edited_text, model)
+        with self.stats_lock:
+            self.speaker_stats['model'] += 1
+        if self.local_speaker:
+            self.speaker_classifier.learn(keyword, edited_text, speaker_info)
+        self.log(f"✅ {label} 화자 분석 완료: {speaker_info}", "#27ae60")
+        return speaker_info
+
+    def edit_row(self, row_data, model, label='원고'):
+        """
+        원고 한 건 수정
+
+        Args:
+            label: 진행 상황에 표시할 이름 ("3/10번째 원고")
+
+        Returns:
+            (수정 원고, 화자 정보, AI 판정)
+        """
+        # 교정만으로 규칙을 모두 지키면 AI 수정 생략
+        gate, corrected = self.gate_row(row_data)
+
+        if gate and not gate['needs_ai']:
+            edited_text = self.add_line_breaks(corrected)
+            self.log(f"⏭️  {label}: 규칙 통과 - AI 수정 생략", "#27ae60")
+        else:
+            if gate:
+                self.log(f"🔎 {label}: {format_decision(gate)}", "#95a5a6")
+            edited_text = self.finish_edit(self.generate_edit(row_data, model, label))
+            self.log(f"✅ {label} AI 수정 및 교정 완료 (결과 글자수: {len(edited_text)}자)", "#27ae60")
+
+        speaker_info = self.speaker_row(edited_text, model, label, row_data['keyword'])
+        return edited_text, speaker_info, format_decision(gate)
+
+    def load_previous_outputs(self, output_file):
+        """이전 결과 파일의 M, N, O열 (행 번호 → (수정 원고, 화자 정보, AI 판정))"""
+        outputs = {}
+        if not os.path.exists(output_file):
+            return outputs
+
+        ws = openpyxl.load_workbook(output_file).active
+        for row_idx in range(2, ws.max_row + 1):
+            edited_text = ws.cell(row_idx, self.EDITED_COLUMN).value
+            if edited_text:
+                outputs[row_idx] = (
+                    edited_text,
+                    ws.cell(row_idx, self.SPEAKER_COLUMN).value,
+                    ws.cell(row_idx, self.GATE_COLUMN).value,
+                )
+        return outputs
+
+    def save_checkpoint(self, wb, output_file, manifest):
+        """지금까지 결과 저장 (일시정지/취소/오류 시)"""
+        wb.save(output_file)
+        manifest.save()
+
+    def process_workbook(self, input_file, model, output_file=None, incremental=True):
+        """
+        엑셀 일괄 처리 (단계별 파이프라인)
+        - 읽기 → 프롬프트 생성 → AI 수정 → 후처리 → 화자 분석 → 순서대로 쓰기
+        - AI 호출 단계는 합쳐서 동시 호출 self.concurrency개까지, 로컬 작업은 그 사이에 병렬로
+        - self.control로 취소하면 진행 중인 호출을 버리고, 처리한 행과 재사용 가능한 행까지 저장
+
+        Args:
+            input_file: 입력 엑셀 파일
+            model: generate_content()를 제공하는 모델
+            output_file: 결과 파일 (없으면 입력 파일에 덮어쓰기)
+            incremental: 매니페스트 기준으로 바뀐 행만 재처리
+
+        Returns:
+            처리 요약 dict
+        """
+        output_file = output_file or input_file
+
+        # 이전 결과 (입력과 지문이 같은 행은 여기서 복사)
+        manifest = RunManifest.for_output(output_file, self.version_fingerprint())
+        previous_outputs = {}
+        if incremental and manifest.previous:
+            previous_outputs = self.load_previous_outputs(output_file)
+
+        wb = openpyxl.load_workbook(input_file)
+        ws = wb.active
+
+        total_rows = ws.max_row - 1
+        summary = {'total_rows': total_rows, 'processed': 0, 'ai_skipped': 0, 'deduplicated': 0, 'reused': 0,
+                   'skipped': 0, 'cancelled': False}
+
+        if not ws.cell(1, self.GATE_COLUMN).value:
+            ws.cell(1, self.GATE_COLUMN).value = 'AI 판정'
+
+        # 로컬 화자 판정: 지난 결과(N열)를 먼저 학습
+        self.speaker_stats = {'local': 0, 'model': 0}
+        self.learn_past_speakers(input_file, output_file)
+
+        # AI 호출 동시 실행 제한 (수정 + 화자 분석 합계, 자동 조절이면 모델이 이 안에서 다시 제한)
+        limiter = threading.BoundedSemaphore(self.concurrency)
+
+        def needs_ai(job):
+            return job['kind'] == 'process' and (not job['gate'] or job['gate']['needs_ai'])
+
+        def read_rows():
+            """읽기: 행 → 작업 (중복 / 변경 없음 / 취소 후 남은 행 / 처리)"""
+            seen = set()
+            for row_idx in range(2, ws.max_row + 1):
+                # 일시정지: 새 원고를 넣지 않고 대기 (진행 중인 원고는 끝까지 처리 후 저장)
+                if self.control.paused and not self.control.cancelled:
+                    self.log("⏸️  일시정지 - 진행 중인 원고까지 처리 후 멈춤", "#f39c12")
+                    try:
+                        self.control.wait_if_paused()
+                        self.log("▶️  재개", "#3498db")
+                    except Cancelled:
+                        pass
+
+                row_data = self.read_row(ws, row_idx)
+                if not row_data['original']:
+                    if not self.control.cancelled:
+                        self.log(f"⚠️  {row_idx}행: 원고 없음, 건너뜀", "#e67e22")
+                    summary['skipped'] += 1
+                    continue
+
+                row_key = self.row_hash(row_data)
+                previous_row = manifest.previous_row(row_key)
+                job = {'row_idx': row_idx, 'row_data': row_data, 'row_key': row_key,
+                       'label': f"{row_idx-1}/{total_rows}번째 원고"}
+
+                if row_key in seen:
+                    job['kind'] = 'duplicate'
+                elif previous_row in previous_outputs:
+                    job['kind'] = 'reuse'
+                    job['result'] = previous_outputs[previous_row]
+                    seen.add(row_key)
+                elif self.control.cancelled:
+                    job['kind'] = 'cancelled'
+                else:
+                    job['kind'] = 'process'
+                    seen.add(row_key)
+                yield job
+
+        def prepare(job):
+            """프롬프트 생성: AI 생략 판정 + 프롬프트"""
+            if job['kind'] == 'process':
+                self.control.check()
+                row_data = job['row_data']
+                self.log(f"📄 {job['label']} 처리 중 (키워드: {row_data['keyword']}, "
+                         f"목표 글자수: {row_data['char_count']}자)", "#3498db")
+                job['gate'], job['corrected'] = self.gate_row(row_data)
+                job['prompt'] = self.build_prompt(row_data) if needs_ai(job) else None
+            return job
+
+        def edit(job):
+            """AI 수정 호출"""
+            if needs_ai(job):
+                self.control.check()
+                if job['gate']:
+                    self.log(f"🔎 {job['label']}: {format_decision(job['gate'])}", "#95a5a6")
+                with limiter:
+                    job['raw'] = self.generate_edit(job['row_data'], model, job['label'], job['prompt'])
+            return job
+
+        def postprocess(job):
+            """후처리: 교정, 줄바꿈 (AI 생략이면 교정 원고에 줄바꿈만)"""
+            if needs_ai(job):
+                job['edited'] = self.finish_edit(job['raw'])
+                self.log(f"✅ {job['label']} AI 수정 및 교정 완료 (결과 글자수: {len(job['edited'])}자)", "#27ae60")
+            elif job['kind'] == 'process':
+                job['edited'] = self.add_line_breaks(job['corrected'])
+                self.log(f"⏭️  {job['label']}: 규칙 통과 - AI 수정 생략", "#27ae60")
+            return job
+
+        def speaker(job):
+            """화자 분석 호출"""
+            if job['kind'] == 'process':
+                self.control.check()
+                with limiter:
+                    job['speaker'] = self.speaker_row(job['edited'], model, job['label'], job['row_data']['keyword'])
+            return job
+
+        # 행 해시 → (수정 원고, 화자 정보, AI 판정) - 중복 원고는 한 번만 처리
+        processed_rows = {}
+        dirty = [False]
+
+        def write(index, job):
+            """순서대로 쓰기 (쓰기는 이 스레드에서만)"""
+            if isinstance(job, StageError):
+                if not isinstance(job.error, Cancelled):
+                    raise job.error
+                if not summary['cancelled']:
+                    summary['cancelled'] = True
+                    self.log("⏹️  취소 - 진행 중이던 요청은 버리고, 남은 행은 이전 결과만 유지", "#e67e22")
+                return
+
+            kind, row_key = job['kind'], job['row_key']
+            if kind == 'duplicate' and row_key in processed_rows:
+                # 중복 원고: 기존 결과 재사용 (AI 호출 생략)
+                result = processed_rows[row_key]
+                summary['deduplicated'] += 1
+                self.log(f"🔁 {job['label']}: 중복 원고 - 기존 결과 재사용", "#27ae60")
+            elif kind == 'reuse':
+                # 변경 없는 행: 이전 결과 파일에서 복사
+                result = job['result']
+                summary['reused'] += 1
+                self.log(f"♻️  {job['label']}: 변경 없음 - 이전 결과 유지", "#27ae60")
+            elif kind == 'process':
+                result = (job['edited'], job['speaker'], format_decision(job['gate']))
+                summary['processed'] += 1
+                if result[2] == SKIP_LABEL:
+                    summary['ai_skipped'] += 1
+            else:
+                # 취소 후 남은 행 (또는 원본이 취소된 중복 행): 다음 실행에서 처리 (매니페스트에 기록하지 않음)
+                if not summary['cancelled']:
+                    summary['cancelled'] = True
+                    self.log("⏹️  취소 - 남은 행은 이전 결과만 유지", "#e67e22")
+                return
+
+            processed_rows[row_key] = result
+            row_idx = job['row_idx']
+            ws.cell(row_idx, self.EDITED_COLUMN).value = result[0]
+            ws.cell(row_idx, self.SPEAKER_COLUMN).value = result[1]
+            ws.cell(row_idx, self.GATE_COLUMN).value = result[2]
+            manifest.record(row_idx, row_key)
+            dirty[0] = True
+
+        def idle():
+            """일시정지 중 진행 중인 원고를 다 쓰면 저장"""
+            if self.control.paused and dirty[0]:
+                self.save_checkpoint(wb, output_file, manifest)
+                dirty[0] = False
+                self.log("💾 일시정지 - 지금까지 결과 저장", "#f39c12")
+
+        pipeline = Pipeline(
+            [
+                Stage('프롬프트', prepare, self.PROMPT_WORKERS),
+                Stage('AI 수정', edit, self.concurrency),
+                Stage('후처리', postprocess, self.POSTPROCESS_WORKERS),
+                Stage('화자 분석', speaker, self.concurrency),
+            ],
+            queue_size=self.concurrency * 2,
+            report=lambda message: self.log(message, "#95a5a6"),
+            status=model.limiter.describe if getattr(model, 'limiter', None) else None,
+        )
+        try:
+            pipeline.run(read_rows(), write, idle)
+        finally:
+            # 결과 파일 저장 후 매니페스트 갱신 (오류로 멈춰도 처리한 행까지)
+            self.save_checkpoint(wb, output_file, manifest)
+
+        self.log(
+            f"📊 처리 {summary['processed']}개 (AI 생략 {summary['ai_skipped']}개) | 중복 재사용 {summary['deduplicated']}개 | "
+            f"변경 없음 {summary['reused']}개 | 원고 없음 {summary['skipped']}개",
+            "#3498db"
+        )
+        for line in pipeline.summary_lines():
+            self.log(f"📊 {line}", "#95a5a6")
+        if self.local_speaker:
+            self.log(f"📊 화자 판정: 로컬 {self.speaker_stats['local']}개 / AI {self.speaker_stats['model']}개", "#95a5a6")
+        if isinstance(model, TieredModel):
+            model.log_summary()
+        return summary
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+학습 예시 검색 (글자 n-gram TF-IDF)
+- 수정전후.xlsx / 블로그_작업_엑셀템플릿.xlsx의 예시 전체를 색인 (키워드 + 수정 전 원고)
+- 원고마다 키워드/내용이 가장 비슷한 예시 k개를 토큰 예산 안에서 선택 (처음 3개 고정 대신)
+- 색인은 한 번 만들어 예시 폴더에 캐시 (예시 내용이 같으면 다시 만들지 않음)
+- 외부 라이브러리 없이 동작 (한글은 띄어쓰기/조사 변화가 많아 단어 대신 글자 2~3-gram)
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from hashing import content_hash, normalize_text
+from token_estimator import estimate_tokens
+
+INDEX_CACHE_FILE = '.example_index.json'
+INDEX_VERSION = 1
+
+NGRAM_SIZES = (2, 3)
+
+# 프롬프트에 넣을 예시 기본값
+DEFAULT_EXAMPLE_COUNT = 3
+DEFAULT_EXAMPLE_TOKENS = 1200
+EXAMPLE_CHARS = 300  # 예시 하나의 수정 전/후 최대 글자수
+
+
+def char_ngrams(text: str, sizes: Sequence[int] = NGRAM_SIZES) -> Counter:
+    """공백 정리 후 글자 n-gram 빈도"""
+    text = re.sub(r'\s+', ' ', normalize_text(text)).strip()
+    grams = Counter()
+    for size in sizes:
+        grams.update(text[i:i + size] for i in range(len(text) - size + 1))
+    return grams
+
+
+def example_document(keyword, original) -> str:
+    """색인/검색에 쓰는 텍스트 (키워드는 두 번 넣어 비중을 높임)"""
+    keyword = normalize_text(keyword)
+    return f"{keyword} {keyword} {normalize_text(original)}"
+
+
+def format_example(number: int, example: Dict, max_chars: int = EXAMPLE_CHARS) -> str:
+    """프롬프트용 예시 텍스트"""
+    return (f"\n\n=== 예시 {number} ===\n"
+            f"키워드: {example['keyword']}\n"
+            f"통키워드: {example['main_keyword_count']}\n"
+            f"조각키워드: {example['sub_keyword_count']}\n"
+            f"서브키워드: {example['extra_keyword_count']}\n"
+            f"수정 전:\n{str(example['original'])[:max_chars]}...\n"
+            f"수정 후:\n{str(example['edited'])[:max_chars]}...\n")
+
+
+def examples_fingerprint(examples: Sequence[Dict]) -> str:
+    """예시 목록 지문 (색인 캐시 확인용)"""
+    return content_hash(INDEX_VERSION, NGRAM_SIZES,
+                        *(example_document(example['keyword'], example['original']) for example in examples))
+
+
+class ExampleIndex:
+    """예시 TF-IDF 색인"""
+
+    def __init__(self, examples: Sequence[Dict], idf: Optional[Dict[str, float]] = None,
+                 vectors: Optional[List[Dict[str, float]]] = None):
+        """
+        Args:
+            examples: 예시 목록 (keyword, original, edited, ...)
+            idf / vectors: 캐시에서 읽은 색인 (없으면 새로 만듦)
+        """
+        self.examples = list(examples)
+        self.fingerprint = examples_fingerprint(self.examples)
+        if idf is None or vectors is None:
+            idf, vectors = self.build(self.examples)
+        self.idf = idf
+        self.vectors = vectors
+
+    @staticmethod
+    def build(examples: Sequence[Dict]) -> Tuple[Dict[str, float], List[Dict[str, float]]]:
+        """TF-IDF 계산 (벡터는 길이 1로 정규화)"""
+        counts = [char_ngrams(example_document(example['keyword'], example['original'])) for example in examples]
+        document_frequency = Counter()
+        for grams in counts:
+            document_frequency.update(grams.keys())
+
+        total = len(counts)
+        idf = {gram: math.log((1 + total) / (1 + frequency)) + 1 for gram, frequency in document_frequency.items()}
+        vectors = [normalize_vector({gram: (1 + math.log(count)) * idf[gram] for gram, count in grams.items()})
+                   for grams in counts]
+        return idf, vectors
+
+    def query_vector(self, keyword, text) -> Dict[str, float]:
+        """검색어 벡터 (색인에 없는 n-gram은 무시)"""
+        grams = char_ngrams(example_document(keyword, text))
+        return normalize_vector({gram: (1 + math.log(count)) * self.idf[gram]
+                                 for gram, count in grams.items() if gram in self.idf})
+
+    def search(self, keyword, text, k: int = DEFAULT_EXAMPLE_COUNT) -> List[Tuple[float, Dict]]:
+        """비슷한 예시 k개 [(유사도, 예시)] - 유사도 높은 순, 같으면 원래 순서"""
+        query = self.query_vector(keyword, text)
+        scored = []
+        for position, vector in enumerate(self.vectors):
+            if len(query) > len(vector):
+                score = sum(weight * query.get(gram, 0.0) for gram, weight in vector.items())
+            else:
+                score = sum(weight * vector.get(gram, 0.0) for gram, weight in query.items())
+            scored.append((score, position))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(score, self.examples[position]) for score, position in scored[:k]]
+
+    def select(self, keyword, text, k: int = DEFAULT_EXAMPLE_COUNT,
+               token_budget: int = DEFAULT_EXAMPLE_TOKENS) -> List[Dict]:
+        """
+        프롬프트에 넣을 예시 - 비슷한 순서로, 합계가 토큰 예산을 넘지 않게 최대 k개
+
+        (예산을 넘는 예시는 건너뛰고 다음으로 비슷한 예시를 봄)
+        """
+        selected, used = [], 0
+        for _, example in self.search(keyword, text, k=len(self.examples)):
+            if len(selected) >= k:
+                break
+            cost = estimate_tokens(format_example(len(selected) + 1, example))
+            if used + cost > token_budget:
+                continue
+            selected.append(example)
+            used += cost
+        return selected
+
+    def to_dict(self) -> Dict:
+        return {'version': INDEX_VERSION, 'fingerprint': self.fingerprint, 'idf': self.idf, 'vectors': self.vectors}
+
+    def save(self, path: str):
+        """캐시 저장 (임시 파일에 쓰고 교체)"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load_or_build(cls, examples: Sequence[Dict], cache_path: Optional[str] = None,
+                      log=print) -> 'ExampleIndex':
+        """
+        캐시가 같은 예시로 만든 것이면 읽고, 아니면 새로 만들어 저장
+
+        Args:
+            cache_path: 캐시 파일 (없으면 캐시 안 씀)
+        """
+        fingerprint = examples_fingerprint(examples)
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == INDEX_VERSION and data.get('fingerprint') == fingerprint:
+                    return cls(examples, idf=data['idf'], vectors=data['vectors'])
+            except (OSError, ValueError, KeyError) as e:
+                log(f"⚠️ 예시 색인 캐시 읽기 실패 (다시 만듦): {e}")
+
+        index = cls(examples)
+        if cache_path:
+            try:
+                index.save(cache_path)
+            except OSError as e:
+                log(f"⚠️ 예시 색인 캐시 저장 실패: {e}")
+        return index
+
+
+def normalize_vector(vector: Dict[str, float]) -> Dict[str, float]:
+    """길이 1로 정규화 (빈 벡터는 그대로)"""
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    if not norm:
+        return vector
+    return {gram: weight / norm for gram, weight in vector.items()}
@@ -4,11 +4,14 @@
 - 조사 결합 형태 우선 처리
 - 여러 대체어 중 랜덤 선택
 - 긴 패턴부터 치환
+- 뒤에 붙은 조사는 대체어 받침에 맞게 교정 (효과가 → 개선이)
 """
 
 import pandas as pd
 import random
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from korean_particles import replace_with_particles
 
 
 class ForbiddenWordsLoader:
@@ -62,16 +65,21 @@ class ForbiddenWordsLoader:
         items.sort(key=lambda x: len(x[0]), reverse=True)
         return items
 
-    def replace_forbidden_words(self, text: str) -> Tuple[str, List[str]]:
+    def replace_forbidden_words(self, text: str, rng: Optional[random.Random] = None) -> Tuple[str, List[str]]:
         """
         금칙어 치환
 
+        Args:
+            text: 원고
+            rng: 문서별 난수 생성기 (없으면 전역 random 사용)
+
         Returns:
             (치환된 텍스트, 변경 내역 리스트)
         """
         if not text:
             return text, []
 
+        rng = rng or random
         modified_text = text
         changes = []
 
@@ -79,11 +87,10 @@ class ForbiddenWordsLoader:
         for forbidden, replacements in self.get_sorted_forbidden_words():
             if forbidden in modified_text:
                 # 대체어 중 랜덤 선택
-                replacement = random.choice(replacements)
+                replacement = rng.choice(replacements)
 
-                # 치환
-                count = modified_text.count(forbidden)
-                modified_text = modified_text.replace(forbidden, replacement)
+                # 치환 (조사 교정 포함)
+                modified_text, count = replace_with_particles(modified_text, forbidden, replacement)
 
                 changes.append(f"{forbidden} → {replacement} ({count}회)")
 
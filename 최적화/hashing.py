@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+입력 해시 / 문서별 난수 생성기
+- 입력 정규화 후 내용 해시 계산
+- 실행 시드 + 내용 해시로 문서별 RNG 생성
+- 같은 입력이면 프로세스가 달라도 같은 결과
+"""
+
+import hashlib
+import random
+import unicodedata
+
+# 기본 실행 시드
+DEFAULT_SEED = 0
+
+
+def normalize_text(value) -> str:
+    """
+    해시용 입력 정규화
+
+    - None / NaN → 빈 문자열
+    - 유니코드 NFC 정규화
+    - 줄바꿈 통일 (\\r\\n → \\n), 줄 끝 공백 제거
+    """
+    if value is None:
+        return ''
+    if isinstance(value, float) and value != value:  # NaN
+        return ''
+
+    text = unicodedata.normalize('NFC', str(value))
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    lines = [line.rstrip() for line in text.split('\n')]
+    return '\n'.join(lines).strip()
+
+
+def content_hash(*parts) -> str:
+    """정규화된 입력들의 SHA-256 해시 (hex)"""
+    joined = '\x1f'.join(normalize_text(part) for part in parts)
+    return hashlib.sha256(joined.encode('utf-8')).hexdigest()
+
+
+def make_rng(seed, *parts) -> random.Random:
+    """
+    문서별 RNG 생성
+
+    Args:
+        seed: 실행 시드
+        *parts: 문서 입력 (원고, 키워드, 브랜드 등)
+
+    Returns:
+        시드 + 내용 해시로 초기화된 random.Random
+    """
+    material = f"{seed}\x1e{content_hash(*parts)}"
+    digest = hashlib.sha256(material.encode('utf-8')).hexdigest()
+    return random.Random(int(digest, 16))
@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""
+SQLite 작업 큐 (원고 수정 행 단위, 작업자 여러 개가 같은 엑셀 하나를 나눠 처리)
+- submit: 엑셀의 행을 작업으로 등록 (원고 없는 행/중복 원고 제외, 다시 등록하면 바뀐 행만 초기화)
+- work: 작업자(CLI, 데몬, GUI - 같은 컴퓨터나 공유 디스크)가 작업을 리스(lease)로 가져가 처리
+  - 처리 중에는 하트비트로 리스 연장, 작업자가 죽으면 리스 만료 후 다른 작업자가 다시 가져감
+  - 실패하면 잠시 뒤 재시도, 최대 시도 횟수를 넘기면 실패 보관(dead-letter) - requeue로 되살림
+- collect: 완료된 결과를 행 순서대로 엑셀 M, N, O열에 모음 (중복 원고는 같은 결과)
+- 배치마다 규칙/프롬프트/모델 지문을 기록해서 금칙어/예시가 다른 작업자는 그 배치를 가져가지 않음
+
+사용법:
+    python job_queue.py submit 작업.xlsx --db 작업큐.db --resources 원고자동화3
+    python job_queue.py work --db 작업큐.db --resources 원고자동화3 --threads 3   # 여러 프로세스/컴퓨터에서 실행
+    python job_queue.py status --db 작업큐.db
+    python job_queue.py collect 작업.xlsx --db 작업큐.db
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing, contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import openpyxl
+
+from deadlines import Cancelled
+from hashing import content_hash
+from manifest import RunManifest
+
+DEFAULT_DB = '작업큐.db'
+
+# 작업 상태
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+DEAD = 'dead'
+STATES = (PENDING, LEASED, DONE, DEAD)
+
+# 리스 기본값 (초) - 하트비트는 리스의 1/3마다
+DEFAULT_LEASE = 120.0
+
+# 최대 시도 횟수 (넘으면 실패 보관), 재시도 대기 (초, 시도마다 2배)
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_DELAY = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id TEXT PRIMARY KEY,
+    input_file TEXT NOT NULL,
+    output_file TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch TEXT NOT NULL REFERENCES batches(id),
+    row_idx INTEGER NOT NULL,
+    row_key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    available_at REAL NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    updated REAL,
+    UNIQUE (batch, row_idx)
+);
+CREATE INDEX IF NOT EXISTS tasks_pending ON tasks (state, available_at);
+"""
+
+
+def log(message):
+    """로그 출력"""
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    print(f"[{timestamp}] [{os.getpid()}] {message}", flush=True)
+
+
+def worker_name() -> str:
+    """작업자 이름 (컴퓨터, 프로세스, 스레드 구분)"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class QueueTask:
+    """리스로 가져간 작업 하나"""
+
+    def __init__(self, task_id: int, batch: str, row_idx: int, row_key: str, row_data: dict, attempts: int,
+                 worker: str):
+        self.id = task_id
+        self.batch = batch
+        self.row_idx = row_idx
+        self.row_key = row_key
+        self.row_data = row_data
+        self.attempts = attempts
+        self.worker = worker
+
+
+class JobQueue:
+    """SQLite 작업 큐 (프로세스/스레드 여러 개에서 동시에 사용, 연결은 작업마다 새로)"""
+
+    def __init__(self, path: str = DEFAULT_DB, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 retry_delay: float = RETRY_DELAY, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            path: SQLite 파일 (공유 디스크 가능)
+            max_attempts: 최대 시도 횟수 (넘으면 실패 보관)
+            retry_delay: 첫 재시도 대기 (초, 시도마다 2배)
+            clock: 시간 함수 (프로세스 사이에서 비교하므로 실제 시각, 테스트용)
+        """
+        self.path = path
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self.clock = clock
+        with closing(sqlite3.connect(self.path, timeout=30)) as db:
+            db.executescript(SCHEMA)  # 자체 트랜잭션
+
+    @contextmanager
+    def connect(self, immediate: bool = False):
+        """
+        연결 (with 블록 하나가 트랜잭션 하나)
+
+        Args:
+            immediate: True면 시작부터 쓰기 잠금 (리스처럼 읽고 바로 쓰는 작업)
+        """
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            db.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+            try:
+                yield db
+            except BaseException:
+                db.execute('ROLLBACK')
+                raise
+            db.execute('COMMIT')
+        finally:
+            db.close()
+
+    # ─────────────────────────────────────────────────────────
+    # 배치 등록 / 조회
+    # ─────────────────────────────────────────────────────────
+
+    def submit(self, input_file: str, output_file: str, fingerprint: str, rows: List[tuple]) -> str:
+        """
+        배치 등록 (같은 입력/결과 파일이면 같은 배치 - 내용이 바뀐 행만 처음부터, 없어진 행은 삭제)
+
+        Args:
+            rows: [(행 번호, 행 해시, 행 데이터)]
+
+        Returns:
+            배치 ID
+        """
+        input_file, output_file = os.path.abspath(input_file), os.path.abspath(output_file)
+        batch = content_hash(input_file, output_file)[:16]
+        now = self.clock()
+        with self.connect(immediate=True) as db:
+            previous = db.execute('SELECT fingerprint FROM batches WHERE id = ?', (batch,)).fetchone()
+            if previous and previous['fingerprint'] != fingerprint:
+                # 규칙/프롬프트/모델이 바뀜 → 모든 행 처음부터
+                db.execute('DELETE FROM tasks WHERE batch = ?', (batch,))
+            db.execute('INSERT INTO batches (id, input_file, output_file, fingerprint, created) VALUES (?, ?, ?, ?, ?) '
+                       'ON CONFLICT (id) DO UPDATE SET fingerprint = excluded.fingerprint',
+                       (batch, input_file, output_file, fingerprint, now))
+            db.executemany(
+                'INSERT INTO tasks (batch, row_idx, row_key, payload, updated) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (batch, row_idx) DO UPDATE SET row_key = excluded.row_key, payload = excluded.payload, '
+                "state = 'pending', attempts = 0, worker = NULL, lease_until = NULL, available_at = 0, "
+                'result = NULL, error = NULL, updated = excluded.updated WHERE tasks.row_key != excluded.row_key',
+                [(batch, row_idx, row_key, json.dumps(row_data, ensure_ascii=False, default=str), now)
+                 for row_idx, row_key, row_data in rows])
+            placeholders = ','.join('?' * len(rows))
+            db.execute(f'DELETE FROM tasks WHERE batch = ? AND row_idx NOT IN ({placeholders})',
+                       [batch] + [row_idx for row_idx, _, _ in rows])
+        return batch
+
+    def batches(self) -> List[sqlite3.Row]:
+        """등록된 배치 (먼저 등록한 순)"""
+        with self.connect() as db:
+            return db.execute('SELECT * FROM batches ORDER BY created').fetchall()
+
+    def find_batch(self, input_file: str, output_file: Optional[str] = None) -> Optional[sqlite3.Row]:
+        """입력 파일(+결과 파일)로 배치 찾기 (여러 개면 마지막에 등록한 것)"""
+        query, params = 'SELECT * FROM batches WHERE input_file = ?', [os.path.abspath(input_file)]
+        if output_file:
+            query += ' AND output_file = ?'
+            params.append(os.path.abspath(output_file))
+        with self.connect() as db:
+            return db.execute(query + ' ORDER BY created DESC LIMIT 1', params).fetchone()
+
+    def counts(self, batch: Optional[str] = None) -> Dict[str, int]:
+        """상태별 작업 수"""
+        query, params = 'SELECT state, COUNT(*) AS n FROM tasks', []
+        if batch:
+            query += ' WHERE batch = ?'
+            params.append(batch)
+        with self.connect() as db:
+            rows = db.execute(query + ' GROUP BY state', params).fetchall()
+        counts = dict.fromkeys(STATES, 0)
+        counts.update({row['state']: row['n'] for row in rows})
+        return counts
+
+    def results(self, batch: str) -> List[sqlite3.Row]:
+        """배치의 모든 작업 (행 순서대로, 완료된 작업은 result에 JSON)"""
+        with self.connect() as db:
+            return db.execute('SELECT * FROM tasks WHERE batch = ? ORDER BY row_idx', (batch,)).fetchall()
+
+    # ─────────────────────────────────────────────────────────
+    # 작업자
+    # ─────────────────────────────────────────────────────────
+
+    def expire_leases(self, db) -> int:
+        """리스가 끝났는데 완료 안 된 작업 (작업자 중단) → 다시 대기, 시도 횟수를 다 썼으면 실패 보관"""
+        now = self.clock()
+        return db.execute(
+            "UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'dead' ELSE 'pending' END, "
+            "error = '리스 만료 (작업자 ' || worker || ' 응답 없음)', worker = NULL, lease_until = NULL, updated = ? "
+            "WHERE state = 'leased' AND lease_until < ?",
+            (self.max_attempts, now, now)).rowcount
+
+    def lease(self, worker: str, lease_seconds: float = DEFAULT_LEASE,
+              fingerprint: Optional[str] = None) -> Optional[QueueTask]:
+        """
+        대기 중인 작업 하나 가져가기 (먼저 등록한 배치, 앞쪽 행부터)
+
+        Args:
+            worker: 작업자 이름 (하트비트/완료 때 본인 확인)
+            fingerprint: 이 지문의 배치만 (금칙어/예시가 다른 작업자가 가져가지 않게)
+
+        Returns:
+            작업 (없으면 None)
+        """
+        with self.connect(immediate=True) as db:
+            self.expire_leases(db)
+            now = self.clock()
+            query = ("SELECT t.* FROM tasks t JOIN batches b ON b.id = t.batch "
+                     "WHERE t.state = 'pending' AND t.available_at <= ?")
+            params = [now]
+            if fingerprint:
+                query += ' AND b.fingerprint = ?'
+                params.append(fingerprint)
+            row = db.execute(query + ' ORDER BY b.created, t.row_idx LIMIT 1', params).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE tasks SET state = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1, "
+                       "updated = ? WHERE id = ?", (worker, now + lease_seconds, now, row['id']))
+        return QueueTask(row['id'], row['batch'], row['row_idx'], row['row_key'], json.loads(row['payload']),
+                         row['attempts'] + 1, worker)
+
+    def owned_update(self, task: QueueTask, assignments: str, params: tuple) -> bool:
+        """아직 이 작업자의 리스인 작업만 갱신 (리스를 잃었으면 False)"""
+        with self.connect() as db:
+            return db.execute(f"UPDATE tasks SET {assignments}, updated = ? "
+                              "WHERE id = ? AND worker = ? AND state = 'leased'",
+                              params + (self.clock(), task.id, task.worker)).rowcount == 1
+
+    def heartbeat(self, task: QueueTask, lease_seconds: float = DEFAULT_LEASE) -> bool:
+        """리스 연장 (False면 리스를 잃음 - 다른 작업자가 가져감)"""
+        return self.owned_update(task, 'lease_until = ?', (self.clock() + lease_seconds,))
+
+    def complete(self, task: QueueTask, result: tuple) -> bool:
+        """완료 (수정 원고, 화자 정보, AI 판정) - 리스를 잃었으면 False (결과 버림)"""
+        return self.owned_update(task, "state = 'done', result = ?, error = NULL, worker = NULL, lease_until = NULL",
+                                 (json.dumps(list(result), ensure_ascii=False),))
+
+    def fail(self, task: QueueTask, error: str) -> str:
+        """
+        실패 기록 → 재시도 대기 또는 실패 보관
+
+        Returns:
+            바뀐 상태 ('pending' / 'dead', 리스를 잃었으면 '')
+        """
+        if task.attempts >= self.max_attempts:
+            state, available_at = DEAD, 0
+        else:
+            state, available_at = PENDING, self.clock() + self.retry_delay * 2 ** (task.attempts - 1)
+        updated = self.owned_update(task, 'state = ?, error = ?, available_at = ?, worker = NULL, lease_until = NULL',
+                                    (state, error, available_at))
+        return state if updated else ''
+
+    def release(self, task: QueueTask) -> bool:
+        """처리하지 않고 돌려놓기 (취소 - 시도 횟수에 넣지 않음)"""
+        return self.owned_update(task, "state = 'pending', attempts = attempts - 1, worker = NULL, lease_until = NULL",
+                                 ())
+
+    def requeue(self, batch: Optional[str] = None) -> int:
+        """실패 보관 작업을 다시 대기로 (시도 횟수 초기화)"""
+        query, params = "UPDATE tasks SET state = 'pending', attempts = 0, available_at = 0, updated = ? " \
+                        "WHERE state = 'dead'", [self.clock()]
+        if batch:
+            query += ' AND batch = ?'
+            params.append(batch)
+        with self.connect() as db:
+            return db.execute(query, params).rowcount
+
+    def outstanding(self, fingerprint: Optional[str] = None) -> int:
+        """아직 끝나지 않은 작업 수 (대기 + 처리 중)"""
+        query = ("SELECT COUNT(*) FROM tasks t JOIN batches b ON b.id = t.batch "
+                 "WHERE t.state IN ('pending', 'leased')")
+        params = []
+        if fingerprint:
+            query += ' AND b.fingerprint = ?'
+            params.append(fingerprint)
+        with self.connect() as db:
+            return db.execute(query, params).fetchone()[0]
+
+
+# ─────────────────────────────────────────────────────────────
+# 원고 수정 엔진 연동
+# ─────────────────────────────────────────────────────────────
+
+def submit_workbook(queue: JobQueue, engine, input_file: str, output_file: Optional[str] = None) -> str:
+    """
+    엑셀 원고를 작업으로 등록 (원고 없는 행, 중복 원고는 등록하지 않음 - collect에서 채움)
+
+    Args:
+        engine: 금칙어/예시를 불러온 EditorEngine (지문을 배치에 기록)
+
+    Returns:
+        배치 ID
+    """
+    ws = openpyxl.load_workbook(input_file).active
+    rows, seen = [], set()
+    for row_idx in range(2, ws.max_row + 1):
+        row_data = engine.read_row(ws, row_idx)
+        row_key = engine.row_hash(row_data)
+        if row_data['original'] and row_key not in seen:
+            seen.add(row_key)
+            rows.append((row_idx, row_key, row_data))
+
+    batch = queue.submit(input_file, output_file or input_file, engine.version_fingerprint(), rows)
+    engine.log(f"📥 작업 큐 등록: {os.path.basename(input_file)} {len(rows)}건 (배치 {batch})", "#3498db")
+    return batch
+
+
+class QueueWorker:
+    """작업 큐에서 행을 가져와 원고 수정 (스레드 하나 = 작업 하나씩)"""
+
+    def __init__(self, queue: JobQueue, engine, model, name: Optional[str] = None,
+                 lease_seconds: float = DEFAULT_LEASE, poll_interval: float = 1.0):
+        """
+        Args:
+            engine: 금칙어/예시를 불러온 EditorEngine (engine.control로 취소)
+            model: generate_content()를 제공하는 모델
+            name: 작업자 이름 (없으면 컴퓨터:프로세스:임의값)
+            lease_seconds: 리스 시간 (초) - 작업자가 죽으면 이 시간 뒤 다른 작업자가 가져감
+            poll_interval: 작업이 없을 때 다시 확인하는 간격 (초)
+        """
+        self.queue = queue
+        self.engine = engine
+        self.model = model
+        self.name = name or worker_name()
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.fingerprint = engine.version_fingerprint()
+        self.stats = {'done': 0, 'retried': 0, 'dead': 0, 'lost': 0}
+
+    def keep_alive(self, task: QueueTask, stop: threading.Event):
+        """하트비트 (리스의 1/3마다 연장)"""
+        while not stop.wait(self.lease_seconds / 3):
+            if not self.queue.heartbeat(task, self.lease_seconds):
+                self.engine.log(f"⚠️  {task.row_idx}행: 리스를 잃음 (다른 작업자가 가져감)", "#e67e22")
+                return
+
+    def process(self, task: QueueTask):
+        """작업 하나 처리 (하트비트 스레드와 함께)"""
+        label = f"{task.row_idx}행 ({task.attempts}번째 시도)"
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self.keep_alive, args=(task, stop), daemon=True)
+        heartbeat.start()
+        try:
+            result = self.engine.edit_row(task.row_data, self.model, label)
+        except Cancelled:
+            self.queue.release(task)
+            raise
+        except Exception as e:
+            state = self.queue.fail(task, f"{type(e).__name__}: {e}")
+            if state == DEAD:
+                self.stats['dead'] += 1
+                self.engine.log(f"❌ {label} 실패 - 실패 보관 ({e})", "#e74c3c")
+            else:
+                self.stats['retried'] += 1
+                self.engine.log(f"⚠️  {label} 실패 - 잠시 뒤 재시도 ({e})", "#e67e22")
+            return
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        if self.queue.complete(task, result):
+            self.stats['done'] += 1
+        else:
+            self.stats['lost'] += 1
+            self.engine.log(f"⚠️  {label}: 리스 만료 - 결과 버림 (다른 작업자가 처리)", "#e67e22")
+
+    def run(self, until_idle: bool = True) -> dict:
+        """
+        작업 처리 반복
+
+        Args:
+            until_idle: True면 이 작업자가 가져갈 수 있는 작업이 모두 끝나면 종료 (다른 작업자 처리 중인 것까지)
+
+        Returns:
+            처리 통계
+        """
+        control = self.engine.control
+        if self.queue.outstanding() and not self.queue.outstanding(self.fingerprint):
+            self.engine.log("⚠️  대기 작업이 모두 금칙어/예시/모델 설정이 다른 배치 - 등록할 때와 같은 --resources인지 확인",
+                            "#e67e22")
+        while not control.cancelled:
+            task = self.queue.lease(self.name, self.lease_seconds, self.fingerprint)
+            if task is None:
+                if until_idle and not self.queue.outstanding(self.fingerprint):
+                    break
+                control.cancel_event.wait(self.poll_interval)
+                continue
+            try:
+                self.process(task)
+            except Cancelled:
+                break
+        return self.stats
+
+
+def run_workers(queue: JobQueue, engine, model, threads: int = 1, until_idle: bool = True, **kwargs) -> dict:
+    """작업자 스레드 여러 개 (같은 엔진/모델 공유) → 합계 통계"""
+    workers = [QueueWorker(queue, engine, model, **kwargs) for _ in range(max(1, threads))]
+    pool = [threading.Thread(target=worker.run, args=(until_idle,)) for worker in workers]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    total = dict.fromkeys(workers[0].stats, 0)
+    for worker in workers:
+        for key, value in worker.stats.items():
+            total[key] += value
+    return total
+
+
+def collect_results(queue: JobQueue, engine, batch: str) -> dict:
+    """
+    완료된 결과를 엑셀에 행 순서대로 쓰기 (결과 파일 + 매니페스트)
+    - 중복 원고 행은 같은 원고의 결과, 아직 안 끝난 행/실패 보관 행은 비워 둠
+
+    Returns:
+        {'written', 'pending', 'dead', 'total_rows'}
+    """
+    with queue.connect() as db:
+        info = db.execute('SELECT * FROM batches WHERE id = ?', (batch,)).fetchone()
+    if info is None:
+        raise ValueError(f"배치가 없습니다: {batch}")
+
+    results, failed = {}, {}
+    for row in queue.results(batch):
+        if row['state'] == DONE:
+            results[row['row_key']] = tuple(json.loads(row['result']))
+        elif row['state'] == DEAD:
+            failed[row['row_key']] = (row['row_idx'], row['error'])
+
+    wb = openpyxl.load_workbook(info['input_file'])
+    ws = wb.active
+    if not ws.cell(1, engine.GATE_COLUMN).value:
+        ws.cell(1, engine.GATE_COLUMN).value = 'AI 판정'
+    manifest = RunManifest.for_output(info['output_file'], info['fingerprint'])
+
+    summary = {'written': 0, 'pending': 0, 'dead': 0, 'total_rows': ws.max_row - 1}
+    for row_idx in range(2, ws.max_row + 1):
+        row_data = engine.read_row(ws, row_idx)
+        if not row_data['original']:
+            continue
+        row_key = engine.row_hash(row_data)
+        if row_key in results:
+            edited_text, speaker_info, gate = results[row_key]
+            ws.cell(row_idx, engine.EDITED_COLUMN).value = edited_text
+            ws.cell(row_idx, engine.SPEAKER_COLUMN).value = speaker_info
+            ws.cell(row_idx, engine.GATE_COLUMN).value = gate
+            manifest.record(row_idx, row_key)
+            summary['written'] += 1
+        elif row_key in failed:
+            summary['dead'] += 1
+            engine.log(f"❌ {row_idx}행: 실패 보관 ({failed[row_key][1]})", "#e74c3c")
+        else:
+            summary['pending'] += 1
+
+    wb.save(info['output_file'])
+    manifest.save()
+    engine.log(f"📊 결과 모음: {summary['written']}행 기록 | 대기/처리 중 {summary['pending']}행 | "
+               f"실패 보관 {summary['dead']}행 → {os.path.basename(info['output_file'])}", "#3498db")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="원고 수정 작업 큐 (여러 작업자가 엑셀 하나를 나눠 처리)")
+    parser.add_argument('command', choices=['submit', 'work', 'status', 'collect', 'requeue'])
+    parser.add_argument('input', nargs='?', help="엑셀 파일 (submit / collect)")
+    parser.add_argument('--db', default=DEFAULT_DB, help=f"작업 큐 SQLite 파일 (기본: {DEFAULT_DB})")
+    parser.add_argument('--output', help="결과 파일 (기본: 입력 파일에 덮어쓰기)")
+    parser.add_argument('--resources', help="금칙어_리스트.xlsx, 수정전후.xlsx 등이 있는 폴더 (기본: 입력 파일 폴더)")
+    parser.add_argument('--api-key', help="Gemini API 키 (없으면 GEMINI_API_KEY, 쉼표 구분이면 키 풀)")
+    parser.add_argument('--threads', type=int, default=3, help="작업자 스레드 수 (work)")
+    parser.add_argument('--lease', type=float, default=DEFAULT_LEASE, help="리스 시간 (초)")
+    parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS, help="최대 시도 횟수")
+    parser.add_argument('--forever', action='store_true', help="작업이 없어도 종료하지 않고 대기 (work)")
+    args = parser.parse_args()
+
+    from editor_engine import EditorEngine
+
+    queue = JobQueue(args.db, max_attempts=args.max_attempts)
+    engine = EditorEngine(log=lambda message, color=None: log(message.strip()), concurrency=args.threads)
+
+    if args.command in ('submit', 'collect') and not args.input:
+        parser.error(f"{args.command}에는 엑셀 파일이 필요합니다")
+    if args.command in ('submit', 'work'):
+        engine.load_resources(args.resources or (os.path.dirname(os.path.abspath(args.input)) if args.input else '.'))
+
+    if args.command == 'submit':
+        submit_workbook(queue, engine, args.input, args.output)
+    elif args.command == 'work':
+        model = engine.create_model(args.api_key or os.getenv('GEMINI_API_KEY'))
+        try:
+            stats = run_workers(queue, engine, model, args.threads, until_idle=not args.forever,
+                                lease_seconds=args.lease)
+        except KeyboardInterrupt:
+            engine.control.cancel()
+            raise
+        log(f"🛑 작업자 종료 (완료 {stats['done']}건, 재시도 {stats['retried']}건, 실패 보관 {stats['dead']}건)")
+    elif args.command == 'status':
+        for batch in queue.batches():
+            counts = queue.counts(batch['id'])
+            print(f"{batch['id']} {os.path.basename(batch['input_file'])}: "
+                  + ', '.join(f"{state} {counts[state]}" for state in STATES))
+    elif args.command == 'collect':
+        batch = queue.find_batch(args.input, args.output)
+        if batch is None:
+            parser.error(f"등록된 배치가 없습니다: {args.input}")
+        collect_results(queue, engine, batch['id'])
+    else:
+        log(f"↩️ 실패 보관 {queue.requeue()}건 다시 대기")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+API 키 풀 - 키 여러 개를 돌아가며 사용 (키 하나의 분당 한도가 전체 처리량을 막지 않게)
+- 키 목록: 직접 전달 (쉼표 구분 가능) + 환경변수 GEMINI_API_KEYS + 설정 파일 gemini_keys.json
+- 순서대로 돌아가며 배정 (라운드 로빈), 키별 분당 요청 수 제한 (rpm)
+- 429(한도 초과) 키는 잠시 쉬게 함 (연속이면 대기 시간 2배), 무효 키는 제외
+- 한도 초과/무효 키로 실패한 요청은 다른 키로 바로 다시 보냄
+- 키별 사용량 (호출/성공/429/오류/평균 시간) 보고
+
+설정 파일 (환경변수 GEMINI_KEYS_FILE로 경로 지정, 기본은 현재 폴더의 gemini_keys.json):
+    {"keys": ["AIza...", "AIza..."], "rpm": 10, "cooldown": 60}
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+from google.api_core import exceptions as api_exceptions
+
+from deadlines import close_stream
+
+KEYS_ENV = 'GEMINI_API_KEYS'
+KEYS_FILE_ENV = 'GEMINI_KEYS_FILE'
+DEFAULT_KEYS_FILE = 'gemini_keys.json'
+
+# 429 후 쉬는 시간 (초) - 연속 429면 2배씩, 최대 MAX_COOLDOWN
+DEFAULT_COOLDOWN = 60
+MAX_COOLDOWN = 600
+
+
+class NoKeyAvailable(RuntimeError):
+    """쓸 수 있는 키가 없음 (모두 무효이거나 대기 시간 초과)"""
+
+
+def load_key_config(path: Optional[str] = None) -> Dict:
+    """키 설정 파일 읽기 (없으면 빈 설정)"""
+    path = path or os.getenv(KEYS_FILE_ENV) or DEFAULT_KEYS_FILE
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    if isinstance(config, list):
+        config = {'keys': config}
+    return config
+
+
+def split_keys(value: Union[None, str, Sequence[str]]) -> List[str]:
+    """"키1, 키2" 또는 [키1, 키2] → [키1, 키2]"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [key.strip() for key in value if key and key.strip()]
+
+
+def load_api_keys(api_key: Union[None, str, Sequence[str]] = None, config: Optional[Dict] = None) -> List[str]:
+    """
+    사용할 키 목록 (중복 제거, 순서 유지)
+
+    Args:
+        api_key: 직접 전달한 키 (쉼표 구분 문자열 또는 목록)
+        config: 키 설정 (없으면 설정 파일)
+    """
+    config = load_key_config() if config is None else config
+    keys = split_keys(api_key) + split_keys(os.getenv(KEYS_ENV)) + split_keys(config.get('keys'))
+    return list(dict.fromkeys(keys))
+
+
+def mask_key(key: str) -> str:
+    """로그용 키 표시 (끝 4자리만)"""
+    return f"…{key[-4:]}"
+
+
+def classify_error(error: BaseException) -> Optional[str]:
+    """키 상태에 영향을 주는 오류인지: 'rate_limited' / 'invalid' / None (그 밖의 오류)"""
+    if isinstance(error, api_exceptions.ResourceExhausted):
+        return 'rate_limited'
+    if isinstance(error, (api_exceptions.PermissionDenied, api_exceptions.Unauthenticated)):
+        return 'invalid'
+    if isinstance(error, api_exceptions.InvalidArgument) and ('API key' in str(error) or 'API_KEY' in str(error)):
+        return 'invalid'
+    # 다른 제공자 SDK (Anthropic 등)는 HTTP 상태 코드로
+    status = getattr(error, 'status_code', None)
+    if status == 429:
+        return 'rate_limited'
+    if status in (401, 403):
+        return 'invalid'
+    return None
+
+
+class KeyState:
+    """키 하나의 요청 기록/대기 상태"""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.label = mask_key(key)
+        self.calls = 0
+        self.succeeded = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.abandoned = 0             # 중간에 버린 스트리밍 (조기 중단/취소) - 성공/응답 시간에 안 넣음
+        self.seconds = 0.0
+        self.in_flight = 0
+        self.recent = deque()          # 최근 1분 요청 시각
+        self.cooldown_until = 0.0
+        self.cooldown = 0.0            # 마지막 대기 시간 (연속 429면 2배)
+        self.invalid = False
+
+    def ready_at(self, now: float, rpm: Optional[int]) -> float:
+        """이 키를 쓸 수 있는 시각 (무효면 inf)"""
+        if self.invalid:
+            return float('inf')
+        while self.recent and now - self.recent[0] >= 60:
+            self.recent.popleft()
+        ready = self.cooldown_until
+        if rpm and len(self.recent) >= rpm:
+            ready = max(ready, self.recent[0] + 60)
+        return ready
+
+
+class KeyPool:
+    """API 키 풀 (스레드 안전)"""
+
+    def __init__(self, keys: Sequence[str], rpm: Optional[int] = None, cooldown: float = DEFAULT_COOLDOWN,
+                 log: Callable[[str], None] = None, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            keys: API 키 목록
+            rpm: 키별 분당 최대 요청 수 (None이면 제한 없음 - 429가 오면 그때 쉼)
+            cooldown: 429 후 첫 대기 시간 (초)
+            log: 로그 함수 (키 대기/제외 알림)
+            clock / sleep: 시간 함수 (테스트용)
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            raise ValueError("API 키가 하나 이상 필요합니다.")
+        self.states = [KeyState(key) for key in keys]
+        self.rpm = rpm
+        self.base_cooldown = cooldown
+        self.log = log or print
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.cursor = 0
+        self.listeners: List[Callable[[str], None]] = []  # 429를 받을 때마다 호출 (동시 요청 자동 조절)
+
+    def __len__(self):
+        return len(self.states)
+
+    @property
+    def usable(self) -> int:
+        """무효가 아닌 키 수"""
+        with self.lock:
+            return sum(not state.invalid for state in self.states)
+
+    def try_acquire(self) -> Union[KeyState, float]:
+        """지금 쓸 수 있는 다음 키 (없으면 가장 빨리 풀리는 시각)"""
+        with self.lock:
+            now = self.clock()
+            earliest = float('inf')
+            for offset in range(len(self.states)):
+                position = (self.cursor + offset) % len(self.states)
+                state = self.states[position]
+                ready = state.ready_at(now, self.rpm)
+                if ready <= now:
+                    self.cursor = position + 1
+                    state.calls += 1
+                    state.in_flight += 1
+                    state.recent.append(now)
+                    return state
+                earliest = min(earliest, ready)
+            return earliest
+
+    def acquire(self, timeout: Optional[float] = None, poll: float = 0.5) -> KeyState:
+        """
+        다음 키 받기 (모두 대기 중이면 풀릴 때까지 기다림)
+
+        Args:
+            timeout: 최대 대기 시간 (초, None이면 무제한)
+            poll: 대기 중 확인 간격 (초)
+        """
+        started = self.clock()
+        while True:
+            result = self.try_acquire()
+            if isinstance(result, KeyState):
+                return result
+            if result == float('inf'):
+                raise NoKeyAvailable("쓸 수 있는 API 키가 없습니다 (모두 무효).")
+            wait = result - self.clock()
+            if timeout is not None:
+                remaining = timeout - (self.clock() - started)
+                if remaining <= 0:
+                    raise NoKeyAvailable(f"API 키 대기 시간 초과 ({timeout:.0f}초)")
+                wait = min(wait, remaining)
+            self.sleep(max(0.01, min(wait, poll)))
+
+    def release(self, state: KeyState, seconds: float, error: Optional[BaseException] = None) -> Optional[str]:
+        """
+        요청 결과 기록
+
+        Returns:
+            classify_error 결과 ('rate_limited' / 'invalid' / None)
+        """
+        kind = classify_error(error) if error else None
+        with self.lock:
+            state.in_flight -= 1
+            state.seconds += seconds
+            if error is None:
+                state.succeeded += 1
+                state.cooldown = 0.0
+            elif kind == 'rate_limited':
+                state.rate_limited += 1
+                state.cooldown = min(MAX_COOLDOWN, state.cooldown * 2 or self.base_cooldown)
+                state.cooldown_until = self.clock() + state.cooldown
+            elif kind == 'invalid':
+                state.errors += 1
+                state.invalid = True
+            else:
+                state.errors += 1
+
+        if kind == 'rate_limited':
+            self.log(f"⏳ API 키 {state.label} 한도 초과 → {state.cooldown:.0f}초 쉬고 다른 키 사용")
+            for listener in self.listeners:
+                listener(kind)
+        elif kind == 'invalid':
+            self.log(f"🚫 API 키 {state.label} 무효 → 제외 ({error})")
+        return kind
+
+    def abandon(self, state: KeyState):
+        """중간에 버린 스트리밍 요청 (조기 중단/취소) - 동시 요청 자리만 돌려주고 성공/응답 시간은 기록 안 함"""
+        with self.lock:
+            state.in_flight -= 1
+            state.abandoned += 1
+
+    def usage(self) -> List[Dict]:
+        """키별 사용량"""
+        with self.lock:
+            now = self.clock()
+            return [{
+                'key': state.label,
+                'calls': state.calls,
+                'succeeded': state.succeeded,
+                'rate_limited': state.rate_limited,
+                'errors': state.errors,
+                'abandoned': state.abandoned,
+                'seconds': round(state.seconds, 3),
+                'status': ('invalid' if state.invalid
+                           else 'cooldown' if state.cooldown_until > now else 'ready'),
+            } for state in self.states]
+
+    def summary_lines(self) -> List[str]:
+        """키별 사용량 요약"""
+        statuses = {'ready': '사용 가능', 'cooldown': '대기 중', 'invalid': '무효'}
+        lines = []
+        for usage in self.usage():
+            finished = usage['calls'] - usage['abandoned']
+            average = usage['seconds'] / finished if finished else 0.0
+            lines.append(f"API 키 {usage['key']}: {usage['calls']}회 호출, 성공 {usage['succeeded']}회, "
+                         f"429 {usage['rate_limited']}회, 오류 {usage['errors']}회, 평균 {average:.1f}초 "
+                         f"({statuses[usage['status']]})")
+        return lines
+
+
+class PooledModel:
+    """키 풀 모델 (generate_content 호환) - 호출마다 다음 키, 한도 초과/무효 키면 다른 키로 다시"""
+
+    def __init__(self, name: str, pool: KeyPool, clients: Dict[str, object]):
+        self.name = name
+        self.pool = pool
+        self.models = {key: client.model(name) for key, client in clients.items()}
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        attempts = 0
+        while True:
+            state = self.pool.acquire()
+            started = time.perf_counter()
+            try:
+                response = self.models[state.key].generate_content(prompt, stream=stream, **kwargs)
+                if not stream:
+                    self.pool.release(state, time.perf_counter() - started)
+                    return response
+                # 한도 초과는 보통 첫 조각에서 나므로 첫 조각까지 받고 나서 키 결정
+                chunks = iter(response)
+                first = next(chunks, None)
+            except Exception as e:
+                kind = self.pool.release(state, time.perf_counter() - started, error=e)
+                attempts += 1
+                if kind is None or attempts >= len(self.pool):
+                    raise
+                continue
+            return self.stream(state, started, first, chunks)
+
+    def stream(self, state: KeyState, started: float, first, chunks):
+        """스트리밍 응답: 끝까지 받으면 성공, 오류면 오류로 키 반환 (받는 쪽이 중간에 닫으면 자리만 반환)"""
+        try:
+            if first is not None:
+                yield first
+            for chunk in chunks:
+                yield chunk
+        except GeneratorExit:
+            # 조기 중단(StreamAborted)/취소로 닫힘 - 잘린 응답을 성공이나 응답 시간으로 세지 않음
+            self.pool.abandon(state)
+            close_stream(chunks)
+            raise
+        except Exception as e:
+            self.pool.release(state, time.perf_counter() - started, error=e)
+            raise
+        self.pool.release(state, time.perf_counter() - started)
+
+
+class KeyPoolClient:
+    """키별 클라이언트 묶음 (model_clients의 클라이언트와 같은 인터페이스)"""
+
+    name = 'key-pool'
+
+    def __init__(self, pool: KeyPool, make_client: Callable[[str], object]):
+        """
+        Args:
+            pool: 키 풀
+            make_client: 키 → 클라이언트 (GeminiClient 등)
+        """
+        self.pool = pool
+        self.clients = {state.key: make_client(state.key) for state in pool.states}
+
+    def model(self, name: str) -> PooledModel:
+        return PooledModel(name, self.pool, self.clients)
+
+    def list_models(self):
+        return next(iter(self.clients.values())).list_models()
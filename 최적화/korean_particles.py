@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+받침 기반 조사 교정
+- 금칙어를 대체어로 바꿀 때 뒤에 붙은 조사도 함께 맞춤
+  예: "효과가" → "개선이", "효과는" → "개선은", "광고로" → "홍보로"
+- 이/가, 은/는, 을/를, 와/과, 으로/로
+- 한글 음절 받침 표는 모듈 로딩 시 한 번만 계산
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+HANGUL_BASE = 0xAC00
+HANGUL_COUNT = 11172
+JONGSEONG_COUNT = 28
+RIEUL = 8  # ㄹ 받침 번호
+
+# 음절별 받침 번호 (0 = 받침 없음)
+JONGSEONG_TABLE = bytes(code % JONGSEONG_COUNT for code in range(HANGUL_COUNT))
+
+# 숫자는 읽는 소리 기준 (영, 일, 이, 삼, 사, 오, 육, 칠, 팔, 구)
+DIGIT_JONGSEONG = {'0': 21, '1': RIEUL, '2': 0, '3': 16, '4': 0,
+                   '5': 0, '6': 1, '7': RIEUL, '8': RIEUL, '9': 0}
+
+# (받침 있을 때, 받침 없을 때)
+PARTICLE_PAIRS = [('으로', '로'), ('이', '가'), ('은', '는'), ('을', '를'), ('과', '와')]
+PARTICLE_PAIR = {particle: pair for pair in PARTICLE_PAIRS for particle in pair}
+
+# 긴 조사부터 확인 (으로 → 로)
+PARTICLE_RE = re.compile('|'.join(sorted(PARTICLE_PAIR, key=len, reverse=True)))
+
+# 조사 뒤에 붙어도 되는 말 (으로는, 와도, 로부터 ...)
+PARTICLE_TAILS = {
+    '으로': ('부터', '는', '도', '서', '써', '만', '의'),
+    '로': ('부터', '는', '도', '서', '써', '만', '의'),
+    '과': ('는', '도', '의', '만'),
+    '와': ('는', '도', '의', '만'),
+}
+
+
+def is_hangul(char: str) -> bool:
+    """완성형 한글 음절 여부"""
+    return 0 <= ord(char) - HANGUL_BASE < HANGUL_COUNT
+
+
+def final_jongseong(word: str) -> Optional[int]:
+    """
+    단어 마지막 글자의 받침 번호
+
+    Returns:
+        0 = 받침 없음, 8 = ㄹ, 그 외 받침 번호 / 판단 불가(영문 등)면 None
+    """
+    word = word.rstrip()
+    if not word:
+        return None
+
+    last = word[-1]
+    if is_hangul(last):
+        return JONGSEONG_TABLE[ord(last) - HANGUL_BASE]
+    return DIGIT_JONGSEONG.get(last)
+
+
+def choose_particle(word: str, particle: str) -> str:
+    """
+    단어에 맞는 조사 형태 선택
+
+    예: choose_particle("개선", "가") → "이", choose_particle("물", "으로") → "로"
+    """
+    pair = PARTICLE_PAIR.get(particle)
+    jongseong = final_jongseong(word)
+    if pair is None or jongseong is None:
+        return particle
+
+    with_batchim, without_batchim = pair
+    if with_batchim == '으로':
+        # ㄹ 받침은 "로" (물로, 서울로)
+        return without_batchim if jongseong in (0, RIEUL) else with_batchim
+    return with_batchim if jongseong else without_batchim
+
+
+def match_particle(text: str, pos: int) -> Optional[str]:
+    """
+    pos 위치에서 시작하는 조사 찾기
+
+    조사 뒤가 한글이면 다른 단어의 일부일 수 있으므로 조사로 보지 않음
+    (단, "으로는", "와도" 처럼 허용된 말이 이어지면 조사로 봄)
+    """
+    match = PARTICLE_RE.match(text, pos)
+    if not match:
+        return None
+
+    particle = match.group()
+    end = match.end()
+    if end >= len(text) or not is_hangul(text[end]):
+        return particle
+
+    for tail in PARTICLE_TAILS.get(particle, ()):
+        tail_end = end + len(tail)
+        if text.startswith(tail, end) and (tail_end >= len(text) or not is_hangul(text[tail_end])):
+            return particle
+    return None
+
+
+def replace_with_particles(text: str, old: str, new: str) -> Tuple[str, int]:
+    """
+    old를 new로 바꾸면서 바로 뒤 조사를 new의 받침에 맞게 교정
+
+    Returns:
+        (치환된 텍스트, 치환 횟수)
+    """
+    if not old or old not in text:
+        return text, 0
+
+    pieces = []
+    last = 0
+    count = 0
+    start = text.find(old)
+    while start != -1:
+        pieces.append(text[last:start])
+        pieces.append(new)
+        last = start + len(old)
+
+        particle = match_particle(text, last)
+        if particle:
+            pieces.append(choose_particle(new, particle))
+            last += len(particle)
+
+        count += 1
+        start = text.find(old, last)
+
+    pieces.append(text[last:])
+    return ''.join(pieces), count
+
+
+def find_particle_errors(text: str, words) -> List[str]:
+    """
+    단어 뒤에 받침과 맞지 않는 조사가 붙은 곳 찾기
+
+    예: find_particle_errors("개선가 있어요", ["개선"]) → ["개선가"]
+    """
+    errors = []
+    for word in words:
+        start = text.find(word)
+        while start != -1:
+            end = start + len(word)
+            particle = match_particle(text, end)
+            if particle and choose_particle(word, particle) != particle:
+                error = word + particle
+                if error not in errors:
+                    errors.append(error)
+            start = text.find(word, end)
+    return errors
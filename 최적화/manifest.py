@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+결과 파일 매니페스트 (변경된 행만 재처리)
+- 결과 파일 옆에 <결과파일>.manifest.json 저장
+- 행마다 입력 해시 + 규칙/프롬프트/모델 버전 지문 기록
+- 입력 해시와 지문이 같은 행은 이전 결과 파일에서 복사
+"""
+
+import json
+import os
+from typing import Dict, Optional
+
+from hashing import content_hash
+
+MANIFEST_SUFFIX = '.manifest.json'
+MANIFEST_VERSION = 1
+
+
+def version_fingerprint(*parts) -> str:
+    """규칙/프롬프트/모델 등 결과에 영향을 주는 요소들의 지문"""
+    return content_hash(*(
+        json.dumps(part, ensure_ascii=False, sort_keys=True, default=str) for part in parts
+    ))
+
+
+class RunManifest:
+    """결과 파일 사이드카 매니페스트"""
+
+    def __init__(self, path: str, fingerprint: str):
+        """
+        초기화
+
+        Args:
+            path: 매니페스트 파일 경로
+            fingerprint: 이번 실행의 버전 지문
+        """
+        self.path = path
+        self.fingerprint = fingerprint
+        # 입력 해시 → 이전 행 번호 (지문이 같은 행만)
+        self.previous: Dict[str, int] = {}
+        # 이번 실행 기록 (행 번호 → 입력 해시, 지문)
+        self.rows: Dict[int, Dict[str, str]] = {}
+        self.load()
+
+    @classmethod
+    def for_output(cls, output_file: str, fingerprint: str) -> 'RunManifest':
+        """결과 파일에 대응하는 매니페스트"""
+        return cls(output_file + MANIFEST_SUFFIX, fingerprint)
+
+    def load(self):
+        """이전 매니페스트 읽기 (없거나 깨졌으면 전체 재처리)"""
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 매니페스트 읽기 실패 (전체 재처리): {e}")
+            return
+
+        if data.get('version') != MANIFEST_VERSION:
+            return
+
+        for row_id, entry in data.get('rows', {}).items():
+            if entry.get('fingerprint') == self.fingerprint:
+                self.previous.setdefault(entry['input_hash'], int(row_id))
+
+    def previous_row(self, input_hash: str) -> Optional[int]:
+        """입력 해시와 지문이 같은 이전 행 번호 (없으면 None)"""
+        return self.previous.get(input_hash)
+
+    def record(self, row_id: int, input_hash: str):
+        """이번 실행에서 처리한 행 기록"""
+        self.rows[int(row_id)] = {'input_hash': input_hash, 'fingerprint': self.fingerprint}
+
+    def save(self):
+        """매니페스트 저장 (임시 파일에 쓰고 교체)"""
+        data = {
+            'version': MANIFEST_VERSION,
+            'fingerprint': self.fingerprint,
+            'rows': {str(row_id): entry for row_id, entry in sorted(self.rows.items())},
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
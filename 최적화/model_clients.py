@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+모델 클라이언트 (AI 백엔드 교체)
+- gemini: 실제 Gemini API (API 키 필요, 키가 여러 개면 키 풀로 돌아가며 사용 - key_pool.py)
+- anthropic: Anthropic Messages API (ANTHROPIC_API_KEY, 모델 단계는 Gemini 단계와 같은 위치끼리 짝지음)
+- record: 실제 Gemini를 호출하면서 요청/응답을 JSONL에 기록
+- replay / fake: 네트워크 없이 기록된 응답(또는 고정 응답)을 돌려줌, 지연/오류/429 흉내
+  (원고 JSON 스키마를 요청한 호출에 JSON이 아닌 응답이면 {"manuscript": 응답}으로 감쌈 - Gemini와 같은 형식)
+  → 동시 처리, 재시도, 캐시를 오프라인(CI)에서 부하 테스트
+- router: 여러 제공자 중 최근 지연 시간/오류율이 좋은 쪽으로, 실패하면 다른 제공자로 (provider_router.py)
+
+클라이언트 인터페이스: name, model(단계 이름) → generate_content(prompt, stream=False, generation_config=None),
+list_models()
+
+선택: 환경변수 GEMINI_BACKEND 또는 create_client(backend=...)
+    gemini
+    record:calls.jsonl
+    replay:calls.jsonl?latency=2&jitter=0.5&errors=0.05&429=0.02
+    fake?latency=1&reply=고정 응답
+    anthropic
+    anthropic:claude-3-5-haiku-latest,claude-sonnet-4-0
+    router:gemini,anthropic?degraded=30&probe=60
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Sequence, Union
+from urllib.parse import parse_qsl
+
+from google.api_core import exceptions as api_exceptions
+
+from deadlines import close_stream
+from hashing import DEFAULT_SEED, content_hash
+from key_pool import DEFAULT_COOLDOWN, KeyPool, KeyPoolClient, load_api_keys, load_key_config
+from provider_router import DEGRADED_SECONDS, PROBE_SECONDS, RouterClient
+from structured_output import OutputFormatError, config_value, manuscript_json, parse_manuscript, wants_manuscript
+
+BACKEND_ENV = 'GEMINI_BACKEND'
+
+API_KEY_MESSAGE = ("Gemini API 키가 필요합니다. "
+                   "환경변수 GEMINI_API_KEY를 설정하거나 api_key 파라미터를 전달하세요.")
+
+ANTHROPIC_KEY_ENV = 'ANTHROPIC_API_KEY'
+ANTHROPIC_KEY_MESSAGE = "Anthropic API 키가 필요합니다. 환경변수 ANTHROPIC_API_KEY를 설정하세요."
+
+# Anthropic 모델 단계 (빠른 모델 → 상위 모델) - 환경변수 ANTHROPIC_MODEL_TIERS (쉼표 구분)로 변경
+ANTHROPIC_TIERS_ENV = 'ANTHROPIC_MODEL_TIERS'
+DEFAULT_ANTHROPIC_TIERS = ['claude-3-5-haiku-latest', 'claude-sonnet-4-0']
+
+# Anthropic은 최대 출력 토큰이 필수 (generation_config에 max_output_tokens가 없을 때)
+ANTHROPIC_MAX_TOKENS = 8192
+
+# 스키마 응답을 받는 도구 이름
+STRUCTURED_TOOL = 'submit_response'
+
+
+class ReplayMiss(KeyError):
+    """기록에 없는 요청 (고정 응답도 없음)"""
+
+
+class GeminiClient:
+    """실제 Gemini API"""
+
+    name = 'gemini'
+
+    def __init__(self, api_key: Optional[str]):
+        if not api_key:
+            raise ValueError(API_KEY_MESSAGE)
+        import google.generativeai as genai
+        from google.ai import generativelanguage as glm
+
+        # genai.configure(전역 설정)는 쓰지 않음 - 키 풀이면 키마다 이 클라이언트가 따로 있어 마지막 키가 이김
+        self.genai = genai
+        self.service = glm.GenerativeServiceClient(client_options={'api_key': api_key})
+        self.models = glm.ModelServiceClient(client_options={'api_key': api_key})
+
+    def model(self, name: str):
+        model = self.genai.GenerativeModel(name)
+        # 키별 클라이언트 연결: GenerativeModel은 _client가 None일 때만 전역 클라이언트를 씀
+        # (google-generativeai 0.8.x 내부 동작 - requirements.txt에서 <0.9로 고정, 바뀌면 조용히 공유하지 않고 멈춤)
+        if '_client' not in vars(model):
+            raise RuntimeError("지원하지 않는 google-generativeai 버전입니다 (0.8.x 필요 - requirements.txt)")
+        model._client = self.service
+        return model
+
+    def list_models(self):
+        return list(self.models.list_models())
+
+
+def align_tier(index: int, count: int, models: Sequence[str]) -> str:
+    """단계 위치 → 다른 제공자의 같은 위치 모델 (단계 수가 다르면 처음/끝을 맞춰 비율로)"""
+    if count <= 1:
+        return models[-1]
+    return models[int(index * (len(models) - 1) / (count - 1) + 0.5)]
+
+
+def message_text(message) -> str:
+    """Anthropic 응답의 텍스트 블록 합치기"""
+    return ''.join(block.text for block in message.content if block.type == 'text')
+
+
+class AnthropicModel:
+    """Anthropic Messages API (generate_content 호환) - JSON 스키마 요청은 도구 입력으로 받음"""
+
+    def __init__(self, name: str, client):
+        self.name = name
+        self.client = client
+
+    def generate_content(self, prompt, stream=False, generation_config=None, **kwargs):
+        request = {
+            'model': self.name,
+            'max_tokens': int(config_value(generation_config, 'max_output_tokens') or ANTHROPIC_MAX_TOKENS),
+            'messages': [{'role': 'user', 'content': str(prompt)}],
+        }
+        temperature = config_value(generation_config, 'temperature')
+        if temperature is not None:
+            request['temperature'] = temperature
+
+        schema = config_value(generation_config, 'response_schema')
+        if schema is not None:
+            # 도구 입력은 끝까지 받아야 JSON이 완성되므로 스트리밍이어도 한 조각으로
+            text = self.structured(request, schema)
+            return iter([SimpleNamespace(text=text)]) if stream else SimpleNamespace(text=text)
+        if stream:
+            return self.stream(request)
+        return SimpleNamespace(text=message_text(self.client.messages.create(**request)))
+
+    def structured(self, request: Dict, schema: Dict) -> str:
+        """스키마 응답: 도구 하나를 반드시 부르게 하고 그 입력을 JSON으로 (객체가 아닌 스키마는 result로 감쌈)"""
+        wrapped = schema.get('type') != 'object'
+        input_schema = {'type': 'object', 'properties': {'result': schema}, 'required': ['result']} if wrapped else schema
+        message = self.client.messages.create(
+            tools=[{'name': STRUCTURED_TOOL, 'description': "응답을 이 형식으로 제출", 'input_schema': input_schema}],
+            tool_choice={'type': 'tool', 'name': STRUCTURED_TOOL},
+            **request,
+        )
+        data = next((block.input for block in message.content if block.type == 'tool_use'), None)
+        if data is None:
+            return message_text(message)  # 로컬 스키마 검증에서 걸러짐 (재시도/상위 모델)
+        return json.dumps(data.get('result') if wrapped else data, ensure_ascii=False)
+
+    def stream(self, request: Dict):
+        """스트리밍 (요청 오류는 첫 조각을 받을 때 남)"""
+        with self.client.messages.stream(**request) as stream:
+            for text in stream.text_stream:
+                yield SimpleNamespace(text=text)
+
+
+class AnthropicClient:
+    """실제 Anthropic API"""
+
+    name = 'anthropic'
+
+    def __init__(self, api_key: Optional[str] = None, tiers: Optional[Sequence[str]] = None,
+                 models: Optional[Sequence[str]] = None):
+        """
+        Args:
+            api_key: Anthropic API 키 (없으면 환경변수 ANTHROPIC_API_KEY)
+            tiers: 이번 실행의 단계 이름 (Gemini 단계 - 같은 위치의 Anthropic 모델로 바꿈)
+            models: Anthropic 모델 단계 (없으면 환경변수 ANTHROPIC_MODEL_TIERS 또는 기본값)
+        """
+        api_key = api_key or os.getenv(ANTHROPIC_KEY_ENV)
+        if not api_key:
+            raise ValueError(ANTHROPIC_KEY_MESSAGE)
+        import anthropic
+
+        # 재시도/다른 모델·제공자로 넘기기는 단계 모델과 라우터가 하므로 SDK 재시도는 끔
+        self.client = anthropic.Anthropic(api_key=api_key, max_retries=0)
+        env_models = [name.strip() for name in os.getenv(ANTHROPIC_TIERS_ENV, '').split(',') if name.strip()]
+        self.models = list(models or env_models or DEFAULT_ANTHROPIC_TIERS)
+        self.tiers = list(tiers or [])
+
+    def model_name(self, name: str) -> str:
+        """단계 이름 → Anthropic 모델 (claude로 시작하면 그대로, 모르는 이름은 최상위 모델)"""
+        if name.startswith('claude'):
+            return name
+        if name not in self.tiers:
+            return self.models[-1]
+        return align_tier(self.tiers.index(name), len(self.tiers), self.models)
+
+    def model(self, name: str):
+        return AnthropicModel(self.model_name(name), self.client)
+
+    def list_models(self):
+        return [SimpleNamespace(name=model.id, display_name=model.display_name, description="Anthropic",
+                                supported_generation_methods=['generateContent'])
+                for model in self.client.models.list()]
+
+
+class RecordingModel:
+    """실제 모델 호출을 그대로 돌려주면서 기록"""
+
+    def __init__(self, name: str, model, recorder: 'RecordingClient'):
+        self.name = name
+        self.inner = model
+        self.recorder = recorder
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.inner.generate_content(prompt, stream=stream, **kwargs)
+        except Exception as e:
+            self.recorder.write(self.name, prompt, None, time.perf_counter() - started, error=e)
+            raise
+        if not stream:
+            self.recorder.write(self.name, prompt, response.text, time.perf_counter() - started)
+            return response
+        return self.record_stream(prompt, response, started)
+
+    def record_stream(self, prompt, response, started):
+        """스트리밍 응답: 조각을 그대로 넘기고 끝나면 기록 (중간에 닫히면 잘린 응답은 기록하지 않음)"""
+        pieces = []
+        try:
+            for chunk in response:
+                try:
+                    pieces.append(chunk.text or '')
+                except ValueError:
+                    pass
+                yield chunk
+        except GeneratorExit:
+            close_stream(response)
+            raise
+        self.recorder.write(self.name, prompt, ''.join(pieces), time.perf_counter() - started)
+
+
+class RecordingClient:
+    """요청/응답을 JSONL로 기록하는 클라이언트 (실제 호출은 inner가)"""
+
+    name = 'record'
+
+    def __init__(self, inner, path: str):
+        self.inner = inner
+        self.path = path
+        self.lock = threading.Lock()
+
+    def model(self, name: str):
+        return RecordingModel(name, self.inner.model(name), self)
+
+    def list_models(self):
+        return self.inner.list_models()
+
+    def write(self, model_name: str, prompt, text: Optional[str], seconds: float, error: Exception = None):
+        record = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'model': model_name,
+            'prompt_hash': content_hash(prompt),
+            'prompt': str(prompt),
+            'response': text,
+            'seconds': round(seconds, 3),
+            'error': f"{type(error).__name__}: {error}" if error else None,
+        }
+        with self.lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def load_records(path: str) -> Dict[str, List[Dict]]:
+    """JSONL 기록 → {프롬프트 해시: [성공한 기록, ...]}"""
+    records = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get('response') is not None:
+                records.setdefault(record['prompt_hash'], []).append(record)
+    return records
+
+
+def as_manuscript(text: str) -> str:
+    """원고 JSON 요청에 대한 가짜 응답 (이미 스키마에 맞는 JSON이면 그대로 - JSON 모드로 기록한 응답)"""
+    try:
+        parse_manuscript(text)
+        return text
+    except OutputFormatError:
+        return manuscript_json(text)
+
+
+class FakeModel:
+    """가짜 모델 - 기록된 응답/고정 응답 + 지연/오류/429"""
+
+    def __init__(self, name: str, client: 'FakeClient'):
+        self.name = name
+        self.client = client
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        client = self.client
+        text = client.respond(self.name, prompt)
+        if wants_manuscript(kwargs.get('generation_config')):
+            text = as_manuscript(text)
+        delay = client.delay()
+        failure = client.failure()
+
+        if not stream:
+            time.sleep(delay)
+            if failure:
+                raise failure
+            return SimpleNamespace(text=text)
+        return self.stream(text, delay, failure)
+
+    def stream(self, text, delay, failure):
+        """지연을 조각마다 나눠서 흘려 줌 (실패는 첫 조각 전에)"""
+        size = self.client.chunk_size
+        pieces = [text[i:i + size] for i in range(0, len(text), size)] or ['']
+        time.sleep(delay / 2)
+        if failure:
+            raise failure
+        for piece in pieces:
+            time.sleep(delay / 2 / len(pieces))
+            yield SimpleNamespace(text=piece)
+
+
+class FakeClient:
+    """네트워크 없는 백엔드 (replay / fake)"""
+
+    def __init__(self, records: Optional[Dict[str, List[Dict]]] = None,
+                 reply: Union[None, str, Callable[[str], str]] = None, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, chunk_size: int = 40,
+                 seed: int = DEFAULT_SEED):
+        """
+        Args:
+            records: load_records() 결과 (같은 프롬프트는 기록 순서대로 돌아가며 응답)
+            reply: 기록에 없을 때 응답 (문자열 또는 프롬프트 → 응답 함수, 없으면 ReplayMiss)
+            latency: 평균 응답 시간 (초)
+            jitter: 응답 시간 ± 범위 (초)
+            error_rate: 503 오류 확률
+            rate_limit_rate: 429 (요청 한도 초과) 확률
+            chunk_size: 스트리밍 조각 크기 (글자)
+            seed: 지연/오류 난수 시드 (같은 시드 → 같은 순서)
+        """
+        self.name = 'replay' if records is not None else 'fake'
+        self.records = records or {}
+        self.reply = reply
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.chunk_size = chunk_size
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.positions = {}
+        self.calls = 0
+
+    def model(self, name: str):
+        return FakeModel(name, self)
+
+    def list_models(self):
+        names = sorted({record['model'] for records in self.records.values() for record in records})
+        return [SimpleNamespace(name=f"models/{name}", display_name=name, description=f"{self.name} 백엔드",
+                                supported_generation_methods=['generateContent'])
+                for name in names or ['fake']]
+
+    def respond(self, model_name: str, prompt) -> str:
+        """기록된 응답 (같은 모델 우선) → 없으면 고정 응답"""
+        with self.lock:
+            self.calls += 1
+            prompt_hash = content_hash(prompt)
+            candidates = self.records.get(prompt_hash, [])
+            same_model = [record for record in candidates if record['model'] == model_name]
+            candidates = same_model or candidates
+            if candidates:
+                key = (model_name, prompt_hash)
+                position = self.positions.get(key, 0)
+                self.positions[key] = position + 1
+                return candidates[position % len(candidates)]['response']
+
+        if self.reply is None:
+            raise ReplayMiss(f"기록에 없는 요청 ({model_name}, {prompt_hash[:12]})")
+        return self.reply(str(prompt)) if callable(self.reply) else self.reply
+
+    def delay(self) -> float:
+        with self.lock:
+            return max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+    def failure(self) -> Optional[Exception]:
+        """이번 호출에서 낼 오류 (없으면 None)"""
+        with self.lock:
+            roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            return api_exceptions.ResourceExhausted("429 Resource has been exhausted (fake)")
+        if roll < self.rate_limit_rate + self.error_rate:
+            return api_exceptions.ServiceUnavailable("503 The model is overloaded (fake)")
+        return None
+
+
+def gemini_client(api_key, log: Callable[[str], None] = None):
+    """실제 Gemini 클라이언트 (키가 여러 개면 키 풀)"""
+    config = load_key_config()
+    keys = load_api_keys(api_key, config)
+    if len(keys) <= 1:
+        return GeminiClient(keys[0] if keys else None)
+    pool = KeyPool(keys, rpm=config.get('rpm'), cooldown=config.get('cooldown', DEFAULT_COOLDOWN), log=log)
+    return KeyPoolClient(pool, GeminiClient)
+
+
+def parse_backend(spec: Optional[str]) -> Dict:
+    """"replay:calls.jsonl?latency=2&429=0.05" → {'kind', 'path', 옵션...}"""
+    spec = (spec or 'gemini').strip()
+    spec, _, query = spec.partition('?')
+    kind, _, path = spec.partition(':')
+    options = dict(parse_qsl(query))
+    return {'kind': kind.strip().lower(), 'path': path.strip(), **options}
+
+
+def router_providers(path: str) -> List[str]:
+    """"gemini,anthropic" → 제공자 백엔드 목록 (없으면 gemini, anthropic, 옵션(?...)은 라우터 옵션)"""
+    return [spec.strip() for spec in path.split(',') if spec.strip()] or ['gemini', 'anthropic']
+
+
+def needs_api_key(backend: Optional[str] = None) -> bool:
+    """실제 Gemini를 호출하는 백엔드인지 (gemini, record, 이 둘이 들어간 router)"""
+    options = parse_backend(backend or os.getenv(BACKEND_ENV))
+    if options['kind'] == 'router':
+        return any(needs_api_key(spec) for spec in router_providers(options['path']))
+    return options['kind'] in ('gemini', 'record')
+
+
+def create_client(api_key: Union[None, str, List[str]] = None, backend: Optional[str] = None,
+                  log: Callable[[str], None] = None, tiers: Optional[Sequence[str]] = None):
+    """
+    모델 클라이언트 생성
+
+    Args:
+        api_key: Gemini API 키 (gemini/record만 필요, 쉼표 구분/목록이면 키 풀)
+        backend: 백엔드 지정 (없으면 환경변수 GEMINI_BACKEND, 그것도 없으면 gemini)
+        log: 키 풀/라우터 로그 함수 (키 대기/제외, 제공자 전환 알림)
+        tiers: 이번 실행의 모델 단계 이름 (다른 제공자가 같은 위치의 자기 모델로 바꿀 때)
+    """
+    options = parse_backend(backend or os.getenv(BACKEND_ENV))
+    kind = options.pop('kind')
+    path = options.pop('path')
+
+    if kind == 'router':
+        providers = []
+        for spec in router_providers(path):
+            name = parse_backend(spec)['kind']
+            if any(name == existing for existing, _ in providers):
+                name = f"{name}#{len(providers) + 1}"
+            providers.append((name, create_client(api_key, spec, log, tiers)))
+        return RouterClient(providers, log=log or print,
+                            degraded_seconds=float(options.get('degraded', DEGRADED_SECONDS)),
+                            probe_seconds=float(options.get('probe', PROBE_SECONDS)))
+    if kind == 'anthropic':
+        return AnthropicClient(tiers=tiers, models=[name.strip() for name in path.split(',') if name.strip()])
+    if kind == 'gemini':
+        return gemini_client(api_key, log)
+    if kind == 'record':
+        return RecordingClient(gemini_client(api_key, log), path or 'gemini_calls.jsonl')
+    if kind in ('replay', 'fake'):
+        if kind == 'replay' and not path:
+            raise ValueError("replay 백엔드에는 기록 파일이 필요합니다 (replay:calls.jsonl)")
+        return FakeClient(
+            records=load_records(path) if kind == 'replay' else None,
+            reply=options.get('reply', None if kind == 'replay' else '가짜 응답입니다.'),
+            latency=float(options.get('latency', 0)),
+            jitter=float(options.get('jitter', 0)),
+            error_rate=float(options.get('errors', 0)),
+            rate_limit_rate=float(options.get('429', 0)),
+            seed=int(options.get('seed', DEFAULT_SEED)),
+        )
+    raise ValueError(f"알 수 없는 백엔드: {kind} (gemini, anthropic, record, replay, fake, router 중 하나)")
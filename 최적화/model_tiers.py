@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+모델 단계(tier) 호출 - 빠른 모델 먼저, 로컬 검증 실패 시에만 상위 모델로
+- 단계 순서: 환경변수 GEMINI_MODEL_TIERS (쉼표 구분) 또는 DEFAULT_TIERS
+- 마지막 단계 결과는 검증 없이 사용
+- 검사기(guard)를 주면 스트리밍으로 받으며 조기 중단 (빠른 단계는 중단 즉시 상위 단계로)
+- 호출마다 마감 시간 (넘기면 상위 단계로), 선택적으로 p95 지연 후 중복 요청(헤징), 취소
+- 단계별 호출 수, 통과율, 중단 수, 지연 시간 기록 (키 풀이면 키별 사용량도)
+- 동시 요청 자동 조절(AdaptiveLimiter)을 주면 단계 호출마다 자리를 받고 결과(429/시간 초과/지연)를 알려줌
+- 원고 호출은 JSON 스키마 응답 요청 + 로컬 검증, 형식 오류면 한 번 재시도 (generate_manuscript)
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from adaptive_limit import AdaptiveLimiter, size_class
+from deadlines import Cancelled, DeadlineExceeded, LatencyTracker, RunControl, call_with_deadline
+from key_pool import classify_error
+from model_clients import create_client
+from streaming import StreamAborted, StreamGuard, stream_generate
+from structured_output import FORMAT_RETRIES, MANUSCRIPT_CONFIG, OutputFormatError, parse_manuscript
+
+# 빠르고 싼 모델 → 느리고 비싼 모델
+DEFAULT_TIERS = ['gemini-2.5-flash', 'gemini-2.5-pro']
+TIERS_ENV = 'GEMINI_MODEL_TIERS'
+
+# 실제 모델 호출 마감 시간 (초) - 평소 10~30초, 이보다 길면 멈춘 것으로 봄
+DEFAULT_TIMEOUT = 120
+
+
+def print_log(message):
+    """로그 출력"""
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+
+def configured_tiers(tiers: Optional[Sequence[str]] = None) -> List[str]:
+    """사용할 모델 단계 (인자 → 환경변수 → 기본값 순)"""
+    if tiers:
+        return list(tiers)
+    env_tiers = [name.strip() for name in os.getenv(TIERS_ENV, '').split(',') if name.strip()]
+    return env_tiers or list(DEFAULT_TIERS)
+
+
+class TieredModel:
+    """단계별 모델 묶음 (generate_content 호환)"""
+
+    def __init__(self, tiers: List[Tuple[str, object]], log: Callable[[str], None] = None,
+                 timeout: Optional[float] = None, hedge: bool = False, control: Optional[RunControl] = None,
+                 limiter: Optional[AdaptiveLimiter] = None):
+        """
+        초기화
+
+        Args:
+            tiers: [(모델 이름, generate_content()를 제공하는 모델)] - 빠른 모델부터
+            log: 로그 함수
+            timeout: 호출 마감 시간 (초, None이면 무제한)
+            hedge: True면 단계별 최근 지연 시간 p95가 지나도 응답이 없을 때 같은 요청 한 번 더
+            control: 취소 상태 (취소되면 진행 중인 호출을 기다리지 않고 Cancelled)
+            limiter: 동시 요청 자동 조절 (키 풀의 429도 전달받음)
+        """
+        if not tiers:
+            raise ValueError("모델 단계가 하나 이상 필요합니다.")
+        self.tiers = tiers
+        self.log = log or print_log
+        self.lock = threading.Lock()
+        self.stats = {name: {'calls': 0, 'accepted': 0, 'errors': 0, 'aborted': 0, 'seconds': 0.0} for name, _ in tiers}
+        self.timeout = timeout
+        self.hedge = hedge
+        self.control = control
+        self.latency = {name: LatencyTracker() for name, _ in tiers}
+        self.limiter = limiter
+        if limiter:
+            for pool in self.key_pools():
+                pool.listeners.append(limiter.penalize)
+
+    @property
+    def names(self) -> List[str]:
+        return [name for name, _ in self.tiers]
+
+    def record(self, name: str, seconds: float, accepted: bool, error: bool = False, aborted: bool = False):
+        with self.lock:
+            stats = self.stats[name]
+            stats['calls'] += 1
+            stats['accepted'] += accepted
+            stats['errors'] += error
+            stats['aborted'] += aborted
+            stats['seconds'] += seconds
+
+    def call(self, name, model, prompt, guard, on_progress, retries, abort_last, **kwargs):
+        """단계 하나 호출 (동시 요청 자동 조절이면 자리를 받고 결과를 알려줌)"""
+        if self.limiter is None:
+            return self.request(name, model, prompt, guard, on_progress, retries, abort_last, **kwargs)
+
+        started = self.limiter.acquire(self.control)
+        outcome, seconds = 'error', None
+        try:
+            response = self.request(name, model, prompt, guard, on_progress, retries, abort_last, **kwargs)
+            outcome, seconds = 'ok', self.limiter.clock() - started
+            return response
+        except DeadlineExceeded:
+            outcome = 'timeout'
+            raise
+        except Exception as e:
+            if classify_error(e) == 'rate_limited':
+                outcome = 'rate_limited'
+            raise
+        finally:
+            self.limiter.release(started, outcome, seconds, size_class(prompt))
+
+    def request(self, name, model, prompt, guard, on_progress, retries, abort_last, **kwargs):
+        """단계 하나 요청 (마감 시간/헤징/취소를 쓰면 별도 스레드에서, 기다리지 않게 된 요청은 다음 조각에서 멈춤)"""
+        def request(attempt=None):
+            if guard or on_progress:
+                return stream_generate(model, prompt, guard.fresh() if guard else None, on_progress, retries=retries,
+                                       abort_last=abort_last, log=self.log, control=attempt or self.control, **kwargs)
+            return model.generate_content(prompt, **kwargs)
+
+        if self.timeout is None and not self.hedge and self.control is None:
+            return request()
+        hedge_delay = self.latency[name].hedge_delay() if self.hedge else None
+        return call_with_deadline(request, self.timeout, hedge_delay, self.control, log=self.log)
+
+    def generate_content(self, prompt, validate: Callable[[str], bool] = None, guard: Optional[StreamGuard] = None,
+                         on_progress: Callable[[int], None] = None, **kwargs):
+        """
+        빠른 단계부터 호출, validate(응답 텍스트)가 False면 다음 단계로
+
+        Args:
+            prompt: 프롬프트
+            validate: 로컬 검증 함수 (없으면 빈 응답만 아니면 통과)
+            guard: 스트리밍 검사기 (주면 스트리밍 + 조기 중단, 마지막 단계는 한 번 재시도 후 끝까지 받음)
+            on_progress: 받은 글자수 콜백 (주면 스트리밍)
+            **kwargs: generate_content에 그대로 전달 (generation_config 등)
+        """
+        last = len(self.tiers) - 1
+        for index, (name, model) in enumerate(self.tiers):
+            started = time.perf_counter()
+            try:
+                response = self.call(name, model, prompt, guard, on_progress, retries=int(index == last),
+                                     abort_last=index < last, **kwargs)
+                text = response.text
+            except Cancelled:
+                raise
+            except StreamAborted as e:
+                self.record(name, time.perf_counter() - started, accepted=False, aborted=True)
+                self.log(f"✋ {name} 생성 중단 ({e.reason}) → {self.tiers[index + 1][0]}")
+                continue
+            except Exception as e:
+                self.record(name, time.perf_counter() - started, accepted=False, error=True)
+                if index == last:
+                    raise
+                self.log(f"⚠️ {name} 오류 → 상위 모델로: {e}")
+                continue
+
+            self.latency[name].record(time.perf_counter() - started)
+            accepted = index == last or bool(text and text.strip() and (validate is None or validate(text)))
+            self.record(name, time.perf_counter() - started, accepted=accepted)
+            if accepted:
+                return response
+            self.log(f"🔼 {name} 결과 검증 실패 → {self.tiers[index + 1][0]}")
+
+    def summary_lines(self) -> List[str]:
+        """단계별 통과율/평균 지연 시간"""
+        lines = []
+        with self.lock:
+            for name, stats in self.stats.items():
+                if not stats['calls']:
+                    continue
+                rate = stats['accepted'] / stats['calls'] * 100
+                average = stats['seconds'] / stats['calls']
+                lines.append(f"{name}: {stats['calls']}회 호출, 통과 {stats['accepted']}회 ({rate:.0f}%), "
+                             f"오류 {stats['errors']}회, 중단 {stats['aborted']}회, 평균 {average:.1f}초")
+        return lines
+
+    def key_pools(self) -> list:
+        """단계 모델들이 쓰는 키 풀 (중복 없이)"""
+        pools = []
+        for _, model in self.tiers:
+            pool = getattr(model, 'pool', None)
+            if pool is not None and all(pool is not seen for seen in pools):
+                pools.append(pool)
+        return pools
+
+    def routers(self) -> list:
+        """단계 모델들이 쓰는 제공자 라우터 (중복 없이)"""
+        routers = []
+        for _, model in self.tiers:
+            router = getattr(model, 'router', None)
+            if router is not None and all(router is not seen for seen in routers):
+                routers.append(router)
+        return routers
+
+    def log_summary(self):
+        """단계별 통계 로그 (키 풀이면 키별 사용량, 라우터면 제공자별 사용량도)"""
+        for line in self.summary_lines():
+            self.log(f"📊 {line}")
+        for pool in self.key_pools():
+            for line in pool.summary_lines():
+                self.log(f"🔑 {line}")
+        for router in self.routers():
+            for line in router.summary_lines():
+                self.log(f"🔀 {line}")
+        if self.limiter:
+            self.log(f"🚦 {self.limiter.summary()}")
+
+
+def create_tiered_model(api_key: Optional[str], tiers: Optional[Sequence[str]] = None, log=None,
+                        timeout: Optional[float] = DEFAULT_TIMEOUT, hedge: bool = False,
+                        control: Optional[RunControl] = None, client=None,
+                        limiter: Optional[AdaptiveLimiter] = None) -> TieredModel:
+    """
+    단계별 모델 생성 (호출마다 마감 시간)
+
+    Args:
+        api_key: API 키 (쉼표 구분/목록이면 키 풀, gemini_keys.json/GEMINI_API_KEYS의 키도 함께 사용)
+        client: 모델 클라이언트 (없으면 환경변수 GEMINI_BACKEND 기준 - 기본은 실제 Gemini, router면 제공자 여럿)
+        limiter: 동시 요청 자동 조절 (없으면 호출하는 쪽의 동시 실행 수 그대로)
+    """
+    names = configured_tiers(tiers)
+    client = client or create_client(api_key, log=log or print_log, tiers=names)
+    return TieredModel([(name, client.model(name)) for name in names], log=log,
+                       timeout=timeout, hedge=hedge, control=control, limiter=limiter)
+
+
+def generate(model, prompt, validate: Callable[[str], bool] = None, guard: Optional[StreamGuard] = None,
+             on_progress: Callable[[int], None] = None, **kwargs):
+    """
+    모델 호출 (단계별 모델이면 로컬 검증 + 상위 모델 승격 + 스트리밍 조기 중단, 아니면 그대로 호출)
+    """
+    if isinstance(model, TieredModel):
+        return model.generate_content(prompt, validate=validate, guard=guard, on_progress=on_progress, **kwargs)
+    return model.generate_content(prompt, **kwargs)
+
+
+def generate_manuscript(model, prompt, validate: Callable[[str], bool] = None, guard: Optional[StreamGuard] = None,
+                        on_progress: Callable[[int], None] = None, log: Callable[[str], None] = print_log,
+                        **kwargs) -> Tuple[str, str]:
+    """
+    원고 JSON 호출 → (원고, 메모)
+
+    Args:
+        validate: 원고 로컬 검증 함수 (단계별 모델이면 형식 오류나 검증 실패 시 상위 모델로)
+        log: 재시도 로그 함수
+
+    Raises:
+        OutputFormatError: 재시도 후에도 응답이 스키마에 맞지 않을 때
+    """
+    def accept(response_text):
+        try:
+            manuscript, _ = parse_manuscript(response_text)
+        except OutputFormatError:
+            return False
+        return validate is None or validate(manuscript)
+
+    for attempt in range(FORMAT_RETRIES + 1):
+        response = generate(model, prompt, validate=accept, guard=guard, on_progress=on_progress,
+                            generation_config=MANUSCRIPT_CONFIG, **kwargs)
+        try:
+            return parse_manuscript(response.text)
+        except OutputFormatError as e:
+            if attempt == FORMAT_RETRIES:
+                raise
+            log(f"🔁 응답 형식 오류 ({e}) → 재시도")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+문단 병렬 재구성 (긴 원고 지연 시간 단축)
+- 원고를 문단 묶음으로 나눠 동시에 재구성하고 순서대로 이어 붙임
+- 각 묶음에는 공통 문맥(키워드, 규칙, 앞뒤 묶음 요약)을 함께 전달
+- 글 전체 규칙(키워드 횟수 등)은 묶음별로 나눠 배정하고, 이어 붙인 뒤 로컬에서 다시 맞춤
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from deadlines import Cancelled
+from edit_ops import split_sentences
+from korean_particles import choose_particle, match_particle
+
+PARAGRAPH_RE = re.compile(r'\n\s*\n')
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """빈 줄 기준 문단 나누기"""
+    return [paragraph.strip() for paragraph in PARAGRAPH_RE.split(text.strip()) if paragraph.strip()]
+
+
+def group_paragraphs(paragraphs: List[str], max_groups: int) -> List[str]:
+    """문단을 순서대로 최대 max_groups개 묶음으로 (글자수 기준 균등)"""
+    if not paragraphs:
+        return []
+
+    max_groups = max(1, max_groups)
+    total = sum(len(paragraph) for paragraph in paragraphs) or 1
+    groups = {}
+    position = 0
+    for paragraph in paragraphs:
+        # 문단 중간 지점이 전체의 어느 구간에 있는지로 묶음 결정
+        index = min(max_groups - 1, int((position + len(paragraph) / 2) / total * max_groups))
+        groups.setdefault(index, []).append(paragraph)
+        position += len(paragraph)
+    return ['\n\n'.join(groups[index]) for index in sorted(groups)]
+
+
+def distribute(total: int, weights: List[float]) -> List[int]:
+    """정수 total을 가중치 비율로 나누기 (최대 나머지 방식, 합계 보존)"""
+    weight_sum = sum(weights)
+    if not weights:
+        return []
+    if weight_sum <= 0:
+        weights = [1] * len(weights)
+        weight_sum = len(weights)
+
+    exact = [total * weight / weight_sum for weight in weights]
+    shares = [int(value) for value in exact]
+    by_remainder = sorted(range(len(weights)), key=lambda i: exact[i] - shares[i], reverse=True)
+    for i in by_remainder[:total - sum(shares)]:
+        shares[i] += 1
+    return shares
+
+
+def summarize(text: str, limit: int = 60) -> str:
+    """묶음 요약 (첫 문장, 최대 limit자) - 모델 호출 없이"""
+    sentences = split_sentences(text)
+    first = sentences[0].strip() if sentences else ''
+    return first if len(first) <= limit else first[:limit] + '...'
+
+
+def build_contexts(groups: List[str]) -> List[Dict]:
+    """묶음별 문맥 (위치, 앞뒤 묶음 요약)"""
+    return [
+        {
+            'index': i,
+            'total': len(groups),
+            'previous': summarize(groups[i - 1]) if i > 0 else '',
+            'next': summarize(groups[i + 1]) if i + 1 < len(groups) else '',
+        }
+        for i in range(len(groups))
+    ]
+
+
+def format_context(context: Dict, notes: List[str] = ()) -> str:
+    """프롬프트에 넣을 문맥 블록"""
+    lines = [
+        "# 문맥 (참고만, 이 부분만 수정해서 출력)",
+        f"- 이 원고는 전체 {context['total']}개 부분 중 {context['index'] + 1}번째 부분입니다.",
+    ]
+    if context['previous']:
+        lines.append(f"- 앞 부분: {context['previous']}")
+    if context['next']:
+        lines.append(f"- 뒷 부분: {context['next']}")
+    lines.extend(f"- {note}" for note in notes)
+    return '\n'.join(lines) + '\n\n'
+
+
+def rewrite_groups(groups: List[str], rewrite_group: Callable[[str, Dict], str], max_workers: int = 0,
+                   log: Callable[[str], None] = print) -> List[str]:
+    """
+    묶음 동시 재구성 (순서 유지, 실패한 묶음은 원본 유지, 취소는 그대로 전달)
+
+    Args:
+        groups: 문단 묶음
+        rewrite_group: (묶음 원고, 문맥) → 재구성 원고
+        max_workers: 동시 호출 수 (0이면 묶음 수)
+        log: 실패한 묶음 알림 출력 함수 (GUI 로그 등)
+    """
+    contexts = build_contexts(groups)
+    with ThreadPoolExecutor(max_workers=max_workers or len(groups) or 1) as executor:
+        futures = [executor.submit(rewrite_group, group, context) for group, context in zip(groups, contexts)]
+
+        results = []
+        for i, (group, future) in enumerate(zip(groups, futures), 1):
+            try:
+                results.append(future.result() or group)
+            except Cancelled:
+                raise
+            except Exception as e:
+                log(f"⚠️ {i}번째 부분 재구성 오류 (원본 유지): {e}")
+                results.append(group)
+    return results
+
+
+def stitch(parts: List[str]) -> str:
+    """묶음 이어 붙이기 (문단 사이 빈 줄)"""
+    return '\n\n'.join(part.strip() for part in parts if part.strip())
+
+
+def trim_excess(text: str, keyword: str, limit: int, replacement: str = '이거', standalone: bool = False) -> str:
+    """
+    키워드가 limit회를 넘으면 뒤쪽부터 replacement로 교체 (뒤 조사도 replacement 받침에 맞춤: "탈모약은" → "이거는")
+
+    Args:
+        standalone: True면 띄어쓰기 단위로만 셈 ("갱년기홍조" 안의 "홍조"는 제외)
+    """
+    if not keyword:
+        return text
+
+    pattern = re.escape(keyword)
+    if standalone:
+        pattern = r'(?<![가-힣])' + pattern + r'(?![가-힣])'
+    positions = [match.start() for match in re.finditer(pattern, text)]
+    for position in reversed(positions[limit:]):
+        end = position + len(keyword)
+        particle = match_particle(text, end)
+        if particle:
+            text = text[:position] + replacement + choose_particle(replacement, particle) + text[end + len(particle):]
+        else:
+            text = text[:position] + replacement + text[end:]
+    return text
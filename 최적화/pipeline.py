@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+단계별 파이프라인 (생산자/소비자)
+- 읽기 → 단계1 작업자들 → 단계2 작업자들 → ... → 순서대로 쓰기
+- 단계 사이는 크기 제한 대기열 (앞 단계가 너무 앞서 나가지 않게)
+- 작업 중 예외는 StageError로 감싸 순서대로 쓰기 쪽에 전달 (쓰기 쪽에서 처리 결정)
+- 단계별 대기열 깊이와 처리량 기록, 주기적으로 보고
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Iterable, List, Optional
+
+# 단계 작업자 종료 신호
+DONE = object()
+
+
+class StageError:
+    """단계 작업 중 예외 (다음 단계는 건너뛰고 쓰기 쪽으로 전달)"""
+
+    def __init__(self, stage: str, error: BaseException):
+        self.stage = stage
+        self.error = error
+
+
+class Stage:
+    """파이프라인 단계 - fn(항목) → 다음 단계로 넘길 항목"""
+
+    def __init__(self, name: str, fn: Callable, workers: int = 1):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.processed = 0
+        self.busy = 0.0
+        self.max_depth = 0
+        self.inbox = None
+
+    def record(self, seconds: float):
+        with self.lock:
+            self.processed += 1
+            self.busy += seconds
+
+    def observe_depth(self):
+        depth = self.inbox.qsize()
+        with self.lock:
+            self.max_depth = max(self.max_depth, depth)
+
+    @property
+    def depth(self) -> int:
+        return self.inbox.qsize() if self.inbox else 0
+
+
+class Pipeline:
+    """단계별 파이프라인 실행기"""
+
+    def __init__(self, stages: List[Stage], queue_size: int = 8, report: Callable[[str], None] = None,
+                 report_interval: float = 10.0, poll: float = 0.1, status: Optional[Callable[[], str]] = None):
+        """
+        Args:
+            stages: 단계 목록 (순서대로)
+            queue_size: 단계 사이 대기열 최대 크기
+            report: 주기 보고 함수 (대기열 깊이, 완료 수)
+            report_interval: 주기 보고 간격 (초)
+            poll: 대기열 확인 간격 (초) - 중단 신호 확인용
+            status: 주기 보고에 덧붙일 상태 (현재 동시 요청 수 등)
+        """
+        self.stages = stages
+        self.queue_size = queue_size
+        self.report = report
+        self.report_interval = report_interval
+        self.poll = poll
+        self.status = status
+        self.stop = threading.Event()
+        self.written = 0
+        self.started = None
+        self.elapsed = 0.0
+
+    def put(self, target: queue.Queue, item) -> bool:
+        """대기열에 넣기 (중단되면 False)"""
+        while not self.stop.is_set():
+            try:
+                target.put(item, timeout=self.poll)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self, source: queue.Queue):
+        """대기열에서 꺼내기 (중단되면 DONE)"""
+        while not self.stop.is_set():
+            try:
+                return source.get(timeout=self.poll)
+            except queue.Empty:
+                continue
+        return DONE
+
+    def read(self, items: Iterable, first: Stage):
+        """읽기: (순번, 항목)을 첫 단계 대기열로"""
+        count = 0
+        try:
+            for item in items:
+                if not self.put(first.inbox, (count, item)):
+                    return
+                count += 1
+        except BaseException as e:
+            # 읽기 실패도 순서대로 쓰기 쪽에서 처리 (마지막 순번 다음으로)
+            self.put(first.inbox, (count, StageError('read', e)))
+        finally:
+            for _ in range(first.workers):
+                self.put(first.inbox, DONE)
+
+    def work(self, stage: Stage, outbox: queue.Queue, next_workers: int, finished: List[int]):
+        """단계 작업자"""
+        while True:
+            entry = self.get(stage.inbox)
+            if entry is DONE:
+                break
+            stage.observe_depth()
+            index, value = entry
+            if not isinstance(value, StageError):
+                started = time.perf_counter()
+                try:
+                    value = stage.fn(value)
+                except BaseException as e:
+                    value = StageError(stage.name, e)
+                stage.record(time.perf_counter() - started)
+            if not self.put(outbox, (index, value)):
+                return
+
+        # 이 단계의 마지막 작업자가 다음 단계 작업자 수만큼 종료 신호
+        with stage.lock:
+            finished[0] += 1
+            last = finished[0] == stage.workers
+        if last:
+            for _ in range(next_workers):
+                self.put(outbox, DONE)
+
+    def status_line(self) -> str:
+        depths = ' | '.join(f"{stage.name} {stage.depth}" for stage in self.stages)
+        status = f" | {self.status()}" if self.status else ""
+        return f"📊 대기열 {depths} | 완료 {self.written}개{status}"
+
+    def run(self, items: Iterable, sink: Callable[[int, object], None], idle: Optional[Callable[[], None]] = None):
+        """
+        실행 - sink(순번, 결과)를 순번 순서대로 호출 (호출한 스레드에서)
+
+        Args:
+            items: 입력 항목
+            sink: 순서대로 쓰기 (StageError도 그대로 전달, 예외를 내면 파이프라인 중단 후 다시 던짐)
+            idle: 쓸 결과가 없을 때 주기적으로 호출
+        """
+        for stage in self.stages:
+            stage.reset()
+            stage.inbox = queue.Queue(self.queue_size)
+        output = queue.Queue(self.queue_size)
+        self.stop.clear()
+        self.written = 0
+        self.started = time.perf_counter()
+
+        threads = [threading.Thread(target=self.read, args=(items, self.stages[0]), daemon=True)]
+        for position, stage in enumerate(self.stages):
+            is_last = position + 1 == len(self.stages)
+            outbox = output if is_last else self.stages[position + 1].inbox
+            next_workers = 1 if is_last else self.stages[position + 1].workers
+            finished = [0]
+            threads += [threading.Thread(target=self.work, args=(stage, outbox, next_workers, finished), daemon=True)
+                        for _ in range(stage.workers)]
+        for thread in threads:
+            thread.start()
+
+        pending = {}
+        next_index = 0
+        last_report = time.perf_counter()
+        try:
+            while True:
+                try:
+                    entry = output.get(timeout=self.poll)
+                except queue.Empty:
+                    entry = None
+                    if idle:
+                        idle()
+
+                if self.report and time.perf_counter() - last_report >= self.report_interval:
+                    self.report(self.status_line())
+                    last_report = time.perf_counter()
+
+                if entry is DONE:
+                    break
+                if entry is None:
+                    continue
+
+                index, value = entry
+                pending[index] = value
+                while next_index in pending:
+                    sink(next_index, pending.pop(next_index))
+                    next_index += 1
+                    self.written += 1
+
+            # 읽기 오류 등 순번이 비어 남은 결과
+            for index in sorted(pending):
+                sink(index, pending[index])
+                self.written += 1
+        finally:
+            self.stop.set()
+            for thread in threads:
+                thread.join(timeout=self.poll * 2)
+            self.elapsed = time.perf_counter() - self.started
+
+    def summary_lines(self) -> List[str]:
+        """단계별 처리량/대기열 깊이"""
+        lines = []
+        for stage in self.stages:
+            throughput = stage.processed / self.elapsed if self.elapsed else 0.0
+            lines.append(f"{stage.name}: {stage.processed}개 (작업자 {stage.workers}), 작업 {stage.busy:.1f}초, "
+                         f"처리량 {throughput:.2f}개/초, 대기열 최대 {stage.max_depth}")
+        return lines
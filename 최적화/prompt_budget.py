@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+토큰 예산 프롬프트 조립
+- 프롬프트를 우선순위가 있는 블록(규칙, 금칙어, 예시, 원고 ...)으로 나눠 조립
+- 로컬 토큰 추정(token_estimator)으로 예산을 넘으면 우선순위 낮은 블록부터 줄이거나 뺌
+- 필수 블록(priority=REQUIRED)은 줄이지 않음 (규칙, 원고, 출력 지시)
+- 블록 순서는 추가한 순서 그대로 (줄여도 프롬프트 모양 유지)
+"""
+
+from typing import List, Optional, Tuple
+
+from token_estimator import estimate_tokens
+
+# 줄이지 않는 블록
+REQUIRED = 0
+
+# 줄이는 방식: 'lines' = 뒤쪽 줄부터 잘라냄 (목록), 'drop' = 통째로 뺌 (예시 하나 등)
+SHRINK_MODES = ('lines', 'drop')
+
+
+class PromptBlock:
+    """프롬프트 블록"""
+
+    __slots__ = ('name', 'text', 'priority', 'shrink', 'tokens')
+
+    def __init__(self, name: str, text: str, priority: int = REQUIRED, shrink: str = 'drop'):
+        if shrink not in SHRINK_MODES:
+            raise ValueError(f"shrink는 {SHRINK_MODES} 중 하나여야 합니다: {shrink}")
+        self.name = name
+        self.text = text
+        self.priority = priority
+        self.shrink = shrink
+        self.tokens = estimate_tokens(text)
+
+    def fit(self, max_tokens: int):
+        """이 블록을 max_tokens 이하로 줄임 ('lines'는 앞쪽 줄부터 담고, 안 되면 비움)"""
+        if self.shrink == 'lines' and max_tokens > 0:
+            kept, used = [], 0
+            for line in self.text.split('\n'):
+                cost = estimate_tokens(line)
+                if used + cost > max_tokens:
+                    break
+                kept.append(line)
+                used += cost
+            self.text = '\n'.join(kept) + ('\n' if kept and self.text.endswith('\n') else '')
+        else:
+            self.text = ''
+        self.tokens = estimate_tokens(self.text)
+
+
+class AssembledPrompt:
+    """조립 결과 (text, 추정 토큰 수, 줄인 블록)"""
+
+    def __init__(self, text: str, tokens: int, budget: Optional[int], trimmed: List[Tuple[str, int, int]]):
+        self.text = text
+        self.tokens = tokens
+        self.budget = budget
+        self.trimmed = trimmed  # [(블록 이름, 원래 토큰, 줄인 뒤 토큰)]
+
+    def __str__(self):
+        return self.text
+
+    def describe(self) -> str:
+        """로그용 한 줄 (줄인 블록 포함)"""
+        budget = f" / 예산 {self.budget}" if self.budget else ""
+        text = f"약 {self.tokens}토큰{budget}"
+        if self.trimmed:
+            text += " (줄임: " + ", ".join(f"{name} {before}→{after}" for name, before, after in self.trimmed) + ")"
+        return text
+
+
+class PromptAssembler:
+    """우선순위 블록 → 예산 안의 프롬프트"""
+
+    def __init__(self, budget: Optional[int] = None):
+        """
+        Args:
+            budget: 입력 토큰 예산 (None이면 줄이지 않음)
+        """
+        self.budget = budget
+        self.blocks: List[PromptBlock] = []
+
+    def add(self, name: str, text: str, priority: int = REQUIRED, shrink: str = 'drop') -> 'PromptAssembler':
+        """
+        블록 추가
+
+        Args:
+            name: 로그에 표시할 이름
+            priority: REQUIRED(0)면 필수, 클수록 먼저 줄임
+            shrink: 'lines' (뒤쪽 줄부터) / 'drop' (통째로)
+        """
+        self.blocks.append(PromptBlock(name, text, priority, shrink))
+        return self
+
+    def build(self) -> AssembledPrompt:
+        """예산에 맞춰 조립 (필수 블록만으로 넘으면 필수 블록은 그대로 두고 나머지를 모두 뺌)"""
+        total = sum(block.tokens for block in self.blocks)
+        trimmed = []
+        if self.budget is not None and total > self.budget:
+            # 우선순위 낮은(숫자 큰) 블록부터, 같으면 뒤에 있는 블록부터
+            optional = [block for block in reversed(self.blocks) if block.priority != REQUIRED]
+            for block in sorted(optional, key=lambda block: -block.priority):
+                excess = total - self.budget
+                if excess <= 0:
+                    break
+                before = block.tokens
+                block.fit(before - excess)
+                total -= before - block.tokens
+                trimmed.append((block.name, before, block.tokens))
+
+        text = ''.join(block.text for block in self.blocks)
+        return AssembledPrompt(text, estimate_tokens(text), self.budget, trimmed)
+
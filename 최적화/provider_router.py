@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+AI 제공자 라우터 - 요청마다 최근 지연 시간/오류율이 가장 좋은 제공자로, 문제가 생기면 다른 제공자로
+- 제공자: model_clients의 클라이언트 (gemini, anthropic, fake/replay ...) - 같은 단계 이름으로 각자 모델 선택
+- 점수: 비슷한 길이 요청끼리 최근 응답 시간 중간값 ÷ 최근 성공률 (낮을수록 좋음)
+- 표본이 모자란 제공자는 먼저 써 봄, PROBE_SECONDS 동안 안 쓴 제공자도 한 번씩 다시 써 봄
+- 최근 오류율이 높거나 연달아 실패하면 DEGRADED_SECONDS 동안 뒤로 뺌 (다른 제공자가 모두 실패할 때만 사용)
+- 응답 전(스트리밍이면 첫 조각 전)에 실패하면 다음 제공자로 바로 다시 보냄
+- 한 제공자가 느려져도 일괄 처리 전체가 멈추지 않음
+
+사용: 환경변수 GEMINI_BACKEND=router:gemini,anthropic (model_clients.create_client)
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from adaptive_limit import size_class
+from deadlines import Cancelled, LatencyTracker, close_stream
+
+# 제공자를 뒤로 빼는 기준: 최근 WINDOW건 중 오류율 (표본 MIN_OUTCOMES건 이상) 또는 연속 실패 수
+WINDOW = 20
+MIN_OUTCOMES = 4
+ERROR_RATE_LIMIT = 0.5
+MAX_CONSECUTIVE_ERRORS = 3
+
+# 뒤로 뺀 제공자를 다시 앞에 세우기까지 (초)
+DEGRADED_SECONDS = 30.0
+
+# 이 시간(초) 동안 안 쓴 정상 제공자는 한 번 다시 써 봄 (지연 시간 갱신)
+PROBE_SECONDS = 60.0
+
+
+class ProviderState:
+    """제공자 하나의 최근 기록"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latency = {}                   # 요청 크기 구간 → LatencyTracker
+        self.outcomes = deque(maxlen=WINDOW)  # 최근 결과 (True = 성공)
+        self.consecutive_errors = 0
+        self.degraded_until = 0.0
+        self.last_used = None
+        self.calls = 0
+        self.errors = 0
+        self.failovers = 0                  # 이 제공자에서 실패해서 다른 제공자로 넘긴 횟수
+        self.seconds = 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def tracker(self, size: int) -> LatencyTracker:
+        return self.latency.setdefault(size, LatencyTracker(window=WINDOW, min_samples=3))
+
+
+class ProviderRouter:
+    """제공자 선택/기록 (스레드 안전)"""
+
+    def __init__(self, names: Sequence[str], log: Callable[[str], None] = print,
+                 degraded_seconds: float = DEGRADED_SECONDS, probe_seconds: float = PROBE_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            names: 제공자 이름 (앞쪽이 기본 우선)
+            log: 로그 함수 (제공자 전환/제외)
+            degraded_seconds: 오류가 잦은 제공자를 뒤로 빼는 시간 (초)
+            probe_seconds: 안 쓴 제공자를 다시 써 보는 간격 (초)
+            clock: 시간 함수 (테스트용)
+        """
+        if not names:
+            raise ValueError("제공자가 하나 이상 필요합니다.")
+        self.states = {name: ProviderState(name) for name in names}
+        self.log = log
+        self.degraded_seconds = degraded_seconds
+        self.probe_seconds = probe_seconds
+        self.clock = clock
+        self.lock = threading.Lock()
+
+    def score(self, state: ProviderState, size: int, now: float) -> tuple:
+        """정렬 기준 (작을수록 먼저): (뒤로 뺐는지, 써 볼 차례가 아닌지, 예상 시간)"""
+        degraded = state.degraded_until > now
+        median = state.tracker(size).percentile(0.5)
+        stale = state.last_used is None or now - state.last_used >= self.probe_seconds
+        explore = not degraded and (median is None or stale)
+        expected = (median or 0.0) / max(0.05, 1.0 - state.error_rate)
+        return degraded, not explore, expected
+
+    def rank(self, prompt) -> List[str]:
+        """이번 요청을 보낼 제공자 순서"""
+        size = size_class(prompt)
+        with self.lock:
+            now = self.clock()
+            order = list(self.states)
+            return sorted(order, key=lambda name: (self.score(self.states[name], size, now), order.index(name)))
+
+    def start(self, name: str):
+        """요청 시작 (써 보는 중인 제공자가 동시 요청마다 다시 뽑히지 않게)"""
+        with self.lock:
+            self.states[name].last_used = self.clock()
+
+    def record(self, name: str, seconds: float, prompt, error: Optional[BaseException] = None,
+               failover: bool = False):
+        """
+        결과 기록
+
+        Args:
+            seconds: 응답 시간 (성공했을 때 지연 시간으로)
+            error: 실패했으면 예외
+            failover: 실패 후 다른 제공자로 넘겼는지
+        """
+        message = None
+        with self.lock:
+            state = self.states[name]
+            state.calls += 1
+            state.seconds += seconds
+            state.outcomes.append(error is None)
+            if error is None:
+                state.tracker(size_class(prompt)).record(seconds)
+                state.consecutive_errors = 0
+                state.degraded_until = 0.0
+            else:
+                state.errors += 1
+                state.failovers += failover
+                state.consecutive_errors += 1
+                now = self.clock()
+                unhealthy = (state.consecutive_errors >= MAX_CONSECUTIVE_ERRORS or
+                             (len(state.outcomes) >= MIN_OUTCOMES and state.error_rate >= ERROR_RATE_LIMIT))
+                if unhealthy and state.degraded_until <= now:
+                    state.degraded_until = now + self.degraded_seconds
+                    message = (f"🔀 {name} 오류가 잦아 {self.degraded_seconds:.0f}초 동안 뒤로 뺌 "
+                               f"(최근 오류율 {state.error_rate:.0%}, 연속 {state.consecutive_errors}회)")
+        if message:
+            self.log(message)
+
+    def summary_lines(self) -> List[str]:
+        """제공자별 호출/오류/평균 시간"""
+        lines = []
+        with self.lock:
+            for state in self.states.values():
+                if not state.calls:
+                    continue
+                average = state.seconds / state.calls
+                lines.append(f"{state.name}: {state.calls}회 호출, 오류 {state.errors}회 "
+                             f"(다른 제공자로 {state.failovers}회), 평균 {average:.1f}초")
+        return lines
+
+
+class RoutedModel:
+    """제공자별 같은 단계 모델 묶음 (generate_content 호환) - 라우터가 고른 순서대로 시도"""
+
+    def __init__(self, name: str, router: ProviderRouter, models: Dict[str, object]):
+        self.name = name
+        self.router = router
+        self.models = models
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        ranked = self.router.rank(prompt)
+        for index, provider in enumerate(ranked):
+            last = index == len(ranked) - 1
+            self.router.start(provider)
+            started = time.perf_counter()
+            try:
+                response = self.models[provider].generate_content(prompt, stream=stream, **kwargs)
+                if not stream:
+                    self.router.record(provider, time.perf_counter() - started, prompt)
+                    return response
+                # 스트리밍: 첫 조각까지 받아야 이 제공자로 확정 (그 뒤 실패는 다시 보낼 수 없음)
+                chunks = iter(response) if hasattr(response, '__iter__') else iter([response])
+                first = next(chunks, None)
+            except Cancelled:
+                raise
+            except Exception as e:
+                self.router.record(provider, time.perf_counter() - started, prompt, error=e, failover=not last)
+                if last:
+                    raise
+                self.router.log(f"🔀 {provider} 오류 → {ranked[index + 1]}로 다시 보냄: {e}")
+                continue
+            return self.stream(provider, prompt, started, first, chunks)
+
+    def stream(self, provider: str, prompt, started: float, first, chunks):
+        """스트리밍 응답: 끝까지 받으면 지연 시간, 중간 오류면 오류로 기록 (검사기 중단/취소는 기록 안 함)"""
+        try:
+            if first is not None:
+                yield first
+            for chunk in chunks:
+                yield chunk
+        except GeneratorExit:
+            # 받는 쪽이 중간에 닫음 - 잘린 응답은 지연 시간으로 세지 않고 제공자 스트림도 닫음
+            close_stream(chunks)
+            raise
+        except Exception as e:
+            self.router.record(provider, time.perf_counter() - started, prompt, error=e)
+            raise
+        self.router.record(provider, time.perf_counter() - started, prompt)
+
+
+class RouterClient:
+    """제공자 클라이언트 묶음 (model_clients의 클라이언트와 같은 인터페이스)"""
+
+    name = 'router'
+
+    def __init__(self, providers: Sequence[Tuple[str, object]], log: Callable[[str], None] = print, **options):
+        """
+        Args:
+            providers: [(이름, 클라이언트)] - 앞쪽이 기본 우선
+            log: 로그 함수
+            **options: ProviderRouter 옵션 (degraded_seconds, probe_seconds, clock)
+        """
+        self.providers = list(providers)
+        self.router = ProviderRouter([name for name, _ in self.providers], log=log, **options)
+
+    def model(self, name: str) -> RoutedModel:
+        return RoutedModel(name, self.router, {provider: client.model(name) for provider, client in self.providers})
+
+    def list_models(self):
+        return [model for _, client in self.providers for model in client.list_models()]
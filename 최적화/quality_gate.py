@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+AI 단계 생략 판정 (규칙 검사)
+- 결정적 단계(금칙어 치환, 조사 교정 등)를 마친 원고가 규칙을 모두 지키면 AI 호출 생략
+- 검사 항목: 금칙어 잔여(점 표현 포함), 조사 오류, 어색한 치환 흔적, 키워드 횟수, 글자수
+- 판정 결과와 사유는 행마다 기록
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+from korean_particles import find_particle_errors
+
+# 판정 기준이 바뀌면 올림 (매니페스트 지문에 포함)
+GATE_VERSION = 1
+
+# AI 생략 판정 문자열
+SKIP_LABEL = 'AI 생략 (규칙 통과)'
+
+# 키워드 → "이거" 치환 후 남는 어색한 표현
+AWKWARD_PATTERNS = ['이거인', '이거 라는', '이거라는', '이런 거 라는']
+
+
+def dotted_variants(word: str) -> List[str]:
+    """점을 끼워 넣은 금칙어 변형 ("증상" → "증.상")"""
+    return [word[:i] + '.' + word[i:] for i in range(1, len(word))]
+
+
+def find_forbidden(text: str, forbidden_words: Iterable[str]) -> List[str]:
+    """원고에 남아 있는 금칙어 (점 표현 포함)"""
+    found = []
+    for word in forbidden_words:
+        if word in text or any(variant in text for variant in dotted_variants(word)):
+            found.append(word)
+    return found
+
+
+def find_awkward(text: str) -> List[str]:
+    """기계 치환 흔적"""
+    return [pattern for pattern in AWKWARD_PATTERNS if pattern in text]
+
+
+def count_standalone(text: str, keyword: str) -> int:
+    """띄어쓰기 단위 키워드 횟수 (조사가 붙은 "키워드를"은 세지 않음)"""
+    if not keyword:
+        return 0
+    return len(re.findall(r'(?<![가-힣])' + re.escape(keyword) + r'(?![가-힣])', text))
+
+
+def starts_with_keyword(sentence: str, keyword: str) -> bool:
+    """키워드로 시작하는 문장인지 (조사가 붙으면 제외)"""
+    sentence = sentence.strip()
+    if not keyword or not sentence.startswith(keyword):
+        return False
+    rest = sentence[len(keyword):]
+    return not rest or not re.match(r'[가-힣]', rest)
+
+
+def parse_count_rules(rule_text) -> Dict[str, int]:
+    """"키워드 : 숫자" 줄들 → {키워드: 횟수}"""
+    rules = {}
+    if not rule_text:
+        return rules
+    for line in str(rule_text).split('\n'):
+        match = re.match(r'(.+?)\s*:\s*(\d+)', line.strip())
+        if match:
+            rules[match.group(1).strip()] = int(match.group(2))
+    return rules
+
+
+def check_common(text: str, forbidden_words: Iterable[str], particle_words: Iterable[str]) -> List[str]:
+    """공통 검사 (금칙어, 조사 오류, 치환 흔적) → 실패 사유 목록"""
+    reasons = []
+
+    forbidden = find_forbidden(text, forbidden_words)
+    if forbidden:
+        reasons.append(f"금칙어 남음({', '.join(forbidden[:3])})")
+
+    particle_errors = find_particle_errors(text, particle_words)
+    if particle_errors:
+        reasons.append(f"조사 오류({', '.join(particle_errors[:3])})")
+
+    awkward = find_awkward(text)
+    if awkward:
+        reasons.append(f"어색한 표현({', '.join(awkward[:3])})")
+
+    return reasons
+
+
+def gate_decision(reasons: List[str]) -> Dict:
+    """사유 목록 → 판정 dict {'needs_ai': bool, 'reasons': [...]}"""
+    return {'needs_ai': bool(reasons), 'reasons': reasons}
+
+
+def format_decision(decision: Optional[Dict]) -> str:
+    """판정 기록용 문자열"""
+    if decision is None:
+        return ''
+    if not decision['needs_ai']:
+        return SKIP_LABEL
+    return 'AI 필요: ' + ', '.join(decision['reasons'])
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+세션 리소스 캐시 (금칙어 사전, 학습 예시)
+- 파일 경로별로 읽은 결과를 한 번만 보관 (실행 버튼을 여러 번 눌러도 다시 파싱하지 않음)
+- 변경 감지: 수정 시각/크기가 같으면 그대로, 다르면 내용 해시 비교 후 바뀐 경우에만 다시 읽기
+- 여러 파일은 동시에 읽기 (서로 독립인 엑셀 파일)
+- 보관하는 값은 읽기 전용 (MappingProxyType / tuple) - 여러 실행/워커가 같은 객체를 안전하게 공유
+- 경로마다 최신 값 하나만 보관 → 반복 실행해도 메모리 일정
+"""
+
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Callable, Dict, Sequence, Tuple
+
+import openpyxl
+
+# 동시에 읽을 최대 파일 수
+LOAD_WORKERS = 4
+
+
+def file_digest(path: str) -> str:
+    """파일 내용 해시"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CachedResource:
+    """캐시 항목 (파일 상태 + 읽은 값)"""
+
+    __slots__ = ('stamp', 'digest', 'value')
+
+    def __init__(self, stamp: Tuple[int, int], digest: str, value):
+        self.stamp = stamp
+        self.digest = digest
+        self.value = value
+
+
+class ResourceCache:
+    """파일 경로 → 읽은 값 (변경 시에만 다시 읽음, 스레드 안전)"""
+
+    def __init__(self):
+        self.entries: Dict[Tuple[str, Callable], CachedResource] = {}
+        self.lock = threading.Lock()
+        self.path_locks: Dict[Tuple[str, Callable], threading.Lock] = {}
+        self.loads = 0  # 실제로 파일을 읽은 횟수
+
+    def key_lock(self, key) -> threading.Lock:
+        with self.lock:
+            return self.path_locks.setdefault(key, threading.Lock())
+
+    def get(self, path: str, loader: Callable[[str], object]):
+        """
+        읽은 값 (없거나 바뀌었으면 loader(path)로 읽음)
+
+        Returns:
+            loader 결과 (같은 파일이면 같은 객체)
+        """
+        key = (os.path.abspath(path), loader)
+        with self.key_lock(key):
+            status = os.stat(path)
+            stamp = (status.st_mtime_ns, status.st_size)
+            entry = self.entries.get(key)
+            if entry and entry.stamp == stamp:
+                return entry.value
+
+            digest = file_digest(path)
+            if entry and entry.digest == digest:
+                entry.stamp = stamp  # 저장만 다시 한 파일 (내용 같음)
+                return entry.value
+
+            value = loader(path)
+            with self.lock:
+                self.entries[key] = CachedResource(stamp, digest, value)
+                self.loads += 1
+            return value
+
+    def load_many(self, requests: Sequence[Tuple[str, Callable[[str], object]]]) -> list:
+        """여러 파일 동시에 읽기 (결과는 요청 순서대로)"""
+        if len(requests) <= 1:
+            return [self.get(path, loader) for path, loader in requests]
+        with ThreadPoolExecutor(max_workers=min(LOAD_WORKERS, len(requests))) as executor:
+            return list(executor.map(lambda request: self.get(*request), requests))
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def read_forbidden_workbook(path: str) -> MappingProxyType:
+    """금칙어_리스트.xlsx → {금칙어: (대체어, ...)} (3행부터, B열 금칙어, C~I열 대체어)"""
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        words = {}
+        for row in wb.active.iter_rows(min_row=3, max_col=9, values_only=True):
+            row = tuple(row) + (None,) * (9 - len(row))
+            forbidden = row[1]
+            alternatives = tuple(str(alt).strip() for alt in row[2:9] if alt)
+            if forbidden and alternatives:
+                words[str(forbidden).strip()] = alternatives
+        return MappingProxyType(words)
+    finally:
+        wb.close()
+
+
+EXAMPLE_FIELDS = ('keyword', 'char_count', 'main_keyword_count', 'sub_keyword_count', 'extra_keyword_count',
+                  'original', 'edited')
+
+
+def read_examples_workbook(path: str) -> Tuple[MappingProxyType, ...]:
+    """수정전후.xlsx / 블로그_작업_엑셀템플릿.xlsx → 예시 목록 (2행부터, B~H열, 수정 전/후 모두 있는 행만)"""
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        examples = []
+        for row in wb.active.iter_rows(min_row=2, max_col=8, values_only=True):
+            row = tuple(row) + (None,) * (8 - len(row))
+            example = dict(zip(EXAMPLE_FIELDS, row[1:8]))
+            if example['original'] and example['edited']:
+                examples.append(MappingProxyType(example))
+        return tuple(examples)
+    finally:
+        wb.close()
+
+
+# 프로세스(GUI 세션) 전체에서 공유하는 캐시
+SESSION_CACHE = ResourceCache()
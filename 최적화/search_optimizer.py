@@ -3,21 +3,34 @@
 - 검색 노출 최적화
 - 키워드+조사 제거
 - 키워드 출현 2-3회로 감소
-- AI 재구성 (선택)
+- AI 재구성 (선택, 규칙을 모두 지키면 생략)
 """
 
 import re
 import random
 import os
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 from blog_optimizer import BlogOptimizer
+from hashing import DEFAULT_SEED, content_hash
+from manifest import RunManifest, version_fingerprint
+from model_tiers import TieredModel
+from quality_gate import GATE_VERSION, check_common, format_decision, gate_decision
 
 
 class SearchOptimizer(BlogOptimizer):
     """검색 노출 최적화 (키워드 띄어쓰기 + 키워드 감소)"""
 
-    def __init__(self, forbidden_words_file='금칙어 리스트.xlsx', use_ai=False, gemini_api_key=None):
+    # AI 생략 판정 기준 - 키워드 2-3회, 원본 대비 글자수 ±10%
+    KEYWORD_RANGE = (2, 3)
+    LENGTH_TOLERANCE = 0.1
+
+    # process_excel 결과 열 (입력 열 뒤에 추가)
+    OUTPUT_COLUMNS = ('최적화_원고', '키워드_출현', '변경사항', '추천_해시태그', 'AI_판정')
+
+    def __init__(self, forbidden_words_file='금칙어 리스트.xlsx', use_ai=False, gemini_api_key=None,
+                 seed=DEFAULT_SEED, ai_model=None, ai_gate=True, ai_output_mode='full',
+                 ai_parallel_groups=0, ai_model_tiers=None, ai_progress=None, ai_adaptive=False):
         """
         초기화
 
@@ -25,22 +38,46 @@ class SearchOptimizer(BlogOptimizer):
             forbidden_words_file: 금칙어 파일 경로
             use_ai: AI 재구성 사용 여부 (기본: False)
             gemini_api_key: Gemini API 키 (없으면 환경변수 GEMINI_API_KEY 사용)
+            seed: 실행 시드 (같은 시드 + 같은 입력 → 같은 결과)
+            ai_model: AI 재구성에 쓸 모델 (테스트용 가짜 모델 등)
+            ai_gate: True면 규칙을 모두 지키는 원고는 AI 재구성 생략
+            ai_output_mode: 'full' (원고 전체) 또는 'edits' (수정 목록, 출력 토큰 절감)
+            ai_parallel_groups: 2 이상이면 긴 원고를 문단 묶음으로 나눠 동시에 AI 재구성
+            ai_model_tiers: AI 모델 단계 (빠른 모델부터, 없으면 환경변수 GEMINI_MODEL_TIERS 또는 기본값)
+            ai_progress: AI 재구성 진행 상황 함수 (message) - 스트리밍으로 받은 글자수 실시간 전달
+            ai_adaptive: True면 AI 동시 요청 수 자동 조절
         """
-        super().__init__(forbidden_words_file)
+        super().__init__(forbidden_words_file, seed=seed)
         self.use_ai = use_ai
+        self.ai_gate = ai_gate
         self.ai_rewriter = None
 
         # AI 재구성 활성화
         if self.use_ai:
             try:
                 from ai_rewriter import AIRewriter
-                self.ai_rewriter = AIRewriter(api_key=gemini_api_key)
+                self.ai_rewriter = AIRewriter(api_key=gemini_api_key, model=ai_model, output_mode=ai_output_mode,
+                                             parallel_groups=ai_parallel_groups, model_tiers=ai_model_tiers,
+                                             progress=ai_progress, adaptive=ai_adaptive)
                 print("✅ AI 재구성 모드 활성화")
             except Exception as e:
                 print(f"⚠️ AI 재구성 초기화 실패: {e}")
                 print("   환경변수 GEMINI_API_KEY를 설정하거나 gemini_api_key 파라미터를 전달하세요.")
                 self.use_ai = False
 
+    def version_fingerprint(self) -> str:
+        """규칙 + AI 프롬프트/모델 버전 지문"""
+        ai_version = None
+        if self.use_ai and self.ai_rewriter:
+            ai_version = [
+                self.ai_rewriter.model_tiers,
+                self.ai_rewriter.output_mode,
+                self.ai_rewriter.parallel_groups,
+                self.ai_rewriter.create_prompt('', ''),
+                GATE_VERSION if self.ai_gate else None,
+            ]
+        return version_fingerprint(super().version_fingerprint(), ai_version)
+
     def remove_hashtag_title(self, text: str) -> str:
         """# 제목 삭제"""
         lines = text.split('\n')
@@ -48,7 +85,7 @@ class SearchOptimizer(BlogOptimizer):
             return '\n'.join(lines[1:]).strip()
         return text
 
-    def remove_keyword_particles(self, text: str, keyword: str) -> str:
+    def remove_keyword_particles(self, text: str, keyword: str, rng: Optional[random.Random] = None) -> str:
         """
         키워드+조사 제거 또는 수정
 
@@ -61,6 +98,7 @@ class SearchOptimizer(BlogOptimizer):
         if not keyword or pd.isna(keyword):
             return text
 
+        rng = rng or random
         modified = text
 
         # 1. 키워드+를/을 처리
@@ -80,7 +118,7 @@ class SearchOptimizer(BlogOptimizer):
                 f'{keyword} 먹으면 ',
                 f'{keyword} 사용하면 ',
             ]
-            return random.choice(choices)
+            return rng.choice(choices)
 
         modified = re.sub(pattern2, replace_subject, modified)
 
@@ -176,6 +214,30 @@ class SearchOptimizer(BlogOptimizer):
 
         return '\n'.join(lines)
 
+    def check_ai_gate(self, text: str, keyword: str, original_length: int) -> Dict:
+        """
+        AI 재구성 필요 여부 판정 (결정적 단계 이후 원고 기준)
+
+        Returns:
+            {'needs_ai': bool, 'reasons': [실패 사유]}
+        """
+        forbidden_dict = self.forbidden_loader.forbidden_dict
+        particle_words = {word for replacements in forbidden_dict.values() for word in replacements}
+        if keyword:
+            particle_words.add(keyword)
+        reasons = check_common(text, forbidden_dict, particle_words)
+
+        if keyword:
+            count = text.count(keyword)
+            low, high = self.KEYWORD_RANGE
+            if not low <= count <= high:
+                reasons.append(f"키워드 {count}회(목표 {low}-{high}회)")
+
+        if original_length and abs(len(text) - original_length) > original_length * self.LENGTH_TOLERANCE:
+            reasons.append(f"글자수 {original_length}→{len(text)}자")
+
+        return gate_decision(reasons)
+
     def optimize_for_search(self, text: str, keyword: str, brand: str = '') -> Dict:
         """
         검색 노출 최적화
@@ -197,40 +259,20 @@ class SearchOptimizer(BlogOptimizer):
                 'changes': []
             }
 
-        original_text = text
         original_length = len(text)
-        all_changes = []
-
-        # 1. # 제목 삭제
-        text = self.remove_hashtag_title(text)
-        all_changes.append('✅ # 제목 삭제')
-
-        # 2. 키워드+조사 제거
-        before_particle = text.count(keyword)
-        text = self.remove_keyword_particles(text, keyword)
-        after_particle = text.count(keyword)
-        all_changes.append(f'✅ 키워드+조사 제거 ({before_particle}회)')
-
-        # 3. 키워드 출현 감소 (2-3회 목표)
-        text = self.reduce_keyword_frequency(text, keyword, target_count=2)
-        final_count = text.count(keyword)
-        all_changes.append(f'✅ 키워드 출현 감소 → {final_count}회')
 
-        # 4. 금칙어 치환
-        text, forbidden_changes = self.replace_forbidden_words(text)
-        if forbidden_changes:
-            all_changes.append(f'✅ 금칙어 {len(forbidden_changes)}개 치환')
+        # 문서별 난수 생성기 (같은 입력 → 같은 결과)
+        rng = self.make_rng(text, keyword, brand)
 
-        # 5. AI 패턴 다양화
-        text, ai_changes = self.diversify_ai_patterns(text)
-        if ai_changes:
-            all_changes.append(f'✅ AI 표현 {len(ai_changes)}개 수정')
+        # 1~6. 규칙 기반 단계
+        text, all_changes, final_count = self.apply_search_rules(text, keyword, rng)
 
-        # 6. 자연스러운 변형
-        text = self.add_natural_variations(text)
+        # 7. AI 재구성 (선택, 규칙을 모두 지키면 생략)
+        gate = self.search_gate(text, keyword, original_length)
 
-        # 7. AI 재구성 (선택)
-        if self.use_ai and self.ai_rewriter:
+        if gate and not gate['needs_ai']:
+            all_changes.append('⏭️ 규칙 통과 - AI 재구성 생략')
+        elif gate:
             try:
                 print(f"  🤖 AI 재구성 중...")
                 ai_text = self.ai_rewriter.rewrite(text, keyword)
@@ -244,10 +286,10 @@ class SearchOptimizer(BlogOptimizer):
                 all_changes.append('⚠️ AI 재구성 실패 (원본 유지)')
 
         # 8. 해시태그 생성
-        hashtags = self.generate_hashtags(keyword, brand)
+        hashtags = self.generate_hashtags(keyword, brand, rng)
 
         # 9. 제목 생성
-        title = self.generate_title(keyword, text)
+        title = self.generate_title(keyword, text, rng)
 
         return {
             'optimized_text': text,
@@ -257,16 +299,117 @@ class SearchOptimizer(BlogOptimizer):
             'keyword_count': final_count,
             'changes': all_changes,
             'hashtags': hashtags,
-            'length_diff': len(text) - original_length
+            'length_diff': len(text) - original_length,
+            'ai_gate': format_decision(gate)
         }
 
-    def process_excel(self, input_file: str, output_file: str = None) -> str:
+    def apply_search_rules(self, text: str, keyword: str, rng: random.Random) -> Tuple[str, List[str], int]:
+        """
+        규칙 기반 단계 (# 제목 삭제 ~ 자연스러운 변형, AI 호출 없음)
+
+        Returns:
+            (원고, 변경 사항, 키워드 출현 수)
+        """
+        all_changes = []
+
+        # 1. # 제목 삭제
+        text = self.remove_hashtag_title(text)
+        all_changes.append('✅ # 제목 삭제')
+
+        # 2. 키워드+조사 제거
+        before_particle = text.count(keyword)
+        text = self.remove_keyword_particles(text, keyword, rng)
+        after_particle = text.count(keyword)
+        all_changes.append(f'✅ 키워드+조사 제거 ({before_particle}회)')
+
+        # 3. 키워드 출현 감소 (2-3회 목표)
+        text = self.reduce_keyword_frequency(text, keyword, target_count=2)
+        final_count = text.count(keyword)
+        all_changes.append(f'✅ 키워드 출현 감소 → {final_count}회')
+
+        # 4. 금칙어 치환
+        text, forbidden_changes = self.replace_forbidden_words(text, rng)
+        if forbidden_changes:
+            all_changes.append(f'✅ 금칙어 {len(forbidden_changes)}개 치환')
+
+        # 5. AI 패턴 다양화
+        text, ai_changes = self.diversify_ai_patterns(text, rng)
+        if ai_changes:
+            all_changes.append(f'✅ AI 표현 {len(ai_changes)}개 수정')
+
+        # 6. 자연스러운 변형
+        text = self.add_natural_variations(text, rng)
+
+        return text, all_changes, final_count
+
+    def search_gate(self, text: str, keyword: str, original_length: int) -> Optional[Dict]:
+        """AI 재구성 판정 (AI를 쓰지 않으면 None, 판정을 끄면 항상 AI)"""
+        if not (self.use_ai and self.ai_rewriter):
+            return None
+        if not self.ai_gate:
+            return gate_decision(['판정 사용 안 함'])
+        return self.check_ai_gate(text, keyword, original_length)
+
+    def extract_keyword(self, text: str) -> str:
+        """TXT 원고의 # 제목 줄에서 키워드 추출 (없으면 빈 문자열)"""
+        for line in text.split('\n'):
+            line = line.strip()
+            if line.startswith('#'):
+                line = line.lstrip('#').strip()
+                for suffix in ['관련해서', '에 대해', '관련', '사용', '후기', '정보']:
+                    if suffix in line:
+                        line = line.split(suffix)[0].strip()
+                        break
+                return line
+        return ''
+
+    def format_txt_report(self, keyword: str, result: Dict) -> str:
+        """TXT 결과 파일 내용 (최적화 정보 + 변경 사항 + 해시태그 + 원고)"""
+        lines = [
+            "=" * 80,
+            "블로그 원고 검색 최적화 결과",
+            "=" * 80,
+            "",
+            "📊 최적화 정보",
+            "-" * 80,
+            f"키워드: {keyword}",
+            f"글자수: {result['optimized_length']}자 ({result['length_diff']:+d}자)",
+            f"키워드 출현: {result['keyword_count']}회",
+            "",
+            "🔧 변경 사항",
+            "-" * 80,
+        ]
+        lines.extend(result['changes'])
+        lines += [
+            "",
+            "🏷️ 추천 해시태그",
+            "-" * 80,
+            ' '.join(['#' + tag for tag in result['hashtags'][:10]]),
+            "",
+        ]
+        if result.get('optimized_title'):
+            lines += ["📌 제목", "-" * 80, result['optimized_title'], ""]
+        lines += ["=" * 80, "📝 최적화된 원고", "=" * 80, "", result['optimized_text']]
+        return '\n'.join(lines)
+
+    def process_excel(self, input_file: str, output_file: str = None, incremental: bool = True) -> str:
         """
         엑셀 파일 일괄 처리
+
+        Args:
+            input_file: 입력 엑셀 파일
+            output_file: 결과 파일 (없으면 <입력>_검색최적화.xlsx)
+            incremental: 매니페스트 기준으로 바뀐 행만 재처리 (나머지는 이전 결과 파일에서 복사)
         """
         if output_file is None:
             output_file = input_file.replace('.xlsx', '_검색최적화.xlsx')
 
+        # 이전 결과 (입력과 지문이 같은 행은 여기서 복사)
+        manifest = RunManifest.for_output(output_file, self.version_fingerprint())
+        previous_df = None
+        if incremental and manifest.previous and os.path.exists(output_file):
+            previous_df = pd.read_excel(output_file)
+
         # 엑셀 읽기
         df = pd.read_excel(input_file)
 
@@ -279,6 +422,12 @@ class SearchOptimizer(BlogOptimizer):
             df['변경사항'] = ''
         if '추천_해시태그' not in df.columns:
             df['추천_해시태그'] = ''
+        if 'AI_판정' not in df.columns:
+            df['AI_판정'] = ''
+
+        processed = 0
+        deduplicated = 0
+        reused = 0
 
         # 각 행 처리
         for idx, row in df.iterrows():
@@ -289,15 +438,38 @@ class SearchOptimizer(BlogOptimizer):
             if pd.isna(text) or not text:
                 continue
 
-            # 최적화
-            result = self.optimize_for_search(text, keyword, brand)
+            row_key = content_hash('optimize_for_search', text, keyword, brand)
+            previous_row = manifest.previous_row(row_key)
+            manifest.record(idx, row_key)
+            processed += 1
+
+            # 변경 없는 행: 이전 결과 파일에서 복사
+            if previous_df is not None and previous_row in previous_df.index:
+                for column in self.OUTPUT_COLUMNS:
+                    if column in previous_df.columns:
+                        df.at[idx, column] = previous_df.at[previous_row, column]
+                reused += 1
+                continue
+
+            # 최적화 (같은 원고/키워드/브랜드는 기존 결과 재사용)
+            result = self.cached_result(row_key)
+            if result is not None:
+                deduplicated += 1
+            else:
+                result = self.optimize_for_search(text, keyword, brand)
+                self.store_result(row_key, result)
 
             # 결과 저장
             df.at[idx, '최적화_원고'] = result['optimized_text']
             df.at[idx, '키워드_출현'] = result['keyword_count']
             df.at[idx, '변경사항'] = '\n'.join(result['changes'])
             df.at[idx, '추천_해시태그'] = ' '.join(['#' + tag for tag in result['hashtags'][:10]])
+            df.at[idx, 'AI_판정'] = result.get('ai_gate', '')
 
         # 저장
         df.to_excel(output_file, index=False)
+        manifest.save()
+        if self.ai_rewriter and isinstance(self.ai_rewriter.model, TieredModel):
+            self.ai_rewriter.model.log_summary()
+        print(f"✅ {processed}개 원고 처리 (중복 {deduplicated}개는 기존 결과 재사용, 변경 없음 {reused}개는 이전 결과 유지)")
         return output_file
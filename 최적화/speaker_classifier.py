@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+화자 정보 로컬 판정 (성별, 연령대, 상황) - 자신 있는 원고는 AI 화자 분석 호출 생략
+- 글 앞 500자(AI 화자 분석과 같은 범위)의 단서: 성별 단서(남편/아내 ...), 나이 표현(50대, 마흔, 45살 ...),
+  연령대 단서(손주, 신혼, 취준 ...)
+- 키워드 분류(갱년기, 임신, 키 성장 ...)의 기본값 + 지난 결과(N열)에서 배운 키워드별 분포
+- 판정마다 신뢰도(0~1) - 기준 미만이면 AI 화자 분석 (그 답은 다시 학습)
+- 결과 형식은 AI 화자 분석과 같음 ("성별: 여성 / 연령대: 50대 / 상황: 갱년기 증상 고민")
+
+사용법 (지난 결과 파일로 학습 → 작업 폴더의 화자모델.json을 편집 엔진이 불러옴):
+    python speaker_classifier.py train 결과1.xlsx 결과2.xlsx --out 원고자동화3/화자모델.json
+    python speaker_classifier.py evaluate 결과.xlsx --model 원고자동화3/화자모델.json
+"""
+
+import argparse
+import json
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Optional
+
+import openpyxl
+
+from hashing import content_hash
+
+SPEAKER_MODEL_FILE = '화자모델.json'
+
+# 판정 규칙 버전 (단서/가중치를 바꾸면 올릴 것 → 결과 파일 재처리)
+SPEAKER_VERSION = 1
+
+# 이 신뢰도 이상이면 AI 화자 분석 생략
+DEFAULT_THRESHOLD = 0.7
+
+# AI 화자 분석과 같은 범위 (글 앞 500자)
+TEXT_CHARS = 500
+
+UNKNOWN = '알 수 없음'
+
+# 성별 단서 → 가중치
+GENDER_CUES = {
+    '여성': {'남편': 3, '신랑': 3, '시어머니': 3, '시댁': 3, '시부모': 3, '워킹맘': 3, '엄마로서': 3, '여자로서': 3,
+           '생리': 3, '폐경': 3, '임신': 2, '출산': 2, '산후': 2, '유방': 2, '브라': 2, '맘카페': 2, '언니들': 2,
+           '갱년기': 1, '가슴': 1, '화장': 1, '여성': 1},
+    '남성': {'아내': 3, '와이프': 3, '장인어른': 3, '처가': 3, '아빠로서': 3, '남자로서': 3, '전립선': 3,
+           '여자친구': 2, '군대': 2, '전역': 2, '면도': 2, '수염': 2, '형님들': 2, '남성': 1},
+}
+
+# 연령대 단서 → {연령대: 가중치}
+AGE_CUES = {
+    '손주': {'60대 이상': 3}, '손자': {'60대 이상': 3}, '손녀': {'60대 이상': 3}, '은퇴': {'60대 이상': 2},
+    '정년': {'60대 이상': 2}, '폐경': {'50대': 2}, '갱년기': {'50대': 2, '40대': 1}, '노안': {'50대': 1},
+    '중학생': {'40대': 2}, '고등학생': {'40대': 1}, '초등학생': {'40대': 1, '30대': 1}, '어린이집': {'30대': 2},
+    '유치원': {'30대': 2}, '신혼': {'30대': 2}, '임신': {'30대': 1}, '출산': {'30대': 1}, '육아': {'30대': 1},
+    '결혼 준비': {'30대': 1}, '취준': {'20대': 2}, '취업 준비': {'20대': 2}, '대학생': {'20대': 2}, '자취': {'20대': 1},
+}
+
+# 나이 표현 (본인 나이로 보고 20 미만은 무시 - 자녀 나이)
+AGE_NUMBER_RE = re.compile(r'(\d{2})\s*(대|살|세)')
+AGE_WORD_RE = re.compile(r'(스물|서른|마흔|쉰|예순|일흔)')
+AGE_WORDS = {'스물': '20대', '서른': '30대', '마흔': '40대', '쉰': '50대', '예순': '60대 이상', '일흔': '60대 이상'}
+AGE_EXPLICIT_WEIGHT = 4
+
+# 키워드 분류: (패턴, 성별, 연령대, 상황) - 키워드와 글에서 찾음, 기본값 가중치 CATEGORY_WEIGHT
+CATEGORIES = [
+    (re.compile(r'갱년기|폐경|홍조'), '여성', '50대', '갱년기 증상 고민'),
+    (re.compile(r'임신|난임|산후|출산'), '여성', '30대', '임신·출산 관련 고민'),
+    (re.compile(r'키 ?성장|성장판|성장 ?클리닉'), '여성', '30대', '자녀 키 성장 고민'),
+    (re.compile(r'가슴|유방'), '여성', None, '가슴 건강·성형 고민'),
+    (re.compile(r'전립선'), '남성', '50대', '전립선 건강 고민'),
+    (re.compile(r'모발이식|탈모|헤어라인'), None, None, '탈모·헤어라인 고민'),
+    (re.compile(r'다이어트|체중|살 ?빼'), None, None, '다이어트 고민'),
+]
+CATEGORY_WEIGHT = 2
+
+# 지난 결과에서 배운 분포의 최대 가중치 (키워드별 표본 LEARN_FULL개 이상이면 전부)
+LEARNED_WEIGHT = 3
+LEARN_FULL = 5
+
+# AI 화자 분석 답 (한 줄로 정리된 것 포함)
+SPEAKER_RE = re.compile(r'성별\s*:\s*([^/\n]+?)\s*(?:/|\n)\s*연령대\s*:\s*([^/\n]+?)\s*(?:/|\n)\s*상황\s*:\s*(.+)', re.S)
+
+
+def parse_speaker(info) -> Optional[tuple]:
+    """화자 정보 문자열 → (성별, 연령대, 상황) - 형식이 다르면 None"""
+    match = SPEAKER_RE.search(str(info or ''))
+    if not match:
+        return None
+    return tuple(part.strip() for part in match.groups())
+
+
+def confidence(scores: Dict[str, float]) -> float:
+    """1위와 2위 점수 차이 → 신뢰도 (차이 3이면 약 0.78, 단서 없으면 0)"""
+    ranked = sorted(scores.values(), reverse=True) + [0.0, 0.0]
+    return 1 - math.exp(-max(0.0, ranked[0] - ranked[1]) / 2)
+
+
+class SpeakerProfile:
+    """판정 결과"""
+
+    def __init__(self, gender: str, age: str, situation: str, scores: Dict[str, float]):
+        self.gender = gender
+        self.age = age
+        self.situation = situation
+        self.scores = scores  # 항목별 신뢰도 (성별, 연령대, 상황)
+        self.confidence = min(scores.values())
+
+    def format(self) -> str:
+        """AI 화자 분석과 같은 형식 (한 줄)"""
+        return f"성별: {self.gender} / 연령대: {self.age} / 상황: {self.situation}"
+
+    def __str__(self):
+        return self.format()
+
+
+class SpeakerClassifier:
+    """규칙 + 지난 결과 학습 기반 화자 판정 (스레드 안전)"""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        """
+        Args:
+            threshold: 이 신뢰도 이상이면 로컬 판정 사용 (미만이면 AI 화자 분석)
+        """
+        self.threshold = threshold
+        # 키워드 → 항목('gender' / 'age' / 'situation') → Counter
+        self.learned = defaultdict(lambda: defaultdict(Counter))
+        self.seen = set()  # 이미 학습한 (키워드, 글, 화자 정보) - 같은 결과를 두 번 세지 않게
+        self.lock = threading.Lock()
+
+    # ─────────────────────────────────────────────────────────
+    # 학습
+    # ─────────────────────────────────────────────────────────
+
+    def learn(self, keyword, text, speaker_info) -> bool:
+        """지난 결과 한 건 학습 (형식이 다르거나 이미 배운 건이면 False)"""
+        parsed = parse_speaker(speaker_info)
+        key = content_hash(keyword, str(text or '')[:TEXT_CHARS], speaker_info)
+        with self.lock:
+            if not parsed or not keyword or key in self.seen:
+                return False
+            self.seen.add(key)
+            stats = self.learned[str(keyword).strip()]
+            for field, value in zip(('gender', 'age', 'situation'), parsed):
+                if value and value != UNKNOWN:
+                    stats[field][value] += 1
+        return True
+
+    def learn_workbook(self, path: str, keyword_column: int = 2, text_columns=(13, 7), speaker_column: int = 14) -> int:
+        """
+        결과 엑셀의 N열 학습 (편집용 양식: B열 키워드, M열 수정 원고(없으면 G열 원고), N열 화자 정보)
+
+        Returns:
+            학습한 행 수
+        """
+        wb = openpyxl.load_workbook(path, read_only=True)
+        try:
+            learned = 0
+            for row in wb.active.iter_rows(min_row=2, values_only=True):
+                if len(row) < speaker_column:
+                    continue
+                text = next((row[column - 1] for column in text_columns if row[column - 1]), None)
+                learned += self.learn(row[keyword_column - 1], text, row[speaker_column - 1])
+            return learned
+        finally:
+            wb.close()
+
+    def save(self, path: str):
+        """학습 결과 저장 (JSON)"""
+        with self.lock:
+            data = {'version': SPEAKER_VERSION,
+                    'keywords': {keyword: {field: dict(counter) for field, counter in stats.items()}
+                                 for keyword, stats in self.learned.items()}}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+
+    def load(self, path: str) -> int:
+        """학습 결과 불러오기 (기존 학습에 더함) → 키워드 수"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        with self.lock:
+            for keyword, stats in data.get('keywords', {}).items():
+                for field, counts in stats.items():
+                    self.learned[keyword][field].update(counts)
+        return len(data.get('keywords', {}))
+
+    # ─────────────────────────────────────────────────────────
+    # 판정
+    # ─────────────────────────────────────────────────────────
+
+    def learned_stats(self, keyword) -> Dict[str, Counter]:
+        """키워드의 학습 결과 복사본 (다른 스레드의 learn()이 세는 도중에 읽지 않게)"""
+        with self.lock:
+            return {field: Counter(counter) for field, counter in self.learned.get(keyword, {}).items()}
+
+    @staticmethod
+    def learned_scores(counter: Counter) -> Dict[str, float]:
+        """지난 결과의 키워드별 분포 → 점수 (표본이 적으면 약하게)"""
+        if not counter:
+            return {}
+        total = sum(counter.values())
+        weight = LEARNED_WEIGHT * min(1.0, total / LEARN_FULL)
+        return {value: weight * count / total for value, count in counter.items()}
+
+    def classify(self, text, keyword=None) -> SpeakerProfile:
+        """화자 판정 (글 앞 500자 + 키워드)"""
+        text = str(text or '')[:TEXT_CHARS]
+        keyword = str(keyword or '').strip()
+        gender_scores, age_scores = Counter(), Counter()
+
+        for gender, cues in GENDER_CUES.items():
+            for cue, weight in cues.items():
+                gender_scores[gender] += weight * min(2, text.count(cue))
+        for cue, weights in AGE_CUES.items():
+            hits = min(2, text.count(cue))
+            for age, weight in weights.items():
+                age_scores[age] += weight * hits
+
+        # 나이 표현 (50대, 45살, 마흔)
+        for number, _ in AGE_NUMBER_RE.findall(text):
+            decade = int(number) // 10 * 10
+            if decade >= 20:
+                age_scores['60대 이상' if decade >= 60 else f'{decade}대'] += AGE_EXPLICIT_WEIGHT
+        for word in AGE_WORD_RE.findall(text):
+            age_scores[AGE_WORDS[word]] += AGE_EXPLICIT_WEIGHT
+
+        # 키워드 분류 기본값
+        situation, situation_confidence = None, 0.0
+        for pattern, gender, age, category_situation in CATEGORIES:
+            if pattern.search(keyword) or pattern.search(text):
+                if gender:
+                    gender_scores[gender] += CATEGORY_WEIGHT
+                if age:
+                    age_scores[age] += CATEGORY_WEIGHT
+                if situation is None:
+                    situation, situation_confidence = category_situation, 1.0
+                break
+
+        # 지난 결과 학습
+        learned = self.learned_stats(keyword)
+        for scores, field in ((gender_scores, 'gender'), (age_scores, 'age')):
+            for value, score in self.learned_scores(learned.get(field)).items():
+                scores[value] += score
+        learned_situations = learned.get('situation')
+        if learned_situations and sum(learned_situations.values()) >= 2:
+            situation, situation_confidence = learned_situations.most_common(1)[0][0], 1.0
+        if situation is None and keyword:
+            situation, situation_confidence = f"{keyword} 관련 고민", 0.8
+
+        return SpeakerProfile(
+            max(gender_scores, key=gender_scores.get) if any(gender_scores.values()) else UNKNOWN,
+            max(age_scores, key=age_scores.get) if any(age_scores.values()) else UNKNOWN,
+            situation or UNKNOWN,
+            {'성별': confidence(gender_scores), '연령대': confidence(age_scores), '상황': situation_confidence},
+        )
+
+    def confident(self, profile: SpeakerProfile) -> bool:
+        """로컬 판정을 쓸 만큼 자신 있는지"""
+        return profile.confidence >= self.threshold
+
+
+def main():
+    parser = argparse.ArgumentParser(description="화자 정보 로컬 판정 (지난 결과 N열로 학습/평가)")
+    parser.add_argument('command', choices=['train', 'evaluate'])
+    parser.add_argument('files', nargs='+', help="결과 엑셀 (B열 키워드, M열 수정 원고, N열 화자 정보)")
+    parser.add_argument('--out', default=SPEAKER_MODEL_FILE, help="학습 결과 파일 (train)")
+    parser.add_argument('--model', help="학습 결과 파일 (evaluate)")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="로컬 판정 신뢰도 기준")
+    args = parser.parse_args()
+
+    classifier = SpeakerClassifier(args.threshold)
+    if args.command == 'train':
+        learned = sum(classifier.learn_workbook(path) for path in args.files)
+        classifier.save(args.out)
+        print(f"✅ {learned}행 학습 (키워드 {len(classifier.learned)}개) → {args.out}")
+        return
+
+    # 평가: 로컬 판정을 쓸 행 비율과 그 행들의 AI 답과 일치율
+    if args.model:
+        classifier.load(args.model)
+    total = local = agree = 0
+    for path in args.files:
+        wb = openpyxl.load_workbook(path, read_only=True)
+        for row in wb.active.iter_rows(min_row=2, values_only=True):
+            parsed = parse_speaker(row[13]) if len(row) >= 14 else None
+            if not parsed:
+                continue
+            total += 1
+            profile = classifier.classify(row[12] or row[6], row[1])
+            if classifier.confident(profile):
+                local += 1
+                agree += (profile.gender, profile.age) == parsed[:2]
+        wb.close()
+    if total:
+        print(f"📊 {total}행 중 로컬 판정 {local}행 ({local / total:.0%}), "
+              f"성별/연령대 일치 {agree}/{local}행" + (f" ({agree / local:.0%})" if local else ""))
+    else:
+        print("⚠️ 화자 정보(N열)가 있는 행이 없습니다")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+스트리밍 생성 + 조기 중단
+- 응답을 조각(chunk) 단위로 받으면서 금칙어(오토마타), 마크다운/설명 문구, 글자수 폭주를 바로 검사
+- 잘못 가고 있는 응답은 끝까지 기다리지 않고 중단 → 재시도 (마지막 시도는 끝까지 받음)
+- 받은 글자수를 진행 상황 콜백으로 전달 (GUI 행별 실시간 진행)
+- 원고 JSON 스키마 호출은 JSON 원문이 아니라 풀어낸 원고 값만 검사/집계 (메모, 키, 이스케이프 제외)
+"""
+
+import copy
+import re
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional
+
+from deadlines import RunControl, close_stream
+from quality_gate import dotted_variants
+from structured_output import ManuscriptStream, wants_manuscript
+
+# 받자마자 잘못된 응답으로 보는 형식 (원고 JSON이면 원고 값 안에서)
+JUNK_PATTERNS = [
+    (re.compile(r'```'), '코드 블록'),
+    (re.compile(r'^#{1,6}\s', re.MULTILINE), '마크다운 제목'),
+    (re.compile(r'^\s*(다음은|아래는|수정된 원고|수정한 원고)'), '설명 문구'),
+]
+
+
+class StreamAborted(RuntimeError):
+    """스트리밍 도중 규칙 위반으로 생성 중단"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class StreamedResponse:
+    """스트리밍으로 모은 응답 (generate_content 응답처럼 .text 제공)"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class ForbiddenAutomaton:
+    """
+    금칙어 오토마타 (Aho-Corasick) - 조각이 나눠 들어와도 상태를 이어서 검사
+    - 점 표현("증.상")도 원래 금칙어로 찾음
+    """
+
+    def __init__(self, words: Iterable[str], dotted: bool = True):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[str]] = [[]]
+
+        for word in words:
+            if not word:
+                continue
+            self.add(word, word)
+            if dotted:
+                for variant in dotted_variants(word):
+                    self.add(variant, word)
+        self.build()
+        self.reset()
+
+    def add(self, pattern: str, word: str):
+        state = 0
+        for char in pattern:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        if word not in self.output[state]:
+            self.output[state].append(word)
+
+    def build(self):
+        """실패 링크 (너비 우선)"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] += [word for word in self.output[self.fail[next_state]]
+                                            if word not in self.output[next_state]]
+
+    def reset(self):
+        self.state = 0
+
+    def feed(self, chunk: str) -> List[str]:
+        """조각 검사 → 이번 조각에서 끝난 금칙어 (앞 조각에서 시작한 것 포함)"""
+        found = []
+        state = self.state
+        for char in chunk:
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            found.extend(self.output[state])
+        self.state = state
+        return found
+
+    def find_all(self, text: str) -> List[str]:
+        """텍스트 전체에서 금칙어 (상태 초기화 후, 중복 제거)"""
+        self.reset()
+        return list(dict.fromkeys(self.feed(text)))
+
+
+class StreamGuard:
+    """스트리밍 응답 검사기 - 위반하면 StreamAborted"""
+
+    def __init__(self, forbidden_words: Iterable[str] = (), max_chars: int = 0, max_forbidden: int = 0,
+                 check_junk: bool = True):
+        """
+        Args:
+            forbidden_words: 나오면 안 되는 단어 (로컬에서 고칠 수 없는 것만)
+            max_chars: 받은 글자수가 이보다 많으면 중단 (0이면 검사 안 함)
+            max_forbidden: 금칙어가 이 횟수를 넘으면 중단
+            check_junk: 마크다운/설명 문구 검사
+        """
+        self.automaton = ForbiddenAutomaton(forbidden_words) if forbidden_words else None
+        self.max_chars = max_chars
+        self.max_forbidden = max_forbidden
+        self.check_junk = check_junk
+        self.reset()
+
+    def fresh(self) -> 'StreamGuard':
+        """같은 규칙의 새 검사기 (동시 요청마다 따로 - 오토마타 표는 공유)"""
+        guard = copy.copy(self)
+        if self.automaton:
+            guard.automaton = copy.copy(self.automaton)
+        guard.reset()
+        return guard
+
+    def reset(self):
+        """새 시도 시작"""
+        self.text = ''
+        self.forbidden = []
+        if self.automaton:
+            self.automaton.reset()
+
+    def feed(self, chunk: str):
+        self.text += chunk
+
+        if self.automaton:
+            self.forbidden += self.automaton.feed(chunk)
+            if len(self.forbidden) > self.max_forbidden:
+                raise StreamAborted(f"금칙어({', '.join(dict.fromkeys(self.forbidden))})")
+
+        if self.max_chars and len(self.text) > self.max_chars:
+            raise StreamAborted(f"글자수 초과({len(self.text)}자 > {self.max_chars}자)")
+
+        if self.check_junk:
+            for pattern, label in JUNK_PATTERNS:
+                if pattern.search(self.text):
+                    raise StreamAborted(label)
+
+
+class ProgressTracker:
+    """행별 진행 상황 (문단 병렬이면 부분별 글자수 합계)"""
+
+    def __init__(self, report: Callable[[str], None], label: str, target: int = 0,
+                 status: Optional[Callable[[], str]] = None):
+        """
+        Args:
+            report: 진행 상황 함수 (message)
+            label: 표시할 이름 ("3/10번째 원고")
+            target: 목표 글자수
+            status: 덧붙일 상태 (현재 동시 요청 수 등)
+        """
+        self.report = report
+        self.label = label
+        self.target = target
+        self.status = status
+        self.parts = {}
+        self.lock = threading.Lock()
+
+    def callback(self, part: int = 0) -> Callable[[int], None]:
+        """stream_generate에 넘길 콜백 (받은 글자수)"""
+        def on_progress(chars):
+            with self.lock:
+                self.parts[part] = chars
+                total = sum(self.parts.values())
+            target = f" / 목표 {self.target}자" if self.target else ''
+            status = f" ({self.status()})" if self.status else ''
+            self.report(f"✍️ {self.label} 생성 중... {total}자{target}{status}")
+        return on_progress
+
+
+def chunk_text(chunk) -> str:
+    """조각 텍스트 (안전 필터 등으로 텍스트가 없는 조각은 빈 문자열)"""
+    try:
+        return chunk.text or ''
+    except ValueError:
+        return ''
+
+
+def stream_generate(model, prompt, guard: Optional[StreamGuard] = None,
+                    on_progress: Optional[Callable[[int], None]] = None, retries: int = 1,
+                    abort_last: bool = False, log: Callable[[str], None] = print,
+                    control: Optional[RunControl] = None, **kwargs) -> StreamedResponse:
+    """
+    스트리밍 호출 + 조기 중단/재시도
+
+    Args:
+        model: generate_content(prompt, stream=True)를 제공하는 모델
+        guard: 응답 검사기 (없으면 진행 상황만)
+        on_progress: 받은 글자수 콜백 (원고 JSON이면 원고 글자수)
+        retries: 중단 후 재시도 횟수
+        abort_last: True면 마지막 시도도 위반 시 중단 (StreamAborted) - 상위 모델이 있을 때
+        control: 취소 상태 (취소되면 다음 조각에서 멈추고 Cancelled)
+        **kwargs: generate_content에 그대로 전달
+
+    Raises:
+        StreamAborted: abort_last이고 마지막 시도까지 중단됐을 때
+    """
+    structured = wants_manuscript(kwargs.get('generation_config'))
+    for attempt in range(retries + 1):
+        last = attempt == retries
+        text = ''
+        received = 0  # 검사한 글자수 (원고 JSON이면 원고 값만)
+        manuscript = ManuscriptStream() if structured else None
+        if guard:
+            guard.reset()
+
+        try:
+            response = model.generate_content(prompt, stream=True, **kwargs)
+            # 스트리밍을 지원하지 않는 모델은 응답 하나를 조각 하나로
+            chunks = response if hasattr(response, '__iter__') else [response]
+            try:
+                for chunk in chunks:
+                    if control:
+                        control.check()
+                    piece = chunk_text(chunk)
+                    text += piece
+                    if manuscript:
+                        piece = manuscript.feed(piece)
+                    received += len(piece)
+                    if guard and (abort_last or not last):
+                        guard.feed(piece)
+                    if on_progress:
+                        on_progress(received)
+            finally:
+                # 중단/취소로 빠져나와도 바로 닫음 (가비지 수집까지 키 자리를 잡고 있지 않게)
+                close_stream(chunks)
+        except StreamAborted as e:
+            if last:
+                raise
+            log(f"✋ 생성 중단 ({e.reason}, {received}자에서) → 재시도")
+            continue
+
+        return StreamedResponse(text)
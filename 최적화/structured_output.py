@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+구조화 출력 (원고 JSON)
+- 원고를 돌려받는 AI 호출(원고 수정, 문단 묶음 수정, AI 재구성)은 JSON 스키마 응답을 요청
+  {"manuscript": "원고 전체", "notes": "전할 말 (선택)"}
+- 응답은 로컬에서 스키마 검증 (JSON이 아니거나, 원고가 비었거나, 모르는 항목이 있으면 OutputFormatError)
+- 앞뒤 설명/마크다운이 원고 열에 섞이지 않음 (예전 정규식 마크다운 정리 대신)
+- 형식 오류면 한 번 자동 재시도 (model_tiers.generate_manuscript)
+- 스트리밍 중에는 원고 값만 풀어서 검사기에 넘김 (ManuscriptStream - 메모/JSON 키는 검사하지 않음)
+"""
+
+import json
+import re
+from typing import Tuple
+
+# Gemini 구조화 출력 스키마
+MANUSCRIPT_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'manuscript': {'type': 'string'},
+        'notes': {'type': 'string'},
+    },
+    'required': ['manuscript'],
+}
+
+# generate_content(generation_config=...) - 딕셔너리로 넘기면 Gemini SDK가 변환
+MANUSCRIPT_CONFIG = {
+    'response_mime_type': 'application/json',
+    'response_schema': MANUSCRIPT_SCHEMA,
+}
+
+# 형식 오류 시 자동 재시도 횟수
+FORMAT_RETRIES = 1
+
+# 프롬프트 출력 지시 (스키마는 generation_config로도 강제)
+OUTPUT_INSTRUCTION = ("JSON으로만 답하세요. 수정된 원고 전체는 \"manuscript\"에 설명 없이 넣고, "
+                      "전할 말이 있으면 \"notes\"에 쓰세요.")
+
+
+class OutputFormatError(ValueError):
+    """AI 응답이 원고 JSON 스키마에 맞지 않음"""
+
+
+def parse_manuscript(response_text) -> Tuple[str, str]:
+    """
+    AI 응답(JSON) → (원고, 메모)
+
+    Raises:
+        OutputFormatError: JSON 아님, 객체 아님, 원고 없음, 모르는 항목, 문자열이 아닌 값
+    """
+    try:
+        data = json.loads(response_text)
+    except (TypeError, json.JSONDecodeError) as e:
+        raise OutputFormatError(f"JSON 아님: {e}")
+
+    if not isinstance(data, dict):
+        raise OutputFormatError("JSON 객체가 아님")
+    unknown = set(data) - set(MANUSCRIPT_SCHEMA['properties'])
+    if unknown:
+        raise OutputFormatError(f"모르는 항목: {', '.join(sorted(unknown))}")
+
+    manuscript, notes = data.get('manuscript'), data.get('notes') or ''
+    if not isinstance(manuscript, str) or not manuscript.strip():
+        raise OutputFormatError("원고(manuscript) 없음")
+    if not isinstance(notes, str):
+        raise OutputFormatError("메모(notes)가 문자열이 아님")
+    return manuscript.strip(), notes.strip()
+
+
+class ManuscriptStream:
+    """
+    스트리밍 JSON 응답에서 원고("manuscript") 문자열 값만 풀어서 꺼냄
+    - 조각 경계에 걸친 이스케이프(\\n, \\uXXXX)는 다음 조각까지 보류
+    - 원고 값이 끝나면 나머지(메모 등)는 버림
+    """
+
+    START_RE = re.compile(r'"manuscript"\s*:\s*"')
+    ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+    def __init__(self):
+        self.pending = ''  # 아직 풀지 않은 원문
+        self.started = False
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        """받은 조각 → 이번에 풀린 원고 글자"""
+        if self.done:
+            return ''
+        self.pending += chunk
+        if not self.started:
+            match = self.START_RE.search(self.pending)
+            if not match:
+                return ''
+            self.started = True
+            self.pending = self.pending[match.end():]
+
+        decoded = []
+        text, i = self.pending, 0
+        while i < len(text):
+            char = text[i]
+            if char == '"':
+                self.done = True
+                self.pending = ''
+                return ''.join(decoded)
+            if char != '\\':
+                decoded.append(char)
+                i += 1
+                continue
+            if i + 1 >= len(text):
+                break  # 이스케이프가 다음 조각에서 끝남
+            code = text[i + 1]
+            if code == 'u':
+                # 이모지 등 서로게이트 쌍(😀)은 두 이스케이프를 합쳐서 한 글자
+                end = i + 12 if text[i + 2:i + 3].upper() == 'D' and text[i + 3:i + 4].upper() in '89AB' else i + 6
+                if end > len(text):
+                    break
+                try:
+                    decoded.append(json.loads(f'"{text[i:end]}"'))
+                except json.JSONDecodeError:
+                    decoded.append(text[i + 2:end])
+                i = end
+            else:
+                decoded.append(self.ESCAPES.get(code, code))
+                i += 2
+        self.pending = text[i:]
+        return ''.join(decoded)
+
+
+def manuscript_json(manuscript: str, notes: str = '') -> str:
+    """원고 → 스키마에 맞는 JSON (가짜 백엔드/테스트용)"""
+    data = {'manuscript': manuscript}
+    if notes:
+        data['notes'] = notes
+    return json.dumps(data, ensure_ascii=False)
+
+
+def config_value(generation_config, key: str):
+    """generation_config 항목 (딕셔너리 또는 GenerationConfig, 없으면 None)"""
+    if isinstance(generation_config, dict):
+        return generation_config.get(key)
+    return getattr(generation_config, key, None)
+
+
+def wants_manuscript(generation_config) -> bool:
+    """원고 JSON 스키마를 요청한 호출인지"""
+    schema = config_value(generation_config, 'response_schema')
+    return isinstance(schema, dict) and 'manuscript' in schema.get('properties', {})
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""동시 요청 자동 조절 테스트 - 정상이면 +1, 429/시간 초과/지연 급증이면 절반"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from google.api_core import exceptions as api_exceptions
+
+from adaptive_limit import AdaptiveLimiter
+from editor_engine import EditorEngine
+from key_pool import KeyPool
+from model_clients import FakeClient
+from model_tiers import TieredModel
+from structured_output import manuscript_json
+from test_incremental import make_editor_workbook, texts
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_additive_increase_multiplicative_decrease():
+    clock = Clock()
+    limiter = AdaptiveLimiter(maximum=8, initial=2, log=lambda message: None, clock=clock)
+
+    # 한도만큼 꽉 찬 상태로 성공 → 한도만큼 성공할 때마다 +1 (2+3+4+5 = 14번이면 6)
+    running = [limiter.acquire() for _ in range(limiter.current)]
+    for _ in range(14):
+        limiter.release(running.pop(0), 'ok', 1.0)
+        while limiter.in_flight < limiter.current:
+            running.append(limiter.acquire())
+    assert limiter.current == 6 and limiter.increases == 4
+    for started in running:
+        limiter.release(started, 'error')
+
+    # 429 → 절반, 줄이기 전에 시작한 요청의 429는 다시 줄이지 않음
+    clock.now = 10
+    early = limiter.acquire()
+    late = limiter.acquire()
+    clock.now = 11
+    limiter.release(late, 'rate_limited')
+    limiter.release(early, 'rate_limited')
+    assert limiter.current == 3 and limiter.decreases['rate_limited'] == 1
+
+    # 시간 초과 → 다시 절반, 최소 1
+    clock.now = 20
+    for _ in range(3):
+        started = limiter.acquire()
+        clock.now += 1
+        limiter.release(started, 'timeout')
+    assert limiter.current == 1
+    print(f"✅ AIMD: {limiter.summary()}")
+
+
+def test_latency_spike_backs_off():
+    limiter = AdaptiveLimiter(maximum=4, initial=4, log=lambda message: None)
+    for _ in range(6):
+        limiter.release(limiter.acquire(), 'ok', 1.0)
+    limiter.release(limiter.acquire(), 'ok', 1.2, size=1)   # 다른 크기 구간은 비교하지 않음
+    assert limiter.current == 4
+    limiter.release(limiter.acquire(), 'ok', 5.0)
+    assert limiter.current == 2 and limiter.decreases['latency'] == 1
+    print("✅ 지연 급증(같은 크기 요청 중간값의 2.5배 이상) → 절반")
+
+
+class QuotaModel:
+    """동시 3개를 넘으면 429 (실제 한도 흉내)"""
+
+    def __init__(self, quota=3):
+        self.quota = quota
+        self.active = 0
+        self.peak = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def generate_content(self, prompt, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            over = self.active > self.quota
+            self.rejected += over
+        try:
+            if over:
+                raise api_exceptions.ResourceExhausted('429 quota')
+            time.sleep(0.01)
+            return SimpleNamespace(text=manuscript_json('응답') if kwargs.get('generation_config') else '응답')
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_tracks_real_quota():
+    model = QuotaModel()
+    limiter = AdaptiveLimiter(maximum=8, initial=2, log=lambda message: None)
+    tiered = TieredModel([('fast', model)], log=lambda message: None, limiter=limiter)
+    done = []
+
+    def worker():
+        for _ in range(15):
+            while True:
+                try:
+                    tiered.generate_content('요청')
+                    break
+                except api_exceptions.ResourceExhausted:
+                    time.sleep(0.005)
+        done.append(True)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 한도(3) 근처에서 오르내림 - 8개가 한꺼번에 몰리지 않음
+    assert len(done) == 8
+    assert limiter.decreases['rate_limited'] >= 1 and model.peak <= 4
+    assert model.rejected < 120 * 0.2
+    print(f"✅ 실제 한도 추종: 최대 동시 {model.peak}, 429 {model.rejected}회 / 120건, {limiter.summary()}")
+
+
+def test_key_pool_rate_limits_reach_limiter():
+    limiter = AdaptiveLimiter(maximum=8, initial=8, log=lambda message: None)
+    pool = KeyPool(['key-aaaa', 'key-bbbb'], log=lambda message: None)
+    pool.listeners.append(limiter.penalize)
+    pool.release(pool.acquire(), 0.1, error=api_exceptions.ResourceExhausted('429'))
+    pool.release(pool.acquire(), 0.1, error=api_exceptions.ResourceExhausted('429'))  # 바로 다음 429는 무시
+    assert limiter.current == 4 and limiter.decreases['rate_limited'] == 1
+    print("✅ 키 풀에서 다른 키로 넘긴 429도 동시 요청 수에 반영")
+
+
+def test_limit_shown_in_progress():
+    import os
+    import tempfile
+
+    input_file = os.path.join(tempfile.mkdtemp(), '자동조절.xlsx')
+    make_editor_workbook(input_file, texts)
+    messages = []
+
+    def reply(prompt):
+        if '화자' in prompt:
+            return "성별: 여성\n연령대: 50대\n상황: 갱년기 고민"
+        return "다시 쓴 원고예요. 두 번째 문장."
+
+    engine = EditorEngine(log=lambda message, color=None: messages.append(message), progress=messages.append,
+                          concurrency=4, adaptive=True)
+    model = engine.create_model(None, client=FakeClient(reply=reply))
+    engine.process_workbook(input_file, model)
+    progress = [message for message in messages if message.startswith('✍️')]
+    assert progress and all('동시 ' in message and '/4' in message for message in progress)
+    assert any(message.startswith('🚦 동시 요청 자동 조절') for message in messages)
+    print(f"✅ 진행 상황에 현재 한도 표시: {progress[-1]}")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("동시 요청 자동 조절 테스트")
+    print("=" * 80)
+    test_additive_increase_multiplicative_decrease()
+    test_latency_spike_backs_off()
+    test_tracks_real_quota()
+    test_key_pool_rate_limits_reach_limiter()
+    test_limit_shown_in_progress()
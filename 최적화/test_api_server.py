@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""HTTP 서버 테스트 - 가짜 Gemini 모델, 로컬 포트에서 실행"""
+
+import json
+import socket
+import threading
+import time
+from types import SimpleNamespace
+
+import requests
+import uvicorn
+
+from api_server import create_app
+from structured_output import manuscript_json
+
+text = """갱년기홍조를 최근에 알게 되었는데, 효과가 있는지 궁금합니다.
+병원에서 상담 받았는데 부작용이 걱정돼요."""
+
+
+class FakeGeminiModel:
+    """가짜 Gemini 모델 (네트워크 없이 고정 응답)"""
+
+    def generate_content(self, prompt, generation_config=None):
+        return SimpleNamespace(text=manuscript_json("AI 재구성 결과입니다. " * 10))
+
+
+def fake_model_factory():
+    return FakeGeminiModel()
+
+
+def start_server(**kwargs):
+    """빈 포트에서 서버 시작 → (base_url, server)"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    app = create_app(workers=2, use_processes=False, **kwargs)
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    threading.Thread(target=server.run, daemon=True).start()
+
+    base_url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            if requests.get(base_url + '/health').json()['status'] == 'ok':
+                return base_url, server
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError("서버 시작 실패")
+
+
+def test_optimize_endpoints():
+    base_url, server = start_server()
+    try:
+        single = requests.post(base_url + '/optimize', json={'text': text, 'keyword': '갱년기홍조'}).json()
+        assert '효과' not in single['optimized_text']
+        assert single['keyword_count'] >= 1
+
+        items = [{'text': text + f" {i}번째", 'keyword': '갱년기홍조'} for i in range(5)]
+        batch = requests.post(base_url + '/optimize/batch', json={'items': items}).json()['results']
+        assert len(batch) == 5
+
+        with requests.post(base_url + '/optimize/batch?stream=true', json={'items': items}, stream=True) as response:
+            assert response.headers['content-type'].startswith('application/x-ndjson')
+            lines = [json.loads(line) for line in response.iter_lines() if line]
+        assert sorted(line['index'] for line in lines) == list(range(5))
+        assert {line['index']: line['result'] for line in lines}[3] == batch[3]
+
+        assert requests.post(base_url + '/rewrite', json={'text': text}).status_code == 503
+
+        health = requests.get(base_url + '/health').json()
+        assert health['metrics']['endpoints']['optimize']['count'] == 1
+        assert health['metrics']['endpoints']['optimize/batch']['count'] == 10
+        assert health['metrics']['in_flight'] == 0
+    finally:
+        server.should_exit = True
+    print("✅ /optimize, /optimize/batch (JSON, NDJSON), /health")
+
+
+def test_rewrite_endpoint():
+    base_url, server = start_server(use_ai=True, model_factory=fake_model_factory)
+    try:
+        result = requests.post(base_url + '/rewrite', json={'text': text, 'keyword': '갱년기홍조'}).json()
+        assert result['rewritten_text'].startswith('AI 재구성 결과')
+    finally:
+        server.should_exit = True
+    print("✅ /rewrite (가짜 모델)")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("HTTP 서버 테스트")
+    print("=" * 80)
+    test_optimize_endpoints()
+    test_rewrite_endpoint()
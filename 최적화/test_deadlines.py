@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""마감 시간/헤징/취소 테스트 - 멈춘 호출이 배치 전체를 붙잡지 않음"""
+
+import os
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+import openpyxl
+
+from deadlines import Cancelled, DeadlineExceeded, LatencyTracker, RunControl, call_with_deadline
+from editor_engine import EditorEngine
+from key_pool import KeyPool, KeyPoolClient
+from model_tiers import TieredModel
+from structured_output import manuscript_json
+from test_incremental import make_editor_workbook, texts
+
+
+def test_deadline():
+    started = time.perf_counter()
+    try:
+        call_with_deadline(lambda attempt: time.sleep(5), timeout=0.3)
+        raise AssertionError('마감 시간')
+    except DeadlineExceeded:
+        pass
+    assert time.perf_counter() - started < 1
+    print("✅ 멈춘 호출: 마감 시간에 바로 포기")
+
+
+def test_hedge_first_wins():
+    delays = iter([2.0, 0.05])
+    lock = threading.Lock()
+
+    def request(attempt):
+        with lock:
+            delay = next(delays)
+        time.sleep(delay)
+        return delay
+
+    started = time.perf_counter()
+    assert call_with_deadline(request, timeout=5, hedge_delay=0.1, log=lambda message: None) == 0.05
+    assert time.perf_counter() - started < 1
+    print("✅ 헤징: 느린 요청 대신 중복 요청 응답 사용")
+
+
+def test_latency_p95():
+    tracker = LatencyTracker(min_samples=5)
+    for seconds in [1, 2, 3, 4]:
+        tracker.record(seconds)
+    assert tracker.hedge_delay() is None
+    for seconds in range(5, 21):
+        tracker.record(seconds)
+    assert tracker.hedge_delay() == 19
+    print("✅ 헤징 지연: 최근 응답 시간 p95")
+
+
+def test_cancel_in_flight():
+    control = RunControl()
+    threading.Timer(0.2, control.cancel).start()
+    started = time.perf_counter()
+    try:
+        call_with_deadline(lambda attempt: time.sleep(5), timeout=10, control=control)
+        raise AssertionError('취소')
+    except Cancelled:
+        pass
+    assert time.perf_counter() - started < 1
+    print("✅ 취소: 진행 중인 호출을 기다리지 않음")
+
+
+class SlowStreamClient:
+    """조각을 천천히 보내는 가짜 스트리밍 클라이언트 (보낸 조각 수, 스트림이 닫혔는지 기록)"""
+
+    def __init__(self, chunks=100, seconds_per_chunk=0.02):
+        self.chunks = chunks
+        self.seconds_per_chunk = seconds_per_chunk
+        self.sent = 0
+        self.closed = 0
+
+    def model(self, name):
+        return self
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        def stream_chunks():
+            try:
+                for _ in range(self.chunks):
+                    time.sleep(self.seconds_per_chunk)
+                    self.sent += 1
+                    yield SimpleNamespace(text="원고 ")
+            finally:
+                self.closed += 1
+        return stream_chunks()
+
+
+def test_timed_out_stream_stops():
+    client = SlowStreamClient()
+    pool = KeyPool(['key-a'], log=lambda message: None)
+    model = TieredModel([('fast', KeyPoolClient(pool, lambda key: client).model('fast'))],
+                        log=lambda message: None, timeout=0.2)
+    try:
+        model.generate_content("프롬프트", on_progress=lambda chars: None)
+        raise AssertionError('마감 시간')
+    except DeadlineExceeded:
+        pass
+
+    time.sleep(0.2)  # 남은 요청이 다음 조각에서 멈출 시간
+    sent = client.sent
+    time.sleep(0.2)
+    assert client.closed == 1 and client.sent == sent < client.chunks
+    assert pool.states[0].in_flight == 0
+    print(f"✅ 시간 초과한 스트림: 다음 조각에서 멈추고 닫힘 ({sent}/{client.chunks}조각, 키 자리 반납)")
+
+
+def test_hedge_loser_stops():
+    slow = SlowStreamClient(seconds_per_chunk=0.05)
+    fast = SlowStreamClient(chunks=3, seconds_per_chunk=0.01)
+    clients = iter([slow, fast])
+
+    def request(attempt):
+        client = next(clients)
+        return ''.join(chunk.text for chunk in iter_controlled(client.generate_content("프롬프트", stream=True), attempt))
+
+    def iter_controlled(chunks, attempt):
+        try:
+            for chunk in chunks:
+                attempt.check()
+                yield chunk
+        finally:
+            chunks.close()
+
+    assert call_with_deadline(request, timeout=5, hedge_delay=0.1, log=lambda message: None) == "원고 " * 3
+    time.sleep(0.2)
+    assert slow.closed == 1 and slow.sent < slow.chunks
+    print(f"✅ 헤징에서 진 요청: 멈추고 닫힘 ({slow.sent}/{slow.chunks}조각)")
+
+
+class HangingModel:
+    """두 번째 원고에서 멈추는 가짜 모델 (멈추면 취소 버튼을 누름)"""
+
+    def __init__(self, control, hang_on=None):
+        self.control = control
+        self.hang_on = hang_on
+        self.prompts = []
+
+    def generate_content(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        if '화자' in prompt:
+            return SimpleNamespace(text="성별: 여성\n연령대: 50대\n상황: 갱년기 고민")
+        if self.hang_on and self.hang_on in prompt:
+            self.control.cancel()
+            time.sleep(5)
+        return SimpleNamespace(text=manuscript_json("다시 쓴 원고예요. 두 번째 문장."))
+
+
+def test_cancel_checkpoints_and_resumes():
+    input_file = os.path.join(tempfile.mkdtemp(), '취소테스트.xlsx')
+    make_editor_workbook(input_file, texts)
+    engine = EditorEngine(log=lambda message, color=None: None)
+
+    fake = HangingModel(engine.control, hang_on=texts[1])
+    model = TieredModel([('fast', fake)], log=lambda message: None, timeout=30, control=engine.control)
+    started = time.perf_counter()
+    summary = engine.process_workbook(input_file, model)
+    assert time.perf_counter() - started < 3
+    # 첫 행은 취소 시점에 화자 분석 중이었을 수도 있음 (파이프라인)
+    assert summary['cancelled'] and summary['processed'] <= 1
+    done = summary['processed']
+
+    ws = openpyxl.load_workbook(input_file).active
+    assert bool(ws.cell(2, 13).value) == bool(done) and not ws.cell(3, 13).value and not ws.cell(4, 13).value
+
+    # 다시 실행 → 처리한 행은 유지, 남은 행만 처리
+    engine.control.reset()
+    fake = HangingModel(engine.control)
+    model = TieredModel([('fast', fake)], log=lambda message: None, timeout=30, control=engine.control)
+    summary = engine.process_workbook(input_file, model)
+    assert not summary['cancelled']
+    assert (summary['reused'], summary['processed']) == (done, 3 - done)
+    print("✅ 취소: 처리한 행까지 저장, 다시 실행하면 이어서")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("마감 시간/헤징/취소 테스트")
+    print("=" * 80)
+    test_deadline()
+    test_hedge_first_wins()
+    test_latency_p95()
+    test_cancel_in_flight()
+    test_timed_out_stream_stops()
+    test_hedge_loser_stops()
+    test_cancel_checkpoints_and_resumes()
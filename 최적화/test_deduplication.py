@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""중복 원고 제거 테스트 - 같은 원고/키워드/브랜드는 한 번만 처리"""
+
+import os
+import tempfile
+
+import pandas as pd
+
+from blog_optimizer import BlogOptimizer
+from search_optimizer import SearchOptimizer
+
+text = """갱년기홍조를 최근에 알게 되었는데, 효과가 있는지 궁금합니다.
+병원에서 상담 받았는데 부작용이 걱정돼요."""
+
+
+def make_workbook():
+    """중복 행 포함 테스트 엑셀 생성 (4행 중 3행이 같은 원고)"""
+    path = os.path.join(tempfile.mkdtemp(), '중복테스트.xlsx')
+    pd.DataFrame({
+        '키워드': ['갱년기홍조', '갱년기홍조', '갱년기홍조', '다른키워드'],
+        '브랜드': ['브랜드A'] * 4,
+        '원고': [text, text + '  ', text.replace('\n', '\r\n'), text],
+    }).to_excel(path, index=False)
+    return path
+
+
+class CountingOptimizer(SearchOptimizer):
+    """optimize_for_search 호출 횟수 기록"""
+
+    calls = 0
+
+    def optimize_for_search(self, text, keyword, brand=''):
+        self.calls += 1
+        return super().optimize_for_search(text, keyword, brand)
+
+
+def test_process_excel_dedup():
+    optimizer = CountingOptimizer()
+    output_file = optimizer.process_excel(make_workbook())
+
+    df = pd.read_excel(output_file)
+    assert optimizer.calls == 2
+    assert df['최적화_원고'][0] == df['최적화_원고'][1] == df['최적화_원고'][2]
+    print("✅ process_excel: 중복 3행 → 1회 처리, 결과 공유")
+
+
+def test_optimize_excel_dedup():
+    result = BlogOptimizer().optimize_excel(make_workbook())
+    assert result['deduplicated_rows'] == 2
+    assert result['total_rows'] == 4
+    print("✅ optimize_excel: 중복 2행 보고")
+
+
+def test_result_cache_is_bounded():
+    optimizer = BlogOptimizer()
+    optimizer.RESULT_CACHE_SIZE = 2
+    for key in ('a', 'b'):
+        optimizer.store_result(key, {'key': key})
+    assert optimizer.cached_result('a') == {'key': 'a'}  # a를 최근 사용으로
+    optimizer.store_result('c', {'key': 'c'})
+    assert list(optimizer.result_cache) == ['a', 'c']
+    assert optimizer.cached_result('b') is None
+    print("✅ 결과 캐시: 최근 RESULT_CACHE_SIZE개만 보관")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("중복 원고 제거 테스트")
+    print("=" * 80)
+    test_process_excel_dedup()
+    test_optimize_excel_dedup()
+    test_result_cache_is_bounded()
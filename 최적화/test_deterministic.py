@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""시드 고정 재현성 테스트 - 같은 입력 → 같은 출력 (프로세스가 달라도)"""
+
+import json
+import os
+import subprocess
+import sys
+
+from search_optimizer import SearchOptimizer
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+text = """# 갱년기홍조에 대해 고민 중인데, 드셔보신 분 계신가요?
+
+갱년기홍조를 최근에 알게 되었는데, 정말 효과가 있는지 궁금합니다.
+갱년기홍조가 너무 힘들어서 병원에 가봤는데 부작용이 걱정돼요.
+솔직히 정말 고민이 많습니다. 광고가 많아서 뭘 믿어야 할지 모르겠네요.
+갱년기홍조는 정말 힘들어요. 갱년기홍조는 언제 끝날까요?"""
+
+keyword = "갱년기홍조"
+brand = "테스트브랜드"
+
+# 다른 프로세스에서 같은 입력으로 실행 (PYTHONHASHSEED 다르게)
+CHILD_SCRIPT = """
+import json, sys
+from search_optimizer import SearchOptimizer
+text, keyword, brand, seed = json.loads(sys.stdin.read())
+result = SearchOptimizer(seed=seed).optimize_for_search(text, keyword, brand)
+print(json.dumps(result, ensure_ascii=False, sort_keys=True))
+"""
+
+
+def run_in_child(seed, hash_seed):
+    env = dict(os.environ, PYTHONHASHSEED=str(hash_seed))
+    proc = subprocess.run(
+        [sys.executable, '-c', CHILD_SCRIPT],
+        input=json.dumps([text, keyword, brand, seed]),
+        capture_output=True, text=True, cwd=BASE_DIR, env=env, check=True
+    )
+    # 마지막 줄이 결과 JSON (앞줄은 로더 로그)
+    return proc.stdout.strip().split('\n')[-1]
+
+
+def test_same_input_same_output():
+    optimizer = SearchOptimizer(seed=42)
+    first = optimizer.optimize_for_search(text, keyword, brand)
+    second = optimizer.optimize_for_search(text, keyword, brand)
+    assert first == second
+    print("✅ 같은 프로세스: 같은 입력 → 같은 출력")
+
+
+def test_same_output_across_processes():
+    outputs = {run_in_child(seed=42, hash_seed=h) for h in (1, 2, 3)}
+    assert len(outputs) == 1
+    print("✅ 다른 프로세스: 같은 입력 → 바이트 단위로 같은 출력")
+
+
+def test_seed_changes_choices():
+    outputs = {
+        SearchOptimizer(seed=seed).optimize_for_search(text, keyword, brand)['optimized_text']
+        for seed in range(10)
+    }
+    assert len(outputs) > 1
+    print(f"✅ 시드 변경 시 다른 대체어 선택 ({len(outputs)}가지)")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("시드 고정 재현성 테스트")
+    print("=" * 80)
+    test_same_input_same_output()
+    test_same_output_across_processes()
+    test_seed_changes_choices()
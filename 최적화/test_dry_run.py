@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""드라이런 테스트 - AI 호출 없이 행 분류/토큰/예상 시간/비용"""
+
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+from dry_run import (CallProfile, DryRunModel, DryRunReport, RowPlan, estimate_editor, estimate_search,
+                     plan_editor_rows)
+from editor_engine import EditorEngine
+from model_clients import FakeClient
+from model_tiers import create_tiered_model
+from search_optimizer import SearchOptimizer
+from test_incremental import FakeModel, make_editor_workbook, texts
+
+
+def test_editor_rows_classified_without_calls():
+    input_file = os.path.join(tempfile.mkdtemp(), '드라이런.xlsx')
+    make_editor_workbook(input_file, texts + [texts[0], None])
+    engine = EditorEngine(log=lambda message, color=None: None, concurrency=2)
+
+    plan = plan_editor_rows(engine, input_file)
+    assert (plan.total_rows, plan.ai_rows, plan.deduplicated, plan.empty, plan.speaker_calls) == (5, 3, 1, 1, 3)
+    assert plan.input_tokens > 0 and plan.output_tokens > 3 * 200
+
+    # 한 번 처리한 뒤에는 전부 변경 없음 → AI 호출 0
+    model = FakeModel()
+    engine.process_workbook(input_file, model)
+    report = estimate_editor(engine, input_file)
+    assert report.plan.reused == 3 and report.calls == 0 and model.calls == 6
+    print(f"✅ 원고 수정 드라이런: {plan.ai_rows}행 AI, 재실행 시 {report.plan.reused}행 변경 없음")
+
+
+def test_wall_time_and_cost():
+    plan = RowPlan()
+    plan.ai_rows = plan.speaker_calls = 100
+    plan.input_tokens, plan.output_tokens = 1_000_000, 200_000
+    profile = CallProfile(['gemini-2.5-flash', 'gemini-2.5-pro'], edit_seconds=20, speaker_seconds=4)
+
+    # 응답 시간 기준: (100×20 + 100×4) / 동시 4 = 600초
+    report = DryRunReport(plan, profile, concurrency=4)
+    assert report.wall_seconds == 600 and report.requests == 200
+    # 분당 10회 한도 → 200요청 = 20분
+    limited = DryRunReport(plan, profile, concurrency=4, requests_per_minute=10)
+    assert limited.wall_seconds == 1200 and any('분당 한도' in line for line in limited.lines())
+
+    # 빠른 모델만: 1M×0.30 + 0.2M×2.50 = $0.80, 모두 상위 모델까지: + 1.25 + 2.00
+    assert round(report.expected_cost, 2) == 0.80 and round(report.worst_cost, 2) == 4.05
+    print(f"✅ 예상 시간/비용: {limited.lines()[2]}")
+
+
+def test_measured_latency():
+    model = create_tiered_model(None, ['fast', 'slow'], timeout=None,
+                                client=FakeClient(reply=lambda prompt: '' if '승격' in prompt else '응답'))
+    model.generate_content('보통 요청')
+    model.generate_content('승격 요청')  # 빠른 모델 빈 응답 → 상위 모델
+    profile = CallProfile.from_model(model)
+    assert profile.shares == {'fast': 1.0, 'slow': 0.5} and profile.source == '이번 세션 측정'
+
+    records = os.path.join(tempfile.mkdtemp(), 'calls.jsonl')
+    with open(records, 'w', encoding='utf-8') as f:
+        for name, seconds in [('fast', 2.0), ('fast', 4.0), ('slow', 6.0)]:
+            f.write(json.dumps({'model': name, 'seconds': seconds}) + '\n')
+    profile = CallProfile.from_records(records, ['fast', 'slow'])
+    assert profile.edit_seconds == 6.0 and profile.attempts == 1.5
+    print(f"✅ 측정 응답 시간: 요청당 {profile.edit_seconds}초, 상위 모델 비율 {profile.shares['slow']}")
+
+
+def test_search_rows_use_gate():
+    clean = ("갱년기홍조 때문에 요즘 밤마다 잠을 설쳐요.\n"
+             "얼굴이 화끈거리고 땀이 나서 일상이 힘들어요.\n"
+             "갱년기홍조 관리하는 방법 아시는 분 계시면 알려주세요.")
+    needs_ai = clean.replace('갱년기홍조 관리하는', '관리하는')  # 키워드 1회 → AI 필요
+    input_file = os.path.join(tempfile.mkdtemp(), '검색드라이런.xlsx')
+    pd.DataFrame({'키워드': ['갱년기홍조'] * 2, '원고': [clean, needs_ai]}).to_excel(input_file, index=False)
+
+    optimizer = SearchOptimizer(use_ai=True, ai_model=DryRunModel())
+    report = estimate_search(optimizer, input_file)
+    assert (report.plan.ai_rows, report.plan.ai_skipped, report.calls) == (1, 1, 1)
+
+    # 실제 처리와 같은 원고(규칙 단계 후)로 프롬프트 조립
+    processed, _, _ = optimizer.apply_search_rules(needs_ai, '갱년기홍조', optimizer.make_rng(needs_ai, '갱년기홍조', ''))
+    assert report.plan.input_tokens == optimizer.ai_rewriter.build_prompt(processed, '갱년기홍조').tokens
+    print(f"✅ 검색 최적화 드라이런: {report.lines()[0]}")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("드라이런 테스트")
+    print("=" * 80)
+    test_editor_rows_classified_without_calls()
+    test_wall_time_and_cost()
+    test_measured_latency()
+    test_search_rows_use_gate()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""수정 목록 모드 테스트 - 적용/검증, 수정전후.xlsx 역산, AI 재구성 폴백"""
+
+import json
+import os
+from types import SimpleNamespace
+
+import pandas as pd
+
+from ai_rewriter import AIRewriter
+from edit_ops import EditApplyError, apply_edits, derive_edits, parse_edits, split_sentences
+from structured_output import manuscript_json, wants_manuscript
+
+text = """갱년기홍조 때문에 진짜 힘들어요.
+딱히 큰 개선는 못 봤어요. 비싼 한약도 먹어봤고요!
+건강기능식품이 정말 개선가 있을지 모르겠어요."""
+
+
+class EditsModel:
+    """수정 목록 모드면 고정 JSON, 아니면 고정 원고를 돌려주는 가짜 모델"""
+
+    def __init__(self, edits):
+        self.edits = edits
+        self.calls = []
+
+    def generate_content(self, prompt, generation_config=None):
+        if wants_manuscript(generation_config):
+            self.calls.append('full')
+            return SimpleNamespace(text=manuscript_json("원고 전체 모드 결과"))
+        self.calls.append('edits')
+        return SimpleNamespace(text=json.dumps(self.edits, ensure_ascii=False))
+
+
+def test_split_and_apply():
+    sentences = split_sentences(text)
+    assert ''.join(sentences) == text
+    assert len(sentences) == 4
+
+    edits = parse_edits('[{"sentence": 1, "old": "개선는", "new": "도움은"},'
+                        ' {"sentence": 3, "old": "개선가", "new": "도움이"}]')
+    result = apply_edits(text, edits)
+    assert "큰 도움은 못 봤어요" in result and "정말 도움이 있을지" in result
+
+    for bad in ([{'sentence': 9, 'old': '개선는', 'new': 'x'}],
+                [{'sentence': 1, 'old': '없는말', 'new': 'x'}],
+                [{'sentence': 1, 'old': '개선는', 'new': '효과는'}]):
+        try:
+            apply_edits(text, bad, forbidden_words=['효과'])
+            assert False, bad
+        except EditApplyError:
+            pass
+    print("✅ 문장 분리 / 수정 목록 적용 / 검증 실패 감지")
+
+
+def test_derive_roundtrip():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '수정전후.xlsx')
+    df = pd.read_excel(path)
+    for _, row in df.iterrows():
+        before, after = str(row['원고']), str(row['최종 원고'])
+        assert apply_edits(before, derive_edits(before, after)) == after
+    print(f"✅ 수정전후.xlsx {len(df)}개: 역산한 수정 목록 적용 = 수정 후 원고")
+
+
+def test_rewriter_edits_mode():
+    model = EditsModel([{'sentence': 1, 'old': '개선는', 'new': '도움은'}])
+    rewriter = AIRewriter(model=model, output_mode='edits')
+    result = rewriter.rewrite(text, '갱년기홍조')
+    assert "큰 도움은 못 봤어요" in result
+    assert model.calls == ['edits']
+    assert '[1] 딱히 큰 개선는 못 봤어요.' in rewriter.create_edits_prompt(text, '갱년기홍조')
+
+    # 적용 안 되는 수정 → 원고 전체 모드로 재시도
+    model = EditsModel([{'sentence': 1, 'old': '없는말', 'new': 'x'}])
+    result = AIRewriter(model=model, output_mode='edits').rewrite(text, '갱년기홍조')
+    assert result == "원고 전체 모드 결과"
+    assert model.calls == ['edits', 'full']
+    print("✅ AI 재구성 수정 목록 모드 + 원고 전체 폴백")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("수정 목록 모드 테스트")
+    print("=" * 80)
+    test_split_and_apply()
+    test_derive_roundtrip()
+    test_rewriter_edits_mode()
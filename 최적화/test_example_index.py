@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""학습 예시 검색 테스트 - 원고와 비슷한 예시를 토큰 예산 안에서 선택, 색인 캐시"""
+
+import json
+import os
+import tempfile
+
+import openpyxl
+
+from editor_engine import EditorEngine
+from example_index import INDEX_CACHE_FILE, ExampleIndex, format_example
+from token_estimator import estimate_tokens
+
+topics = [
+    ('강남 맛집 추천', "강남역 근처 맛집을 찾다가 파스타 집에 가봤어요. 분위기도 좋고 맛도 괜찮았어요."),
+    ('갱년기홍조', "갱년기홍조 때문에 얼굴이 화끈거려서 잠을 못 자요. 갱년기 증상 관리 방법이 궁금해요."),
+    ('다이어트 식단', "다이어트 식단을 짜보려고 닭가슴살이랑 샐러드 위주로 먹고 있어요."),
+    ('갱년기 영양제', "갱년기 증상 때문에 영양제를 알아보고 있어요. 홍조랑 불면이 제일 힘들어요."),
+    ('강아지 사료', "강아지 사료를 바꿨더니 잘 먹어요. 알레르기가 있어서 고르기 힘들었어요."),
+]
+
+
+def make_examples():
+    return [{'keyword': keyword, 'char_count': 500, 'main_keyword_count': 1, 'sub_keyword_count': '',
+             'extra_keyword_count': 3, 'original': original, 'edited': f"{original} (수정본)"}
+            for keyword, original in topics]
+
+
+def test_similar_examples_first():
+    index = ExampleIndex(make_examples())
+    results = index.search('갱년기홍조', "갱년기 홍조가 심해져서 밤에 자꾸 깨요. 좋은 방법 있을까요?", k=2)
+    assert [example['keyword'] for _, example in results] == ['갱년기홍조', '갱년기 영양제']
+    assert results[0][0] > results[1][0] > 0
+    print("✅ 키워드/내용이 비슷한 예시 우선")
+
+
+def test_token_budget():
+    index = ExampleIndex(make_examples())
+    one = estimate_tokens(format_example(1, index.examples[1]))
+    selected = index.select('갱년기홍조', "갱년기 홍조", k=3, token_budget=one + 5)
+    assert len(selected) == 1 and selected[0]['keyword'] == '갱년기홍조'
+    assert len(index.select('갱년기홍조', "갱년기 홍조", k=3, token_budget=10000)) == 3
+    print(f"✅ 토큰 예산: 예시 하나 {one}토큰 → 예산 {one + 5}이면 1개만")
+
+
+def test_cache_reused_until_examples_change():
+    path = os.path.join(tempfile.mkdtemp(), INDEX_CACHE_FILE)
+    examples = make_examples()
+    first = ExampleIndex.load_or_build(examples, path)
+    assert os.path.exists(path)
+
+    # 캐시를 읽었는지 확인하려고 캐시 안의 벡터를 표시해 둠
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    data['vectors'][0] = {'캐시': 1.0}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    assert ExampleIndex.load_or_build(examples, path).vectors[0] == {'캐시': 1.0}
+
+    examples[0]['original'] = "강남역 파스타 집 후기예요."
+    changed = ExampleIndex.load_or_build(examples, path)
+    assert changed.fingerprint != first.fingerprint
+    print("✅ 색인 캐시: 예시가 같으면 재사용, 바뀌면 다시 만듦")
+
+
+def test_engine_prompt_uses_similar_examples():
+    base_dir = tempfile.mkdtemp()
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(['번호', '키워드', '글자수', '통키워드', '조각키워드', '서브키워드', '수정 전', '수정 후'])
+    for example in make_examples():
+        ws.append([1, example['keyword'], 500, 1, '', 3, example['original'], example['edited']])
+    wb.save(os.path.join(base_dir, '수정전후.xlsx'))
+
+    engine = EditorEngine(log=lambda message, color=None: None)
+    assert engine.load_examples(base_dir)
+    assert os.path.exists(os.path.join(base_dir, INDEX_CACHE_FILE))
+
+    row = {key: None for key in EditorEngine.INPUT_COLUMNS}
+    row.update(keyword='다이어트 식단', original="다이어트 식단 때문에 요즘 샐러드만 먹어요.")
+    prompt = engine.create_prompt(row)
+    assert "=== 예시 1 ===\n키워드: 다이어트 식단" in prompt and "=== 예시 4 ===" not in prompt
+    print("✅ 원고 수정 프롬프트: 원고와 가장 비슷한 예시부터")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("학습 예시 검색 테스트")
+    print("=" * 80)
+    test_similar_examples_first()
+    test_token_budget()
+    test_cache_reused_until_examples_change()
+    test_engine_prompt_uses_similar_examples()
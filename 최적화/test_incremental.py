@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""매니페스트 기반 증분 재처리 테스트 - 바뀐 행만 다시 처리"""
+
+import os
+import tempfile
+from types import SimpleNamespace
+
+import openpyxl
+import pandas as pd
+
+from editor_engine import EditorEngine
+from search_optimizer import SearchOptimizer
+from structured_output import manuscript_json
+
+texts = [
+    "갱년기홍조를 최근에 알게 되었는데, 효과가 있는지 궁금합니다.",
+    "병원에서 상담 받았는데 부작용이 걱정돼요.",
+    "광고가 많아서 뭘 믿어야 할지 모르겠네요.",
+]
+
+
+class CountingOptimizer(SearchOptimizer):
+    """optimize_for_search 호출 횟수 기록"""
+
+    calls = 0
+
+    def optimize_for_search(self, text, keyword, brand=''):
+        self.calls += 1
+        return super().optimize_for_search(text, keyword, brand)
+
+
+class FakeModel:
+    """generate_content 호출 횟수 기록용 가짜 모델"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, prompt, generation_config=None):
+        self.calls += 1
+        reply = f"수정된 원고 {self.calls}. 두 번째 문장."
+        return SimpleNamespace(text=manuscript_json(reply) if generation_config else reply)
+
+
+def test_process_excel_incremental():
+    input_file = os.path.join(tempfile.mkdtemp(), '증분테스트.xlsx')
+    pd.DataFrame({'키워드': ['갱년기홍조'] * 3, '브랜드': ['브랜드A'] * 3, '원고': texts}).to_excel(input_file, index=False)
+
+    first = CountingOptimizer()
+    output_file = first.process_excel(input_file)
+    assert first.calls == 3
+    assert os.path.exists(output_file + '.manifest.json')
+
+    # 변경 없음 → 전부 이전 결과 복사
+    second = CountingOptimizer()
+    second.process_excel(input_file)
+    assert second.calls == 0
+
+    # 한 행만 수정 → 그 행만 재처리
+    df = pd.read_excel(input_file)
+    df.at[1, '원고'] = texts[1] + " 추가 문장이에요."
+    df.to_excel(input_file, index=False)
+
+    third = CountingOptimizer()
+    third.process_excel(input_file)
+    assert third.calls == 1
+
+    result = pd.read_excel(output_file)
+    assert result['최적화_원고'].notna().all()
+
+    # 시드가 바뀌면 지문이 달라서 전체 재처리
+    fourth = CountingOptimizer(seed=7)
+    fourth.process_excel(input_file)
+    assert fourth.calls == 3
+    print("✅ process_excel: 변경된 행만 재처리, 지문 변경 시 전체 재처리")
+
+
+def make_editor_workbook(path, rows):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(['번호', '키워드', 'C', '통키워드', '조각키워드', 'F', '원고', 'H', 'I', '글자수', '문장시작', '서브키워드'])
+    for i, text in enumerate(rows, 1):
+        ws.append([i, '갱년기홍조', None, '갱년기홍조 : 2', '홍조 : 1', None, text, None, None, 500, 2, 3])
+    wb.save(path)
+
+
+def test_editor_engine_incremental():
+    input_file = os.path.join(tempfile.mkdtemp(), '수정테스트.xlsx')
+    make_editor_workbook(input_file, texts)
+    engine = EditorEngine(log=lambda message, color=None: None)
+
+    model = FakeModel()
+    summary = engine.process_workbook(input_file, model)
+    assert summary['processed'] == 3
+    assert model.calls == 6  # 원고 수정 + 화자 분석
+
+    # 변경 없음 → AI 호출 없음
+    model = FakeModel()
+    summary = engine.process_workbook(input_file, model)
+    assert model.calls == 0
+    assert summary['reused'] == 3
+
+    # 한 행만 수정
+    wb = openpyxl.load_workbook(input_file)
+    wb.active.cell(3, 7).value = texts[1] + " 추가 문장이에요."
+    wb.save(input_file)
+
+    model = FakeModel()
+    summary = engine.process_workbook(input_file, model)
+    assert model.calls == 2
+    assert summary == {'total_rows': 3, 'processed': 1, 'ai_skipped': 0, 'deduplicated': 0, 'reused': 2, 'skipped': 0,
+                       'cancelled': False}
+    assert openpyxl.load_workbook(input_file).active.cell(2, 13).value
+    print("✅ 편집 엔진: 변경된 행만 AI 호출")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("증분 재처리 테스트")
+    print("=" * 80)
+    test_process_excel_incremental()
+    test_editor_engine_incremental()
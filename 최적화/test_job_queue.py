@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""SQLite 작업 큐 테스트 - 리스/하트비트/재시도/실패 보관, 작업자 여러 개가 엑셀 하나를 나눠 처리"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from types import SimpleNamespace
+
+import openpyxl
+
+from editor_engine import EditorEngine
+from job_queue import DEAD, DONE, PENDING, JobQueue, QueueWorker, collect_results, run_workers, submit_workbook
+from structured_output import manuscript_json
+from test_incremental import make_editor_workbook, texts
+from test_watch_daemon import fake_model_factory
+from watch_daemon import WatchDaemon
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingModel:
+    """프롬프트별 호출 기록 (스레드 안전), fail_text가 들어간 원고는 fail_times번 실패"""
+
+    def __init__(self, fail_text=None, fail_times=0):
+        self.calls = []
+        self.fail_text = fail_text
+        self.fail_times = fail_times
+        self.lock = threading.Lock()
+
+    def generate_content(self, prompt, generation_config=None):
+        with self.lock:
+            self.calls.append(prompt)
+            if self.fail_text and self.fail_text in prompt and self.fail_times > 0:
+                self.fail_times -= 1
+                raise RuntimeError("503 overloaded")
+        if '화자' in prompt:
+            return SimpleNamespace(text="성별: 여성\n연령대: 50대\n상황: 갱년기 고민")
+        original = next(text for text in texts if text in prompt)
+        return SimpleNamespace(text=manuscript_json(f"{original} 다시 썼어요."))
+
+
+def quiet_engine():
+    return EditorEngine(log=lambda message, color=None: None, ai_gate=False)
+
+
+def test_lease_expiry_retry_and_dead_letter():
+    clock = Clock()
+    queue = JobQueue(os.path.join(tempfile.mkdtemp(), 'q.db'), max_attempts=2, retry_delay=10, clock=clock)
+    batch = queue.submit('a.xlsx', 'a.xlsx', 'v1', [(2, 'k2', {'original': '가'}), (3, 'k3', {'original': '나'})])
+
+    first = queue.lease('w1', lease_seconds=30)
+    second = queue.lease('w2', lease_seconds=30)
+    assert (first.row_idx, second.row_idx) == (2, 3) and queue.lease('w3') is None
+
+    # w1은 하트비트로 리스 유지, w2는 죽음 → 만료 후 다른 작업자가 가져감
+    clock.now += 20
+    assert queue.heartbeat(first, lease_seconds=30)
+    clock.now += 20
+    retaken = queue.lease('w3', lease_seconds=30)
+    assert retaken.row_idx == 3 and retaken.attempts == 2
+    assert not queue.complete(second, ('늦은 결과', '', ''))  # 리스를 잃은 작업자의 결과는 버림
+
+    # 실패 → 재시도 대기(10초) → 다시 실패하면 실패 보관
+    assert queue.fail(first, 'RuntimeError: 503') == PENDING and queue.lease('w1') is None
+    clock.now += 11
+    again = queue.lease('w1', lease_seconds=30)
+    assert again.row_idx == 2 and queue.fail(again, 'RuntimeError: 503') == DEAD
+    assert queue.complete(retaken, ('결과', '화자', ''))
+    assert queue.counts(batch) == {PENDING: 0, 'leased': 0, DONE: 1, DEAD: 1}
+
+    # 다른 지문(금칙어/예시가 다른 작업자)은 가져가지 않음, requeue로 되살림
+    assert queue.requeue(batch) == 1
+    assert queue.lease('w4', fingerprint='v2') is None and queue.lease('w4', fingerprint='v1').row_idx == 2
+    print("✅ 리스 만료 → 재배정, 늦은 결과 버림, 재시도 후 실패 보관, requeue")
+
+
+def test_workers_share_one_workbook():
+    folder = tempfile.mkdtemp()
+    input_file = os.path.join(folder, '공유작업.xlsx')
+    output_file = os.path.join(folder, '공유작업_결과.xlsx')
+    make_editor_workbook(input_file, texts + [texts[1], None])
+    db = os.path.join(folder, '작업큐.db')
+
+    batch = submit_workbook(JobQueue(db), quiet_engine(), input_file, output_file)
+    model = CountingModel()
+    # 작업자 둘 (각자 연결/엔진), 스레드 2개씩
+    results = []
+    workers = [threading.Thread(target=lambda: results.append(run_workers(JobQueue(db), quiet_engine(), model, 2)))
+               for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    # 원고 3건 × (수정 + 화자 분석) - 같은 행을 두 번 처리하지 않음
+    assert sum(result['done'] for result in results) == 3 and len(model.calls) == 6
+    summary = collect_results(JobQueue(db), quiet_engine(), batch)
+    assert summary == {'written': 4, 'pending': 0, 'dead': 0, 'total_rows': 5}
+
+    ws = openpyxl.load_workbook(output_file).active
+    for row_idx, text in enumerate(texts + [texts[1]], start=2):
+        assert ws.cell(row_idx, EditorEngine.EDITED_COLUMN).value.startswith(text[:10])
+        assert ws.cell(row_idx, EditorEngine.SPEAKER_COLUMN).value
+    assert ws.cell(6, EditorEngine.EDITED_COLUMN).value is None
+    print(f"✅ 작업자 2개 × 스레드 2개: 원고 {summary['written']}행을 순서대로 모음 (AI 호출 {len(model.calls)}회)")
+
+
+def test_failed_row_retried_then_dead_letter():
+    folder = tempfile.mkdtemp()
+    input_file = os.path.join(folder, '실패.xlsx')
+    make_editor_workbook(input_file, texts)
+    queue = JobQueue(os.path.join(folder, 'q.db'), max_attempts=2, retry_delay=0)
+    batch = submit_workbook(queue, quiet_engine(), input_file)
+
+    # 한 번 실패 → 재시도로 완료
+    stats = QueueWorker(queue, quiet_engine(), CountingModel(texts[0], fail_times=1), poll_interval=0.01).run()
+    assert stats == {'done': 3, 'retried': 1, 'dead': 0, 'lost': 0}
+
+    # 다시 등록해도 바뀐 행만 대기 → 두 번 모두 실패하면 실패 보관, 결과 파일에는 나머지 행만
+    make_editor_workbook(input_file, [texts[0] + " 추가 문장."] + texts[1:])
+    assert submit_workbook(queue, quiet_engine(), input_file) == batch
+    assert queue.counts(batch)[PENDING] == 1
+    stats = QueueWorker(queue, quiet_engine(), CountingModel(texts[0], fail_times=5), poll_interval=0.01).run()
+    assert stats['dead'] == 1
+    summary = collect_results(queue, quiet_engine(), batch)
+    assert (summary['written'], summary['dead']) == (2, 1)
+    assert openpyxl.load_workbook(input_file).active.cell(2, EditorEngine.EDITED_COLUMN).value is None
+    print("✅ 실패 행 재시도 → 실패 보관, 나머지 행은 결과 파일에")
+
+
+def test_cli_processes():
+    folder = tempfile.mkdtemp()
+    input_file = os.path.join(folder, '프로세스.xlsx')
+    make_editor_workbook(input_file, texts)
+    db = os.path.join(folder, '작업큐.db')
+    env = dict(os.environ, GEMINI_BACKEND='fake?reply=성별: 여성 연령대: 50대 상황: 고민. 다시 쓴 원고예요.')
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'job_queue.py')
+
+    def run(*args):
+        return subprocess.Popen([sys.executable, script, *args, '--db', db, '--resources', folder], env=env,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+    assert run('submit', input_file).wait() == 0
+    workers = [run('work', '--threads', '2') for _ in range(2)]
+    outputs = [worker.communicate(timeout=60)[0] for worker in workers]
+    assert all(worker.returncode == 0 for worker in workers), outputs
+    assert run('collect', input_file).wait() == 0
+
+    ws = openpyxl.load_workbook(input_file).active
+    assert all(ws.cell(row_idx, EditorEngine.EDITED_COLUMN).value for row_idx in range(2, 5))
+    print("✅ CLI: 등록 → 작업자 프로세스 2개 → 결과 모음")
+
+
+def test_daemon_pulls_from_queue():
+    folder = tempfile.mkdtemp()
+    input_file = os.path.join(folder, '데몬큐.xlsx')
+    make_editor_workbook(input_file, texts)
+    db = os.path.join(folder, '작업큐.db')
+    batch = submit_workbook(JobQueue(db), EditorEngine(log=lambda message, color=None: None), input_file)
+
+    daemon = WatchDaemon(os.path.join(folder, '감시'), workers=1, use_ai=True, model_factory=fake_model_factory,
+                         poll_interval=0.05, use_processes=False, queue_db=db)
+    daemon.run(until_idle=True)
+    assert JobQueue(db).counts(batch)[DONE] == 3
+    print("✅ 데몬이 폴더 감시와 함께 작업 큐 행 처리")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("작업 큐 테스트")
+    print("=" * 80)
+    test_lease_expiry_retry_and_dead_letter()
+    test_workers_share_one_workbook()
+    test_failed_row_retried_then_dead_letter()
+    test_cli_processes()
+    test_daemon_pulls_from_queue()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""API 키 풀 테스트 - 돌아가며 배정, 분당 한도, 429/무효 키 처리, 사용량 보고"""
+
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+
+from google.api_core import exceptions as api_exceptions
+
+from key_pool import KEYS_ENV, KeyPool, KeyPoolClient, NoKeyAvailable, load_api_keys, load_key_config
+from model_clients import FakeClient
+from model_tiers import TieredModel
+from streaming import StreamAborted, StreamGuard, stream_generate
+
+
+class FakeClock:
+    """테스트용 시계 (sleep하면 시간이 흐름)"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class InvalidKeyClient:
+    """항상 '무효 키' 오류를 내는 클라이언트"""
+
+    def model(self, name):
+        def generate_content(prompt, stream=False, **kwargs):
+            raise api_exceptions.InvalidArgument("API key not valid. Please pass a valid API key.")
+        return SimpleNamespace(generate_content=generate_content)
+
+
+def make_client(key):
+    if key == 'key-limited':
+        return FakeClient(reply='응답', rate_limit_rate=1.0)
+    if key == 'key-invalid':
+        return InvalidKeyClient()
+    return FakeClient(reply=f'{key} 응답')
+
+
+def test_round_robin_and_bad_keys():
+    logs = []
+    pool = KeyPool(['key-good1', 'key-limited', 'key-invalid', 'key-good2'], log=logs.append)
+    model = KeyPoolClient(pool, make_client).model('fast')
+
+    replies = [model.generate_content('프롬프트').text for _ in range(6)]
+    assert replies == ['key-good1 응답', 'key-good2 응답'] * 3
+
+    usage = {item['key']: item for item in pool.usage()}
+    assert usage['…ood1']['succeeded'] == 3 and usage['…ood2']['succeeded'] == 3
+    assert usage['…ited']['rate_limited'] == 1 and usage['…ited']['status'] == 'cooldown'
+    assert usage['…alid']['status'] == 'invalid' and pool.usable == 3
+    assert any('한도 초과' in line for line in logs) and any('무효' in line for line in logs)
+    print("✅ 돌아가며 배정, 429 키는 쉬고 무효 키는 제외 (실패한 요청은 다른 키로)")
+
+
+def test_rpm_and_cooldown():
+    clock = FakeClock()
+    pool = KeyPool(['a', 'b'], rpm=2, cooldown=10, log=lambda message: None, clock=clock, sleep=clock.sleep)
+
+    for _ in range(4):
+        pool.release(pool.acquire(), 0.1)
+    assert clock.now == 0
+    pool.acquire()
+    assert clock.now >= 60
+    print(f"✅ 분당 한도: 키 2개 × 2회 후 {clock.now:.0f}초 대기")
+
+    # 연속 429 → 대기 시간 2배, 성공하면 초기화
+    single = KeyPool(['c'], cooldown=10, log=lambda message: None, clock=clock, sleep=clock.sleep)
+    started = clock.now
+    single.release(single.acquire(), 0.1, error=api_exceptions.ResourceExhausted('429'))
+    single.release(single.acquire(), 0.1, error=api_exceptions.ResourceExhausted('429'))
+    assert clock.now - started == 10
+    state = single.acquire()
+    assert clock.now - started == 30
+    single.release(state, 0.1)
+    assert state.cooldown == 0
+
+    bad = KeyPool(['x'], log=lambda message: None, clock=clock, sleep=clock.sleep)
+    bad.release(bad.acquire(), 0.1, error=api_exceptions.PermissionDenied('key disabled'))
+    try:
+        bad.acquire()
+        raise AssertionError('NoKeyAvailable')
+    except NoKeyAvailable:
+        pass
+    print("✅ 연속 429면 대기 시간 2배, 키가 모두 무효면 NoKeyAvailable")
+
+
+def test_streaming_retries_other_key():
+    pool = KeyPool(['key-limited', 'key-good'], log=lambda message: None)
+    model = KeyPoolClient(pool, make_client).model('fast')
+    text = ''.join(chunk.text for chunk in model.generate_content('프롬프트', stream=True))
+    assert text == 'key-good 응답'
+    assert [item['succeeded'] for item in pool.usage()] == [0, 1]
+
+    # 단계별 모델 요약에 키별 사용량 포함
+    logs = []
+    TieredModel([('fast', model)], log=logs.append).log_summary()
+    assert any(line.startswith('🔑 API 키 …good: 1회 호출, 성공 1회') for line in logs)
+    print("✅ 스트리밍: 첫 조각에서 429 → 다른 키로, 요약에 키별 사용량")
+
+
+def test_aborted_stream_releases_key():
+    pool = KeyPool(['key-good'], log=lambda message: None)
+    model = KeyPoolClient(pool, lambda key: FakeClient(reply='긴 응답입니다. ' * 20, chunk_size=5)).model('fast')
+    try:
+        stream_generate(model, '프롬프트', guard=StreamGuard(max_chars=20, check_junk=False), retries=0,
+                        abort_last=True)
+        raise AssertionError('조기 중단')
+    except StreamAborted as e:
+        error = e  # 예외가 스트림을 붙잡고 있어도 (가비지 수집 전) 키 자리는 이미 반환됨
+
+    usage = pool.usage()[0]
+    assert error.reason and pool.states[0].in_flight == 0
+    assert usage['succeeded'] == 0 and usage['abandoned'] == 1 and usage['seconds'] == 0
+    print("✅ 조기 중단한 스트림: 키 자리 바로 반환, 성공/응답 시간으로 세지 않음")
+
+
+def test_load_keys_from_config():
+    path = os.path.join(tempfile.mkdtemp(), 'gemini_keys.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'keys': ['key-c', 'key-a'], 'rpm': 5}, f)
+
+    config = load_key_config(path)
+    os.environ[KEYS_ENV] = 'key-b, key-c'
+    try:
+        assert load_api_keys('key-a,key-d', config) == ['key-a', 'key-d', 'key-b', 'key-c']
+    finally:
+        del os.environ[KEYS_ENV]
+    assert config['rpm'] == 5 and load_key_config(path + '.없음') == {}
+    print("✅ 키 목록: 직접 입력 + 환경변수 + 설정 파일 (중복 제거)")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("API 키 풀 테스트")
+    print("=" * 80)
+    test_round_robin_and_bad_keys()
+    test_rpm_and_cooldown()
+    test_streaming_retries_other_key()
+    test_aborted_stream_releases_key()
+    test_load_keys_from_config()
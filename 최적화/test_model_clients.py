@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""모델 클라이언트 테스트 - 기록/재생/가짜 백엔드로 네트워크 없이 AI 경로 실행"""
+
+import os
+import tempfile
+
+import openpyxl
+from google.api_core import exceptions as api_exceptions
+
+from ai_rewriter import AIRewriter
+from editor_engine import EditorEngine
+from model_clients import FakeClient, GeminiClient, RecordingClient, ReplayMiss, create_client, load_records, needs_api_key
+from test_incremental import make_editor_workbook, texts
+
+text = """갱년기홍조 때문에 진짜 힘들어요. 얼굴이 화끈거려서 잠을 못 자요.
+딱히 큰 도움은 못 봤어요. 비싼 한약도 먹어봤는데 부담돼서 그만뒀고요.
+갱년기홍조 관리 방법 아시는 분 알려주세요. 경험담이 제일 궁금해요."""
+
+
+def test_record_then_replay():
+    path = os.path.join(tempfile.mkdtemp(), 'calls.jsonl')
+
+    # 기록: 실제 클라이언트 자리에 가짜 클라이언트 (스트리밍/일반 호출 모두 기록)
+    recorder = RecordingClient(FakeClient(reply=lambda prompt: text), path)
+    rewriter = AIRewriter(client=recorder)
+    assert rewriter.rewrite(text, '갱년기홍조') == text
+    assert ''.join(chunk.text for chunk in recorder.model('gemini-2.5-pro').generate_content('스트림', stream=True)) == text
+    assert sum(len(records) for records in load_records(path).values()) == 2
+
+    # 재생: 같은 프롬프트 → 기록된 응답, 없는 프롬프트 → ReplayMiss
+    replay = create_client(backend=f'replay:{path}')
+    assert AIRewriter(client=replay).rewrite(text, '갱년기홍조') == text
+    try:
+        replay.model('gemini-2.5-flash').generate_content('처음 보는 프롬프트')
+        raise AssertionError('ReplayMiss')
+    except ReplayMiss:
+        pass
+    print("✅ 기록 → 재생 (API 키, 네트워크 없이)")
+
+
+def test_fake_failures():
+    # 429/503 흉내 (시드 고정 → 같은 순서)
+    client = FakeClient(reply=text, rate_limit_rate=1.0)
+    try:
+        client.model('fast').generate_content('프롬프트')
+        raise AssertionError('429')
+    except api_exceptions.ResourceExhausted:
+        pass
+
+    spec = create_client(backend='fake?errors=0.5&seed=3')
+    failures = [spec.failure() for _ in range(200)]
+    assert 70 < sum(isinstance(f, api_exceptions.ServiceUnavailable) for f in failures) < 130
+    assert not needs_api_key('replay:x.jsonl') and needs_api_key('record:x.jsonl')
+    print("✅ 가짜 백엔드: 429/503 비율")
+
+
+def test_editor_offline():
+    input_file = os.path.join(tempfile.mkdtemp(), '오프라인.xlsx')
+    make_editor_workbook(input_file, texts)
+
+    def reply(prompt):
+        if '화자' in prompt:
+            return "성별: 여성\n연령대: 50대\n상황: 갱년기 고민"
+        return "다시 쓴 원고예요. 두 번째 문장."
+
+    engine = EditorEngine(log=lambda message, color=None: None)
+    model = engine.create_model(None, client=FakeClient(reply=reply, latency=0.01))
+    summary = engine.process_workbook(input_file, model)
+    assert summary['processed'] == 3
+    assert openpyxl.load_workbook(input_file).active.cell(2, 14).value == "성별: 여성 / 연령대: 50대 / 상황: 갱년기 고민"
+    print("✅ 원고 수정 엔진: 가짜 백엔드로 일괄 처리")
+
+
+def test_gemini_clients_per_key():
+    from google.generativeai import client as genai_client
+
+    first, second = GeminiClient('key-first'), GeminiClient('key-second')
+    assert first.model('gemini-2.5-flash')._client is first.service
+    assert second.model('gemini-2.5-flash')._client is second.service
+    # 전역 설정(genai.configure)은 건드리지 않음 - 키마다 따로 (네트워크 호출 없음)
+    assert genai_client._client_manager.client_config['client_options'].api_key is None
+    print("✅ Gemini: 키별 클라이언트, 전역 설정 안 씀")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("모델 클라이언트 테스트")
+    print("=" * 80)
+    test_record_then_replay()
+    test_fake_failures()
+    test_editor_offline()
+    test_gemini_clients_per_key()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""모델 단계 테스트 - 빠른 모델 결과가 검증을 통과하면 상위 모델 호출 없음"""
+
+from types import SimpleNamespace
+
+from ai_rewriter import AIRewriter
+from editor_engine import EditorEngine
+from model_tiers import TieredModel, configured_tiers
+from structured_output import manuscript_json
+
+text = """갱년기홍조 때문에 진짜 힘들어요. 얼굴이 화끈거려서 잠을 못 자요.
+딱히 큰 도움은 못 봤어요. 비싼 한약도 먹어봤는데 부담돼서 그만뒀고요.
+갱년기홍조 관리 방법 아시는 분 알려주세요. 경험담이 제일 궁금해요."""
+
+
+class FixedModel:
+    """고정 응답 가짜 모델 (호출 수 기록)"""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = 0
+
+    def generate_content(self, prompt, generation_config=None, **kwargs):
+        self.calls += 1
+        if isinstance(self.reply, Exception):
+            raise self.reply
+        return SimpleNamespace(text=manuscript_json(self.reply) if generation_config else self.reply)
+
+
+def test_configured_tiers():
+    assert configured_tiers(['a', 'b']) == ['a', 'b']
+    assert configured_tiers()[-1] == 'gemini-2.5-pro'
+    print("✅ 모델 단계 설정")
+
+
+def test_escalation():
+    # 빠른 모델 결과가 검증 통과 → 상위 모델 호출 없음
+    fast, pro = FixedModel(text), FixedModel(text)
+    rewriter = AIRewriter(model=TieredModel([('fast', fast), ('pro', pro)]))
+    assert rewriter.rewrite(text, '갱년기홍조') == text
+    assert (fast.calls, pro.calls) == (1, 0)
+
+    # 금칙어가 남은 결과 → (스트리밍 중단) 상위 모델로
+    fast.reply = text.replace('도움은', '효과는')
+    assert rewriter.rewrite(text, '갱년기홍조') == text
+    assert (fast.calls, pro.calls) == (2, 1)
+
+    # 빠른 모델 오류 → 상위 모델로
+    fast.reply = RuntimeError('429')
+    assert rewriter.rewrite(text, '갱년기홍조') == text
+    assert (fast.calls, pro.calls) == (3, 2)
+
+    stats = rewriter.model.stats
+    assert stats['fast'] == {'calls': 3, 'accepted': 1, 'errors': 1, 'aborted': 1, 'seconds': stats['fast']['seconds']}
+    assert stats['pro']['accepted'] == 2
+    assert any(line.startswith('fast: 3회 호출, 통과 1회 (33%)') for line in rewriter.model.summary_lines())
+    print("✅ 검증 실패/오류 시에만 상위 모델, 단계별 통계")
+
+
+def test_speaker_uses_fast_tier():
+    fast = FixedModel("성별: 여성\n연령대: 50대\n상황: 갱년기 고민")
+    pro = FixedModel("성별: 여성\n연령대: 40대\n상황: 다른 답")
+    engine = EditorEngine(log=lambda message, color=None: None)
+    model = TieredModel([('fast', fast), ('pro', pro)])
+    assert engine.analyze_speaker(text, model) == "성별: 여성 / 연령대: 50대 / 상황: 갱년기 고민"
+    assert pro.calls == 0
+
+    fast.reply = "잘 모르겠어요"
+    assert engine.analyze_speaker(text, model).endswith("다른 답")
+    assert pro.calls == 1
+    print("✅ 화자 분석: 형식 맞으면 빠른 모델로 끝")
+
+
+def test_editor_escalates_only_hard_failures():
+    engine = EditorEngine(log=lambda message, color=None: None)
+    engine.forbidden_words = {'효과': ['도움'], '완치': []}
+    row = {key: None for key in EditorEngine.INPUT_COLUMNS}
+    row.update(keyword='갱년기홍조', char_count=len(text), main_keyword_count='갱년기홍조 : 5')
+
+    # 키워드 횟수/글자수 ±5%를 못 맞춰도 받아들임 (상위 모델 호출 없음)
+    drifted = text + " 다들 어떠세요?"
+    assert engine.check_rules(row, drifted)['needs_ai']
+    assert engine.validate_edit(row, drifted)
+    assert engine.validate_edit(row, text.replace('도움은', '효과는'))  # 대체어 있는 금칙어는 후처리가 고침
+
+    # 후처리로 못 고치는 실패만 상위 모델로
+    assert not engine.validate_edit(row, text.replace('도움은', '완치는'))
+    assert not engine.validate_edit(row, "다음은 수정된 원고입니다.\n" + text)
+    assert not engine.validate_edit(row, "## 제목\n" + text)
+    assert not engine.validate_edit(row, text[:len(text) // 2])
+    assert not engine.validate_edit(row, "  ")
+    print("✅ 원고 수정: 세부 규칙 차이는 받아들이고 큰 실패만 상위 모델로")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("모델 단계 테스트")
+    print("=" * 80)
+    test_configured_tiers()
+    test_escalation()
+    test_speaker_uses_fast_tier()
+    test_editor_escalates_only_hard_failures()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""문단 병렬 재구성 테스트 - 출력 길이에 비례해 느린 가짜 모델로 지연 시간 비교"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from ai_rewriter import AIRewriter
+from editor_engine import EditorEngine
+from paragraph_parallel import distribute, group_paragraphs, rewrite_groups, split_paragraphs, trim_excess
+from structured_output import manuscript_json
+
+paragraphs = [
+    "갱년기홍조 때문에 요즘 너무 힘들어요. 얼굴이 화끈거려서 잠을 못 자요." * 6,
+    "처음엔 그냥 피로 때문이라고 생각했어요. 친구 얘기를 듣고 알게 됐어요." * 6,
+    "석류즙이나 칡즙도 먹어봤는데 크게 달라진 건 없었어요. 한약은 부담됐고요." * 6,
+    "혹시 관리에 도움 되는 방법 있으시면 알려주세요. 경험담이 제일 궁금해요." * 6,
+]
+text = '\n\n'.join(paragraphs)
+
+
+class SlowModel:
+    """입력 원고 길이에 비례해 지연되는 가짜 모델 (묶음 원고를 그대로 돌려줌)"""
+
+    def __init__(self, seconds_per_char=0.0005):
+        self.seconds_per_char = seconds_per_char
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def generate_content(self, prompt, generation_config=None):
+        with self.lock:
+            self.prompts.append(prompt)
+        output = '\n\n'.join(p for p in paragraphs if p in prompt)
+        time.sleep(len(output) * self.seconds_per_char)
+        return SimpleNamespace(text=manuscript_json(output))
+
+
+def test_helpers():
+    assert split_paragraphs(text) == paragraphs
+    groups = group_paragraphs(paragraphs, 2)
+    assert len(groups) == 2 and '\n\n'.join(groups) == text
+    assert distribute(3, [1, 1, 1, 1]) == [1, 1, 1, 0]
+    assert sum(distribute(7, [5, 3, 2])) == 7
+    assert trim_excess("홍조 홍조 갱년기홍조 홍조", '홍조', 2, standalone=True) == "홍조 홍조 갱년기홍조 이거"
+    print("✅ 문단 나누기 / 묶기 / 배정 / 초과 키워드 정리")
+
+
+def test_trim_excess_particles():
+    # 받침 있는 키워드 → 받침 없는 "이거" (뒤 조사도 맞춤)
+    assert trim_excess("탈모약은 좋다. 탈모약은 비싸다. 탈모약을 샀다.", '탈모약', 1) == \
+        "탈모약은 좋다. 이거는 비싸다. 이거를 샀다."
+    assert trim_excess("탈모약이 있다. 탈모약으로 바꿨다. 탈모약과 물.", '탈모약', 0) == \
+        "이거가 있다. 이거로 바꿨다. 이거와 물."
+    assert trim_excess("탈모약 두 알, 탈모약", '탈모약', 1) == "탈모약 두 알, 이거"
+    print("✅ 초과 키워드 정리: 조사 받침 맞춤 (탈모약은 → 이거는)")
+
+
+def test_failed_group_logged():
+    logs = []
+
+    def rewrite_group(group, context):
+        if context['index'] == 1:
+            raise ValueError("응답 없음")
+        return group.upper()
+
+    assert rewrite_groups(['a', 'b'], rewrite_group, log=logs.append) == ['A', 'b']
+    assert logs == ["⚠️ 2번째 부분 재구성 오류 (원본 유지): 응답 없음"]
+    print("✅ 실패한 부분: 원본 유지 + 전달받은 로그로 알림")
+
+
+def test_rewriter_parallel_latency():
+    sequential = AIRewriter(model=SlowModel())
+    started = time.perf_counter()
+    sequential.rewrite(text, '갱년기홍조')
+    sequential_seconds = time.perf_counter() - started
+
+    model = SlowModel()
+    parallel = AIRewriter(model=model, parallel_groups=4)
+    started = time.perf_counter()
+    result = parallel.rewrite(text, '갱년기홍조')
+    parallel_seconds = time.perf_counter() - started
+
+    assert len(model.prompts) == 4
+    assert all('# 문맥' in prompt for prompt in model.prompts)
+    assert '전체 4개 부분 중 2번째' in ''.join(model.prompts)
+    assert split_paragraphs(result)[1] == paragraphs[1]  # 순서 유지
+    assert result.count('갱년기홍조') <= AIRewriter.KEYWORD_MAX
+    assert parallel_seconds < sequential_seconds * 0.6
+    print(f"✅ AI 재구성 문단 병렬: {sequential_seconds:.2f}초 → {parallel_seconds:.2f}초")
+
+
+def test_editor_parallel():
+    engine = EditorEngine(log=lambda message, color=None: None, ai_gate=False, parallel_groups=2)
+    model = SlowModel(seconds_per_char=0)
+    row = {
+        'keyword': '갱년기홍조',
+        'main_keyword_count': '갱년기홍조 : 1',
+        'sub_keyword_count': '홍조 : 2',
+        'original': text,
+        'char_count': 1000,
+        'keyword_start_count': 2,
+        'extra_keyword_count': 5,
+    }
+    edited = engine.edit_text_parallel(row, model)
+    assert len(model.prompts) == 2
+    first, second = sorted(model.prompts, key=lambda prompt: paragraphs[0] not in prompt)
+    assert "첫 문단이 아닙니다" in second and "첫 문단이 아닙니다" not in first
+    # 통키워드 1회는 첫 문단을 뺀 길이가 더 긴 뒷 묶음에 배정
+    assert "'갱년기홍조'를 정확히 0번" in first and "'갱년기홍조'를 정확히 1번" in second
+    assert split_paragraphs(edited)[0] == paragraphs[0]
+    print("✅ 원고 수정 문단 병렬: 규칙 배정 + 첫 문단 규칙 분리")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("문단 병렬 재구성 테스트")
+    print("=" * 80)
+    test_helpers()
+    test_trim_excess_particles()
+    test_failed_group_logged()
+    test_rewriter_parallel_latency()
+    test_editor_parallel()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""받침 기반 조사 교정 테스트"""
+
+import random
+
+from forbidden_words_loader import ForbiddenWordsLoader
+from korean_particles import choose_particle, final_jongseong, replace_with_particles
+
+
+def test_choose_particle():
+    assert choose_particle('개선', '가') == '이'
+    assert choose_particle('도움', '는') == '은'
+    assert choose_particle('변화', '을') == '를'
+    assert choose_particle('결과', '과') == '와'
+    assert choose_particle('개선', '로') == '으로'
+    assert choose_particle('서울', '으로') == '로'
+    assert choose_particle('1', '가') == '이'
+    assert choose_particle('2', '이') == '가'
+    assert choose_particle('ABC', '가') == '가'  # 판단 불가 → 그대로
+    assert final_jongseong('') is None
+    print("✅ 받침별 조사 선택")
+
+
+def test_replace_with_particles():
+    text = "효과가 좋고 효과는 확실해요. 효과를 봤어요. 효과로 유명하고 효과와 함께, 효과"
+    result, count = replace_with_particles(text, '효과', '개선')
+    assert count == 6
+    assert result == "개선이 좋고 개선은 확실해요. 개선을 봤어요. 개선으로 유명하고 개선과 함께, 개선"
+
+    # 조사가 아닌 경우는 그대로
+    assert replace_with_particles("효과적이에요", '효과', '개선')[0] == "개선적이에요"
+    assert replace_with_particles("효과이용", '효과', '개선')[0] == "개선이용"
+
+    # 조사 뒤에 이어지는 말
+    assert replace_with_particles("효과로는 부족", '효과', '개선')[0] == "개선으로는 부족"
+    assert replace_with_particles("광고와도 달라요", '광고', '소개')[0] == "소개와도 달라요"
+    print("✅ 치환 + 조사 교정")
+
+
+def test_loader_particles():
+    loader = ForbiddenWordsLoader()
+    loader.forbidden_dict = {'효과': ['개선']}
+    result, changes = loader.replace_forbidden_words("효과가 있어요. 효과는 글쎄요.", random.Random(0))
+    assert result == "개선이 있어요. 개선은 글쎄요."
+    assert changes == ['효과 → 개선 (2회)']
+    print("✅ 금칙어 로더: 개선가/개선는 오류 없음")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("조사 교정 테스트")
+    print("=" * 80)
+    test_choose_particle()
+    test_replace_with_particles()
+    test_loader_particles()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""파이프라인 테스트 - 단계가 겹쳐 돌고, 결과는 입력 순서대로 쓰임"""
+
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+
+import openpyxl
+
+from editor_engine import EditorEngine
+from model_clients import FakeClient
+from pipeline import Pipeline, Stage, StageError
+from test_incremental import make_editor_workbook
+
+
+def test_ordered_output():
+    rng = random.Random(0)
+    delays = [rng.uniform(0, 0.02) for _ in range(30)]
+
+    def slow_square(value):
+        time.sleep(delays[value])
+        if value == 7:
+            raise ValueError('7')
+        return value * value
+
+    written = []
+    pipeline = Pipeline([Stage('제곱', slow_square, workers=4), Stage('더하기', lambda value: value + 1, workers=2)],
+                        queue_size=3)
+    pipeline.run(range(30), lambda index, value: written.append((index, value)))
+
+    assert [index for index, _ in written] == list(range(30))
+    assert isinstance(written[7][1], StageError) and written[7][1].stage == '제곱'
+    assert all(value == index * index + 1 for index, value in written if index != 7)
+    assert pipeline.stages[0].processed == 30 and pipeline.stages[1].processed == 29
+    assert pipeline.stages[0].max_depth <= 3
+    assert len(pipeline.summary_lines()) == 2
+    print("✅ 순서 유지, 오류는 StageError로 전달, 대기열 크기 제한")
+
+
+def test_sink_error_stops_pipeline():
+    def sink(index, value):
+        if index == 2:
+            raise RuntimeError('쓰기 실패')
+
+    pipeline = Pipeline([Stage('그대로', lambda value: value, workers=2)], queue_size=2)
+    try:
+        pipeline.run(range(1000), sink)
+        raise AssertionError('쓰기 실패')
+    except RuntimeError as e:
+        assert str(e) == '쓰기 실패'
+    assert pipeline.stages[0].processed < 1000
+    print("✅ 쓰기 실패 → 파이프라인 중단")
+
+
+def test_editor_pipeline_overlaps_calls():
+    rows = [f"원고 {i}번 내용이에요. 갱년기홍조 이야기예요." for i in range(1, 9)]
+    input_file = os.path.join(tempfile.mkdtemp(), '파이프라인.xlsx')
+    make_editor_workbook(input_file, rows)
+
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def reply(prompt):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.1)
+        with lock:
+            active[0] -= 1
+        if '화자' in prompt:
+            return "성별: 여성\n연령대: 50대\n상황: 갱년기 고민"
+        number = re.search(r'원고 (\d+)번', prompt).group(1)
+        return f"다시 쓴 원고 {number}번이에요."
+
+    engine = EditorEngine(log=lambda message, color=None: None, concurrency=4)
+    model = engine.create_model(None, client=FakeClient(reply=reply))
+    started = time.perf_counter()
+    summary = engine.process_workbook(input_file, model)
+    elapsed = time.perf_counter() - started
+
+    # 순서대로면 8행 × (수정 + 화자) × 0.1초 = 1.6초
+    assert summary['processed'] == 8
+    assert elapsed < 1.0, elapsed
+    assert peak[0] == 4
+    ws = openpyxl.load_workbook(input_file).active
+    for i in range(1, 9):
+        assert f"{i}번" in ws.cell(i + 1, 13).value
+    print(f"✅ 원고 수정 파이프라인: 8행 {elapsed:.2f}초 (순차 1.6초), 동시 호출 최대 {peak[0]}개")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("파이프라인 테스트")
+    print("=" * 80)
+    test_ordered_output()
+    test_sink_error_stops_pipeline()
+    test_editor_pipeline_overlaps_calls()
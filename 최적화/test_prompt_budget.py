@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""토큰 예산 프롬프트 조립 테스트 - 우선순위 낮은 블록부터 줄이고, 행별 토큰 추정 로그"""
+
+import os
+import tempfile
+
+from ai_rewriter import AIRewriter
+from editor_engine import EditorEngine
+from model_clients import FakeClient
+from prompt_budget import PromptAssembler
+from structured_output import OUTPUT_INSTRUCTION
+from test_incremental import make_editor_workbook, texts
+from token_estimator import estimate_output_tokens, estimate_tokens
+
+
+def test_estimate_tokens():
+    assert estimate_tokens('') == 0
+    assert estimate_tokens('가' * 150) == 100
+    assert estimate_tokens('abcd efgh') == 2
+    assert estimate_tokens('갱년기 홍조!!') == 6  # 한글 5자 3.3 + 문장부호 2, 공백 무시 → 올림
+    assert estimate_output_tokens(1500) == 800
+    print("✅ 토큰 추정: 한글 1.5자, 영문 4자당 1토큰")
+
+
+def test_lowest_priority_trimmed_first():
+    assembler = PromptAssembler(budget=50)
+    assembler.add('규칙', '규칙 ' * 20)                                   # 필수, 약 27토큰
+    assembler.add('목록', ''.join(f'항목{i}\n' for i in range(10)), priority=1, shrink='lines')
+    assembler.add('예시', '예시 ' * 30, priority=2)                        # 먼저 통째로 빠짐
+    assembler.add('원고', '원고 ' * 10)                                    # 필수, 약 14토큰
+    prompt = assembler.build()
+
+    assert [name for name, _, _ in prompt.trimmed] == ['예시', '목록']
+    assert '예시' not in prompt.text and prompt.text.startswith('규칙') and prompt.text.endswith('원고 ')
+    assert '항목0\n' in prompt.text and '항목9' not in prompt.text
+    assert prompt.tokens <= 50
+    print(f"✅ 예산 50토큰: {prompt.describe()}")
+
+
+def test_required_blocks_kept():
+    prompt = PromptAssembler(budget=5).add('규칙', '규칙 ' * 20).add('예시', '예시', priority=1).build()
+    assert prompt.text == '규칙 ' * 20 and prompt.tokens > 5
+    print("✅ 필수 블록만으로 넘으면 필수 블록은 그대로")
+
+
+def test_engine_prompt_budget():
+    engine = EditorEngine(log=lambda message, color=None: None, prompt_tokens=3000)
+    engine.forbidden_words = {f'금칙어{i}': [f'대체어{i}'] for i in range(500)}
+    row = {key: None for key in EditorEngine.INPUT_COLUMNS}
+    row.update(keyword='갱년기홍조', original="갱년기홍조 때문에 금칙어7 이야기를 해요.", char_count=800)
+
+    unlimited = EditorEngine(log=lambda message, color=None: None, prompt_tokens=10 ** 6)
+    unlimited.forbidden_words = engine.forbidden_words
+    assert estimate_tokens(unlimited.create_prompt(row)) > 3000
+
+    prompt = engine.build_prompt(row)
+    assert prompt.tokens <= 3000
+    assert "'금칙어7' 대신" in prompt.text and "'금칙어499' 대신" not in prompt.text
+    assert prompt.trimmed[0][0] == '금칙어(나머지)'
+    assert "# 수정할 원고" in prompt.text and OUTPUT_INSTRUCTION in prompt.text
+    print(f"✅ 원고 수정 프롬프트: {prompt.describe()}")
+
+
+def test_rewriter_drops_final_check_first():
+    rewriter = AIRewriter(model=object())
+    text = "갱년기홍조 때문에 힘들어요."
+    full = rewriter.build_prompt(text, '갱년기홍조')
+    rewriter.PROMPT_TOKENS = full.tokens - 50
+    trimmed = rewriter.build_prompt(text, '갱년기홍조')
+    assert [name for name, _, _ in trimmed.trimmed] == ['최종 체크']
+    assert '# 🎯 최종 체크' not in trimmed.text and trimmed.text.endswith(rewriter.FULL_OUTPUT_INSTRUCTION)
+    print(f"✅ AI 재구성 프롬프트: 최종 체크부터 뺌 ({full.tokens} → {trimmed.tokens}토큰)")
+
+
+def test_tokens_logged_per_row():
+    input_file = os.path.join(tempfile.mkdtemp(), '토큰로그.xlsx')
+    make_editor_workbook(input_file, texts)
+    logs = []
+
+    def reply(prompt):
+        if '화자' in prompt:
+            return "성별: 여성\n연령대: 50대\n상황: 갱년기 고민"
+        return "다시 쓴 원고예요. 두 번째 문장."
+
+    engine = EditorEngine(log=lambda message, color=None: logs.append(message), ai_gate=False)
+    engine.process_workbook(input_file, engine.create_model(None, client=FakeClient(reply=reply)))
+    token_lines = [line for line in logs if line.startswith('📏')]
+    assert len(token_lines) == 3 and all('입력 약' in line and '출력 약' in line for line in token_lines)
+    print(f"✅ 행별 토큰 추정 로그: {token_lines[0]}")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("토큰 예산 프롬프트 테스트")
+    print("=" * 80)
+    test_estimate_tokens()
+    test_lowest_priority_trimmed_first()
+    test_required_blocks_kept()
+    test_engine_prompt_budget()
+    test_rewriter_drops_final_check_first()
+    test_tokens_logged_per_row()
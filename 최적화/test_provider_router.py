@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""제공자 라우터 테스트 - 빠른 제공자 우선, 오류 시 다른 제공자로, 오류가 잦으면 뒤로 뺐다가 복귀, Anthropic 어댑터"""
+
+import json
+from types import SimpleNamespace
+
+from key_pool import KeyPool, KeyPoolClient, classify_error
+from model_clients import AnthropicClient, AnthropicModel, FakeClient, create_client, needs_api_key
+from model_tiers import TieredModel
+from provider_router import MAX_CONSECUTIVE_ERRORS, RouterClient
+from streaming import StreamAborted, StreamGuard, stream_generate
+from structured_output import MANUSCRIPT_CONFIG, parse_manuscript
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def served_by(model, prompt="프롬프트"):
+    """이번 요청을 받은 제공자 (가짜 응답에 제공자 이름을 넣어 둠)"""
+    return model.generate_content(prompt).text
+
+
+def test_prefers_faster_provider():
+    logs = []
+    client = RouterClient([('느림', FakeClient(reply="느림", latency=0.03)), ('빠름', FakeClient(reply="빠름"))],
+                          log=logs.append, clock=FakeClock())
+    model = client.model('gemini-2.5-flash')
+    first = [served_by(model) for _ in range(6)]
+    assert set(first) == {'느림', '빠름'}  # 표본이 모자란 동안은 둘 다 써 봄
+
+    rest = [served_by(model) for _ in range(10)]
+    assert rest == ['빠름'] * 10, rest
+    assert not logs
+    print(f"✅ 지연 시간 기준 선택: {rest.count('빠름')}/10 빠른 제공자")
+
+
+def test_failover_and_recovery():
+    logs = []
+    clock = FakeClock()
+    broken = FakeClient(reply="고장", error_rate=1.0)
+    client = RouterClient([('고장', broken), ('예비', FakeClient(reply="예비", latency=0.01))],
+                          log=logs.append, degraded_seconds=30, probe_seconds=1000, clock=clock)
+    model = client.model('gemini-2.5-flash')
+
+    # 실패하면 같은 요청을 다음 제공자로 다시 보냄
+    assert [served_by(model) for _ in range(MAX_CONSECUTIVE_ERRORS)] == ['예비'] * MAX_CONSECUTIVE_ERRORS
+    assert broken.calls == MAX_CONSECUTIVE_ERRORS
+    assert any("뒤로 뺌" in line for line in logs)
+    assert sum("다시 보냄" in line for line in logs) == MAX_CONSECUTIVE_ERRORS
+
+    # 뒤로 뺀 동안은 고장 난 제공자를 건너뜀
+    for _ in range(5):
+        assert served_by(model) == '예비'
+    assert broken.calls == MAX_CONSECUTIVE_ERRORS
+
+    # 시간이 지나면 다시 써 보고, 성공하면 복귀
+    broken.error_rate = 0.0
+    clock.now += 31
+    assert served_by(model) == '고장'
+
+    summary = client.router.summary_lines()
+    assert summary[0].startswith(f"고장: {MAX_CONSECUTIVE_ERRORS + 1}회 호출, 오류 {MAX_CONSECUTIVE_ERRORS}회")
+    print(f"✅ 오류 → 다른 제공자, 복귀: {summary}")
+
+
+def test_all_providers_failing_raises():
+    client = RouterClient([('a', FakeClient(reply="a", error_rate=1.0)), ('b', FakeClient(reply="b", error_rate=1.0))],
+                          log=lambda message: None, clock=FakeClock())
+    try:
+        client.model('fake').generate_content("프롬프트")
+        raise AssertionError('모두 실패')
+    except Exception as e:
+        assert '503' in str(e)
+    print("✅ 모든 제공자 실패 → 마지막 오류 (단계 모델이 재시도/상위 모델)")
+
+
+def test_stream_failover_before_first_chunk():
+    client = RouterClient([('고장', FakeClient(reply="고장", error_rate=1.0)),
+                           ('예비', FakeClient(reply="예비 원고입니다.", chunk_size=2))],
+                          log=lambda message: None, clock=FakeClock())
+    chunks = list(client.model('fake').generate_content("프롬프트", stream=True, generation_config=MANUSCRIPT_CONFIG))
+    assert len(chunks) > 1
+    assert parse_manuscript(''.join(chunk.text for chunk in chunks)) == ("예비 원고입니다.", '')
+    assert client.router.states['예비'].calls == 1 and client.router.states['고장'].failovers == 1
+    print(f"✅ 스트리밍: 첫 조각 전 실패 → 다른 제공자 ({len(chunks)}조각)")
+
+
+def test_aborted_stream_not_recorded():
+    pool = KeyPool(['key-a'], log=lambda message: None)
+    provider = KeyPoolClient(pool, lambda key: FakeClient(reply="긴 응답입니다. " * 20, chunk_size=5))
+    client = RouterClient([('a', provider)], log=lambda message: None, clock=FakeClock())
+    try:
+        stream_generate(client.model('fake'), "프롬프트", guard=StreamGuard(max_chars=20, check_junk=False),
+                        retries=0, abort_last=True)
+        raise AssertionError('조기 중단')
+    except StreamAborted as e:
+        error = e  # 예외가 스트림을 붙잡고 있어도 제공자 스트림(키 자리)은 이미 닫힘
+
+    state = client.router.states['a']
+    assert error.reason and state.calls == 0 and not state.outcomes
+    assert pool.states[0].in_flight == 0 and pool.usage()[0]['abandoned'] == 1
+    print("✅ 조기 중단한 스트림: 제공자 스트림까지 닫고 지연 시간/오류로 세지 않음")
+
+
+def test_create_router_backend():
+    assert not needs_api_key('router:fake,replay:calls.jsonl?degraded=10')
+    assert needs_api_key('router:gemini,fake') and needs_api_key('router')
+
+    logs = []
+    client = create_client(backend='router:fake,fake?probe=5', log=logs.append)
+    assert [name for name, _ in client.providers] == ['fake', 'fake#2']
+    assert client.router.probe_seconds == 5
+
+    model = TieredModel([(name, client.model(name)) for name in ('fast', 'pro')], log=logs.append)
+    for _ in range(4):
+        assert model.generate_content("프롬프트").text == '가짜 응답입니다.'
+    model.log_summary()
+    assert any(line.startswith("🔀 fake: ") for line in logs)
+    print("✅ GEMINI_BACKEND=router:fake,fake")
+
+
+class StubMessages:
+    """Anthropic SDK의 messages 자리 (요청 기록 + 정해 둔 응답)"""
+
+    def __init__(self, content):
+        self.content = content
+        self.requests = []
+
+    def create(self, **request):
+        self.requests.append(request)
+        return SimpleNamespace(content=self.content)
+
+
+def test_anthropic_adapter():
+    # 원고 JSON 스키마 → 도구 하나를 강제해서 그 입력을 JSON으로
+    messages = StubMessages([SimpleNamespace(type='tool_use', input={'manuscript': "원고", 'notes': "메모"})])
+    model = AnthropicModel('claude-sonnet-4-0', SimpleNamespace(messages=messages))
+    assert parse_manuscript(model.generate_content("프롬프트", generation_config=MANUSCRIPT_CONFIG).text) == \
+        ("원고", "메모")
+    chunks = list(model.generate_content("프롬프트", stream=True, generation_config=MANUSCRIPT_CONFIG))
+    assert len(chunks) == 1 and json.loads(chunks[0].text)['manuscript'] == "원고"
+    request = messages.requests[0]
+    assert request['tool_choice'] == {'type': 'tool', 'name': request['tools'][0]['name']}
+    assert request['max_tokens'] > 0 and request['messages'][0]['content'] == "프롬프트"
+
+    # 객체가 아닌 스키마는 감쌌다가 풂
+    messages = StubMessages([SimpleNamespace(type='tool_use', input={'result': ['a', 'b']})])
+    model = AnthropicModel('claude-3-5-haiku-latest', SimpleNamespace(messages=messages))
+    config = {'response_schema': {'type': 'array', 'items': {'type': 'string'}}, 'max_output_tokens': 100}
+    assert json.loads(model.generate_content("목록", generation_config=config).text) == ['a', 'b']
+    assert messages.requests[0]['max_tokens'] == 100
+
+    # 일반 텍스트
+    messages = StubMessages([SimpleNamespace(type='text', text="성별: 여성")])
+    model = AnthropicModel('claude-3-5-haiku-latest', SimpleNamespace(messages=messages))
+    assert model.generate_content("화자 분석").text == "성별: 여성"
+    print("✅ Anthropic 어댑터: 스키마 → 도구 입력 JSON")
+
+
+def test_anthropic_tier_mapping():
+    client = AnthropicClient('test-key', tiers=['gemini-2.5-flash-lite', 'gemini-2.5-flash', 'gemini-2.5-pro'],
+                             models=['claude-3-5-haiku-latest', 'claude-sonnet-4-0'])
+    assert [client.model_name(name) for name in client.tiers] == \
+        ['claude-3-5-haiku-latest', 'claude-sonnet-4-0', 'claude-sonnet-4-0']
+    assert client.model_name('claude-opus-4-1') == 'claude-opus-4-1'
+    assert client.model_name('모르는-모델') == 'claude-sonnet-4-0'
+
+    assert classify_error(SimpleNamespace(status_code=429)) == 'rate_limited'
+    assert classify_error(SimpleNamespace(status_code=401)) == 'invalid'
+    print("✅ Gemini 단계 → 같은 위치의 Anthropic 모델")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("제공자 라우터 테스트")
+    print("=" * 80)
+    test_prefers_faster_provider()
+    test_failover_and_recovery()
+    test_all_providers_failing_raises()
+    test_stream_failover_before_first_chunk()
+    test_aborted_stream_not_recorded()
+    test_create_router_backend()
+    test_anthropic_adapter()
+    test_anthropic_tier_mapping()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""AI 생략 판정 테스트 - 규칙을 모두 지키는 원고는 AI 호출 없이 통과"""
+
+from types import SimpleNamespace
+
+from editor_engine import EditorEngine
+from quality_gate import SKIP_LABEL, find_awkward, find_forbidden
+from korean_particles import find_particle_errors
+from search_optimizer import SearchOptimizer
+from structured_output import manuscript_json
+
+
+class CountingModel:
+    """호출된 프롬프트를 기록하는 가짜 모델"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt, generation_config=None):
+        self.prompts.append(prompt)
+        if '화자' in prompt:
+            return SimpleNamespace(text="성별: 여성\n연령대: 50대\n상황: 갱년기 고민")
+        return SimpleNamespace(text=manuscript_json("AI 재구성 결과입니다. " * 10))
+
+
+def test_checks():
+    assert find_forbidden("증.상이 심해요", ['증상']) == ['증상']
+    assert find_forbidden("증세가 심해요", ['증상']) == []
+    assert find_particle_errors("개선가 있고 도움이 돼요. 개선는 글쎄요", ['개선', '도움']) == ['개선가', '개선는']
+    assert find_awkward("이거인 줄 몰랐어요") == ['이거인']
+    print("✅ 금칙어(점 표현) / 조사 오류 / 치환 흔적 검사")
+
+
+def test_optimizer_gate():
+    model = CountingModel()
+    optimizer = SearchOptimizer(use_ai=True, ai_model=model)
+
+    clean = ("갱년기홍조 때문에 요즘 밤마다 잠을 설쳐요.\n"
+             "얼굴이 화끈거리고 땀이 나서 일상이 힘들어요.\n"
+             "갱년기홍조 관리하는 방법 아시는 분 계시면 알려주세요.")
+    result = optimizer.optimize_for_search(clean, '갱년기홍조')
+    assert result['ai_gate'] == SKIP_LABEL, result['ai_gate']
+    assert model.prompts == []
+
+    # 키워드 1회 → AI 필요
+    result = optimizer.optimize_for_search(clean.replace('갱년기홍조 관리하는', '관리하는'), '갱년기홍조')
+    assert result['ai_gate'].startswith('AI 필요: 키워드 1회')
+    assert len(model.prompts) == 1
+
+    # 판정 끄면 항상 AI
+    optimizer.ai_gate = False
+    optimizer.optimize_for_search(clean, '갱년기홍조')
+    assert len(model.prompts) == 2
+    print("✅ 검색 최적화: 통과 원고는 AI 생략, 판정 기록")
+
+
+def make_row(original):
+    return {
+        'keyword': '갱년기홍조',
+        'main_keyword_count': '갱년기홍조 : 1',
+        'sub_keyword_count': '홍조 : 1',
+        'original': original,
+        'char_count': len(original),
+        'keyword_start_count': 2,
+        'extra_keyword_count': None,
+    }
+
+
+def test_editor_gate():
+    engine = EditorEngine(log=lambda message, color=None: None)
+    engine.forbidden_words = {'효과': ['도움', '개선']}
+    model = CountingModel()
+
+    original = ("갱년기홍조 고민이 있어요. 요즘 너무 힘들어요. 갱년기홍조 정보를 찾고 있어요.\n"
+                "갱년기홍조 때문에 잠을 못 자요.\n"
+                "홍조 말고 다른 것도 궁금해요.")
+    edited, speaker, gate = engine.edit_row(make_row(original), model)
+    assert gate == SKIP_LABEL
+    assert len(model.prompts) == 1 and '화자' in model.prompts[0]  # 화자 분석만 호출
+    assert speaker.startswith('성별: 여성')
+
+    # 금칙어 + 조사 오류 → 치환 후 통과 (효과가 → 도움이)
+    edited, _, gate = engine.edit_row(make_row(original.replace('궁금해요', '효과가 궁금해요')), model)
+    assert gate == SKIP_LABEL
+    assert '도움이 궁금해요' in edited
+
+    # 첫 문단 키워드 1회 → AI 수정
+    edited, _, gate = engine.edit_row(make_row(original.replace('갱년기홍조 정보를', '정보를')), model)
+    assert gate.startswith('AI 필요: 첫 문단 키워드 1회')
+    assert edited.startswith('AI 재구성 결과')
+    print("✅ 원고 수정: 통과 원고는 AI 수정 생략, 판정 기록")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("AI 생략 판정 테스트")
+    print("=" * 80)
+    test_checks()
+    test_optimizer_gate()
+    test_editor_gate()
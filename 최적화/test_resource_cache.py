@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""세션 리소스 캐시 테스트 - 반복 실행해도 다시 파싱하지 않고, 예시가 쌓이지 않음"""
+
+import os
+import tempfile
+import time
+
+import openpyxl
+
+from editor_engine import EditorEngine
+from resource_cache import ResourceCache
+
+
+def make_resources(base_dir, forbidden=('효과', '부작용')):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(['금칙어 리스트'])
+    ws.append(['번호', '금칙어', '대체어1', '대체어2'])
+    for number, word in enumerate(forbidden, 1):
+        ws.append([number, word, f'{word} 대체', f'{word} 대체2'])
+    wb.save(os.path.join(base_dir, '금칙어_리스트.xlsx'))
+
+    for name, keyword in [('수정전후.xlsx', '갱년기홍조'), ('블로그_작업_엑셀템플릿.xlsx', '다이어트 식단')]:
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.append(['번호', '키워드', '글자수', '통키워드', '조각키워드', '서브키워드', '수정 전', '수정 후'])
+        for i in range(3):
+            ws.append([i, keyword, 500, 1, '', 3, f'{keyword} 원고 {i}', f'{keyword} 수정 원고 {i}'])
+        wb.save(os.path.join(base_dir, name))
+
+
+def test_repeated_runs_reuse_cache():
+    base_dir = tempfile.mkdtemp()
+    make_resources(base_dir)
+    cache = ResourceCache()
+    engine = EditorEngine(log=lambda message, color=None: None, resource_cache=cache)
+
+    assert engine.load_resources(base_dir) == (True, True)
+    forbidden, examples, index = engine.forbidden_words, engine.examples, engine.example_index
+    for _ in range(5):
+        engine.load_resources(base_dir)
+
+    # 파일당 한 번만 파싱, 예시는 쌓이지 않음, 같은 객체 재사용
+    assert cache.loads == 3 and len(cache.entries) == 3
+    assert len(engine.examples) == 6 and engine.examples == examples
+    assert engine.forbidden_words is forbidden and engine.example_index is index
+    assert engine.forbidden_words['효과'] == ('효과 대체', '효과 대체2')
+    try:
+        engine.forbidden_words['새 금칙어'] = ('대체',)
+        raise AssertionError('읽기 전용')
+    except TypeError:
+        pass
+    print("✅ 반복 실행: 파일당 한 번만 읽음, 예시 6개 유지, 읽기 전용")
+
+
+def test_reload_only_on_content_change():
+    base_dir = tempfile.mkdtemp()
+    make_resources(base_dir)
+    cache = ResourceCache()
+    engine = EditorEngine(log=lambda message, color=None: None, resource_cache=cache)
+    engine.load_resources(base_dir)
+
+    # 수정 시각만 바뀜 → 내용 해시가 같으므로 다시 읽지 않음
+    path = os.path.join(base_dir, '금칙어_리스트.xlsx')
+    later = time.time() + 10
+    os.utime(path, (later, later))
+    engine.load_resources(base_dir)
+    assert cache.loads == 3
+
+    # 내용 변경 → 다시 읽어 교체 (경로마다 값 하나)
+    make_resources(base_dir, forbidden=('효과', '부작용', '완치'))
+    engine.load_resources(base_dir)
+    assert '완치' in engine.forbidden_words
+    assert len(cache.entries) == 3 and len(engine.examples) == 6
+    print(f"✅ 변경 감지: 수정 시각만 바뀌면 유지, 내용이 바뀌면 다시 읽음 (누적 {cache.loads}회)")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("세션 리소스 캐시 테스트")
+    print("=" * 80)
+    test_repeated_runs_reuse_cache()
+    test_reload_only_on_content_change()
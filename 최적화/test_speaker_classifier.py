@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""화자 정보 로컬 판정 테스트 - 자신 있는 원고만 로컬, 나머지는 AI 화자 분석 (그 답을 학습)"""
+
+import os
+import sys
+import tempfile
+import threading
+from types import SimpleNamespace
+
+import openpyxl
+
+from dry_run import plan_editor_rows
+from editor_engine import EditorEngine
+from speaker_classifier import SPEAKER_MODEL_FILE, SpeakerClassifier, parse_speaker
+from structured_output import manuscript_json
+
+
+class SpeakerModel:
+    """화자 분석 요청이면 정해진 화자 정보, 수정 요청이면 프롬프트 속 원고를 그대로 돌려주는 가짜 모델"""
+
+    def __init__(self, texts, speaker="성별: 여성\n연령대: 40대\n상황: 탈모 치료 고민"):
+        self.texts = texts
+        self.speaker = speaker
+        self.calls = {'edit': 0, 'speaker': 0}
+
+    def generate_content(self, prompt, **kwargs):
+        if '화자' in prompt and '연령대:' in prompt:
+            self.calls['speaker'] += 1
+            return SimpleNamespace(text=self.speaker)
+        self.calls['edit'] += 1
+        return SimpleNamespace(text=manuscript_json(next(text for text in self.texts if text in prompt)))
+
+
+def make_workbook(path, rows):
+    """편집용 양식 (B열 키워드, G열 원고, N열 화자 정보)"""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(['번호', '키워드', 'C', '통키워드', '조각키워드', 'F', '원고', 'H', 'I', '글자수', '문장시작',
+               '서브키워드', '수정원고', '화자'])
+    for i, (keyword, text, speaker) in enumerate(rows, 1):
+        ws.append([i, keyword, None, f'{keyword} : 2', None, None, text, None, None, 500, 2, 3,
+                   text if speaker else None, speaker])
+    wb.save(path)
+
+
+def test_rules_confident_or_fallback():
+    classifier = SpeakerClassifier()
+
+    # 키워드 분류 + 글의 단서가 같은 방향 → 로컬 판정
+    profile = classifier.classify("50대 들어서 갱년기홍조가 심해졌어요. 남편도 걱정하더라고요.", '갱년기홍조')
+    assert (profile.gender, profile.age, profile.situation) == ('여성', '50대', '갱년기 증상 고민')
+    assert classifier.confident(profile)
+    assert parse_speaker(profile.format()) == ('여성', '50대', '갱년기 증상 고민')
+
+    # 단서가 부족하거나 엇갈리면 AI 화자 분석
+    profile = classifier.classify("모발이식 상담을 받고 왔습니다. 비용이 궁금하네요.", '모발이식')
+    assert not classifier.confident(profile)
+    profile = classifier.classify("아내와 함께 갔는데 남편분들도 많더라고요. 가슴 수술 후기입니다.", '잠실유방외과')
+    assert not classifier.confident(profile)
+    print(f"✅ 규칙 판정: {classifier.classify('50대 갱년기홍조', '갱년기홍조')}")
+
+
+def test_learns_from_past_results():
+    path = os.path.join(tempfile.mkdtemp(), '지난결과.xlsx')
+    answer = "성별: 남성 / 연령대: 30대 / 상황: 탈모 초기 고민"
+    make_workbook(path, [('모발이식', f"모발이식 후기 {i}번째 글입니다.", answer) for i in range(6)]
+                  + [('모발이식', "형식이 다른 답", "분석 실패: 시간 초과")])
+
+    classifier = SpeakerClassifier()
+    text = "모발이식 상담을 받고 왔습니다. 비용이 궁금하네요."
+    before = classifier.classify(text, '모발이식').confidence
+    assert classifier.learn_workbook(path) == 6
+    assert classifier.learn_workbook(path) == 0  # 같은 결과는 두 번 세지 않음
+    profile = classifier.classify(text, '모발이식')
+    assert profile.format() == answer and classifier.confident(profile) and profile.confidence > before
+
+    # 저장 → 불러오기
+    saved = os.path.join(os.path.dirname(path), SPEAKER_MODEL_FILE)
+    classifier.save(saved)
+    loaded = SpeakerClassifier()
+    assert loaded.load(saved) == 1
+    assert loaded.classify(text, '모발이식').format() == answer
+    print(f"✅ 지난 결과 학습: 신뢰도 {before:.2f} → {profile.confidence:.2f}")
+
+
+def test_learn_while_classifying():
+    classifier = SpeakerClassifier()
+    errors = []
+
+    def learn():
+        for i in range(1500):
+            classifier.learn('모발이식', f"후기 {i}", f"성별: 남성 / 연령대: {i}대 / 상황: 고민 {i}")  # 항목이 계속 늘어남
+
+    def classify():
+        try:
+            for _ in range(1500):
+                classifier.classify("모발이식 상담을 받고 왔습니다.", '모발이식')
+        except RuntimeError as e:  # dictionary changed size during iteration
+            errors.append(e)
+
+    threads = [threading.Thread(target=learn)] + [threading.Thread(target=classify) for _ in range(3)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # 스레드 전환을 잦게 해서 겹침을 드러냄
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert not errors, errors
+    print("✅ 학습하면서 동시에 판정해도 안전")
+
+
+def test_engine_skips_confident_rows():
+    directory = tempfile.mkdtemp()
+    input_file = os.path.join(directory, '화자테스트.xlsx')
+    rows = [('갱년기홍조', "50대 들어서 갱년기홍조가 심해졌어요. 남편도 걱정하더라고요.", None),
+            ('갱년기홍조', "요즘 갱년기홍조 때문에 잠을 못 자요. 폐경 후에 더 심해졌네요.", None),
+            ('모발이식', "모발이식 상담을 받고 왔습니다. 비용이 궁금하네요.", None)]
+    make_workbook(input_file, rows)
+
+    texts = [text for _, text, _ in rows]
+    model = SpeakerModel(texts)
+    engine = EditorEngine(log=lambda message, color=None: None)
+    engine.process_workbook(input_file, model, incremental=False)
+    assert model.calls['speaker'] == 3
+
+    make_workbook(input_file, rows)  # 지난 결과(N열) 없이 다시
+    model = SpeakerModel(texts)
+    engine = EditorEngine(log=lambda message, color=None: None, local_speaker=True)
+    assert plan_editor_rows(engine, input_file, incremental=False).speaker_calls == 1
+    engine.process_workbook(input_file, model, incremental=False)
+    assert model.calls['speaker'] == 1  # 모발이식만 AI 화자 분석
+    assert engine.speaker_stats == {'local': 2, 'model': 1}
+
+    wb = openpyxl.load_workbook(input_file)
+    speakers = [wb.active.cell(row, EditorEngine.SPEAKER_COLUMN).value for row in range(2, 5)]
+    assert parse_speaker(speakers[0])[:2] == ('여성', '50대')
+    assert speakers[2] == "성별: 여성 / 연령대: 40대 / 상황: 탈모 치료 고민"
+    print(f"✅ 편집 엔진: 화자 분석 AI 호출 3 → {model.calls['speaker']}회")
+
+
+def test_engine_loads_trained_model():
+    directory = tempfile.mkdtemp()
+    trained = SpeakerClassifier()
+    for i in range(5):
+        trained.learn('모발이식', f"후기 {i}", "성별: 남성 / 연령대: 30대 / 상황: 탈모 초기 고민")
+    trained.save(os.path.join(directory, SPEAKER_MODEL_FILE))
+
+    messages = []
+    engine = EditorEngine(log=lambda message, color=None: messages.append(message), local_speaker=True)
+    engine.load_resources(directory)
+    engine.load_resources(directory)  # 바뀌지 않았으면 다시 읽지 않음
+    assert sum('화자 판정 학습 결과 로드됨' in message for message in messages) == 1
+    profile = engine.speaker_classifier.classify("모발이식 상담을 받고 왔습니다.", '모발이식')
+    assert engine.speaker_classifier.confident(profile) and profile.gender == '남성'
+
+    # 로컬 판정 여부는 결과 지문에 반영 (켜고 끄면 재처리)
+    assert engine.version_fingerprint() != EditorEngine(log=lambda message, color=None: None).version_fingerprint()
+    print("✅ 화자모델.json 로드")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("화자 정보 로컬 판정 테스트")
+    print("=" * 80)
+    test_rules_confident_or_fallback()
+    test_learns_from_past_results()
+    test_learn_while_classifying()
+    test_engine_skips_confident_rows()
+    test_engine_loads_trained_model()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""스트리밍 조기 중단 테스트 - 잘못 가는 응답은 끝까지 받지 않고 중단 후 재시도"""
+
+import json
+from types import SimpleNamespace
+
+from ai_rewriter import AIRewriter
+from model_tiers import TieredModel
+from streaming import ForbiddenAutomaton, StreamAborted, StreamGuard, stream_generate
+from structured_output import MANUSCRIPT_CONFIG, ManuscriptStream, manuscript_json, parse_manuscript
+
+text = """갱년기홍조 때문에 진짜 힘들어요. 얼굴이 화끈거려서 잠을 못 자요.
+딱히 큰 도움은 못 봤어요. 비싼 한약도 먹어봤는데 부담돼서 그만뒀고요.
+갱년기홍조 관리 방법 아시는 분 알려주세요. 경험담이 제일 궁금해요."""
+
+
+class StreamingModel:
+    """응답을 10자씩 조각으로 흘려 주는 가짜 모델 (받아 간 조각 수 기록)"""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = 0
+        self.chunks_sent = 0
+
+    def generate_content(self, prompt, stream=False, generation_config=None):
+        reply = self.replies[min(self.calls, len(self.replies) - 1)]
+        self.calls += 1
+        if generation_config and not isinstance(reply, tuple):
+            reply = (reply,)
+        return self.chunks(manuscript_json(*reply) if generation_config else reply)
+
+    def chunks(self, reply):
+        for i in range(0, len(reply), 10):
+            self.chunks_sent += 1
+            yield SimpleNamespace(text=reply[i:i + 10])
+
+
+def test_automaton_across_chunks():
+    automaton = ForbiddenAutomaton(['증상', '부작용', '작용'])
+    assert automaton.feed('이런 증') == []
+    assert automaton.feed('상이') == ['증상']
+    assert automaton.feed('랑 부작') == []
+    assert automaton.feed('용') == ['부작용', '작용']
+    assert automaton.find_all('증.상 없음') == ['증상']
+    print("✅ 금칙어 오토마타: 조각 경계 + 점 표현")
+
+
+def test_guard():
+    for reply, reason in [('```\n원고', '코드 블록'), ('# 제목\n원고', '마크다운 제목'),
+                          ('다음은 수정된 원고입니다', '설명 문구'), ('가' * 31, '글자수 초과')]:
+        guard = StreamGuard(max_chars=30)
+        try:
+            for i in range(0, len(reply), 3):
+                guard.feed(reply[i:i + 3])
+            raise AssertionError(reply)
+        except StreamAborted as e:
+            assert e.reason.startswith(reason), e.reason
+
+    guard = StreamGuard(['효과'], max_forbidden=1)
+    guard.feed('효과 한 번은 괜찮고')
+    try:
+        guard.feed(' 효과 두 번은 중단')
+        raise AssertionError('금칙어')
+    except StreamAborted as e:
+        assert e.reason == '금칙어(효과)'
+    print("✅ 검사기: 마크다운/설명 문구/글자수/금칙어 횟수")
+
+
+def test_abort_escalates_early():
+    # 빠른 모델이 첫 문장부터 금칙어 → 몇 조각 만에 끊고 상위 모델로
+    bad = '효과가 좋았어요. ' + text
+    fast, pro = StreamingModel(bad), StreamingModel(text)
+    progress = []
+    rewriter = AIRewriter(model=TieredModel([('fast', fast), ('pro', pro)], log=lambda message: None),
+                          progress=progress.append)
+    assert rewriter.rewrite(text, '갱년기홍조') == text
+    assert fast.chunks_sent == 2 and fast.calls == 1  # JSON 머리('{"manuscript": "') 조각 + 금칙어 조각
+    assert pro.calls == 1
+    assert rewriter.model.stats['fast']['aborted'] == 1
+    assert progress[-1] == f"✍️ AI 재구성 생성 중... {len(text)}자 / 목표 {len(text)}자"  # 원고 글자수만
+    print(f"✅ 빠른 모델 {len(manuscript_json(bad)) // 10 + 1}조각 중 2조각에서 중단 → 상위 모델")
+
+
+def test_manuscript_stream_decodes_value():
+    manuscript = '첫 줄 "따옴표"\n둘째 줄\t탭 \\ 역슬래시 😀'
+    for raw in [manuscript_json(manuscript, "메모"), manuscript_json(manuscript).replace('", ', '",  '),
+                '{"notes": "앞 메모", "manuscript": ' + json.dumps(manuscript) + '}']:  # ensure_ascii (\uXXXX)
+        for size in (1, 3, 7):
+            stream = ManuscriptStream()
+            decoded = ''.join(stream.feed(raw[i:i + size]) for i in range(0, len(raw), size))
+            assert decoded == manuscript, (raw, size, decoded)
+    print("✅ 원고 JSON 스트림: 조각 경계의 이스케이프까지 원고 값만 풀어냄")
+
+
+def test_guard_checks_manuscript_only():
+    guard = StreamGuard(['효과'], max_chars=len(text) + 5)
+
+    # 메모의 금칙어, JSON 키/이스케이프/메모 글자수는 검사하지 않음
+    model = StreamingModel((text, "효과 → 개선으로 바꿨어요. " * 10))
+    response = stream_generate(model, '프롬프트', guard.fresh(), abort_last=True, generation_config=MANUSCRIPT_CONFIG)
+    assert parse_manuscript(response.text)[0] == text
+
+    # 원고 안의 마크다운 제목은 줄 머리에서 찾음
+    model = StreamingModel("# 제목\n" + text)
+    try:
+        stream_generate(model, '프롬프트', guard.fresh(), retries=0, abort_last=True,
+                        generation_config=MANUSCRIPT_CONFIG)
+        raise AssertionError('마크다운 제목')
+    except StreamAborted as e:
+        assert e.reason == '마크다운 제목'
+    print("✅ 원고 JSON 검사: 원고 값만 (메모의 금칙어로 중단하지 않음, 원고의 마크다운은 중단)")
+
+
+def test_last_tier_retries_then_finishes():
+    # 마지막 단계: 한 번 중단 후 재시도, 재시도는 끝까지 받음 (결과는 검증 없이 사용)
+    runaway = text * 3
+    pro = StreamingModel(runaway, runaway)
+    model = TieredModel([('pro', pro)], log=lambda message: None)
+    response = model.generate_content('프롬프트', guard=StreamGuard(max_chars=len(text)))
+    assert pro.calls == 2
+    assert response.text == runaway
+    print("✅ 마지막 단계: 중단 → 재시도 → 끝까지 받음")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("스트리밍 조기 중단 테스트")
+    print("=" * 80)
+    test_automaton_across_chunks()
+    test_guard()
+    test_abort_escalates_early()
+    test_manuscript_stream_decodes_value()
+    test_guard_checks_manuscript_only()
+    test_last_tier_retries_then_finishes()
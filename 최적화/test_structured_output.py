@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""구조화 출력 테스트 - 원고 JSON 스키마 검증, 형식 오류 한 번 재시도, 설명 문구가 원고 열에 섞이지 않음"""
+
+import os
+import tempfile
+from types import SimpleNamespace
+
+import openpyxl
+
+from editor_engine import EditorEngine
+from model_clients import FakeClient
+from model_tiers import generate_manuscript
+from structured_output import MANUSCRIPT_CONFIG, OutputFormatError, manuscript_json, parse_manuscript
+from test_incremental import make_editor_workbook, texts
+
+
+class ScriptedModel:
+    """원고 요청에는 정해 둔 응답을 차례로, 화자 분석에는 고정 답을 돌려주는 가짜 모델"""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.configs = []
+
+    def generate_content(self, prompt, generation_config=None):
+        if '화자' in prompt:
+            return SimpleNamespace(text="성별: 여성\n연령대: 50대\n상황: 갱년기 고민")
+        self.configs.append(generation_config)
+        return SimpleNamespace(text=self.replies[min(len(self.configs), len(self.replies)) - 1])
+
+
+def test_parse_manuscript():
+    assert parse_manuscript('{"manuscript": " 원고입니다. "}') == ('원고입니다.', '')
+    assert parse_manuscript(manuscript_json("원고", "키워드가 부족해요")) == ('원고', '키워드가 부족해요')
+
+    for bad, reason in [("다음은 수정된 원고입니다:\n원고", 'JSON 아님'), ('["원고"]', '객체가 아님'),
+                        ('{"manuscript": "  "}', '원고(manuscript) 없음'), ('{"notes": "메모"}', '원고(manuscript) 없음'),
+                        ('{"manuscript": "원고", "extra": 1}', '모르는 항목: extra'),
+                        ('{"manuscript": "원고", "notes": 3}', '문자열이 아님')]:
+        try:
+            parse_manuscript(bad)
+            raise AssertionError(bad)
+        except OutputFormatError as e:
+            assert reason in str(e), (bad, e)
+    print("✅ 원고 JSON 스키마 검증")
+
+
+def test_retry_once_on_invalid_output():
+    logs = []
+    model = ScriptedModel("다음은 수정된 원고입니다:\n\n원고", manuscript_json("원고", "메모"))
+    assert generate_manuscript(model, "프롬프트", log=logs.append) == ("원고", "메모")
+    assert model.configs == [MANUSCRIPT_CONFIG, MANUSCRIPT_CONFIG]
+    assert len(logs) == 1 and logs[0].startswith("🔁 응답 형식 오류")
+
+    # 재시도까지 틀리면 오류 (원고 열에 쓰지 않음)
+    model = ScriptedModel("원고만 드릴게요", "```json\n{}\n```", manuscript_json("너무 늦음"))
+    try:
+        generate_manuscript(model, "프롬프트", log=logs.append)
+        raise AssertionError('형식 오류')
+    except OutputFormatError:
+        pass
+    assert len(model.configs) == 2
+    print("✅ 형식 오류 → 한 번 재시도")
+
+
+def test_editor_writes_manuscript_only():
+    input_file = os.path.join(tempfile.mkdtemp(), '구조화테스트.xlsx')
+    make_editor_workbook(input_file, texts[:1])
+    messages = []
+    engine = EditorEngine(log=lambda message, color=None: messages.append(message), ai_gate=False)
+    model = ScriptedModel("다음은 수정된 원고입니다.\n\n**갱년기홍조** 고민이에요.",
+                          manuscript_json("갱년기홍조 고민이에요. 두 번째 문장이에요.", "글자수가 부족해요"))
+    engine.process_workbook(input_file, model, incremental=False)
+
+    edited = openpyxl.load_workbook(input_file).active.cell(2, EditorEngine.EDITED_COLUMN).value
+    assert edited == "갱년기홍조 고민이에요.\n두 번째 문장이에요."
+    assert any("AI 메모: 글자수가 부족해요" in message for message in messages)
+    print(f"✅ 원고 열에는 manuscript만: {edited!r}")
+
+
+def test_fake_backend_answers_in_schema():
+    model = FakeClient(reply="가짜 원고입니다.").model('fake')
+    assert parse_manuscript(model.generate_content("프롬프트", generation_config=MANUSCRIPT_CONFIG).text) == \
+        ("가짜 원고입니다.", '')
+    assert model.generate_content("화자 분석").text == "가짜 원고입니다."
+
+    # JSON 모드로 기록한 응답은 그대로
+    recorded = manuscript_json("기록된 원고", "메모")
+    model = FakeClient(reply=recorded).model('fake')
+    assert model.generate_content("프롬프트", generation_config=MANUSCRIPT_CONFIG).text == recorded
+    print("✅ 가짜/재생 백엔드도 원고 JSON으로 응답")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("구조화 출력 테스트")
+    print("=" * 80)
+    test_parse_manuscript()
+    test_retry_once_on_invalid_output()
+    test_editor_writes_manuscript_only()
+    test_fake_backend_answers_in_schema()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""폴더 감시 데몬 테스트 - 가짜 Gemini 모델로 오프라인 실행"""
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+import openpyxl
+import pandas as pd
+
+from structured_output import manuscript_json
+from watch_daemon import STALE_SECONDS, WatchDaemon, create_watcher, InotifyWatcher, is_editor_workbook
+
+text = """# 갱년기홍조 관련해서 질문드려요
+
+갱년기홍조를 최근에 알게 되었는데, 효과가 있는지 궁금합니다.
+병원에서 상담 받았는데 부작용이 걱정돼요."""
+
+# 실제 편집 양식(블로그 작업_엑셀템플릿.xlsx, test.xlsx, 수정전후.xlsx)의 1행
+TEMPLATE_HEADER = ['날짜', '키워드', '글자수', '통키워드 반복수', '조각키워드 반복수', '서브키워드 목록 수', '원고']
+# 검색 최적화 양식(테스트데이터.xlsx, 작업 의뢰용 데이터.xlsx)의 1행 앞부분
+SEARCH_HEADER = ['날짜', '브랜드', '키워드', '아이디', '내 글 URL', '글자수(공백포함)', '통키워드 반복수',
+                 '조각키워드 반복수', '서브키워드 목록 수', '빈칸 스크린샷 수', '상대 제목', '제목', '원고']
+
+
+class FakeGeminiModel:
+    """가짜 Gemini 모델 (네트워크 없이 고정 응답)"""
+
+    def generate_content(self, prompt, generation_config=None):
+        if '화자' in prompt:
+            return SimpleNamespace(text="성별: 여성\n연령대: 50대\n상황: 갱년기 고민")
+        return SimpleNamespace(text=manuscript_json("갱년기홍조 때문에 고민이에요. 도움 되는 방법이 있을까요?" * 3))
+
+
+def fake_model_factory():
+    return FakeGeminiModel()
+
+
+def make_inbox_files(inbox):
+    with open(os.path.join(inbox, '원고.txt'), 'w', encoding='utf-8') as f:
+        f.write(text)
+
+    pd.DataFrame({'키워드': ['갱년기홍조'], '브랜드': ['브랜드A'], '원고': [text]}).to_excel(
+        os.path.join(inbox, '검색.xlsx'), index=False)
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(TEMPLATE_HEADER)
+    ws.append([1, '갱년기홍조', None, '갱년기홍조 : 2', '홍조 : 1', None, text, None, None, 500, 2, 3])
+    wb.save(os.path.join(inbox, '편집.xlsx'))
+
+    # 깨진 파일 → error 폴더
+    with open(os.path.join(inbox, '깨짐.xlsx'), 'w') as f:
+        f.write('엑셀 아님')
+
+    # 임시 파일은 무시
+    with open(os.path.join(inbox, '~$편집.xlsx'), 'w') as f:
+        f.write('')
+
+
+def run_daemon(use_processes):
+    root = tempfile.mkdtemp()
+    daemon = WatchDaemon(root, workers=2, use_ai=True, model_factory=fake_model_factory,
+                         poll_interval=0.1, settle_seconds=0, use_processes=use_processes)
+    make_inbox_files(daemon.dirs['inbox'])
+
+    stats = daemon.run(until_idle=True)
+
+    outbox = sorted(os.listdir(daemon.dirs['outbox']))
+    assert stats == {'done': 3, 'failed': 1}
+    assert '원고_최적화.txt' in outbox
+    assert '검색_검색최적화.xlsx' in outbox
+    assert '편집_수정완료.xlsx' in outbox
+    assert sorted(os.listdir(daemon.dirs['archive'])) == sorted(['원고.txt', '검색.xlsx', '편집.xlsx'])
+    assert '깨짐.xlsx' in os.listdir(daemon.dirs['error'])
+    assert '깨짐.xlsx.error.txt' in os.listdir(daemon.dirs['error'])
+    assert os.listdir(daemon.dirs['processing']) == []
+    assert os.listdir(daemon.dirs['inbox']) == ['~$편집.xlsx']
+
+    edited = openpyxl.load_workbook(os.path.join(daemon.dirs['outbox'], '편집_수정완료.xlsx')).active
+    assert edited.cell(2, 14).value.startswith('성별: 여성')
+    return daemon
+
+
+def test_daemon_threads():
+    run_daemon(use_processes=False)
+    print("✅ 스레드 풀: txt / 검색 엑셀 / 편집 엑셀 처리, 깨진 파일 error 이동")
+
+
+def test_daemon_processes():
+    run_daemon(use_processes=True)
+    print("✅ 프로세스 풀: 같은 결과")
+
+
+class StopAfterDispatch(WatchDaemon):
+    """첫 배정 직후 멈추는 데몬 (작업이 도는 중에 종료)"""
+
+    def dispatch(self, executor):
+        super().dispatch(executor)
+        self.stop()
+
+
+def test_stop_moves_failed_jobs_to_error():
+    root = tempfile.mkdtemp()
+    daemon = StopAfterDispatch(root, workers=2, poll_interval=0.1, settle_seconds=0)
+    with open(os.path.join(daemon.dirs['inbox'], '깨짐.xlsx'), 'w') as f:
+        f.write('엑셀 아님')
+    with open(os.path.join(daemon.dirs['inbox'], '원고.txt'), 'w', encoding='utf-8') as f:
+        f.write(text)
+
+    assert daemon.run() == {'done': 1, 'failed': 1}
+    assert os.listdir(daemon.dirs['processing']) == []
+    assert sorted(os.listdir(daemon.dirs['error'])) == ['깨짐.xlsx', '깨짐.xlsx.error.txt']
+    print("✅ 종료 중 실패한 작업도 error로 이동")
+
+
+def test_inotify_wakes_on_new_file():
+    inbox = tempfile.mkdtemp()
+    watcher = create_watcher(inbox)
+    if not isinstance(watcher, InotifyWatcher):
+        print("⚠️ inotify 사용 불가 - 건너뜀")
+        return
+
+    assert watcher.wait(0.05) is False
+
+    def drop_file():
+        time.sleep(0.1)
+        with open(os.path.join(inbox, 'new.txt'), 'w') as f:
+            f.write('x')
+
+    threading.Thread(target=drop_file).start()
+    started = time.time()
+    assert watcher.wait(5) is True
+    assert time.time() - started < 2
+    watcher.close()
+    print("✅ inotify: 새 파일 즉시 감지")
+
+
+def save_header(path, header):
+    wb = openpyxl.Workbook()
+    wb.active.append(header)
+    wb.save(path)
+    return path
+
+
+def test_editor_workbook_detection():
+    folder = tempfile.mkdtemp()
+    assert is_editor_workbook(save_header(os.path.join(folder, '편집.xlsx'), TEMPLATE_HEADER))
+    assert is_editor_workbook(save_header(os.path.join(folder, '수정전후.xlsx'), TEMPLATE_HEADER + ['최종 원고']))
+    assert not is_editor_workbook(save_header(os.path.join(folder, '검색.xlsx'), SEARCH_HEADER))
+    assert not is_editor_workbook(save_header(os.path.join(folder, '간단.xlsx'), ['키워드', '브랜드', '원고']))
+    assert not is_editor_workbook(save_header(os.path.join(folder, '브랜드.xlsx'), TEMPLATE_HEADER + ['브랜드']))
+
+    # 저장소에 있는 실제 양식으로도 확인
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name, expected in [('블로그 작업_엑셀템플릿.xlsx', True), ('test.xlsx', True), ('테스트데이터.xlsx', False)]:
+        if os.path.exists(os.path.join(here, name)):
+            assert is_editor_workbook(os.path.join(here, name)) is expected, name
+    print("✅ 편집 양식 판별: B열 키워드, D열 통키워드 반복수, G열 원고, 브랜드 없음")
+
+
+def dead_pid():
+    """이미 끝난 프로세스 번호"""
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def test_recover_only_dead_owners():
+    root = tempfile.mkdtemp()
+    daemon = WatchDaemon(root, settle_seconds=0)
+    host = socket.gethostname()
+    claims = {
+        f"{host}-{os.getppid()}": '살아있음.txt',  # 같은 컴퓨터, 도는 프로세스
+        f"{host}-{dead_pid()}": '멈춤.txt',  # 같은 컴퓨터, 끝난 프로세스
+        "다른컴퓨터-123": '원격.txt',  # 다른 컴퓨터, 하트비트 최근
+        "다른컴퓨터-456": '원격멈춤.txt',  # 다른 컴퓨터, 하트비트 끊김
+    }
+    for owner, name in claims.items():
+        os.makedirs(os.path.join(daemon.dirs['processing'], owner))
+        with open(os.path.join(daemon.dirs['processing'], owner, name), 'w', encoding='utf-8') as f:
+            f.write(text)
+    stale = time.time() - STALE_SECONDS - 1
+    os.utime(os.path.join(daemon.dirs['processing'], "다른컴퓨터-456"), (stale, stale))
+    # 데몬별 폴더가 없던 이전 버전의 파일
+    with open(os.path.join(daemon.dirs['processing'], '예전.txt'), 'w', encoding='utf-8') as f:
+        f.write(text)
+
+    daemon.recover()
+    assert sorted(os.listdir(daemon.dirs['inbox'])) == sorted(['멈춤.txt', '원격멈춤.txt', '예전.txt'])
+    assert sorted(os.listdir(daemon.dirs['processing'])) == sorted([f"{host}-{os.getppid()}", "다른컴퓨터-123"])
+    print("✅ 복구: 멈춘 데몬의 선점 파일만 inbox로 (살아 있는 데몬 것은 그대로)")
+
+
+def test_claim_is_exclusive():
+    root = tempfile.mkdtemp()
+    first = WatchDaemon(root, settle_seconds=0)
+    second = WatchDaemon(root, settle_seconds=0)
+    with open(os.path.join(first.dirs['inbox'], 'a.txt'), 'w') as f:
+        f.write(text)
+
+    assert first.claim('a.txt') is not None
+    assert second.claim('a.txt') is None
+    print("✅ 선점: 한 데몬만 가져감")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("폴더 감시 데몬 테스트")
+    print("=" * 80)
+    test_claim_is_exclusive()
+    test_editor_workbook_detection()
+    test_recover_only_dead_owners()
+    test_inotify_wakes_on_new_file()
+    test_stop_moves_failed_jobs_to_error()
+    test_daemon_threads()
+    test_daemon_processes()
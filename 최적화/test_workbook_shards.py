@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""엑셀 분할/병합 테스트 - 조각별로 처리한 결과가 한 번에 처리한 결과와 같은 순서/내용"""
+
+import os
+import random
+import shutil
+import tempfile
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from editor_engine import EditorEngine
+from search_optimizer import SearchOptimizer
+from test_incremental import make_editor_workbook, texts
+from test_job_queue import CountingModel
+from workbook_shards import load_shards, merge_shards, shard_workbook
+
+rows = [texts[0], None, texts[1], texts[2], texts[0] + " 추가 문장.", texts[1], None]
+
+
+def editor_values(path):
+    ws = openpyxl.load_workbook(path).active
+    return [[ws.cell(row_idx, column).value for column in range(1, 16)] for row_idx in range(2, len(rows) + 2)]
+
+
+def test_editor_shards_merge_in_order():
+    folder = tempfile.mkdtemp()
+    input_file = os.path.join(folder, '큰작업.xlsx')
+    make_editor_workbook(input_file, rows)
+    whole = os.path.join(folder, '한번에.xlsx')
+    shutil.copy(input_file, whole)
+
+    info_path = shard_workbook(input_file, 3)
+    info = load_shards(info_path)
+    assert [(shard['first_row'], shard['last_row']) for shard in info['shards']] == [(2, 3), (4, 5), (6, 8)]
+    assert info['total_rows'] == len(rows) and 12 not in info['key_columns']  # M열(결과)은 해시에서 제외
+
+    # 컴퓨터마다 조각 하나씩 (결과는 조각 파일에 덮어쓰기), 병합 순서는 섞어서
+    engine = EditorEngine(log=lambda message, color=None: None, ai_gate=False)
+    shard_files = [os.path.join(os.path.dirname(info_path), shard['file']) for shard in info['shards']]
+    for shard_file in shard_files:
+        engine.process_workbook(shard_file, CountingModel(), incremental=False)
+    engine.process_workbook(whole, CountingModel(), incremental=False)
+
+    random.Random(0).shuffle(shard_files)
+    merged = merge_shards(info_path, shard_files)
+    assert merged == os.path.join(folder, '큰작업_병합.xlsx')
+    assert editor_values(merged) == editor_values(whole)
+    print(f"✅ 편집용 양식 {len(rows)}행 → 조각 3개 → 원래 순서대로 병합 (한 번에 처리한 결과와 같음)")
+
+
+def test_search_shards_merge_in_order():
+    folder = tempfile.mkdtemp()
+    input_file = os.path.join(folder, '검색큰작업.xlsx')
+    texts_with_gap = [texts[0], texts[1], None, texts[2]]
+    pd.DataFrame({'키워드': ['갱년기홍조'] * 4, '브랜드': ['브랜드A'] * 4, '원고': texts_with_gap}).to_excel(
+        input_file, index=False)
+
+    info_path = shard_workbook(input_file, 2)
+    outputs = []
+    for shard in load_shards(info_path)['shards']:
+        shard_file = os.path.join(os.path.dirname(info_path), shard['file'])
+        outputs.append(SearchOptimizer().process_excel(shard_file))
+    whole = SearchOptimizer().process_excel(input_file)
+
+    merged = merge_shards(info_path, outputs, os.path.join(folder, '병합.xlsx'))
+    pd.testing.assert_frame_equal(pd.read_excel(merged), pd.read_excel(whole))
+    print("✅ 검색 최적화 양식: 조각별 process_excel 결과 병합 = 한 번에 처리")
+
+
+def test_merge_validates_every_row():
+    folder = tempfile.mkdtemp()
+    input_file = os.path.join(folder, '검증.xlsx')
+    make_editor_workbook(input_file, rows)
+    info_path = shard_workbook(input_file, 3)
+    shard_dir = os.path.dirname(info_path)
+    shard_files = [os.path.join(shard_dir, shard['file']) for shard in load_shards(info_path)['shards']]
+
+    # 조각 하나 빠짐
+    with pytest.raises(ValueError, match='part02of03.xlsx: 결과 파일 없음'):
+        merge_shards(info_path, [shard_files[0], shard_files[2]])
+
+    # 결과에서 행이 빠지거나 바뀜
+    wb = openpyxl.load_workbook(shard_files[2])
+    wb.active.cell(2, 7).value = '다른 원고'
+    wb.active.delete_rows(3)
+    wb.save(shard_files[2])
+    with pytest.raises(ValueError) as error:
+        merge_shards(info_path, shard_files)
+    assert '6행: 입력이 원본과 다름' in str(error.value) and '8행: 결과에 없음' in str(error.value)
+    assert not os.path.exists(os.path.join(folder, '검증_병합.xlsx'))
+    print(f"✅ 병합 검증: {str(error.value).splitlines()[1]}")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("엑셀 분할/병합 테스트")
+    print("=" * 80)
+    test_editor_shards_merge_in_order()
+    test_search_shards_merge_in_order()
+    test_merge_validates_every_row()
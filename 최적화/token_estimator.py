@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+로컬 토큰 수 추정 (API 호출 없이, 한국어 원고 기준)
+- 한글: 약 1.5글자당 1토큰 (Gemini 토크나이저에서 한글 음절은 대부분 1~2글자 단위로 쪼개짐)
+- 영문/숫자: 약 4글자당 1토큰
+- 공백은 앞뒤 글자에 붙음, 그 밖의 기호/문장부호는 글자당 1토큰
+- 실제 값과 ±15% 정도 차이 - 예산 맞추기/비용 추정용
+"""
+
+import math
+import re
+
+HANGUL_CHARS_PER_TOKEN = 1.5
+ASCII_CHARS_PER_TOKEN = 4.0
+
+HANGUL_RE = re.compile(r'[가-힣ㄱ-ㅎㅏ-ㅣ]')
+ASCII_RE = re.compile(r'[A-Za-z0-9]')
+SPACE_RE = re.compile(r'\s')
+
+
+def estimate_tokens(text) -> int:
+    """텍스트의 대략적인 토큰 수"""
+    if not text:
+        return 0
+    text = str(text)
+    hangul = len(HANGUL_RE.findall(text))
+    ascii_chars = len(ASCII_RE.findall(text))
+    spaces = len(SPACE_RE.findall(text))
+    other = len(text) - hangul - ascii_chars - spaces
+    return math.ceil(hangul / HANGUL_CHARS_PER_TOKEN + ascii_chars / ASCII_CHARS_PER_TOKEN + other)
+
+
+def estimate_output_tokens(chars) -> int:
+    """목표 글자수의 한국어 원고를 출력할 때 토큰 수 (원고는 약 80%가 한글, 나머지는 공백/문장부호)"""
+    return math.ceil(int(chars or 0) * 0.8 / HANGUL_CHARS_PER_TOKEN)
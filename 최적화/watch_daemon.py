@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+폴더 감시 데몬 (inbox → outbox)
+- inbox 폴더에 .xlsx / .txt 파일을 넣으면 자동 처리
+- inotify로 감시 (사용 불가 시 주기적 폴링)
+- processing/<컴퓨터-pid> 폴더로 이름 변경해서 원자적으로 선점 (데몬 여러 개 실행 가능)
+- 시작할 때 멈춘 데몬(프로세스 없음, 또는 하트비트 끊김)이 선점한 파일만 inbox로 복구
+- 금칙어/학습 예시를 미리 로딩한 워커 풀에서 처리
+- 결과는 outbox, 원본은 archive, 실패는 error 폴더로 이동
+- --queue를 주면 SQLite 작업 큐(job_queue)의 원고 수정 행도 함께 처리 (GUI/CLI 작업자와 나눠서)
+
+폴더 구조:
+    <root>/inbox       입력 파일
+    <root>/processing  처리 중 (데몬마다 <컴퓨터-pid> 폴더에 선점된 파일)
+    <root>/outbox      결과 파일
+    <root>/archive     처리 완료된 원본
+    <root>/error       실패한 원본 + <파일명>.error.txt
+
+사용법:
+    python watch_daemon.py --root 작업폴더 --workers 4
+    python watch_daemon.py --root 작업폴더 --ai --resources 원고자동화3
+    python watch_daemon.py --root 작업폴더 --ai --resources 원고자동화3 --queue 작업큐.db
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import shutil
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import wait
+
+import openpyxl
+
+from editor_engine import EditorEngine
+from hashing import DEFAULT_SEED
+from job_queue import JobQueue, run_workers
+from worker_pool import create_executor, get_worker, log
+
+SUPPORTED_EXTENSIONS = ('.xlsx', '.txt')
+FOLDERS = ('inbox', 'processing', 'outbox', 'archive', 'error')
+# 다른 컴퓨터의 데몬은 살아 있는지 알 수 없음 → 선점 폴더를 이 시간 넘게 갱신하지 않으면 멈춘 것으로 봄
+STALE_SECONDS = 600.0
+
+
+def is_supported(name: str) -> bool:
+    """처리 대상 파일 이름 여부 (숨김/엑셀 임시 파일 제외)"""
+    return not name.startswith(('.', '~$')) and name.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+# ─────────────────────────────────────────────────────────────
+# 폴더 감시
+# ─────────────────────────────────────────────────────────────
+
+class PollingWatcher:
+    """주기적 폴링 (inotify 사용 불가 시)"""
+
+    def wait(self, timeout: float) -> bool:
+        time.sleep(timeout)
+        return True
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify 감시 (파일 쓰기 완료 / 이동됨 이벤트)"""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+
+    def __init__(self, path: str):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 실패')
+
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO
+        if libc.inotify_add_watch(self.fd, os.fsencode(path), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f'inotify_add_watch 실패: {path}')
+
+    def wait(self, timeout: float) -> bool:
+        """이벤트가 오거나 timeout까지 대기 (이벤트 여부 반환)"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+
+        # 이벤트 내용은 쓰지 않음 (깨어나면 inbox 전체를 다시 훑음)
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+def create_watcher(path: str, use_inotify: bool = True):
+    """inotify 감시 생성 (실패 시 폴링)"""
+    if use_inotify:
+        try:
+            watcher = InotifyWatcher(path)
+            log("👀 inotify로 inbox 감시")
+            return watcher
+        except (OSError, AttributeError) as e:
+            log(f"⚠️ inotify 사용 불가 → 폴링으로 대체 ({e})")
+    return PollingWatcher()
+
+
+# ─────────────────────────────────────────────────────────────
+# 워커 작업
+# ─────────────────────────────────────────────────────────────
+
+# 편집용 양식의 열 위치 (EditorEngine이 읽는 열) → 헤더 이름
+EDITOR_HEADER = {
+    EditorEngine.INPUT_COLUMNS['keyword']: '키워드',  # B열
+    EditorEngine.INPUT_COLUMNS['main_keyword_count']: '통키워드 반복수',  # D열
+    EditorEngine.INPUT_COLUMNS['original']: '원고',  # G열
+}
+
+
+def is_editor_workbook(path: str) -> bool:
+    """편집용 양식 여부 - B열 키워드, D열 통키워드 반복수, G열 원고이고 브랜드 열이 없음 (그 밖은 검색 최적화 양식)"""
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        header = next(wb.active.iter_rows(min_row=1, max_row=1, values_only=True), ())
+    finally:
+        wb.close()
+    header = ['' if value is None else str(value).strip() for value in header]
+    if '브랜드' in header:
+        return False
+    return all(col <= len(header) and header[col - 1] == name for col, name in EDITOR_HEADER.items())
+
+
+def process_job(path: str, outbox: str) -> list:
+    """
+    파일 하나 처리 (워커에서 실행)
+
+    Returns:
+        생성된 결과 파일 경로 리스트
+    """
+    worker = get_worker()
+    optimizer = worker['optimizer']
+    stem, ext = os.path.splitext(os.path.basename(path))
+
+    if ext == '.txt':
+        with open(path, 'r', encoding='utf-8') as f:
+            original_text = f.read()
+
+        keyword = optimizer.extract_keyword(original_text) or "키워드"
+        result = optimizer.optimize_for_search(original_text, keyword)
+
+        output_file = os.path.join(outbox, f"{stem}_최적화.txt")
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(optimizer.format_txt_report(keyword, result))
+        return [output_file]
+
+    if not is_editor_workbook(path):
+        output_file = os.path.join(outbox, f"{stem}_검색최적화.xlsx")
+        optimizer.process_excel(path, output_file)
+        return [output_file]
+
+    model = worker['editor_model']
+    if model is None:
+        raise ValueError("편집용 엑셀은 AI 모델이 필요합니다 (--ai 와 API 키 설정)")
+
+    output_file = os.path.join(outbox, f"{stem}_수정완료.xlsx")
+    worker['engine'].process_workbook(path, model, output_file=output_file)
+    return [output_file]
+
+
+# ─────────────────────────────────────────────────────────────
+# 데몬
+# ─────────────────────────────────────────────────────────────
+
+class WatchDaemon:
+    """inbox 감시 + 워커 풀 처리"""
+
+    def __init__(self, root, workers=2, use_ai=False, api_key=None, seed=DEFAULT_SEED,
+                 resources_dir=None, model_factory=None, poll_interval=2.0, settle_seconds=1.0,
+                 use_processes=True, use_inotify=True, queue_db=None, queue_threads=2):
+        """
+        초기화
+
+        Args:
+            root: 작업 폴더 (inbox/processing/outbox/archive/error 자동 생성)
+            workers: 워커 수
+            use_ai: AI 재구성 사용 여부
+            api_key: Gemini API 키 (없으면 환경변수 GEMINI_API_KEY)
+            seed: 실행 시드
+            resources_dir: 편집용 금칙어/학습 예시 폴더
+            model_factory: 모델 생성 함수 (테스트용 가짜 모델 등, 프로세스 풀이면 pickle 가능해야 함)
+            poll_interval: 감시 대기 간격 (초)
+            settle_seconds: 마지막 수정 후 이 시간이 지난 파일만 선점 (쓰는 중인 파일 보호)
+            use_processes: True면 프로세스 풀, False면 스레드 풀
+            use_inotify: False면 항상 폴링
+            queue_db: 작업 큐 SQLite 파일 (주면 큐의 원고 수정 행도 처리)
+            queue_threads: 작업 큐 작업자 스레드 수
+        """
+        self.dirs = {name: os.path.join(root, name) for name in FOLDERS}
+        for path in self.dirs.values():
+            os.makedirs(path, exist_ok=True)
+        # 이 데몬이 선점한 파일 폴더 (다른 데몬의 처리 중 파일과 섞이지 않게)
+        self.owner = f"{socket.gethostname()}-{os.getpid()}"
+        self.claim_dir = os.path.join(self.dirs['processing'], self.owner)
+
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.use_processes = use_processes
+        self.use_inotify = use_inotify
+        self.queue_db = queue_db
+        self.queue_threads = queue_threads
+        self.config = {
+            'use_ai': use_ai,
+            'api_key': api_key or os.getenv('GEMINI_API_KEY'),
+            'seed': seed,
+            'resources_dir': resources_dir,
+            'model_factory': model_factory,
+        }
+
+        self.stop_event = threading.Event()
+        self.pending = {}  # future → 선점한 파일 경로
+        self.stats = {'done': 0, 'failed': 0}
+
+    def owner_alive(self, owner: str, path: str) -> bool:
+        """선점 폴더 주인 데몬이 아직 도는지 (같은 컴퓨터면 프로세스 확인, 아니면 하트비트)"""
+        host, _, pid = owner.rpartition('-')
+        if host == socket.gethostname() and pid.isdigit() and os.name == 'posix':
+            if int(pid) == os.getpid():
+                return False  # 같은 pid를 쓰던 이전 실행
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                return False
+            except PermissionError:
+                pass
+            return True
+        return time.time() - os.path.getmtime(path) < STALE_SECONDS
+
+    def recover(self):
+        """멈춘 데몬이 처리 중이던 파일을 inbox로 되돌림 (살아 있는 데몬의 선점 파일은 그대로)"""
+        for owner in os.listdir(self.dirs['processing']):
+            path = os.path.join(self.dirs['processing'], owner)
+            if not os.path.isdir(path):
+                # 데몬별 폴더가 없던 이전 버전이 남긴 파일
+                os.replace(path, os.path.join(self.dirs['inbox'], owner))
+                log(f"↩️ 미완료 파일 복구: {owner}")
+                continue
+            if self.owner_alive(owner, path):
+                continue
+            for name in os.listdir(path):
+                os.replace(os.path.join(path, name), os.path.join(self.dirs['inbox'], name))
+                log(f"↩️ 미완료 파일 복구: {name} ({owner})")
+            os.rmdir(path)
+
+    def heartbeat(self):
+        """선점 폴더 시각 갱신 (다른 컴퓨터의 데몬이 멈춘 것으로 보지 않게)"""
+        os.makedirs(self.claim_dir, exist_ok=True)
+        os.utime(self.claim_dir)
+
+    def is_candidate(self, name: str) -> bool:
+        """처리 대상 파일 여부 (임시/숨김 파일 제외, 쓰기 끝난 파일만)"""
+        if not is_supported(name):
+            return False
+        try:
+            age = time.time() - os.path.getmtime(os.path.join(self.dirs['inbox'], name))
+        except OSError:
+            return False
+        return age >= self.settle_seconds
+
+    def claim(self, name: str):
+        """inbox → processing/<컴퓨터-pid> 이름 변경으로 선점 (다른 데몬이 먼저 가져가면 None)"""
+        os.makedirs(self.claim_dir, exist_ok=True)
+        claimed = os.path.join(self.claim_dir, name)
+        try:
+            os.rename(os.path.join(self.dirs['inbox'], name), claimed)
+        except FileNotFoundError:
+            return None
+        return claimed
+
+    def dispatch(self, executor):
+        """inbox의 파일을 선점해서 워커에 배정 (대기 작업은 워커 수의 2배까지)"""
+        for name in sorted(os.listdir(self.dirs['inbox'])):
+            if len(self.pending) >= self.workers * 2:
+                break
+            if not self.is_candidate(name):
+                continue
+
+            claimed = self.claim(name)
+            if claimed:
+                log(f"📥 선점: {name}")
+                self.pending[executor.submit(process_job, claimed, self.dirs['outbox'])] = claimed
+
+    def collect(self):
+        """완료된 작업 정리 (원본 → archive / error)"""
+        for future in [f for f in self.pending if f.done()]:
+            claimed = self.pending.pop(future)
+            name = os.path.basename(claimed)
+            try:
+                outputs = future.result()
+            except Exception as e:
+                shutil.move(claimed, os.path.join(self.dirs['error'], name))
+                with open(os.path.join(self.dirs['error'], name + '.error.txt'), 'w', encoding='utf-8') as f:
+                    f.write(''.join(traceback.format_exception(type(e), e, e.__traceback__)))
+                self.stats['failed'] += 1
+                log(f"❌ 실패: {name} ({e})")
+            else:
+                shutil.move(claimed, os.path.join(self.dirs['archive'], name))
+                self.stats['done'] += 1
+                log(f"✅ 완료: {name} → {', '.join(os.path.basename(p) for p in outputs)}")
+
+    def start_queue_workers(self):
+        """작업 큐 작업자 스레드 시작 (데몬이 멈출 때까지) → (엔진, 스레드)"""
+        engine = EditorEngine(log=lambda message, color=None: log(message.strip()), concurrency=self.queue_threads)
+        if self.config['resources_dir']:
+            engine.load_resources(self.config['resources_dir'])
+        factory = self.config['model_factory']
+        model = factory() if factory else engine.create_model(self.config['api_key'])
+        self.job_queue = JobQueue(self.queue_db)
+        self.queue_fingerprint = engine.version_fingerprint()
+        thread = threading.Thread(target=run_workers, args=(self.job_queue, engine, model, self.queue_threads),
+                                  kwargs={'until_idle': False}, daemon=True)
+        thread.start()
+        log(f"📋 작업 큐 작업자 {self.queue_threads}개: {self.queue_db}")
+        return engine, thread
+
+    def run(self, until_idle=False):
+        """
+        감시 시작
+
+        Args:
+            until_idle: True면 inbox와 대기 작업이 모두 비면 종료 (테스트/일회성 실행용)
+        """
+        self.recover()
+        watcher = create_watcher(self.dirs['inbox'], self.use_inotify)
+        log(f"🚀 데몬 시작 (워커 {self.workers}개): {self.dirs['inbox']}")
+        queue_workers = self.start_queue_workers() if self.queue_db else None
+
+        with create_executor(self.config, self.workers, self.use_processes) as executor:
+            try:
+                while not self.stop_event.is_set():
+                    self.heartbeat()
+                    self.dispatch(executor)
+                    self.collect()
+
+                    if until_idle and not self.pending and \
+                            not any(is_supported(name) for name in os.listdir(self.dirs['inbox'])) and \
+                            not (queue_workers and self.job_queue.outstanding(self.queue_fingerprint)):
+                        break
+
+                    # 작업 중이면 짧게, 한가하면 이벤트/폴링 간격만큼 대기
+                    watcher.wait(0.1 if self.pending else self.poll_interval)
+            finally:
+                watcher.close()
+                if queue_workers:
+                    # 진행 중인 행은 큐에 돌려놓고 종료 (다른 작업자가 이어서)
+                    queue_workers[0].control.cancel()
+                    queue_workers[1].join()
+                # 실패한 작업도 기다린 뒤 collect에서 error로 옮김 (첫 실패에서 멈추지 않게)
+                wait(list(self.pending))
+                self.collect()
+                if os.path.isdir(self.claim_dir) and not os.listdir(self.claim_dir):
+                    os.rmdir(self.claim_dir)
+
+        log(f"🛑 데몬 종료 (완료 {self.stats['done']}개, 실패 {self.stats['failed']}개)")
+        return self.stats
+
+    def stop(self):
+        """감시 중지 (진행 중인 작업은 마무리)"""
+        self.stop_event.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="블로그 원고 폴더 감시 데몬")
+    parser.add_argument('--root', required=True, help="작업 폴더 (inbox/outbox/error 등 자동 생성)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="워커 수")
+    parser.add_argument('--ai', action='store_true', help="AI 재구성/편집 사용 (GEMINI_API_KEY 필요)")
+    parser.add_argument('--resources', help="편집용 금칙어_리스트.xlsx, 수정전후.xlsx 등이 있는 폴더")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="실행 시드")
+    parser.add_argument('--poll', type=float, default=2.0, help="폴링 간격 (초)")
+    parser.add_argument('--threads', action='store_true', help="프로세스 대신 스레드 풀 사용")
+    parser.add_argument('--no-inotify', action='store_true', help="inotify 대신 폴링만 사용")
+    parser.add_argument('--queue', help="작업 큐 SQLite 파일 (원고 수정 행도 함께 처리, --ai 필요)")
+    parser.add_argument('--queue-threads', type=int, default=2, help="작업 큐 작업자 스레드 수")
+    args = parser.parse_args()
+
+    daemon = WatchDaemon(
+        args.root,
+        workers=args.workers,
+        use_ai=args.ai,
+        seed=args.seed,
+        resources_dir=args.resources,
+        poll_interval=args.poll,
+        use_processes=not args.threads,
+        use_inotify=not args.no_inotify,
+        queue_db=args.queue,
+        queue_threads=args.queue_threads,
+    )
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        log("⏹️ 중지 요청 - 진행 중인 작업 마무리")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+엑셀 분할/병합 (큰 작업을 여러 컴퓨터에 나눠 처리)
+- shard: 입력 엑셀을 N개의 연속된 행 구간으로 나눔 (헤더와 열 배치 그대로)
+  - 편집용 양식(B, D, E, G, J, K, L → M, N, O)과 검색 최적화 양식(process_excel, 결과 열은 뒤에 추가) 모두
+  - 분할 정보(<입력>.shards.json)에 조각마다 원래 행 번호와 행별 입력 해시 기록 (결과 열을 뺀 입력 열 전체)
+- merge: 조각별 결과 파일을 원래 행 순서대로 합침
+  - 결과 파일은 순서 상관없이 입력 해시로 조각을 찾음
+  - 모든 행이 있는지, 입력이 그대로인지 검증 (빠졌거나 다른 행이 있으면 합치지 않음)
+
+사용법:
+    python workbook_shards.py shard 작업.xlsx --shards 4              # → 작업_shards/작업_part01of04.xlsx ...
+    (각 컴퓨터에서 조각 처리 - 예: watch_daemon.py inbox에 넣기 → outbox/작업_part01of04_수정완료.xlsx)
+    python workbook_shards.py merge 작업_shards/작업.shards.json 결과폴더/*.xlsx --output 작업_결과.xlsx
+"""
+
+import argparse
+import json
+import os
+from typing import Dict, List, Optional
+
+import openpyxl
+
+from editor_engine import EditorEngine
+from hashing import content_hash
+from search_optimizer import SearchOptimizer
+
+SHARDS_SUFFIX = '.shards.json'
+SHARDS_VERSION = 1
+
+# 처리하면 채워지는 열 - 입력 해시에서 제외 (편집: M, N, O열 / 검색 최적화: 헤더 이름)
+EDITOR_OUTPUT_COLUMNS = (EditorEngine.EDITED_COLUMN, EditorEngine.SPEAKER_COLUMN, EditorEngine.GATE_COLUMN)
+
+# 병합 오류 메시지에 보여줄 최대 행 수
+MAX_REPORTED = 10
+
+
+def cell_text(value):
+    """해시용 셀 값 (pandas로 저장하면 정수가 3.0이 되는 것 통일)"""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def key_positions(header) -> List[int]:
+    """행 입력 해시에 쓰는 열 위치 (0부터, 원본 헤더 기준 - 결과 열 제외)"""
+    return [i for i, name in enumerate(header)
+            if i + 1 not in EDITOR_OUTPUT_COLUMNS and str(name).strip() not in SearchOptimizer.OUTPUT_COLUMNS]
+
+
+def row_key(row, positions: List[int]) -> str:
+    """행 입력 해시 (앞 16자리)"""
+    return content_hash(*(cell_text(row[i]) if i < len(row) else None for i in positions))[:16]
+
+
+def read_rows(path: str):
+    """(헤더, 데이터 행 리스트) - 끝쪽의 빈 행은 제외"""
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        rows = list(wb.active.iter_rows(values_only=True))
+    finally:
+        wb.close()
+    header, data = (list(rows[0]) if rows else []), [list(row) for row in rows[1:]]
+    while data and all(value is None for value in data[-1]):
+        data.pop()
+    return header, data
+
+
+def write_rows(path: str, header, rows):
+    """헤더 + 행 저장"""
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(header)
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def shard_workbook(input_file: str, shards: int, out_dir: Optional[str] = None) -> str:
+    """
+    입력 엑셀을 연속된 행 구간 N개로 분할
+
+    Args:
+        shards: 조각 수 (행 수보다 많으면 행 수만큼)
+        out_dir: 조각 저장 폴더 (없으면 <입력>_shards)
+
+    Returns:
+        분할 정보 파일 경로 (<입력 이름>.shards.json)
+    """
+    stem = os.path.splitext(os.path.basename(input_file))[0]
+    out_dir = out_dir or os.path.join(os.path.dirname(os.path.abspath(input_file)), f"{stem}_shards")
+    os.makedirs(out_dir, exist_ok=True)
+
+    header, rows = read_rows(input_file)
+    if not rows:
+        raise ValueError(f"데이터 행이 없습니다: {input_file}")
+    positions = key_positions(header)
+    count = max(1, min(shards, len(rows)))
+
+    pieces = []
+    for index in range(count):
+        start, end = len(rows) * index // count, len(rows) * (index + 1) // count
+        name = f"{stem}_part{index + 1:02d}of{count:02d}.xlsx"
+        write_rows(os.path.join(out_dir, name), header, rows[start:end])
+        pieces.append({
+            'file': name,
+            'first_row': start + 2,  # 원본 엑셀 행 번호 (헤더가 1행)
+            'last_row': end + 1,
+            'row_keys': [row_key(row, positions) for row in rows[start:end]],
+        })
+
+    info_path = os.path.join(out_dir, stem + SHARDS_SUFFIX)
+    with open(info_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': SHARDS_VERSION, 'source': os.path.abspath(input_file), 'key_columns': positions,
+                   'total_rows': len(rows), 'shards': pieces}, f, ensure_ascii=False, indent=1)
+    return info_path
+
+
+def load_shards(info_path: str) -> dict:
+    """분할 정보 읽기"""
+    with open(info_path, 'r', encoding='utf-8') as f:
+        info = json.load(f)
+    if info.get('version') != SHARDS_VERSION:
+        raise ValueError(f"분할 정보 버전이 다릅니다: {info.get('version')} (지원: {SHARDS_VERSION})")
+    return info
+
+
+def empty_key(positions: List[int]) -> str:
+    """빈 행의 입력 해시"""
+    return row_key([], positions)
+
+
+def match_output(shard: dict, positions: List[int], outputs: Dict[str, tuple]) -> Optional[str]:
+    """조각의 결과 파일 찾기 - 첫 번째 빈 행이 아닌 행의 입력 해시가 같은 파일"""
+    stem = os.path.splitext(shard['file'])[0]
+    blank = empty_key(positions)
+    offset = next((i for i, key in enumerate(shard['row_keys']) if key != blank), None)
+    by_content, by_name = [], []
+    for path, (_, rows) in outputs.items():
+        if offset is not None and offset < len(rows) and \
+                row_key(rows[offset], positions) == shard['row_keys'][offset]:
+            by_content.append(path)
+        if os.path.basename(path).startswith(stem):
+            by_name.append(path)
+
+    # 입력 해시가 맞는 파일 → 없으면 이름으로 (행별 검증에서 다른 점을 알려줌)
+    # 이름이 조각 이름으로 시작하는 파일 우선, 처리 전 조각 파일 그대로는 마지막 (편집 엔진은 제자리에 저장)
+    candidates = by_content or by_name
+    candidates.sort(key=lambda path: (path not in by_name, os.path.basename(path) == shard['file']))
+    return (candidates or [None])[0]
+
+
+def check_rows(shard: dict, rows: List[list], positions: List[int]) -> List[str]:
+    """조각 결과가 원래 행을 순서대로 모두 가졌는지 → 문제 목록 (원래 행 번호로)"""
+    problems = []
+    expected = shard['row_keys']
+    # 조각 끝의 빈 행은 결과 파일에 없어도 됨 (pandas로 저장하면 빠짐)
+    blank = empty_key(positions)
+    required = len(expected)
+    while required > len(rows) and expected[required - 1] == blank:
+        required -= 1
+
+    for offset, key in enumerate(expected[:required]):
+        row_number = shard['first_row'] + offset
+        if offset >= len(rows):
+            problems.append(f"{row_number}행: 결과에 없음")
+        elif row_key(rows[offset], positions) != key:
+            problems.append(f"{row_number}행: 입력이 원본과 다름 (순서가 바뀌었거나 다른 파일)")
+    if len(rows) > len(expected):
+        problems.append(f"{shard['file']}: 원본보다 {len(rows) - len(expected)}행 많음")
+    return problems
+
+
+def merge_shards(info_path: str, output_files: List[str], output_file: Optional[str] = None) -> str:
+    """
+    조각별 결과 파일을 원래 행 순서대로 병합 (모든 행 검증 후 저장)
+
+    Args:
+        info_path: shard_workbook이 만든 분할 정보 파일
+        output_files: 조각별 결과 파일 (순서 상관없음, 관계없는 파일은 무시)
+        output_file: 병합 결과 (없으면 <원본>_병합.xlsx)
+
+    Returns:
+        병합 결과 파일 경로
+
+    Raises:
+        ValueError: 빠진 조각/행, 원본과 다른 행, 조각마다 다른 열 구성
+    """
+    info = load_shards(info_path)
+    positions = info['key_columns']
+    outputs = {path: read_rows(path) for path in output_files}
+
+    header, merged, problems = None, [], []
+    for shard in info['shards']:
+        path = match_output(shard, positions, outputs)
+        if path is None:
+            problems.append(f"{shard['file']}: 결과 파일 없음 ({shard['first_row']}~{shard['last_row']}행)")
+            continue
+        shard_header, rows = outputs.pop(path)
+        if header is None:
+            header = shard_header
+        elif shard_header != header:
+            problems.append(f"{os.path.basename(path)}: 열 구성이 다른 조각과 다름")
+            continue
+        problems.extend(check_rows(shard, rows, positions))
+        merged.extend(rows)
+        merged.extend([[None] * len(header)] * (len(shard['row_keys']) - len(rows)))  # 끝쪽 빈 행 복원
+
+    if problems:
+        shown = problems[:MAX_REPORTED]
+        more = f"\n... 외 {len(problems) - MAX_REPORTED}건" if len(problems) > MAX_REPORTED else ""
+        raise ValueError("병합할 수 없습니다:\n" + "\n".join(shown) + more)
+
+    if output_file is None:
+        source_stem = os.path.splitext(info['source'])[0]
+        output_file = f"{source_stem}_병합.xlsx"
+    write_rows(output_file, header, merged)
+    return output_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="엑셀 분할/병합 (여러 컴퓨터에 나눠 처리)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    shard_parser = subparsers.add_parser('shard', help="입력 엑셀을 행 구간 N개로 분할")
+    shard_parser.add_argument('input', help="입력 엑셀 파일")
+    shard_parser.add_argument('--shards', type=int, required=True, help="조각 수")
+    shard_parser.add_argument('--out-dir', help="조각 저장 폴더 (기본: <입력>_shards)")
+
+    merge_parser = subparsers.add_parser('merge', help="조각별 결과를 원래 순서대로 병합")
+    merge_parser.add_argument('info', help="분할 정보 파일 (<입력>.shards.json)")
+    merge_parser.add_argument('outputs', nargs='+', help="조각별 결과 엑셀 (순서 상관없음)")
+    merge_parser.add_argument('--output', help="병합 결과 파일 (기본: <원본>_병합.xlsx)")
+    args = parser.parse_args()
+
+    if args.command == 'shard':
+        info_path = shard_workbook(args.input, args.shards, args.out_dir)
+        info = load_shards(info_path)
+        for shard in info['shards']:
+            print(f"✂️ {shard['file']}: {shard['first_row']}~{shard['last_row']}행 ({len(shard['row_keys'])}행)")
+        print(f"📋 분할 정보: {info_path}")
+    else:
+        try:
+            output_file = merge_shards(args.info, args.outputs, args.output)
+        except ValueError as e:
+            parser.exit(1, f"❌ {e}\n")
+        print(f"✅ 병합 완료 (모든 행 확인): {output_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+워커 풀 (데몬 / HTTP 서버 공용)
+- 워커마다 금칙어/학습 예시를 한 번만 로딩해서 재사용
+- 프로세스 풀 또는 스레드 풀
+- 워커에서 실행할 작업 함수 (pickle 가능한 모듈 함수)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+from editor_engine import EditorEngine
+from hashing import DEFAULT_SEED
+from search_optimizer import SearchOptimizer
+
+# 워커별 상태 (프로세스마다 하나, 스레드 풀은 공유)
+_worker = {}
+
+
+def log(message):
+    """로그 출력"""
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    print(f"[{timestamp}] [{os.getpid()}] {message}", flush=True)
+
+
+def init_worker(config: dict):
+    """
+    워커 초기화 - 옵티마이저, 편집 엔진, 모델 미리 준비
+
+    config 키:
+        use_ai: AI 재구성 사용 여부
+        api_key: Gemini API 키
+        seed: 실행 시드
+        resources_dir: 편집용 금칙어/학습 예시 폴더
+        model_factory: 모델 생성 함수 (테스트용 가짜 모델 등)
+        ai_output_mode: AI 재구성 출력 모드 ('full' / 'edits')
+        parallel_groups: 긴 원고 문단 병렬 재구성/수정 묶음 수 (0이면 사용 안 함)
+        adaptive: AI 동시 요청 수 자동 조절 (429/시간 초과/지연 급증이면 줄임)
+        local_speaker: 화자 정보 로컬 판정 (신뢰도가 낮은 원고만 AI 화자 분석)
+    """
+    model = config['model_factory']() if config.get('model_factory') else None
+
+    use_ai = config.get('use_ai', False)
+    optimizer = SearchOptimizer(
+        use_ai=use_ai,
+        gemini_api_key=config.get('api_key'),
+        seed=config.get('seed', DEFAULT_SEED),
+        ai_model=model,
+        ai_output_mode=config.get('ai_output_mode', 'full'),
+        ai_parallel_groups=config.get('parallel_groups', 0),
+        ai_adaptive=config.get('adaptive', False),
+    )
+
+    engine = EditorEngine(log=lambda message, color=None: log(message.strip()),
+                          parallel_groups=config.get('parallel_groups', 0), adaptive=config.get('adaptive', False),
+                          local_speaker=config.get('local_speaker', False))
+    resources_dir = config.get('resources_dir')
+    if resources_dir:
+        engine.load_resources(resources_dir)
+
+    editor_model = model
+    if editor_model is None and use_ai and config.get('api_key'):
+        editor_model = engine.create_model(config['api_key'])
+
+    _worker.update(optimizer=optimizer, engine=engine, editor_model=editor_model)
+
+
+def get_worker() -> dict:
+    """현재 워커 상태 (optimizer, engine, editor_model)"""
+    return _worker
+
+
+def create_executor(config: dict, workers: int, use_processes: bool = True):
+    """워커 풀 생성 (프로세스마다 금칙어/학습 예시 미리 로딩)"""
+    if use_processes:
+        return ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(config,))
+
+    # 스레드 풀: 한 번만 로딩해서 공유
+    init_worker(config)
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def ping() -> int:
+    """워커 준비 확인 (예열용)"""
+    return os.getpid()
+
+
+def warm_up(executor, workers: int):
+    """모든 워커를 미리 띄워서 첫 요청 지연 제거"""
+    futures = [executor.submit(ping) for _ in range(workers)]
+    return sorted({future.result() for future in futures})
+
+
+# ─────────────────────────────────────────────────────────────
+# 워커 작업
+# ─────────────────────────────────────────────────────────────
+
+def optimize_document(text: str, keyword: str, brand: str = '') -> dict:
+    """원고 한 건 검색 최적화"""
+    return _worker['optimizer'].optimize_for_search(text, keyword, brand)
+
+
+def rewrite_document(text: str, keyword: str) -> str:
+    """원고 한 건 AI 재구성 (AI 미사용 설정이면 ValueError)"""
+    rewriter = _worker['optimizer'].ai_rewriter
+    if rewriter is None:
+        raise ValueError("AI 재구성이 비활성화되어 있습니다 (--ai 와 API 키 설정)")
+    return rewriter.rewrite(text, keyword)